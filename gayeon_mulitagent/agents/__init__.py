@@ -1,5 +1,8 @@
 """
-이광수 친일 챗봇 멀티 에이전트 시스템
+이광수 친일 챗봇 멀티 에이전트 시스템 (Ollama 버전)
+
+에이전트 구현은 agents_2 하나뿐이고, 이 패키지는 Ollama 백엔드를 기본으로 쓰도록
+설정만 바꾼 얇은 호환 계층이다 (기존 `from agents import ...` 코드용).
 """
 
 from .style_agent import StyleAgent
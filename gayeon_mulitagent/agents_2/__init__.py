@@ -1,15 +1,33 @@
 """
 이광수 친일 챗봇 멀티 에이전트 시스템 (Gemini 2.5 Flash API 버전)
+
+에이전트 모듈은 google.genai / LangChain / Chroma를 끌어오므로,
+패키지 임포트만으로는 불러오지 않고 처음 사용할 때 임포트한다.
 """
+import importlib
 
-from .style_agent import StyleAgent
-from .validator_agent import ValidatorAgent
-from .knowledge_agent import KnowledgeAgent
-from .orchestrator import MultiAgentOrchestrator
+_LAZY_EXPORTS = {
+    "StyleAgent": ".style_agent",
+    "ValidatorAgent": ".validator_agent",
+    "KnowledgeAgent": ".knowledge_agent",
+    "MultiAgentOrchestrator": ".orchestrator",
+}
 
 __all__ = [
     "StyleAgent",
-    "ValidatorAgent", 
+    "ValidatorAgent",
     "KnowledgeAgent",
     "MultiAgentOrchestrator"
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
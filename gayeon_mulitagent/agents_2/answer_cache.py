@@ -0,0 +1,173 @@
+"""
+자주 묻는 질문의 답변 캐시
+
+prewarm_cache.py가 지난 대화 로그의 질문을 임베딩으로 묶어, 빈도가 높은 묶음마다 검증을 통과한
+대표 답변을 만들어 JSON 파일로 저장한다. 서버는 시작할 때 이 파일을 읽고, 들어온 질문이
+
+- 묶음에 속했던 질문 문장과 (공백/문장부호를 빼고) 똑같으면 임베딩 없이 바로,
+- 아니면 질문 임베딩과 묶음 중심 벡터의 코사인 유사도가 임계값 이상이면
+
+파이프라인을 거치지 않고 캐시된 답변을 돌려준다.
+
+파일 형식:
+  {"version": 1, "embedding_model": str, "created_at": str, "similarity": float,
+   "entries": [{"id", "question", "variants", "count", "vector", "answer",
+                "validation_score", "validation_details", "knowledge_sources", "created_at"}, ...]}
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+_IGNORED = re.compile(r"[\s\.,!?~…·'\"“”‘’()\[\]]+")
+
+
+def normalize_query(query: str) -> str:
+    """완전 일치 비교용 질문 정규화 (공백/문장부호 제거, 소문자)"""
+    return _IGNORED.sub("", query).lower()
+
+
+class AnswerCache:
+    """대표 답변 캐시 (읽기 전용 항목 + 스레드 안전한 적중 카운터)"""
+
+    def __init__(self, entries: List[Dict[str, Any]], embedding_model: Optional[str] = None,
+                 similarity: Optional[float] = None, path: Optional[str] = None):
+        """
+        Args:
+            entries: 캐시 항목 (파일 형식 참고)
+            embedding_model: 중심 벡터를 만든 임베딩 모델 (다른 모델의 질문 벡터와는 비교하지 않음)
+            similarity: 의미 일치 임계값 (None이면 환경변수 ANSWER_CACHE_SIMILARITY, 기본 0.9)
+            path: 불러온 파일 경로 (상태 표시용)
+        """
+        if similarity is None:
+            similarity = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.9"))
+        self.entries = entries
+        self.embedding_model = embedding_model
+        self.similarity = similarity
+        self.path = path
+        self._exact: Dict[str, int] = {}
+        for index, entry in enumerate(entries):
+            for variant in [entry["question"], *entry.get("variants", [])]:
+                self._exact.setdefault(normalize_query(variant), index)
+        vectors = [entry.get("vector") for entry in entries]
+        if entries and all(v is not None for v in vectors):
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._matrix = matrix / np.where(norms == 0, 1.0, norms)
+        else:
+            self._matrix = None
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "similar": 0}
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str, similarity: Optional[float] = None) -> "AnswerCache":
+        """
+        캐시 파일 불러오기
+
+        Args:
+            similarity: 의미 일치 임계값 (None이면 환경변수 ANSWER_CACHE_SIMILARITY, 없으면 파일에 저장된 값)
+
+        Raises:
+            ValueError: 형식이나 버전이 맞지 않는 경우
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CACHE_VERSION or not isinstance(data.get("entries"), list):
+            raise ValueError(f"답변 캐시 형식이 올바르지 않습니다: {path}")
+        if similarity is None and not os.getenv("ANSWER_CACHE_SIMILARITY"):
+            # 환경변수로 덮어쓰지 않았으면 캐시를 만들 때 묶음 기준으로 쓴 유사도
+            similarity = data.get("similarity")
+        return cls(data["entries"], embedding_model=data.get("embedding_model"),
+                   similarity=similarity, path=path)
+
+    def save(self, path: str, extra: Optional[Dict[str, Any]] = None):
+        """캐시 파일 저장 (임시 파일에 쓴 뒤 교체하므로 서버가 읽는 중이어도 깨지지 않음)"""
+        data = {
+            "version": CACHE_VERSION,
+            "embedding_model": self.embedding_model,
+            "similarity": self.similarity,
+            **(extra or {}),
+            "entries": self.entries,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def semantic(self) -> bool:
+        """의미 일치(임베딩 비교)를 쓸 수 있는지"""
+        return self._matrix is not None
+
+    def lookup_exact(self, query: str) -> Optional[Dict[str, Any]]:
+        """질문 문장이 캐시된 질문과 똑같으면 그 항목 (임베딩 없음)"""
+        index = self._exact.get(normalize_query(query))
+        if index is None:
+            return None
+        self._count("exact")
+        return self.entries[index]
+
+    def lookup_vector(self, vector: List[float]) -> Optional[Dict[str, Any]]:
+        """질문 임베딩과 가장 가까운 중심 벡터가 임계값 이상이면 그 항목 (아니면 미스로 기록)"""
+        index = self.nearest(vector)
+        if index is None:
+            self._count(None)
+            return None
+        self._count("similar")
+        return self.entries[index]
+
+    def nearest(self, vector: List[float]) -> Optional[int]:
+        """임계값 이상으로 가장 가까운 항목의 위치 (카운터는 건드리지 않음)"""
+        if self._matrix is None:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        scores = self._matrix @ (query / norm)
+        best = int(np.argmax(scores))
+        return best if scores[best] >= self.similarity else None
+
+    def classify(self, query: str, vector: Optional[List[float]] = None) -> Optional[str]:
+        """조회했다면 어떻게 적중했을지 ("exact" / "similar" / None, 카운터는 건드리지 않음 - 적중률 추정용)"""
+        if normalize_query(query) in self._exact:
+            return "exact"
+        if vector is not None and self.nearest(vector) is not None:
+            return "similar"
+        return None
+
+    def miss(self):
+        """임베딩 없이 미스로 끝난 조회 기록 (의미 일치를 못 쓰는 경우)"""
+        self._count(None)
+
+    def _count(self, kind: Optional[str]):
+        with self._lock:
+            if kind is None:
+                self.misses += 1
+            else:
+                self.hits[kind] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """항목 수와 적중률"""
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                "path": self.path,
+                "entries": len(self.entries),
+                "embedding_model": self.embedding_model,
+                "similarity": self.similarity,
+                "semantic": self.semantic,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
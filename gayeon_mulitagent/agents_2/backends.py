@@ -0,0 +1,537 @@
+"""
+LLM 백엔드 인터페이스
+
+에이전트는 모델 호출을 직접 하지 않고 백엔드를 통해서만 한다. 백엔드는 제공자별
+클라이언트(Gemini / Ollama / 오프라인 스텁)를 감싸며, 모델 이름은 호출마다 받으므로
+백엔드 하나를 여러 에이전트가 서로 다른 모델로 함께 쓸 수 있다.
+
+에이전트별 백엔드는 설정으로 고른다 (MultiAgentOrchestrator 참고):
+  LLM_BACKEND=gemini|ollama|stub             기본 백엔드 (기본 gemini)
+  LLM_BACKEND_KNOWLEDGE / _STYLE / _VALIDATOR  에이전트별 덮어쓰기
+
+제공자 SDK는 무거우므로 백엔드를 실제로 만들 때 임포트한다.
+
+호출 수 제한과 토큰 사용량 기록은 LLMBackend의 generate / agenerate / stream과 embeddings()가
+돌려주는 임베딩 객체가 한 곳에서 하고, 제공자별 클래스는 실제 호출(_generate / _stream /
+_create_embeddings)만 구현한다. 임베딩은 호출 타임아웃을 받지 않으므로 현재 요청의 남은 시간
+(agents_2.deadline)을 제한 자리 대기 시간의 상한으로 쓴다.
+  LLM_RATE_LIMIT=60                          백엔드별 분당 최대 호출 수 (기본 0, 제한 없음)
+  LLM_RATE_LIMIT_GEMINI / _OLLAMA / _STUB    백엔드별 덮어쓰기
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+
+from .deadline import current_deadline
+from .errors import EmbeddingError
+from .tracing import record_usage, set_attributes, span
+
+# 제공자 응답의 토큰 사용량 (입력, 출력), 모르면 None
+Usage = Optional[Tuple[Optional[int], Optional[int]]]
+
+
+class RateLimiter:
+    """분당 호출 수 제한 (최근 1분 호출 시각의 슬라이딩 윈도, 스레드 안전)"""
+
+    def __init__(self, per_minute: int):
+        """
+        Args:
+            per_minute: 분당 최대 호출 수 (0 이하면 제한 없음)
+        """
+        self.per_minute = per_minute
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        호출 자리가 날 때까지 기다림
+
+        Args:
+            timeout: 최대 대기 시간 (초, None이면 무한)
+
+        Returns:
+            기다린 시간 (초)
+
+        Raises:
+            TimeoutError: timeout 안에 자리가 나지 않는 경우 (기다리지 않고 바로)
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        started = time.monotonic()
+        slept = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                if len(self._recent) < self.per_minute:
+                    self._recent.append(now)
+                    if not slept:
+                        return 0.0
+                    waited = now - started
+                    self.waited += 1
+                    self.wait_seconds += waited
+                    return waited
+                wait = 60 - (now - self._recent[0])
+            if timeout is not None and now - started + wait > timeout:
+                raise TimeoutError(f"호출 수 제한(분당 {self.per_minute}회) 때문에 {timeout:.1f}초 안에 호출할 수 없음")
+            time.sleep(wait)
+            slept = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"per_minute": self.per_minute, "waited": self.waited,
+                    "wait_seconds": round(self.wait_seconds, 3)}
+
+
+class RateLimitedEmbeddings:
+    """
+    제공자 임베딩 객체를 감싸 호출마다 백엔드의 호출 수 제한 자리를 잡는다
+
+    벡터스토어(Chroma / 메모리 맵 인덱스)가 검색할 때 부르는 embed_query까지 제한에 들어간다.
+    그 밖의 속성은 감싼 객체의 것을 그대로 보여준다.
+    """
+
+    def __init__(self, backend: "LLMBackend", embeddings: Any):
+        self.backend = backend
+        self.wrapped = embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.backend._acquire_for_embedding()
+        return self.wrapped.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.backend._acquire_for_embedding()
+        return self.wrapped.embed_query(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        self.backend._acquire_for_embedding()
+        return self.wrapped.embed_queries(texts)
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+class LLMBackend(ABC):
+    """모든 LLM 백엔드의 기본 클래스"""
+
+    name = "base"
+    # 이 백엔드의 임베딩으로 만든 Chroma DB를 구분하는 이름 (ingest.chroma_location)
+    index_tag = "base"
+
+    def __init__(self):
+        self._embeddings: Dict[str, Any] = {}
+        self._embeddings_lock = threading.Lock()
+        per_minute = os.getenv(f"LLM_RATE_LIMIT_{self.name.upper()}") or os.getenv("LLM_RATE_LIMIT", "0")
+        self.limiter = RateLimiter(int(per_minute))
+
+    @property
+    @abstractmethod
+    def default_model(self) -> str:
+        """에이전트가 모델을 지정하지 않았을 때 쓸 생성 모델"""
+
+    @property
+    @abstractmethod
+    def default_embedding_model(self) -> str:
+        """에이전트가 모델을 지정하지 않았을 때 쓸 임베딩 모델"""
+
+    def generate(self, model: str, system_instruction: str, user_message: str,
+                 temperature: float, response_schema: Any = None,
+                 max_output_tokens: Optional[int] = None, thinking_budget: Optional[int] = None,
+                 timeout: Optional[float] = None) -> str:
+        """
+        텍스트 생성 (호출 수 제한 안에서, 제공자 응답의 토큰 사용량을 현재 스팬에 기록)
+
+        Args:
+            model: 생성 모델 이름
+            system_instruction: 시스템 프롬프트
+            user_message: 사용자 메시지
+            temperature: 생성 온도
+            response_schema: 지정하면 이 스키마(Pydantic 모델)에 맞는 JSON으로 응답을 제한
+            max_output_tokens: 최대 출력 토큰 수 (None이면 모델 기본값)
+            thinking_budget: 사고 토큰 예산 (None이면 모델 기본값, 지원하지 않는 백엔드는 무시)
+            timeout: 호출 타임아웃 (초, None이면 제한 없음, 호출 수 제한 대기 시간 포함). 넘기면 예외 발생
+
+        Returns:
+            생성된 텍스트 (빈 응답이면 빈 문자열)
+        """
+        timeout = self._acquire(timeout)
+        text, usage = self._generate(model, system_instruction, user_message, temperature, response_schema,
+                                     max_output_tokens, thinking_budget, timeout)
+        self._record_usage(usage)
+        return text
+
+    async def agenerate(self, model: str, system_instruction: str, user_message: str,
+                        temperature: float, response_schema: Any = None,
+                        max_output_tokens: Optional[int] = None, thinking_budget: Optional[int] = None,
+                        timeout: Optional[float] = None) -> str:
+        """
+        텍스트 생성 (비동기) - generate를 작업 스레드에서 실행
+
+        호출 수 제한 대기도 스레드에서 하므로 이벤트 루프를 막지 않고, 컨텍스트(현재 스팬,
+        마감 시간)가 그대로 넘어가 제한 / 사용량 기록은 generate와 같다.
+        """
+        return await asyncio.to_thread(self.generate, model, system_instruction, user_message, temperature,
+                                       response_schema, max_output_tokens, thinking_budget, timeout)
+
+    def stream(self, model: str, system_instruction: str, user_message: str,
+               temperature: float, max_output_tokens: Optional[int] = None,
+               thinking_budget: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        """텍스트 생성 (스트리밍) - 도착하는 텍스트 조각을 차례로 반환 (제한 / 사용량 기록은 generate와 같음)"""
+        timeout = self._acquire(timeout)
+        usage = yield from self._stream(model, system_instruction, user_message, temperature,
+                                        max_output_tokens, thinking_budget, timeout)
+        self._record_usage(usage)
+
+    @abstractmethod
+    def _generate(self, model: str, system_instruction: str, user_message: str, temperature: float,
+                  response_schema: Any, max_output_tokens: Optional[int], thinking_budget: Optional[int],
+                  timeout: Optional[float]) -> Tuple[str, Usage]:
+        """제공자 호출 (generate 참고). (생성된 텍스트, 토큰 사용량) 반환"""
+
+    @abstractmethod
+    def _stream(self, model: str, system_instruction: str, user_message: str, temperature: float,
+                max_output_tokens: Optional[int], thinking_budget: Optional[int],
+                timeout: Optional[float]) -> Generator[str, None, Usage]:
+        """제공자 스트리밍 호출. 텍스트 조각을 yield하고 끝나면 토큰 사용량을 return"""
+
+    def _acquire(self, timeout: Optional[float]) -> Optional[float]:
+        """호출 수 제한 자리를 잡고, 기다린 만큼 줄인 호출 타임아웃 반환"""
+        waited = self.limiter.acquire(timeout)
+        if waited > 0:
+            set_attributes(**{"llm.rate_limit_wait": round(waited, 3)})
+        return timeout - waited if timeout is not None else None
+
+    def _acquire_for_embedding(self):
+        """
+        임베딩 호출의 제한 자리 잡기 (현재 요청의 남은 시간까지만 기다림)
+
+        Raises:
+            EmbeddingError: 마감 시간 안에 자리가 나지 않는 경우
+        """
+        deadline = current_deadline()
+        try:
+            self._acquire(deadline.remaining() if deadline is not None else None)
+        except TimeoutError as e:
+            raise EmbeddingError(f"{self.name} 백엔드", str(e), step="rate_limit") from e
+
+    @staticmethod
+    def _record_usage(usage: Usage):
+        """제공자 응답의 토큰 사용량을 현재 호출 스팬에 기록"""
+        if usage is not None:
+            record_usage(*usage)
+
+    def embeddings(self, model: Optional[str] = None):
+        """
+        벡터스토어(Chroma / 메모리 맵 인덱스)에 넘길 임베딩 객체 (모델별로 하나만 만들어 공유)
+
+        embed_documents / embed_query / embed_queries 를 제공하며, 호출마다 호출 수 제한 자리를 잡는다
+        (RateLimitedEmbeddings).
+        """
+        model = model or self.default_embedding_model
+        embeddings = self._embeddings.get(model)
+        if embeddings is not None:
+            return embeddings
+        with self._embeddings_lock:
+            if model not in self._embeddings:
+                self._embeddings[model] = RateLimitedEmbeddings(self, self._create_embeddings(model))
+            return self._embeddings[model]
+
+    @abstractmethod
+    def _create_embeddings(self, model: str):
+        """임베딩 객체 생성 (embeddings()에서 락 안에서 호출)"""
+
+    def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        여러 질의를 한꺼번에 임베딩 (배치 처리용, 호출 수 제한은 embeddings()의 객체가 적용)
+
+        Raises:
+            EmbeddingError: 임베딩 실패, 또는 마감 시간 안에 호출 수 제한 자리가 나지 않은 경우
+        """
+        model = model or self.default_embedding_model
+        with span("embedding", kind="client", **{"gen_ai.system": self.name, "gen_ai.request.model": model,
+                                                 "embedding.texts": len(texts)}):
+            return self.embeddings(model).embed_queries(texts)
+
+
+class GeminiBackend(LLMBackend):
+    """google.genai 클라이언트 (GEMINI_API_KEY 환경변수 사용)"""
+
+    name = "gemini"
+    index_tag = "gemini"
+
+    def __init__(self):
+        super().__init__()
+        from google import genai
+
+        self.client = genai.Client()
+
+    @property
+    def default_model(self) -> str:
+        return os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+
+    @property
+    def default_embedding_model(self) -> str:
+        return os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+
+    @staticmethod
+    def _config(temperature: float, response_schema: Any = None, max_output_tokens: Optional[int] = None,
+                thinking_budget: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        config = {
+            "temperature": temperature,
+        }
+        if response_schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        if max_output_tokens is not None:
+            config["max_output_tokens"] = max_output_tokens
+        if thinking_budget is not None:
+            config["thinking_config"] = {"thinking_budget": thinking_budget}
+        if timeout is not None:
+            # HTTP 요청 타임아웃 (밀리초)
+            config["http_options"] = {"timeout": max(1, int(timeout * 1000))}
+        return config
+
+    def _generate(self, model, system_instruction, user_message, temperature, response_schema,
+                  max_output_tokens, thinking_budget, timeout):
+        response = self.client.models.generate_content(
+            model=model,
+            contents=f"{system_instruction}\n\n{user_message}",
+            config=self._config(temperature, response_schema, max_output_tokens, thinking_budget, timeout)
+        )
+        return response.text or "", self._usage(response)
+
+    def _stream(self, model, system_instruction, user_message, temperature, max_output_tokens,
+                thinking_budget, timeout):
+        stream = self.client.models.generate_content_stream(
+            model=model,
+            contents=f"{system_instruction}\n\n{user_message}",
+            config=self._config(temperature, None, max_output_tokens, thinking_budget, timeout)
+        )
+        usage = None
+        for chunk in stream:
+            # 사용량은 마지막 조각에 누적값으로 온다
+            usage = self._usage(chunk) or usage
+            if chunk.text:
+                yield chunk.text
+        return usage
+
+    @staticmethod
+    def _usage(response) -> Usage:
+        """응답의 토큰 사용량 (없으면 None)"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return None
+        return usage.prompt_token_count, usage.candidates_token_count
+
+    def _create_embeddings(self, model: str):
+        from .gemini_embeddings import GeminiEmbeddings
+        return GeminiEmbeddings(model=model, client=self.client)
+
+
+class OllamaBackend(LLMBackend):
+    """로컬 Ollama 서버 (LangChain ChatOllama / OllamaEmbeddings, OLLAMA_BASE_URL)"""
+
+    name = "ollama"
+    index_tag = "ollama"
+
+    def __init__(self, base_url: Optional[str] = None):
+        super().__init__()
+        self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self._chat_models: Dict[tuple, Any] = {}
+        self._chat_lock = threading.Lock()
+
+    @property
+    def default_model(self) -> str:
+        return os.getenv("OLLAMA_MODEL", "gemma3:4b")
+
+    @property
+    def default_embedding_model(self) -> str:
+        return os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+
+    def _chat(self, model: str, temperature: float, json_mode: bool = False,
+              max_output_tokens: Optional[int] = None, timeout: Optional[float] = None):
+        """(모델, 온도, JSON 모드, 최대 토큰, 타임아웃)별 ChatOllama (한 번만 생성)"""
+        # 타임아웃은 초 단위로 올림해 키 수를 예산(초)만큼으로 제한
+        timeout = math.ceil(timeout) if timeout is not None else None
+        key = (model, temperature, json_mode, max_output_tokens, timeout)
+        with self._chat_lock:
+            if key not in self._chat_models:
+                from langchain_community.chat_models import ChatOllama
+                options = {"format": "json"} if json_mode else {}
+                if max_output_tokens is not None:
+                    options["num_predict"] = max_output_tokens
+                if timeout is not None:
+                    options["timeout"] = timeout
+                self._chat_models[key] = ChatOllama(model=model, temperature=temperature,
+                                                    base_url=self.base_url, **options)
+            return self._chat_models[key]
+
+    @staticmethod
+    def _messages(system_instruction: str, user_message: str):
+        from langchain_core.messages import HumanMessage, SystemMessage
+        return [
+            SystemMessage(content=system_instruction),
+            HumanMessage(content=user_message)
+        ]
+
+    # thinking_budget은 Ollama에 해당 설정이 없어 무시한다
+
+    def _generate(self, model, system_instruction, user_message, temperature, response_schema,
+                  max_output_tokens, thinking_budget, timeout):
+        # Ollama는 스키마 제한이 없으므로 JSON 모드만 켠다 (스키마 검사는 호출한 쪽에서)
+        chat = self._chat(model, temperature, response_schema is not None, max_output_tokens, timeout)
+        response = chat.invoke(self._messages(system_instruction, user_message))
+        return response.content or "", self._usage(response)
+
+    def _stream(self, model, system_instruction, user_message, temperature, max_output_tokens,
+                thinking_budget, timeout):
+        chat = self._chat(model, temperature, max_output_tokens=max_output_tokens, timeout=timeout)
+        usage = None
+        for chunk in chat.stream(self._messages(system_instruction, user_message)):
+            # 사용량은 마지막 조각에 온다
+            usage = self._usage(chunk) or usage
+            if chunk.content:
+                yield chunk.content
+        return usage
+
+    @staticmethod
+    def _usage(message) -> Usage:
+        """LangChain 메시지의 토큰 사용량 (없으면 None)"""
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return None
+        return usage.get("input_tokens"), usage.get("output_tokens")
+
+    def _create_embeddings(self, model: str):
+        from langchain_community.embeddings import OllamaEmbeddings
+
+        class BatchOllamaEmbeddings(OllamaEmbeddings):
+            def embed_queries(self, texts: List[str]) -> List[List[float]]:
+                try:
+                    return self.embed_documents(texts)
+                except Exception as e:
+                    raise EmbeddingError("OllamaEmbeddings", str(e), step="embed_queries") from e
+
+        return BatchOllamaEmbeddings(model=model, base_url=self.base_url)
+
+
+class StubEmbeddings:
+    """텍스트 해시로 만든 결정적 단위 벡터 (오프라인 테스트용, 의미 검색은 되지 않음)"""
+
+    def __init__(self, model: str, dim: int = 768):
+        self.model = model
+        self.dim = dim
+
+    def _vector(self, text: str) -> List[float]:
+        rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.dim)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+
+class StubBackend(LLMBackend):
+    """
+    API 호출 없이 즉시 응답하는 오프라인 백엔드 (테스트 / 벤치마크용)
+
+    - 생성: 사용자 메시지 앞부분을 그대로 돌려줌. STUB_LATENCY(초)를 주면 호출마다 그만큼 기다리고,
+      타임아웃이 더 짧으면 TimeoutError (마감 시간 테스트용)
+    - 스키마 응답: 숫자 항목은 상한의 STUB_SCORE_RATIO(기본 0.8)배, 문자열 항목은 고정 문구
+    - 임베딩: 텍스트 해시 기반 벡터. 기본 임베딩 모델 이름을 Gemini와 같게 두어
+      Gemini로 만든 인덱스도 열 수 있다 (검색 결과는 의미가 없음)
+    """
+
+    name = "stub"
+    index_tag = "gemini"
+
+    @property
+    def default_model(self) -> str:
+        return "stub"
+
+    @property
+    def default_embedding_model(self) -> str:
+        return os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+
+    def _generate(self, model, system_instruction, user_message, temperature, response_schema,
+                  max_output_tokens, thinking_budget, timeout):
+        self._wait(timeout)
+        if response_schema is not None:
+            return json.dumps(self._schema_response(response_schema), ensure_ascii=False), None
+        return f"[{model}] {user_message.strip()[:300]}", None
+
+    def _stream(self, model, system_instruction, user_message, temperature, max_output_tokens,
+                thinking_budget, timeout):
+        text, usage = self._generate(model, system_instruction, user_message, temperature, None,
+                                     max_output_tokens, thinking_budget, timeout)
+        for start in range(0, len(text), 20):
+            yield text[start:start + 20]
+        return usage
+
+    @staticmethod
+    def _wait(timeout: Optional[float]):
+        latency = float(os.getenv("STUB_LATENCY", "0"))
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stub 호출이 {timeout:.1f}초 안에 끝나지 않음")
+        if latency > 0:
+            time.sleep(latency)
+
+    @staticmethod
+    def _schema_response(response_schema: Any) -> Dict[str, Any]:
+        ratio = float(os.getenv("STUB_SCORE_RATIO", "0.8"))
+        response = {}
+        for name, field in response_schema.model_fields.items():
+            if field.annotation in (int, float):
+                upper = next((m.le for m in field.metadata if getattr(m, "le", None) is not None), 1)
+                response[name] = field.annotation(upper * ratio)
+            else:
+                response[name] = "PASS" if name == "feedback" else f"stub {name}"
+        return response
+
+    def _create_embeddings(self, model: str):
+        return StubEmbeddings(model)
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "ollama": OllamaBackend,
+    "stub": StubBackend,
+}
+
+_instances: Dict[str, LLMBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def check_backend(name: str) -> str:
+    """백엔드 이름 확인 (모르는 이름이면 ValueError)"""
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 LLM 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return name
+
+
+def get_backend(name: str) -> LLMBackend:
+    """이름으로 백엔드 가져오기 (프로세스에서 이름마다 하나만 만들어 에이전트들이 공유)"""
+    check_backend(name)
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
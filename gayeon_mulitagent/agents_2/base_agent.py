@@ -1,24 +1,40 @@
 """
 기본 에이전트 추상 클래스 (Gemini 2.5 Flash API 버전)
+
+모델 호출은 backends의 LLMBackend를 거치므로, 호출 수 집계와 오류 처리, 요청 마감 시간에 따른
+호출별 타임아웃, 호출 스팬 기록(tracing)은 여기 한 곳에서 한다.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from google import genai
+from typing import Dict, Any, Optional, Callable
+from .backends import LLMBackend, get_backend
+from .deadline import current_deadline
+from .errors import DeadlineExceeded, GenerationError
+from .metrics import count_llm_call
+from .routing import resolve_settings
+from .tokens import estimate_tokens
+from .tracing import add_event, record_usage, span
 
 
 class BaseAgent(ABC):
-    """모든 에이전트의 기본 클래스 (Gemini 2.5 Flash 사용)"""
+    """모든 에이전트의 기본 클래스 (기본 백엔드: Gemini 2.5 Flash)"""
     
-    def __init__(self, model_name: str = "models/gemini-2.5-flash", temperature: float = 0.7):
+    def __init__(self, model_name: Optional[str] = None, temperature: float = 0.7,
+                 backend: Optional[LLMBackend] = None,
+                 routing: Optional[Dict[str, Dict[str, Any]]] = None):
         """
         Args:
-            model_name: 사용할 Gemini 모델명 (models/gemini-2.5-flash, models/gemini-2.5-pro 등)
+            model_name: 사용할 모델명 (None이면 백엔드 기본 모델, Gemini는 GEMINI_MODEL)
             temperature: 생성 온도 (0.0 ~ 2.0)
+            backend: LLM 백엔드 (None이면 Gemini)
+            routing: 이 에이전트의 라우팅 설정 {"": 에이전트 설정, 단계: 단계 설정}
+                     (routing.agent_routing 참고, None이면 model_name / temperature만 사용)
         """
-        # GEMINI_API_KEY 환경변수에서 자동으로 API 키를 가져옴
-        self.client = genai.Client()
-        self.model_name = model_name
+        if backend is None:
+            backend = get_backend("gemini")
+        self.backend = backend
+        self.model_name = model_name or backend.default_model
         self.temperature = temperature
+        self.routing = routing or {}
         self.agent_name = self.__class__.__name__
         
     @abstractmethod
@@ -34,31 +50,129 @@ class BaseAgent(ABC):
         """
         pass
     
-    def _generate_content(self, system_instruction: str, user_message: str) -> str:
+    def _generate_content(self, system_instruction: str, user_message: str,
+                          step: Optional[str] = None, response_schema: Any = None) -> str:
         """
-        Gemini API를 사용하여 콘텐츠 생성
+        백엔드를 사용하여 콘텐츠 생성
         
         Args:
             system_instruction: 시스템 프롬프트
             user_message: 사용자 메시지
+            step: 에이전트 내부 단계 이름 (오류 보고용)
+            response_schema: 지정하면 이 스키마(Pydantic 모델)에 맞는 JSON으로 응답을 제한
             
         Returns:
             생성된 텍스트
+            
+        Raises:
+            GenerationError: API 호출 실패 또는 빈 응답
+            DeadlineExceeded: 요청 마감 시간 안에 호출할 수 없거나 호출이 타임아웃됨
+        """
+        settings = self._settings(step)
+        with span("llm.generate", kind="client", **self._span_attributes(settings, step)):
+            timeout = self._call_timeout(step)
+            count_llm_call(settings["model"])
+            try:
+                text = self.backend.generate(settings["model"], system_instruction, user_message,
+                                             settings["temperature"], response_schema,
+                                             settings["max_output_tokens"], settings["thinking_budget"],
+                                             timeout)
+            except Exception as e:
+                self.log(f"API 호출 오류: {e}")
+                raise self._call_error(e, step) from e
+            record_usage(estimate_tokens(system_instruction + user_message), estimate_tokens(text or ""),
+                         estimated=True)
+        
+        # 안전 필터 등으로 본문이 비어 있으면 다음 단계에 넘기지 않는다
+        if not text:
+            raise GenerationError(self.agent_name, "빈 응답", step=step)
+        return text
+    
+    def _generate_content_stream(self, system_instruction: str, user_message: str,
+                                 on_token: Callable[[str], None],
+                                 step: Optional[str] = None) -> str:
         """
-        try:
-            # Gemini 2.5 Flash API 호출
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=f"{system_instruction}\n\n{user_message}",
-                config={
-                    "temperature": self.temperature,
-                }
-            )
-            return response.text
-        except Exception as e:
-            self.log(f"API 호출 오류: {e}")
-            return f"오류 발생: {str(e)}"
+        백엔드 스트리밍으로 콘텐츠 생성 (토큰 조각이 도착할 때마다 on_token 호출)
+        
+        Args:
+            system_instruction: 시스템 프롬프트
+            user_message: 사용자 메시지
+            on_token: 텍스트 조각을 받을 콜백
+            step: 에이전트 내부 단계 이름 (오류 보고용)
+            
+        Returns:
+            생성된 전체 텍스트
+            
+        Raises:
+            GenerationError: API 호출 실패 또는 빈 응답
+            DeadlineExceeded: 요청 마감 시간 안에 호출할 수 없거나 호출이 타임아웃됨
+        """
+        settings = self._settings(step)
+        with span("llm.stream", kind="client", **self._span_attributes(settings, step)):
+            timeout = self._call_timeout(step)
+            count_llm_call(settings["model"])
+            parts = []
+            try:
+                for chunk in self.backend.stream(settings["model"], system_instruction, user_message,
+                                                 settings["temperature"], settings["max_output_tokens"],
+                                                 settings["thinking_budget"], timeout):
+                    if not parts:
+                        add_event("first_token")
+                    parts.append(chunk)
+                    on_token(chunk)
+            except Exception as e:
+                self.log(f"API 스트리밍 오류: {e}")
+                raise self._call_error(e, step) from e
+            text = "".join(parts)
+            record_usage(estimate_tokens(system_instruction + user_message), estimate_tokens(text),
+                         estimated=True)
+        
+        if not text:
+            raise GenerationError(self.agent_name, "빈 응답", step=step)
+        return text
+    
+    def _settings(self, step: Optional[str]) -> Dict[str, Any]:
+        """이번 호출의 생성 설정 (라우팅 표와 현재 승격 단계 반영)"""
+        return resolve_settings({"model": self.model_name, "temperature": self.temperature},
+                                self.routing, step)
+    
+    def _span_attributes(self, settings: Dict[str, Any], step: Optional[str]) -> Dict[str, Any]:
+        """LLM 호출 스팬 속성 (OpenTelemetry gen_ai 규약 이름)"""
+        deadline = current_deadline()
+        return {
+            "gen_ai.system": self.backend.name,
+            "gen_ai.request.model": settings["model"],
+            "gen_ai.request.temperature": settings["temperature"],
+            "gen_ai.request.max_tokens": settings["max_output_tokens"],
+            "agent": self.agent_name,
+            "agent.step": step,
+            "deadline.remaining": round(deadline.remaining(), 3) if deadline is not None else None,
+        }
+    
+    def _call_timeout(self, step: Optional[str]) -> Optional[float]:
+        """
+        현재 요청의 남은 시간으로 정한 호출 타임아웃 (마감 시간이 없으면 None)
+        
+        Raises:
+            DeadlineExceeded: 남은 시간이 호출 하나를 하기에도 부족한 경우 (호출하지 않음)
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return None
+        timeout = deadline.call_timeout()
+        if timeout is None:
+            raise DeadlineExceeded(self.agent_name, f"마감 시간 부족 (남은 시간 {deadline.remaining():.1f}초)",
+                                   step=step)
+        return timeout
+    
+    def _call_error(self, error: Exception, step: Optional[str]) -> GenerationError:
+        """백엔드 예외 → 에이전트 오류 (마감 시간이 지나서 끊긴 호출은 DeadlineExceeded)"""
+        deadline = current_deadline()
+        if deadline is not None and deadline.call_timeout() is None:
+            return DeadlineExceeded(self.agent_name, f"마감 시간 초과: {error}", step=step)
+        return GenerationError(self.agent_name, str(error), step=step)
     
     def log(self, message: str):
-        """로깅 헬퍼 함수"""
+        """로깅 헬퍼 함수 (추적 중이면 현재 스팬에 이벤트로도 남김)"""
         print(f"[{self.agent_name}] {message}")
+        add_event("log", agent=self.agent_name, message=message)
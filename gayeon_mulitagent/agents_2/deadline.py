@@ -0,0 +1,89 @@
+"""
+요청 마감 시간 (지연 시간 예산)
+
+API가 요청을 받은 시점부터 마감 시간을 세고, 오케스트레이터는 deadline_scope() 안에서
+파이프라인을 실행한다. 에이전트의 LLM 호출은 current_deadline()의 남은 시간을 호출별
+타임아웃으로 백엔드에 넘기므로, 마감 시간을 따로 인자로 전달하지 않아도 모든 호출에 적용된다.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Union
+
+# 남은 시간이 이보다 짧으면 호출을 시작하지 않는다 (초)
+MIN_CALL_SECONDS = 1.0
+
+
+class Deadline:
+    """요청 하나의 마감 시간 (time.monotonic 기준)"""
+
+    def __init__(self, seconds: float, started: Optional[float] = None):
+        """
+        Args:
+            seconds: 전체 예산 (초)
+            started: 예산을 세기 시작한 시각 (None이면 지금, 대기열 대기 시간도 포함하려면 도착 시각)
+        """
+        if seconds <= 0:
+            raise ValueError("마감 시간은 0보다 커야 합니다")
+        self.budget = float(seconds)
+        self.started = time.monotonic() if started is None else started
+        self.expires_at = self.started + self.budget
+
+    def remaining(self) -> float:
+        """남은 시간 (초, 지났으면 0)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """예산을 세기 시작한 뒤 지난 시간 (초)"""
+        return time.monotonic() - self.started
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def fits(self, seconds: float) -> bool:
+        """seconds초가 걸리는 작업을 마감 전에 끝낼 수 있는지"""
+        return self.remaining() >= seconds
+
+    def call_timeout(self) -> Optional[float]:
+        """
+        다음 LLM 호출의 타임아웃 (초)
+
+        Returns:
+            남은 시간. MIN_CALL_SECONDS보다 짧으면 None (호출하지 말 것)
+        """
+        remaining = self.remaining()
+        return remaining if remaining >= MIN_CALL_SECONDS else None
+
+    def to_dict(self) -> dict:
+        """결과에 담을 요약"""
+        remaining = self.remaining()
+        return {
+            "budget": round(self.budget, 3),
+            "remaining": round(remaining, 3),
+            "expired": remaining <= 0,
+        }
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def as_deadline(value: Union[Deadline, float, None]) -> Optional[Deadline]:
+    """초 단위 숫자 또는 Deadline → Deadline (None이나 0 이하면 마감 없음)"""
+    if value is None or isinstance(value, Deadline):
+        return value
+    return Deadline(value) if value > 0 else None
+
+
+def current_deadline() -> Optional[Deadline]:
+    """현재 요청의 마감 시간 (없으면 None)"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """with 블록 안의 LLM 호출에 마감 시간 적용 (ContextVar라 요청/스레드마다 독립)"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
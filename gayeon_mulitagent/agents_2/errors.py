@@ -0,0 +1,70 @@
+"""
+에이전트 오류 타입 정의
+
+에이전트는 실패를 문자열로 반환하지 않고 아래 예외를 발생시킨다.
+오케스트레이터는 이 예외를 받아 실패 정책(abort / fallback / degrade)에 따라 처리한다.
+"""
+from typing import Optional
+
+
+class AgentError(Exception):
+    """모든 에이전트 오류의 기본 클래스"""
+
+    def __init__(self, agent_name: str, message: str, step: Optional[str] = None):
+        """
+        Args:
+            agent_name: 오류가 발생한 에이전트 이름
+            message: 오류 메시지
+            step: 에이전트 내부 단계 이름 (예: "tone", "modernize")
+        """
+        super().__init__(message)
+        self.agent_name = agent_name
+        self.message = message
+        self.step = step
+
+    def __str__(self):
+        where = f"{self.agent_name}.{self.step}" if self.step else self.agent_name
+        return f"[{where}] {self.message}"
+
+
+class GenerationError(AgentError):
+    """LLM 호출(콘텐츠 생성) 실패"""
+
+
+class EmbeddingError(AgentError):
+    """임베딩 호출 실패"""
+
+
+class RetrievalError(AgentError):
+    """벡터 검색 실패"""
+
+
+class DeadlineExceeded(GenerationError):
+    """요청 마감 시간 안에 LLM 호출을 시작하거나 끝낼 수 없음"""
+
+
+class PipelineError(Exception):
+    """실패 정책이 abort일 때 오케스트레이터가 발생시키는 오류"""
+
+    def __init__(self, stage: str, cause: AgentError, wasted_calls: int = 0):
+        """
+        Args:
+            stage: 실패한 파이프라인 단계 (knowledge / style / validation)
+            cause: 원인이 된 에이전트 오류
+            wasted_calls: 이번 요청에서 결과에 쓰이지 못한 LLM 호출 수
+        """
+        super().__init__(f"{stage} 단계 실패: {cause}")
+        self.stage = stage
+        self.cause = cause
+        self.wasted_calls = wasted_calls
+
+
+class SessionNotFound(KeyError):
+    """대화 ID가 발급한 적 없거나 만료/제거된 세션 (새 대화를 시작해야 함)"""
+
+    def __init__(self, conversation_id: str):
+        super().__init__(conversation_id)
+        self.conversation_id = conversation_id
+
+    def __str__(self):
+        return f"대화 세션을 찾을 수 없습니다 (없거나 만료됨): {self.conversation_id}"
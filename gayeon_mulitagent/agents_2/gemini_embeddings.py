@@ -2,19 +2,27 @@
 Gemini 임베딩을 위한 커스텀 클래스
 """
 from typing import List
-from google import genai
 from langchain_core.embeddings import Embeddings
+from .errors import EmbeddingError
 
 
 class GeminiEmbeddings(Embeddings):
     """Gemini API를 사용한 임베딩 클래스"""
     
-    def __init__(self, model: str = "models/text-embedding-004"):
+    # embed_content 한 번에 보낼 수 있는 최대 텍스트 수
+    BATCH_LIMIT = 100
+    
+    def __init__(self, model: str = "models/text-embedding-004", client=None):
         """
         Args:
             model: 사용할 Gemini 임베딩 모델
+            client: 공유할 genai.Client (None이면 새로 생성)
         """
-        self.client = genai.Client()
+        if client is None:
+            from google import genai
+            client = genai.Client()
+        
+        self.client = client
         self.model = model
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
@@ -42,5 +50,26 @@ class GeminiEmbeddings(Embeddings):
             )
             return result.embeddings[0].values
         except Exception as e:
+            # 제로 벡터로 검색하면 무의미한 결과가 프롬프트에 들어가므로 실패를 알린다
             print(f"쿼리 임베딩 오류: {e}")
-            return [0.0] * 768
+            raise EmbeddingError("GeminiEmbeddings", str(e), step="embed_query") from e
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 쿼리를 한 번의 호출로 임베딩 (BATCH_LIMIT개씩 나눠 호출)"""
+        vectors = []
+        for start in range(0, len(texts), self.BATCH_LIMIT):
+            batch = texts[start:start + self.BATCH_LIMIT]
+            try:
+                result = self.client.models.embed_content(
+                    model=self.model,
+                    contents=batch
+                )
+            except Exception as e:
+                print(f"배치 쿼리 임베딩 오류: {e}")
+                raise EmbeddingError("GeminiEmbeddings", str(e), step="embed_queries") from e
+            if len(result.embeddings) != len(batch):
+                raise EmbeddingError("GeminiEmbeddings",
+                                     f"임베딩 수 불일치 ({len(result.embeddings)}/{len(batch)})",
+                                     step="embed_queries")
+            vectors.extend(embedding.values for embedding in result.embeddings)
+        return vectors
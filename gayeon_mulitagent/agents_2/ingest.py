@@ -0,0 +1,171 @@
+"""
+원문 PDF 수집 및 청크 분할 (인덱스 빌드와 에이전트의 Chroma 생성이 함께 사용)
+
+기본은 pdf_text의 정제 + 한국어 문장 단위 청크. 기존 방식(cleaned=False)은 비교용으로 남겨 둔다.
+"""
+import hashlib
+import os
+from typing import Dict, Any, List, Tuple
+
+
+# 인덱스 이름 → 원문 디렉토리 / 청크 설정 / (기존) Chroma 위치
+INDEX_SPECS: Dict[str, Dict[str, Any]] = {
+    "papers": {
+        "source_dir": "GS_paper",
+        "chunk_size": 1000,
+        "chunk_overlap": 100,
+        "chroma_dir": "chroma_db_gemini",
+        "collection": "lee_gwangsu_papers_gemini",
+    },
+    "style": {
+        "source_dir": "GS_talk_style",
+        "chunk_size": 500,
+        "chunk_overlap": 50,
+        "chroma_dir": "chroma_db_style_gemini",
+        "collection": "lee_gwangsu_style_gemini",
+    },
+}
+
+
+def resolve_dir(path: str) -> str:
+    """상대 경로는 프로젝트 루트(agents_2의 상위) 기준으로 변환"""
+    if os.path.isabs(path):
+        return path
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, path.lstrip('./'))
+
+
+def chroma_location(name: str, tag: str = "gemini") -> Tuple[str, str]:
+    """
+    Chroma DB 디렉토리 이름 / 컬렉션 이름
+
+    임베딩 백엔드마다 벡터 공간이 다르므로 따로 둔다 (tag: LLMBackend.index_tag).
+    Gemini는 INDEX_SPECS의 이름 그대로 (chroma_db_gemini), Ollama는 chroma_db_ollama 식.
+    """
+    spec = INDEX_SPECS[name]
+    return spec["chroma_dir"].replace("gemini", tag), spec["collection"].replace("gemini", tag)
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """파일 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_pdfs(source_dir: str) -> List[str]:
+    """디렉토리의 PDF 파일 경로 (이름순)"""
+    return [os.path.join(source_dir, f) for f in sorted(os.listdir(source_dir)) if f.endswith('.pdf')]
+
+
+def load_documents(source_dir: str, log=print) -> List[Any]:
+    """
+    디렉토리의 PDF를 페이지 단위 문서로 로드 (메타데이터에 source_file 추가)
+
+    읽을 수 없는 파일은 건너뛴다.
+    """
+    from langchain_community.document_loaders import PyPDFLoader
+
+    documents = []
+    for pdf_path in list_pdfs(source_dir):
+        pdf_file = os.path.basename(pdf_path)
+        try:
+            docs = PyPDFLoader(pdf_path).load()
+        except Exception as e:
+            log(f"  - {pdf_file} 로드 실패: {e}")
+            continue
+        for doc in docs:
+            doc.metadata['source_file'] = pdf_file
+        documents.extend(docs)
+        log(f"  - {pdf_file} 로드 완료")
+    return documents
+
+
+def split_documents(documents: List[Any], chunk_size: int, chunk_overlap: int) -> List[Any]:
+    """문서를 청크로 분할"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    return text_splitter.split_documents(documents)
+
+
+def load_clean_documents(source_dir: str, chunk_size: int, chunk_overlap: int, log=print) -> List[Any]:
+    """
+    디렉토리의 PDF를 정제된 문장 단위 청크 문서로 로드 (pdf_text 사용, 쪽 텍스트는 캐시)
+
+    메타데이터는 PyPDFLoader와 같은 source / page 에 source_file 을 더한다.
+    읽을 수 없는 파일은 건너뛴다.
+    """
+    from langchain_core.documents import Document
+    from .pdf_text import extract_pages, clean_pages, chunk_pages, text_warning
+
+    documents = []
+    for pdf_path in list_pdfs(source_dir):
+        pdf_file = os.path.basename(pdf_path)
+        try:
+            pages = extract_pages(pdf_path)
+        except Exception as e:
+            log(f"  - {pdf_file} 로드 실패: {e}")
+            continue
+        warning = text_warning(pages)
+        if warning:
+            log(f"  ⚠️  {pdf_file}: {warning}")
+        chunks = chunk_pages(clean_pages(pages), chunk_size, chunk_overlap)
+        documents.extend(
+            Document(page_content=text, metadata={"source": pdf_path, "page": page, "source_file": pdf_file})
+            for text, page in chunks
+        )
+        log(f"  - {pdf_file} 로드 완료 ({len(chunks)}개 청크)")
+    return documents
+
+
+def load_chunks(name: str, source_dir: str = None, log=print, cleaned: bool = True) -> List[Any]:
+    """
+    INDEX_SPECS의 설정대로 PDF를 읽어 청크 목록 반환
+
+    Args:
+        name: "papers" 또는 "style"
+        source_dir: 원문 디렉토리 (None이면 INDEX_SPECS 기본값)
+        cleaned: True면 정제 + 문장 단위 청크, False면 기존 방식 (PyPDFLoader + 글자 수 분할)
+    """
+    spec = INDEX_SPECS[name]
+    source_dir = resolve_dir(source_dir or spec["source_dir"])
+    if cleaned:
+        return load_clean_documents(source_dir, spec["chunk_size"], spec["chunk_overlap"], log=log)
+    documents = load_documents(source_dir, log=log)
+    return split_documents(documents, spec["chunk_size"], spec["chunk_overlap"])
+
+
+def chunk_stats(name: str, source_dir: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    기존 방식과 정제 방식의 청크 수 / 글자 수 비교 (임베딩 없이, 캐시된 쪽 텍스트 사용)
+
+    Returns:
+        {"before": {"chunks", "chars"}, "after": {"chunks", "chars"}}
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from .pdf_text import extract_pages, clean_pages, chunk_pages
+
+    spec = INDEX_SPECS[name]
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=spec["chunk_size"],
+        chunk_overlap=spec["chunk_overlap"]
+    )
+    before, after = [], []
+    for pdf_path in list_pdfs(resolve_dir(source_dir or spec["source_dir"])):
+        try:
+            pages = extract_pages(pdf_path)
+        except Exception:
+            continue
+        for page in pages:
+            before.extend(text_splitter.split_text(page))
+        after.extend(text for text, _ in chunk_pages(clean_pages(pages), spec["chunk_size"], spec["chunk_overlap"]))
+    return {
+        "before": {"chunks": len(before), "chars": sum(len(c) for c in before)},
+        "after": {"chunks": len(after), "chars": sum(len(c) for c in after)},
+    }
@@ -1,13 +1,14 @@
 """
 지식 에이전트: 논문에서 이광수 관련 지식을 검색하고 제공 (Gemini 2.5 Flash API 버전)
 """
-from typing import Dict, Any, List
-from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Dict, Any, List, Optional
 import os
 from .base_agent import BaseAgent
-from .gemini_embeddings import GeminiEmbeddings
+from .backends import LLMBackend
+from .errors import AgentError, RetrievalError
+from .mmap_index import load_index, search_many, PAPER_INDEX
+from .tracing import set_attributes, span
+from .ingest import chroma_location, resolve_dir, load_chunks
 
 
 class KnowledgeAgent(BaseAgent):
@@ -15,33 +16,44 @@ class KnowledgeAgent(BaseAgent):
     
     def __init__(self,
                  paper_dir: str = "./GS_paper",
-                 model_name: str = "models/gemini-2.5-flash",
+                 model_name: Optional[str] = None,
                  temperature: float = 0.5,
-                 embedding_model: str = "models/text-embedding-004"):
+                 embedding_model: Optional[str] = None,
+                 index_dir: Optional[str] = None,
+                 allow_build: bool = False,
+                 backend: Optional[LLMBackend] = None,
+                 routing: Optional[Dict[str, Dict[str, Any]]] = None):
         """
         Args:
             paper_dir: 논문 PDF가 있는 디렉토리
-            model_name: 사용할 Gemini 모델
+            model_name: 사용할 모델 (None이면 백엔드 기본 모델)
             temperature: 생성 온도
-            embedding_model: 임베딩용 Gemini 모델
+            embedding_model: 임베딩 모델 (None이면 백엔드 기본 임베딩 모델)
+            index_dir: 메모리 맵 인덱스 루트 (지정하면 Chroma 대신 공유 인덱스 사용)
+            allow_build: 인덱스가 없을 때 PDF를 읽어 직접 만들지 여부 (기본: 만들지 않고 오류)
+            backend: LLM 백엔드 (None이면 Gemini)
+            routing: 단계별 모델 / 생성 설정 (BaseAgent 참고)
         """
-        super().__init__(model_name, temperature)
+        super().__init__(model_name, temperature, backend, routing)
         self.paper_dir = paper_dir
         self.vectorstore = None
-        self.embeddings = GeminiEmbeddings(model=embedding_model)
-        self._load_papers()
+        self.embedding_model = embedding_model or self.backend.default_embedding_model
+        self.embeddings = self.backend.embeddings(self.embedding_model)
+        self.allow_build = allow_build
+        if index_dir:
+            self.vectorstore = load_index(self.agent_name, index_dir, PAPER_INDEX, self.embeddings,
+                                          embedding_model=self.embedding_model)
+            self.log(f"메모리 맵 인덱스 사용: {index_dir}/{PAPER_INDEX} ({len(self.vectorstore)}개 문서)")
+        else:
+            self._load_papers()
         
     def _load_papers(self):
-        """논문 데이터 로드 (기존 벡터 DB 사용)"""
-        # 상대 경로를 절대 경로로 변환
-        if not os.path.isabs(self.paper_dir):
-            # 현재 파일 기준으로 상위 디렉토리로 이동
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            abs_paper_dir = os.path.join(base_dir, self.paper_dir.lstrip('./'))
-        else:
-            abs_paper_dir = self.paper_dir
-            
-        persist_directory = os.path.join(abs_paper_dir, "chroma_db_gemini")
+        """논문 데이터 로드 (기존 Chroma DB 사용, allow_build일 때만 새로 생성)"""
+        # Chroma는 무거우므로 Chroma 인덱스를 쓸 때만 임포트
+        from langchain_community.vectorstores import Chroma
+        
+        chroma_dir, collection = chroma_location(PAPER_INDEX, self.backend.index_tag)
+        persist_directory = os.path.join(resolve_dir(self.paper_dir), chroma_dir)
         
         # 기존 벡터스토어가 있으면 로드
         if os.path.exists(persist_directory):
@@ -50,56 +62,76 @@ class KnowledgeAgent(BaseAgent):
                 self.vectorstore = Chroma(
                     persist_directory=persist_directory,
                     embedding_function=self.embeddings,
-                    collection_name="lee_gwangsu_papers_gemini"
+                    collection_name=collection
                 )
                 self.log("벡터스토어 로드 완료 (기존 DB 사용)")
                 return
             except Exception as e:
+                if not self.allow_build:
+                    raise RetrievalError(self.agent_name, f"벡터스토어 로드 실패: {e}",
+                                         step="load_index") from e
                 self.log(f"기존 DB 로드 실패, 새로 생성합니다: {e}")
         
+        if not self.allow_build:
+            # 요청을 처리하는 서버가 몇 분씩 PDF를 임베딩하지 않도록 빌드는 build_index.py에서만
+            raise RetrievalError(
+                self.agent_name,
+                "사전 빌드된 인덱스가 없습니다. 'python build_index.py build papers'를 먼저 실행하세요",
+                step="load_index"
+            )
+        
         # 새로 생성
         self.log("논문 데이터 로딩 중...")
-        
-        documents = []
-        pdf_files = [f for f in os.listdir(self.paper_dir) if f.endswith('.pdf')]
-        
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(self.paper_dir, pdf_file)
-            try:
-                loader = PyPDFLoader(pdf_path)
-                docs = loader.load()
-                # 메타데이터에 파일명 추가
-                for doc in docs:
-                    doc.metadata['source_file'] = pdf_file
-                documents.extend(docs)
-                self.log(f"  - {pdf_file} 로드 완료")
-            except Exception as e:
-                self.log(f"  - {pdf_file} 로드 실패: {e}")
-        
-        # 텍스트 분할
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100
-        )
-        splits = text_splitter.split_documents(documents)
+        splits = load_chunks(PAPER_INDEX, self.paper_dir, log=self.log)
         
         # 벡터스토어 생성 및 저장
         self.vectorstore = Chroma.from_documents(
             documents=splits,
             embedding=self.embeddings,
-            collection_name="lee_gwangsu_papers_gemini",
+            collection_name=collection,
             persist_directory=persist_directory
         )
         
-        self.log(f"논문 데이터 로드 완료: {len(pdf_files)}개 논문, {len(splits)}개 청크 (캐시 생성)")
+        self.log(f"논문 데이터 로드 완료: {len(splits)}개 청크 (캐시 생성)")
         
     def search_knowledge(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """지식 검색"""
         if not self.vectorstore:
             return []
         
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        with span("vector.search", **{"vector.index": PAPER_INDEX, "vector.k": k, "vector.queries": 1}):
+            try:
+                results = self.vectorstore.similarity_search_with_score(query, k=k)
+            except AgentError:
+                raise
+            except Exception as e:
+                raise RetrievalError(self.agent_name, str(e), step="search") from e
+            set_attributes(**{"vector.results": len(results)})
         
+        return self._to_knowledge_items(results)
+    
+    def search_knowledge_by_vectors(self, vectors: List[List[float]], k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        미리 임베딩한 여러 질의로 한꺼번에 지식 검색 (배치 처리용)
+        
+        Returns:
+            질의마다 search_knowledge와 같은 형식의 목록
+        """
+        if not self.vectorstore:
+            return [[] for _ in vectors]
+        
+        with span("vector.search", **{"vector.index": PAPER_INDEX, "vector.k": k, "vector.queries": len(vectors)}):
+            try:
+                results = search_many(self.vectorstore, vectors, k=k)
+            except AgentError:
+                raise
+            except Exception as e:
+                raise RetrievalError(self.agent_name, str(e), step="search") from e
+            set_attributes(**{"vector.results": sum(len(r) for r in results)})
+        return [self._to_knowledge_items(r) for r in results]
+    
+    def _to_knowledge_items(self, results) -> List[Dict[str, Any]]:
+        """(문서, 거리) 목록 → 지식 항목"""
         knowledge_items = []
         for doc, score in results:
             knowledge_items.append({
@@ -118,7 +150,9 @@ class KnowledgeAgent(BaseAgent):
         Args:
             input_data: {
                 "query": str,  # 검색 질의
-                "top_k": int  # 검색할 문서 수 (기본 5)
+                "top_k": int,  # 검색할 문서 수 (기본 5)
+                "knowledge_items": List[Dict],  # 미리 검색한 결과 (선택, 있으면 검색 생략)
+                "history": str  # 같은 대화의 이전 턴 (선택, session.ConversationSession.history)
             }
             
         Returns:
@@ -130,11 +164,14 @@ class KnowledgeAgent(BaseAgent):
         """
         query = input_data.get("query", "")
         top_k = input_data.get("top_k", 5)
+        history = input_data.get("history", "")
         
         self.log(f"지식 검색 시작: {query[:50]}...")
         
-        # 관련 지식 검색
-        knowledge_items = self.search_knowledge(query, k=top_k)
+        # 관련 지식 검색 (배치 처리에서 미리 검색했으면 그대로 사용)
+        knowledge_items = input_data.get("knowledge_items")
+        if knowledge_items is None:
+            knowledge_items = self.search_knowledge(query, k=top_k)
         
         if not knowledge_items:
             return {
@@ -160,7 +197,13 @@ class KnowledgeAgent(BaseAgent):
 3. 자신의 행동과 주장을 직접 설명하고 정당화하는 어조
 4. 역사적 사실에 기반하되 이광수의 시점에서 재구성"""
 
-        user_message = f"""이광수로서 다음 질문에 1인칭으로 답변해주세요:
+        # 후속 질문이면 앞선 대화를 함께 주어 "그때", "그 글" 같은 지시어를 풀 수 있게 한다
+        history_block = f"""지금까지의 대화:
+{history}
+
+""" if history else ""
+
+        user_message = f"""{history_block}이광수로서 다음 질문에 1인칭으로 답변해주세요:
 
 질문: {query}
 
@@ -171,7 +214,7 @@ class KnowledgeAgent(BaseAgent):
 "이광수는..."이 아니라 "나는..."으로 시작하세요."""
 
         # Gemini API 호출
-        answer = self._generate_content(system_instruction, user_message)
+        answer = self._generate_content(system_instruction, user_message, step="draft")
         
         # 출처 목록 추출
         sources = list(set([item['source'] for item in knowledge_items]))
@@ -0,0 +1,118 @@
+"""
+파이프라인 메트릭 수집기
+
+프로세스 내에서 누적되는 간단한 카운터 모음. 여러 스레드에서 동시에
+갱신될 수 있으므로 모든 갱신은 락으로 보호한다.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+
+class PipelineMetrics:
+    """요청/실패/낭비된 호출 수 등을 누적하는 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+
+    def increment(self, name: str, value: float = 1):
+        """카운터 증가"""
+        with self._lock:
+            self._counters[name] += value
+
+    def record_failure(self, stage: str, wasted_calls: int):
+        """
+        단계 실패 기록
+
+        Args:
+            stage: 실패한 단계 이름
+            wasted_calls: 실패로 인해 결과에 쓰이지 못한 LLM 호출 수
+        """
+        with self._lock:
+            self._counters["failures"] += 1
+            self._counters[f"failures.{stage}"] += 1
+            self._counters["wasted_calls"] += wasted_calls
+            self._counters[f"wasted_calls.{stage}"] += wasted_calls
+
+    def record_validator_parse(self, status: str):
+        """
+        검증 응답 파싱 결과 기록
+
+        Args:
+            status: "json" (스키마 그대로), "repaired" (로컬 복구), "legacy" (줄 단위 파싱), "failed"
+        """
+        with self._lock:
+            self._counters["validator_parses"] += 1
+            self._counters[f"validator_parse.{status}"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 카운터 값 복사본 반환"""
+        with self._lock:
+            data = dict(self._counters)
+        failures = data.get("failures", 0)
+        data["wasted_calls_per_failure"] = (
+            data.get("wasted_calls", 0) / failures if failures else 0.0
+        )
+        parses = data.get("validator_parses", 0)
+        # 스키마대로 오지 않은 응답 비율 (복구 성공 포함) / 끝내 점수를 못 읽은 비율
+        data["validator_malformed_rate"] = (
+            (parses - data.get("validator_parse.json", 0)) / parses if parses else 0.0
+        )
+        data["validator_parse_failure_rate"] = (
+            data.get("validator_parse.failed", 0) / parses if parses else 0.0
+        )
+        return data
+
+    def reset(self):
+        """모든 카운터 초기화"""
+        with self._lock:
+            self._counters.clear()
+
+
+class CallCounter:
+    """요청 하나에서 발생한 LLM 호출 수 (모델별 호출 수 포함)"""
+
+    def __init__(self):
+        self.value = 0
+        self.models: Dict[str, int] = defaultdict(int)
+
+
+_current_counter: ContextVar[Optional[CallCounter]] = ContextVar("llm_call_counter", default=None)
+
+
+def count_llm_call(model: Optional[str] = None):
+    """현재 요청의 LLM 호출 수 증가 (추적 중이 아니면 무시)"""
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.value += 1
+        if model:
+            counter.models[model] += 1
+
+
+@contextmanager
+def time_stage(timings: Dict[str, float], stage: str):
+    """with 블록의 소요 시간(초)을 timings[stage]에 더한다 (재시도로 여러 번 실행되는 단계는 합산)"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.monotonic() - start
+
+
+@contextmanager
+def track_llm_calls():
+    """
+    with 블록 안에서 발생한 LLM 호출 수를 센다
+
+    ContextVar를 사용하므로 스레드/태스크마다 독립적으로 집계된다.
+    """
+    counter = CallCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
@@ -0,0 +1,322 @@
+"""
+읽기 전용 메모리 맵 벡터 인덱스
+
+여러 API 워커가 같은 인덱스를 공유하도록, Chroma 컬렉션을 한 번 내보내 두고
+각 워커는 파일을 mmap으로 열기만 한다. 페이지는 OS 페이지 캐시에서 공유되므로
+워커를 늘려도 인덱스 메모리는 한 벌만 사용된다.
+
+인덱스 디렉토리 구성:
+- vectors.npy: 정규화된 임베딩 (float32, N x D)
+- records.jsonl: 한 줄에 문서 하나 ({"page_content": ..., "metadata": {...}})
+- offsets.npy: records.jsonl 에서 각 줄의 시작 바이트 오프셋 (int64, N + 1)
+- manifest.json: 문서 수, 차원, 임베딩 모델, 원본 정보, 파일별 크기/SHA-256
+
+버전 관리 (build_index.py가 생성):
+  <root>/<name>/<version>/   한 번 만들면 바꾸지 않는 인덱스
+  <root>/<name>/CURRENT      서버가 읽을 버전 이름 (os.replace로 원자적 교체)
+"""
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .errors import AgentError, RetrievalError
+from .tracing import span
+
+
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "offsets.npy"
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+DATA_FILES = (VECTORS_FILE, RECORDS_FILE, OFFSETS_FILE)
+FORMAT_VERSION = 1
+
+# 인덱스 디렉토리 이름 (VECTOR_INDEX_DIR 아래)
+PAPER_INDEX = "papers"
+STYLE_INDEX = "style"
+
+
+class IndexedDocument:
+    """검색 결과 문서 (LangChain Document와 같은 속성만 제공)"""
+
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content: str, metadata: Dict[str, Any]):
+        self.page_content = page_content
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"IndexedDocument({self.page_content[:30]!r}, {self.metadata})"
+
+
+def write_index(out_dir: str,
+                embeddings: List[List[float]],
+                documents: List[str],
+                metadatas: List[Optional[Dict[str, Any]]],
+                manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    임베딩과 문서를 메모리 맵 인덱스 형식으로 저장
+
+    Returns:
+        기록된 manifest
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if vectors.ndim != 2 or len(vectors) != len(documents):
+        raise ValueError(f"임베딩 형태가 문서 수와 맞지 않습니다: {vectors.shape}, {len(documents)}")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    np.save(os.path.join(out_dir, VECTORS_FILE), vectors / norms)
+
+    offsets = [0]
+    with open(os.path.join(out_dir, RECORDS_FILE), "wb") as f:
+        for text, metadata in zip(documents, metadatas):
+            line = json.dumps({"page_content": text, "metadata": metadata or {}},
+                              ensure_ascii=False).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(out_dir, OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+
+    manifest = dict(manifest or {})
+    manifest.update({
+        "format_version": FORMAT_VERSION,
+        "count": int(vectors.shape[0]),
+        "dim": int(vectors.shape[1]),
+        "files": {name: _file_info(os.path.join(out_dir, name)) for name in DATA_FILES},
+    })
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _file_info(path: str) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": os.path.getsize(path), "sha256": digest.hexdigest()}
+
+
+def verify_index(index_dir: str, full: bool = True,
+                 embedding_model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    인덱스 무결성 확인 (문제가 있으면 ValueError)
+
+    Args:
+        index_dir: 인덱스 디렉토리
+        full: True면 SHA-256까지 확인, False면 파일 크기와 배열 형태만 확인 (서버 시작용)
+        embedding_model: 지정하면 인덱스를 만든 임베딩 모델과 같은지 확인
+
+    Returns:
+        manifest
+    """
+    with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for name, expected in manifest.get("files", {}).items():
+        path = os.path.join(index_dir, name)
+        if not os.path.exists(path):
+            raise ValueError(f"파일 없음: {name}")
+        actual = _file_info(path) if full else {"size": os.path.getsize(path)}
+        for key, value in actual.items():
+            if expected.get(key) != value:
+                raise ValueError(f"{name}의 {key}가 manifest와 다릅니다")
+    vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+    offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+    if vectors.shape != (manifest["count"], manifest["dim"]) or len(offsets) != manifest["count"] + 1:
+        raise ValueError(f"배열 형태가 manifest와 다릅니다: {vectors.shape}, {len(offsets)}")
+    if embedding_model and manifest.get("embedding_model") not in (None, embedding_model):
+        raise ValueError(
+            f"임베딩 모델 불일치: 인덱스 {manifest['embedding_model']}, 현재 {embedding_model}"
+        )
+    return manifest
+
+
+def list_versions(root: str, name: str) -> List[str]:
+    """인덱스의 버전 목록 (오래된 순)"""
+    index_home = os.path.join(root, name)
+    if not os.path.isdir(index_home):
+        return []
+    return sorted(
+        v for v in os.listdir(index_home)
+        if not v.startswith(".") and os.path.exists(os.path.join(index_home, v, MANIFEST_FILE))
+    )
+
+
+def current_version(root: str, name: str) -> Optional[str]:
+    """CURRENT가 가리키는 버전 (없으면 None)"""
+    path = os.path.join(root, name, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def activate_version(root: str, name: str, version: str):
+    """CURRENT를 version으로 원자적으로 교체 (이미 떠 있는 서버는 재시작 시 반영)"""
+    index_home = os.path.join(root, name)
+    if not os.path.exists(os.path.join(index_home, version, MANIFEST_FILE)):
+        raise ValueError(f"버전 없음: {name}/{version}")
+    tmp_path = os.path.join(index_home, f".{CURRENT_FILE}.tmp{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(index_home, CURRENT_FILE))
+
+
+def resolve_index_dir(root: str, name: str) -> str:
+    """
+    <root>/<name> 에서 실제 인덱스 디렉토리 찾기
+
+    CURRENT가 있으면 그 버전, 없으면 <root>/<name> 자체(버전 없는 내보내기)를 사용한다.
+    """
+    version = current_version(root, name)
+    if version:
+        return os.path.join(root, name, version)
+    return os.path.join(root, name)
+
+
+def export_chroma(persist_directory: str, collection_name: str, out_dir: str,
+                  manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Chroma 컬렉션을 메모리 맵 인덱스로 내보내기 (저장된 임베딩을 그대로 사용하므로 API 호출 없음)
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    data = client.get_collection(collection_name).get(
+        include=["embeddings", "documents", "metadatas"]
+    )
+    return write_index(
+        out_dir,
+        data["embeddings"],
+        data["documents"],
+        data["metadatas"],
+        manifest=dict(manifest or {}, collection=collection_name, source=persist_directory)
+    )
+
+
+class MmapVectorIndex:
+    """
+    메모리 맵 벡터 인덱스 (읽기 전용, 프로세스 간 공유)
+
+    Chroma 벡터스토어 대신 에이전트에서 사용할 수 있도록 similarity_search /
+    similarity_search_with_score 를 같은 의미로 제공한다 (점수는 코사인 거리).
+    """
+
+    def __init__(self, index_dir: str, embeddings=None):
+        """
+        Args:
+            index_dir: write_index / export_chroma 로 만든 디렉토리
+            embeddings: 질의 임베딩에 사용할 객체 (embed_query 제공)
+        """
+        self.index_dir = index_dir
+        self.embeddings = embeddings
+        with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(index_dir, RECORDS_FILE), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.vectors) != len(self.offsets) - 1:
+            raise ValueError(f"인덱스 파일이 서로 맞지 않습니다: {index_dir}")
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def document(self, i: int) -> IndexedDocument:
+        """i번째 문서"""
+        record = json.loads(self._records[int(self.offsets[i]):int(self.offsets[i + 1])])
+        return IndexedDocument(record["page_content"], record["metadata"])
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float],
+                                               k: int = 4) -> List[Tuple[IndexedDocument, float]]:
+        """임베딩으로 검색 → (문서, 코사인 거리) 목록 (가까운 순)"""
+        if len(self.vectors) == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.document(i), float(1.0 - scores[i])) for i in top]
+
+    def similarity_search_by_vectors_with_score(self, embeddings: List[List[float]],
+                                                k: int = 4) -> List[List[Tuple[IndexedDocument, float]]]:
+        """
+        여러 임베딩을 행렬 곱 한 번으로 검색
+
+        Returns:
+            임베딩마다 (문서, 코사인 거리) 목록 (가까운 순)
+        """
+        if len(self.vectors) == 0 or len(embeddings) == 0:
+            return [[] for _ in embeddings]
+        queries = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1.0)
+        scores = queries @ self.vectors.T
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            order = candidates[np.argsort(-scores[row, candidates])]
+            results.append([(self.document(i), float(1.0 - scores[row, i])) for i in order])
+        return results
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[IndexedDocument, float]]:
+        """질의 문자열로 검색 → (문서, 코사인 거리) 목록"""
+        with span("embedding", kind="client", **{"embedding.texts": 1}):
+            embedding = self.embeddings.embed_query(query)
+        return self.similarity_search_by_vector_with_score(embedding, k)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[IndexedDocument]:
+        """질의 문자열로 검색 → 문서 목록"""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+
+def search_many(store, embeddings: List[List[float]], k: int = 4) -> List[List[Tuple[Any, float]]]:
+    """
+    벡터스토어 종류와 관계없이 여러 임베딩으로 검색 → 임베딩마다 (문서, 거리) 목록
+
+    MmapVectorIndex는 행렬 곱 한 번으로, Chroma는 임베딩마다 한 번씩 검색한다.
+    """
+    if hasattr(store, "similarity_search_by_vectors_with_score"):
+        return store.similarity_search_by_vectors_with_score(embeddings, k)
+    # langchain Chroma: 이름과 달리 점수는 거리 (similarity_search_with_score와 같은 값)
+    return [store.similarity_search_by_vector_with_relevance_scores(e, k=k) for e in embeddings]
+
+
+def has_index(index_root: str, name: str) -> bool:
+    """<root>/<name> 에 불러올 수 있는 인덱스가 있는지"""
+    return os.path.exists(os.path.join(resolve_index_dir(index_root, name), MANIFEST_FILE))
+
+
+def load_index(agent_name: str, index_root: str, name: str, embeddings,
+               embedding_model: Optional[str] = None) -> MmapVectorIndex:
+    """
+    에이전트용 인덱스 로드 (CURRENT 버전, 실패 시 RetrievalError)
+
+    Args:
+        agent_name: 오류 보고용 에이전트 이름
+        index_root: 인덱스 루트 (VECTOR_INDEX_DIR)
+        name: PAPER_INDEX 또는 STYLE_INDEX
+        embeddings: 질의 임베딩 객체
+        embedding_model: 질의 임베딩 모델 (인덱스와 다르면 거부)
+    """
+    index_dir = resolve_index_dir(index_root, name)
+    try:
+        verify_index(index_dir, full=False, embedding_model=embedding_model)
+        return MmapVectorIndex(index_dir, embeddings)
+    except AgentError:
+        raise
+    except Exception as e:
+        raise RetrievalError(agent_name, f"인덱스 로드 실패 ({index_dir}): {e}",
+                             step="load_index") from e
+
@@ -2,10 +2,20 @@
 오케스트레이터: 멀티 에이전트 시스템을 조율하는 핵심 컴포넌트 (Gemini 2.5 Flash API 버전)
 """
 import os
-from typing import Dict, Any, List
-from .style_agent import StyleAgent
-from .validator_agent import ValidatorAgent
-from .knowledge_agent import KnowledgeAgent
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Callable, Iterator, Optional, Union
+from .answer_cache import AnswerCache
+from .backends import check_backend, get_backend
+from .routing import load_routing, agent_routing, escalated
+from .deadline import Deadline, as_deadline, deadline_scope
+from .errors import AgentError, DeadlineExceeded, PipelineError, SessionNotFound
+from .metrics import PipelineMetrics, CallCounter, track_llm_calls, time_stage
+from .profiling import RequestProfiler
+from .session import ConversationSession, SessionStore
+from .tracing import Tracer, set_attributes, span
 
 
 class MultiAgentOrchestrator:
@@ -16,62 +26,318 @@ class MultiAgentOrchestrator:
     1. KnowledgeAgent: 질문에 대한 지식 검색 및 초안 생성
     2. StyleAgent: 초안을 이광수 스타일로 변환
     3. ValidatorAgent: 스타일 적합성 검증
-    4. 검증 실패 시 재시도 (최대 3회)
+    4. 검증 실패 시 재시도 (최대 3회) - 약한 항목에 따라 근대어 변환만 다시 하거나
+       보강 편집만 하고, 그래도 점수가 오르지 않으면 전체를 다시 변환
+    
+    에이전트(와 벡터 인덱스)는 처음 사용할 때 만들어진다. 서버 시작 직후 첫 요청이
+    느려지지 않게 하려면 prewarm()으로 백그라운드에서 미리 만들어 둘 수 있다.
+    
+    단계 실패 정책 (failure_policy):
+    - "abort": 즉시 PipelineError 발생
+    - "fallback": 재시도를 멈추고 지금까지의 최고점 후보(없으면 초안)를 반환
+    - "degrade": 실패한 단계만 건너뛰고 나머지 단계로 계속 진행
+    
+    마감 시간 (deadline):
+    - 모든 LLM 호출은 남은 시간을 타임아웃으로 받는다 (agents_2.deadline)
+    - 다음 재시도 라운드가 남은 시간 안에 끝나지 않을 것 같으면 재시도를 멈추고 최고점 후보를 반환
+    - 호출이 마감 시간에 걸려 끊겨도 실패 정책과 무관하게 최고점 후보(없으면 스타일 결과, 초안)를 반환
+    - 건너뛴 단계는 결과의 skipped_stages에 기록
+    
+    대화 세션 (process_conversation):
+    - conversation_id별로 이전 턴을 토큰 예산 안의 요약으로 기억해 초안 프롬프트에 넣는다
+    - 후속 질문이 이전 검색 주제와 가까우면 이전 검색 결과를 재사용 (agents_2.session)
+    
+    답변 캐시 (answer_cache, 기본 꺼짐):
+    - prewarm_cache.py로 미리 만든 자주 묻는 질문의 대표 답변. 대화의 첫 질문(이전 턴이 없는 질문)이
+      캐시된 질문과 같거나 임베딩이 충분히 가까우면 파이프라인 없이 바로 반환 (agents_2.answer_cache).
+      ANSWER_CACHE_PATH나 answer_cache 인자로 파일을 지정해야 켜진다
+    
+    요청 프로파일링 (profiler, 기본 꺼짐):
+    - PROFILE_MODE=sample|cprofile이면 profile=True로 요청하거나 PROFILE_SAMPLE_RATE 확률로 뽑힌 요청의
+      프로파일을 PROFILE_DIR에 저장 (분당 개수 제한, agents_2.profiling)
+    
+    스팬 추적 (tracer, 기본 꺼짐):
+    - TRACE_FILE을 주면 요청마다 에이전트 처리 / LLM 호출 / 임베딩 / 벡터 검색 스팬을
+      OpenTelemetry JSON 형태로 회전 파일에 기록 (agents_2.tracing)
     """
     
+    FAILURE_POLICIES = ("abort", "fallback", "degrade")
+    
+    # 재시도 방식별 설명 (StyleAgent.process의 mode)
+    REVISION_LABELS = {
+        "full": "스타일 전체 재변환",
+        "modernize": "근대어 변환만 다시",
+        "strengthen": "약한 항목 보강 편집",
+    }
+    # 피드백(평가 사유 제외)에 이 말이 있으면 어휘/문체 문제로 보고 근대어 변환만 다시 한다.
+    # "근대"나 "말투"처럼 답변 주제에도 흔히 나오는 말은 넣지 않는다
+    VOCABULARY_KEYWORDS = ("어휘", "한자", "문체", "어미", "격식", "근대어", "현대어", "현대적 표현")
+    # 재시도 라운드의 LLM 호출 수 (스타일 단계 + 검증 1회) - 마감 시간 안에 끝날지 추정할 때 사용
+    ROUND_CALLS = {"full": 3, "modernize": 2, "strengthen": 2}
+    
     def __init__(self,
                  talk_style_dir: str = "./GS_talk_style",
                  paper_dir: str = "./GS_paper",
                  max_retries: int = 3,
                  model_name: str = None,
-                 embedding_model: str = None):
+                 embedding_model: str = None,
+                 failure_policy: str = None,
+                 metrics: PipelineMetrics = None,
+                 index_dir: str = None,
+                 prewarm: bool = None,
+                 allow_build: bool = None,
+                 backend: str = None,
+                 routing: Union[str, Dict[str, Any]] = None,
+                 deadline: float = None,
+                 sessions: SessionStore = None,
+                 answer_cache: Union[str, AnswerCache] = None,
+                 profiler: RequestProfiler = None,
+                 tracer: Tracer = None):
         """
         Args:
             talk_style_dir: 말투 데이터 디렉토리
             paper_dir: 논문 데이터 디렉토리
             max_retries: 검증 실패 시 최대 재시도 횟수
-            model_name: Gemini 모델 이름 (None이면 환경변수 사용)
-            embedding_model: 임베딩 모델 이름 (None이면 환경변수 사용)
+            model_name: 생성 모델 이름 (None이면 백엔드 기본값, Gemini는 환경변수 GEMINI_MODEL)
+            embedding_model: 임베딩 모델 이름 (None이면 백엔드 기본값, Gemini는 GEMINI_EMBEDDING_MODEL)
+            failure_policy: 단계 실패 정책 abort/fallback/degrade (None이면 환경변수 사용)
+            metrics: 공유할 메트릭 수집기 (None이면 새로 생성)
+            index_dir: 메모리 맵 인덱스 루트 (None이면 환경변수 VECTOR_INDEX_DIR,
+                       그것도 없으면 build_index.py 기본 위치 ./indexes, 없으면 Chroma 사용.
+                       빈 문자열이면 항상 Chroma)
+            prewarm: 백그라운드에서 에이전트를 미리 생성할지 여부 (None이면 환경변수 AGENT_PREWARM)
+            allow_build: 인덱스가 없을 때 에이전트가 직접 만들지 여부 (None이면 환경변수 ALLOW_INDEX_BUILD)
+            backend: LLM 백엔드 gemini/ollama/stub (None이면 환경변수 LLM_BACKEND, 기본 gemini).
+                     에이전트별로는 LLM_BACKEND_KNOWLEDGE / LLM_BACKEND_STYLE / LLM_BACKEND_VALIDATOR
+            routing: 에이전트/단계별 모델과 생성 설정 - 프로필 이름(uniform/split/cheap_first),
+                     JSON 파일 경로, JSON 문자열 또는 표 (None이면 환경변수 MODEL_ROUTING, 기본 uniform).
+                     escalate 설정이 있으면 검증 실패 후 재시도의 스타일 단계를 더 무거운 모델로 실행
+            deadline: 요청 하나의 기본 마감 시간 (초, None이면 환경변수 PIPELINE_DEADLINE, 0이면 제한 없음).
+                      process_query의 deadline 인자가 우선
+            sessions: 대화 세션 저장소 (None이면 SESSION_* 환경변수 설정으로 새로 생성)
+            answer_cache: 답변 캐시 파일 경로 또는 AnswerCache (None이면 환경변수 ANSWER_CACHE_PATH,
+                          설정하지 않았거나 빈 문자열이면 캐시 없음. prewarm_cache.py로 만든 파일도
+                          경로를 지정해야만 사용)
+            profiler: 요청 프로파일러 (None이면 PROFILE_* 환경변수 설정으로 새로 생성)
+            tracer: 스팬 추적기 (None이면 TRACE_* 환경변수 설정으로 새로 생성)
         """
         print("=" * 60)
-        print("멀티 에이전트 시스템 초기화 중 (Gemini 2.5 Flash)...")
+        print("멀티 에이전트 시스템 초기화 중...")
         print("=" * 60)
         
-        # 환경 변수에서 모델 이름 가져오기
-        if model_name is None:
-            model_name = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
-        if embedding_model is None:
-            embedding_model = os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+        # 에이전트별 백엔드 (모델 이름을 지정하지 않으면 각 백엔드의 기본 모델 사용)
+        if backend is None:
+            backend = os.getenv("LLM_BACKEND", "gemini")
+        backends = {
+            name: check_backend(os.getenv(f"LLM_BACKEND_{name.upper()}") or backend)
+            for name in ("knowledge", "style", "validator")
+        }
+        if routing is None:
+            routing = os.getenv("MODEL_ROUTING", "uniform")
+        routing_name = routing if isinstance(routing, str) else "custom"
+        routing = load_routing(routing)
+        if failure_policy is None:
+            failure_policy = os.getenv("PIPELINE_FAILURE_POLICY", "fallback")
+        if failure_policy not in self.FAILURE_POLICIES:
+            raise ValueError(f"알 수 없는 실패 정책: {failure_policy} (가능: {self.FAILURE_POLICIES})")
+        if index_dir is None:
+            index_dir = os.getenv("VECTOR_INDEX_DIR") or None
+        if index_dir is None:
+            default_root = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "indexes")
+            index_dir = default_root if os.path.isdir(default_root) else None
+        if allow_build is None:
+            allow_build = os.getenv("ALLOW_INDEX_BUILD", "0") == "1"
+        if prewarm is None:
+            prewarm = os.getenv("AGENT_PREWARM", "0") == "1"
+        if deadline is None:
+            deadline = float(os.getenv("PIPELINE_DEADLINE", "0"))
+        if answer_cache is None:
+            answer_cache = os.getenv("ANSWER_CACHE_PATH", "")
+        if isinstance(answer_cache, str):
+            answer_cache = self._load_answer_cache(answer_cache)
         
-        print(f"\n사용 모델: {model_name}")
-        print(f"임베딩 모델: {embedding_model}\n")
+        print(f"\nLLM 백엔드: {', '.join(f'{name}={kind}' for name, kind in backends.items())}")
+        print(f"사용 모델: {model_name or '백엔드 기본값'} (라우팅: {routing_name})")
+        print(f"임베딩 모델: {embedding_model or '백엔드 기본값'}")
+        print(f"벡터 인덱스: {index_dir or 'Chroma DB'}")
+        print(f"요청 마감 시간: {f'{deadline:g}초' if deadline > 0 else '없음'}")
+        print(f"답변 캐시: {f'{len(answer_cache)}개 ({answer_cache.path})' if answer_cache else '없음'}")
+        if profiler is None:
+            profiler = RequestProfiler()
+        print(f"요청 프로파일링: {f'{profiler.mode} → {profiler.directory}' if profiler.enabled else '끔'}")
+        if tracer is None:
+            tracer = Tracer()
+        print(f"스팬 추적: {tracer.exporter.path if tracer.enabled else '끔'}\n")
         
-        self.knowledge_agent = KnowledgeAgent(
-            paper_dir=paper_dir,
-            model_name=model_name,
-            embedding_model=embedding_model
-        )
-        self.style_agent = StyleAgent(
-            talk_style_dir=talk_style_dir,
-            model_name=model_name,
-            embedding_model=embedding_model
-        )
-        self.validator_agent = ValidatorAgent(
-            style_agent=self.style_agent,
-            model_name=model_name
-        )
+        self.talk_style_dir = talk_style_dir
+        self.paper_dir = paper_dir
+        self.model_name = model_name
+        self.embedding_model = embedding_model
+        self.backends = backends
+        self.routing = routing
+        self.routing_name = routing_name
+        self.index_dir = index_dir
+        self.allow_build = allow_build
         self.max_retries = max_retries
+        self.failure_policy = failure_policy
+        self.deadline = deadline
+        self.sessions = sessions if sessions is not None else SessionStore()
+        self.answer_cache = answer_cache
+        self.profiler = profiler
+        self.tracer = tracer
+        self._cache_semantic: Optional[bool] = None
+        # 후속 질문의 임베딩이 이전 검색 질문과 이 값 이상 가까우면 검색 결과 재사용
+        self.reuse_similarity = float(os.getenv("SESSION_REUSE_SIMILARITY", "0.7"))
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
         
-        print("\n✓ 모든 에이전트 초기화 완료!")
+        self._agents: Dict[str, Any] = {}
+        self._agents_lock = threading.Lock()
+        self._prewarm_thread: Optional[threading.Thread] = None
+        
+        if prewarm:
+            self.prewarm()
+            print("\n✓ 설정 완료 (에이전트는 백그라운드에서 생성 중)")
+        else:
+            print("\n✓ 설정 완료 (에이전트는 첫 요청 시 생성)")
         print("=" * 60)
+    
+    # ----- 에이전트 지연 생성 -----
+    
+    def _get_agent(self, name: str):
+        """에이전트를 처음 사용할 때 생성 (동시에 여러 요청이 와도 한 번만)"""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        with self._agents_lock:
+            if name not in self._agents:
+                self._agents[name] = self._build_agent(name)
+            return self._agents[name]
+    
+    def _build_agent(self, name: str):
+        """에이전트 생성 (_agents_lock 안에서 호출)"""
+        if name == "knowledge":
+            from .knowledge_agent import KnowledgeAgent
+            return KnowledgeAgent(
+                paper_dir=self.paper_dir,
+                model_name=self.model_name,
+                embedding_model=self.embedding_model,
+                index_dir=self.index_dir,
+                allow_build=self.allow_build,
+                backend=get_backend(self.backends[name]),
+                routing=agent_routing(self.routing, name)
+            )
+        if name == "style":
+            from .style_agent import StyleAgent
+            return StyleAgent(
+                talk_style_dir=self.talk_style_dir,
+                model_name=self.model_name,
+                embedding_model=self.embedding_model,
+                index_dir=self.index_dir,
+                allow_build=self.allow_build,
+                backend=get_backend(self.backends[name]),
+                routing=agent_routing(self.routing, name)
+            )
+        if name == "validator":
+            from .validator_agent import ValidatorAgent
+            if "style" not in self._agents:
+                self._agents["style"] = self._build_agent("style")
+            return ValidatorAgent(
+                style_agent=self._agents["style"],
+                model_name=self.model_name,
+                backend=get_backend(self.backends[name]),
+                routing=agent_routing(self.routing, name)
+            )
+        raise ValueError(f"알 수 없는 에이전트: {name}")
+    
+    @property
+    def knowledge_agent(self):
+        return self._get_agent("knowledge")
+    
+    @property
+    def style_agent(self):
+        return self._get_agent("style")
+    
+    @property
+    def validator_agent(self):
+        return self._get_agent("validator")
+    
+    def prewarm(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        모든 에이전트를 미리 생성 (인덱스 로드, 클라이언트 생성)
+        
+        Args:
+            background: True면 백그라운드 스레드에서 생성하고 스레드를 반환
+        """
+        def build():
+            for name in ("knowledge", "style", "validator"):
+                try:
+                    self._get_agent(name)
+                except Exception as e:
+                    # 실패해도 첫 요청에서 다시 시도하고, 그때 오류가 요청으로 전달된다
+                    print(f"[MultiAgentOrchestrator] {name} 에이전트 사전 생성 실패: {e}")
+            print("[MultiAgentOrchestrator] ✓ 에이전트 사전 생성 완료")
         
-    def process_query(self, query: str, verbose: bool = True) -> Dict[str, Any]:
+        if not background:
+            build()
+            return None
+        if self._prewarm_thread is None:
+            self._prewarm_thread = threading.Thread(target=build, name="agent-prewarm", daemon=True)
+            self._prewarm_thread.start()
+        return self._prewarm_thread
+    
+    def is_ready(self) -> bool:
+        """모든 에이전트가 생성되었는지 여부"""
+        return all(name in self._agents for name in ("knowledge", "style", "validator"))
+        
+    def prefetch(self, queries: List[str], top_k: int = 5, style_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        여러 질문의 검색을 한꺼번에 수행 (배치 처리용)
+        
+        질문들을 한 번의 호출로 임베딩하고, 논문/스타일 인덱스를 각각 한 번씩 검색한다.
+        스타일 예시는 초안 대신 질문 임베딩으로 검색한다 (같은 임베딩 모델).
+        
+        Returns:
+            질문마다 process_query의 prefetched 인자로 넘길 값
+            {"knowledge_items": List[Dict], "style_examples": List[str], "vector": List[float]}
+            (vector는 답변 캐시 조회에 다시 쓰는 질문 임베딩)
+        
+        Raises:
+            AgentError: 임베딩 또는 검색 실패
+        """
+        if not queries:
+            return []
+        knowledge_agent = self.knowledge_agent
+        vectors = knowledge_agent.backend.embed(queries, knowledge_agent.embedding_model)
+        knowledge = knowledge_agent.search_knowledge_by_vectors(vectors, k=top_k)
+        styles = self.style_agent.get_style_examples_by_vectors(vectors, k=style_k)
+        return [
+            {"knowledge_items": items, "style_examples": examples, "vector": vector}
+            for items, examples, vector in zip(knowledge, styles, vectors)
+        ]
+    
+    def process_query(self, query: str, verbose: bool = True,
+                      on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      prefetched: Optional[Dict[str, Any]] = None,
+                      deadline: Union[Deadline, float, None] = None,
+                      history: str = "",
+                      profile: Optional[bool] = None) -> Dict[str, Any]:
         """
         사용자 질문을 처리하여 최종 답변 생성
         
         Args:
             query: 사용자 질문
             verbose: 상세 로그 출력 여부
+            on_event: 진행 이벤트 콜백 (선택). 다음 형태의 딕셔너리를 받는다
+                - {"type": "stage", "stage": "retrieval"|"tone"|"modernize"|"strengthen"|"validation"|"retry",
+                   "status": "start"|"done", "retry": int}
+                - {"type": "token", "text": str, "retry": int}  # 답변을 쓰는 단계(근대어 변환/보강 편집)의 토큰
+                - {"type": "validation", "retry": int, "score": float, "aspects": Dict, "is_valid": bool}
+            prefetched: prefetch()로 미리 검색한 결과 (선택, 있으면 검색 생략)
+            deadline: 마감 시간 - 초 단위 예산 또는 Deadline (API가 요청 도착 시각부터 세는 경우).
+                      None이면 생성 시 지정한 기본값
+            history: 같은 대화의 이전 턴 요약 (선택, 초안 프롬프트에 포함 - process_conversation 참고)
+            profile: True면 이 요청을 프로파일링 (PROFILE_MODE가 켜져 있고 분당 한도 안일 때),
+                     False면 안 함, None이면 PROFILE_SAMPLE_RATE 확률
             
         Returns:
             {
@@ -79,10 +345,232 @@ class MultiAgentOrchestrator:
                 "validation_score": float,  # 검증 점수
                 "knowledge_sources": List[str],  # 참고 출처
                 "retry_count": int,  # 재시도 횟수
-                "workflow_log": List[Dict]  # 처리 과정 로그
+                "workflow_log": List[Dict],  # 처리 과정 로그
+                "failure": Optional[Dict],  # 단계 실패 정보 (없으면 None)
+                "degraded": bool,  # 실패 정책 또는 마감 시간에 의해 축소된 결과인지 여부
+                "llm_calls": int,  # 이번 요청의 LLM 호출 수
+                "models": Dict[str, int],  # 모델별 LLM 호출 수
+                "timings": Dict[str, float],  # 단계별 소요 시간(초): retrieval, style, validation, total
+                "deadline": Optional[Dict],  # {"budget", "remaining", "expired"} (마감 시간이 없으면 None)
+                "skipped_stages": List[Dict],  # 마감 시간 때문에 건너뛴 단계 [{"stage", "retry", "reason"}]
+                "cached": bool,  # 답변 캐시에서 바로 돌려준 답변인지 (이때 llm_calls는 0)
+                "profile": Optional[Dict],  # 프로파일 파일 {"mode", "path", "seconds", "samples"} (없으면 None)
+                "trace_id": Optional[str]  # 추적 파일에서 이 요청을 찾을 트레이스 ID (추적하지 않았으면 None)
             }
+            
+        Raises:
+            PipelineError: 실패 정책이 abort이거나 지식 검색 단계가 실패한 경우
+                           (마감 시간 안에 초안을 만들지 못한 경우 포함, cause가 DeadlineExceeded)
+        """
+        if deadline is None:
+            deadline = self.deadline
+        with self.profiler.profile("query", force=profile) as profiled, \
+                self.tracer.trace("process_query", **{"query.length": len(query),
+                                                      "query.has_history": bool(history)}) as root, \
+                track_llm_calls() as calls, deadline_scope(as_deadline(deadline)) as deadline:
+            self.metrics.increment("requests")
+            try:
+                entry = None
+                if self.answer_cache is not None and not history:
+                    started = time.monotonic()
+                    with span("answer_cache.lookup"):
+                        entry, prefetched = self._lookup_answer_cache(query, prefetched)
+                if entry is not None:
+                    if verbose:
+                        print(f"\n💾 답변 캐시 적중: {entry['question']}")
+                    result = self._cached_result(entry, time.monotonic() - started, deadline)
+                else:
+                    result = self._run_pipeline(query, verbose, calls, on_event, prefetched, deadline, history)
+            finally:
+                self.metrics.increment("llm_calls", calls.value)
+            set_attributes(**{
+                "pipeline.cached": result["cached"],
+                "pipeline.retry_count": result["retry_count"],
+                "pipeline.success": result["success"],
+                "pipeline.degraded": result["degraded"],
+                "pipeline.skipped_stages": len(result["skipped_stages"]),
+                "validation.score": float(result["validation_score"]),
+                "llm.calls": calls.value,
+            })
+        # 프로파일 파일은 with 블록이 끝날 때 저장된다
+        result["profile"] = profiled.to_dict() if profiled is not None else None
+        result["trace_id"] = root.trace_id if root is not None else None
+        return result
+    
+    def process_conversation(self, conversation_id: Optional[str], query: str, verbose: bool = False,
+                             on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             deadline: Union[Deadline, float, None] = None,
+                             profile: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        대화 세션에 이어서 질문 처리 (같은 conversation_id의 이전 턴을 기억)
+        
+        - conversation_id가 None이면 새 세션을 만들고 발급한 ID를 결과의 conversation_id로 돌려준다.
+          발급하지 않은 ID로는 세션을 만들지 않는다
+        - 이전 턴은 세션의 대화 기록(최근 턴 + 오래된 턴 요약, 토큰 예산 안)으로 초안 프롬프트에 들어간다
+        - 질문 임베딩이 세션의 마지막 검색 주제와 가까우면 그 검색 결과를 그대로 쓰고,
+          아니면 같은 임베딩으로 새로 검색한다 (어느 쪽이든 임베딩 호출은 한 번)
+        - 같은 세션의 턴은 차례로 처리된다
+        - profile은 process_query와 같고, 프로파일에는 세션 검색까지 포함된다
+        
+        Returns:
+            process_query 결과 + {"conversation_id": str, "turn": int, "retrieval_reused": bool}
+        
+        Raises:
+            SessionNotFound: 발급한 적 없거나 만료/제거된 conversation_id
+            PipelineError: process_query와 같음 (실패한 턴은 대화 기록에 남지 않음)
+        """
+        if conversation_id is None:
+            session = self.sessions.create()
+        else:
+            session = self.sessions.get(conversation_id)
+            if session is None:
+                raise SessionNotFound(conversation_id)
+        conversation_id = session.conversation_id
+        with session.lock, self.profiler.profile(conversation_id, force=profile) as profiled, \
+                self.tracer.trace("process_conversation", **{"conversation.id": conversation_id,
+                                                             "conversation.turn": session.turns + 1}):
+            started = time.monotonic()
+            with span("session.retrieval"):
+                prefetched, reused = self._session_retrieval(session, query)
+                set_attributes(**{"session.retrieval_reused": reused})
+            retrieval_time = time.monotonic() - started
+            result = self.process_query(query, verbose=verbose, on_event=on_event, prefetched=prefetched,
+                                        deadline=deadline, history=session.history())
+            session.record(query, result["final_answer"])
+            turn = session.turns
+        if profiled is not None:
+            result["profile"] = profiled.to_dict()
+        
+        self.metrics.increment("session_turns")
+        if reused:
+            self.metrics.increment("session_retrieval_reused")
+        result["timings"]["session_retrieval"] = round(retrieval_time, 3)
+        return {**result, "conversation_id": conversation_id, "turn": turn, "retrieval_reused": reused}
+    
+    def _session_retrieval(self, session: ConversationSession, query: str):
+        """
+        세션의 이전 검색 결과를 재사용하거나 새로 검색
+        
+        Returns:
+            (process_query의 prefetched 인자, 재사용 여부). 임베딩/검색이 실패하면 (None, False)로
+            process_query가 직접 검색하게 한다 (실패하면 그쪽에서 PipelineError)
+        """
+        knowledge_agent = self.knowledge_agent
+        try:
+            vector = knowledge_agent.backend.embed([query], knowledge_agent.embedding_model)[0]
+            items = session.reusable_retrieval(vector, self.reuse_similarity)
+            if items is not None:
+                return {"knowledge_items": items, "vector": vector}, True
+            items = knowledge_agent.search_knowledge_by_vectors([vector], k=5)[0]
+        except AgentError as e:
+            print(f"[MultiAgentOrchestrator] 세션 검색 실패, 일반 검색으로 진행: {e}")
+            return None, False
+        session.remember_retrieval(items, vector)
+        return {"knowledge_items": items, "vector": vector}, False
+    
+    # ----- 답변 캐시 -----
+    
+    @staticmethod
+    def _load_answer_cache(path: str) -> Optional[AnswerCache]:
+        """캐시 파일 불러오기 (없거나 깨졌으면 경고만 하고 캐시 없이 동작)"""
+        if not path:
+            return None
+        try:
+            return AnswerCache.load(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  답변 캐시를 불러오지 못했습니다 (캐시 없이 진행): {e}")
+            return None
+    
+    def _semantic_cache(self) -> bool:
+        """캐시 중심 벡터가 지식 검색과 같은 임베딩 모델로 만들어져 의미 일치를 쓸 수 있는지"""
+        if self._cache_semantic is None:
+            model = self.knowledge_agent.embedding_model
+            self._cache_semantic = self.answer_cache.semantic and self.answer_cache.embedding_model == model
+            if self.answer_cache.semantic and not self._cache_semantic:
+                print(f"⚠️  답변 캐시 임베딩 모델({self.answer_cache.embedding_model})이 "
+                      f"현재 모델({model})과 달라 완전 일치만 사용합니다")
+        return self._cache_semantic
+    
+    def _lookup_answer_cache(self, query: str, prefetched: Optional[Dict[str, Any]]):
         """
+        답변 캐시 조회
+        
+        완전 일치를 먼저 보고, 아니면 질문 임베딩(prefetched에 있으면 그대로)으로 의미 일치를 본다.
+        미스면 방금 만든 임베딩으로 검색까지 해서 파이프라인이 같은 질문을 다시 임베딩하지 않게 한다.
+        
+        Returns:
+            (캐시 항목 또는 None, 파이프라인에 넘길 prefetched)
+        """
+        entry = self.answer_cache.lookup_exact(query)
+        if entry is None:
+            vector = (prefetched or {}).get("vector")
+            if (vector is None and prefetched is not None) or not self._semantic_cache():
+                # 배치 검색 결과에 임베딩이 없거나 임베딩 모델이 다르면 완전 일치만
+                self.answer_cache.miss()
+            else:
+                knowledge_agent = self.knowledge_agent
+                try:
+                    if vector is None:
+                        vector = knowledge_agent.backend.embed([query], knowledge_agent.embedding_model)[0]
+                        entry = self.answer_cache.lookup_vector(vector)
+                        if entry is None:
+                            prefetched = {
+                                "knowledge_items": knowledge_agent.search_knowledge_by_vectors([vector], k=5)[0],
+                                "vector": vector,
+                            }
+                    else:
+                        entry = self.answer_cache.lookup_vector(vector)
+                except AgentError as e:
+                    # 캐시 조회 실패는 요청 실패가 아니다 - 파이프라인이 직접 검색
+                    print(f"[MultiAgentOrchestrator] 답변 캐시 조회 실패: {e}")
+        self.metrics.increment("answer_cache_hits" if entry is not None else "answer_cache_misses")
+        set_attributes(**{"answer_cache.hit": entry is not None,
+                          "answer_cache.entry": entry.get("id") if entry is not None else None})
+        return entry, prefetched
+    
+    @staticmethod
+    def _cached_result(entry: Dict[str, Any], elapsed: float, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """캐시 항목 → process_query 결과 형식"""
+        return {
+            "final_answer": entry["answer"],
+            "validation_score": entry["validation_score"],
+            "validation_details": entry.get("validation_details"),
+            "knowledge_sources": entry.get("knowledge_sources", []),
+            "retry_count": 0,
+            "workflow_log": [],
+            "success": True,
+            "failure": None,
+            "degraded": False,
+            "llm_calls": 0,
+            "models": {},
+            "timings": {"cache": round(elapsed, 3), "total": round(elapsed, 3)},
+            "deadline": deadline.to_dict() if deadline is not None else None,
+            "skipped_stages": [],
+            "cached": True
+        }
+    
+    def _run_pipeline(self, query: str, verbose: bool, calls: CallCounter,
+                      on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      prefetched: Optional[Dict[str, Any]] = None,
+                      deadline: Optional[Deadline] = None,
+                      history: str = "") -> Dict[str, Any]:
+        """process_query의 본체 (calls: 요청 단위 LLM 호출 카운터)"""
+        prefetched = prefetched or {}
+        started = time.monotonic()
+        # 단계별 소요 시간 (초, 재시도 포함 합계)
+        timings: Dict[str, float] = {}
         workflow_log = []
+        retry_count = 0
+        # 마감 시간 때문에 건너뛴 단계, 끝난 라운드들의 소요 시간/호출 수 (다음 라운드 시간 추정용)
+        skipped_stages: List[Dict[str, Any]] = []
+        deadline_hit = False
+        spent_seconds, spent_calls = 0.0, 0
+        
+        def emit(event: Dict[str, Any]):
+            # 에이전트가 보낸 이벤트에도 현재 시도 번호를 붙여 전달
+            if on_event:
+                event.setdefault("retry", retry_count)
+                on_event(event)
         
         if verbose:
             print(f"\n{'='*60}")
@@ -93,10 +581,22 @@ class MultiAgentOrchestrator:
         if verbose:
             print("🔍 Step 1: 지식 검색 중...")
         
-        knowledge_result = self.knowledge_agent.process({
-            "query": query,
-            "top_k": 5
-        })
+        emit({"type": "stage", "stage": "retrieval", "status": "start"})
+        try:
+            with time_stage(timings, "retrieval"), \
+                    span("KnowledgeAgent.process", **{"knowledge.prefetched": "knowledge_items" in prefetched}):
+                knowledge_result = self.knowledge_agent.process({
+                    "query": query,
+                    "top_k": 5,
+                    "knowledge_items": prefetched.get("knowledge_items"),
+                    "history": history
+                })
+        except AgentError as e:
+            # 초안이 없으면 어떤 정책으로도 돌려줄 답변이 없으므로 항상 중단
+            self._record_failure("knowledge", e, calls.value, verbose)
+            raise PipelineError("knowledge", e, wasted_calls=calls.value) from e
+        emit({"type": "stage", "stage": "retrieval", "status": "done"})
+        
         workflow_log.append({
             "step": 1,
             "agent": "KnowledgeAgent",
@@ -112,46 +612,134 @@ class MultiAgentOrchestrator:
         draft_answer = knowledge_result['answer']
         
         # Step 2~4: 스타일 변환 및 검증 (최대 max_retries회 시도)
-        retry_count = 0
         final_answer = None
+        styled_answer = None
         validation_result = None
+        failure = None
+        # (점수, 텍스트, 검증 결과) - fallback 시 가장 점수가 높은 후보를 반환
+        candidates = []
+        # 마지막으로 결과에 반영될 수 있는 상태가 된 시점의 호출 수
+        checkpoint = calls.value
+        # 이번 시도의 재생성 방식 (첫 시도는 전체 변환, 이후는 _plan_revision이 결정)
+        revision = {"mode": "full"}
+        # 스타일 예시는 초안 기준으로 한 번만 검색해 모든 재시도와 검증에서 재사용
+        from .style_agent import StyleContext
+        style_context = StyleContext(self.style_agent, draft_answer,
+                                     examples=prefetched.get("style_examples"))
         
         while retry_count < self.max_retries:
+            if retry_count > 0 and deadline is not None and spent_calls:
+                # 지금까지의 호출당 평균 시간으로 이번 라운드가 마감 전에 끝날지 추정
+                estimate = spent_seconds / spent_calls * self.ROUND_CALLS[revision["mode"]]
+                if not deadline.fits(estimate):
+                    skipped_stages += self._skipped_round(retry_count, revision["mode"], "budget")
+                    deadline_hit = True
+                    if verbose:
+                        print(f"\n⏱  마감 시간 부족: 재시도 {retry_count} 생략 "
+                              f"(예상 {estimate:.1f}초 / 남은 {deadline.remaining():.1f}초)")
+                    break
+            round_started, round_calls = time.monotonic(), calls.value
+            
             # Step 2: 스타일 변환
             if verbose:
                 if retry_count == 0:
                     print(f"\n✍️  Step 2: 이광수 스타일로 변환 중...")
                 else:
-                    print(f"\n🔄 재시도 {retry_count}/{self.max_retries - 1}: 스타일 재변환 중...")
+                    print(f"\n🔄 재시도 {retry_count}/{self.max_retries - 1}: "
+                          f"{self.REVISION_LABELS[revision['mode']]} 중...")
+            if retry_count > 0:
+                emit({"type": "stage", "stage": "retry", "status": "start"})
             
-            style_result = self.style_agent.process({
-                "text": draft_answer,
-                "context": query
-            })
-            workflow_log.append({
-                "step": 2,
-                "agent": "StyleAgent",
-                "retry": retry_count,
-                "result": style_result
-            })
-            
-            styled_answer = style_result['styled_text']
+            try:
+                # 재시도는 라우팅의 escalate 설정(더 무거운 모델)으로 실행
+                with time_stage(timings, "style"), escalated(1 if retry_count > 0 else 0), \
+                        span("StyleAgent.process", **{"pipeline.retry": retry_count,
+                                                      "pipeline.mode": revision["mode"]}):
+                    style_result = self.style_agent.process({
+                        "text": draft_answer,
+                        "context": query,
+                        "on_event": emit if on_event else None,
+                        "style_context": style_context,
+                        **revision
+                    })
+            except DeadlineExceeded as e:
+                skipped_stages += self._skipped_round(retry_count, revision["mode"], "timeout")
+                deadline_hit = True
+                if verbose:
+                    print(f"   ⏱  스타일 단계 마감 시간 초과: {e}")
+                break
+            except AgentError as e:
+                failure = self._handle_failure("style", e, calls.value - checkpoint, verbose)
+                if self.failure_policy == "degrade" and not candidates:
+                    # 스타일 단계만 건너뛰고 초안을 그대로 검증한다
+                    styled_answer = knowledge_result['answer']
+                    style_result = {"styled_text": styled_answer, "style_examples": style_context.cached}
+                else:
+                    break
+            else:
+                workflow_log.append({
+                    "step": 2,
+                    "agent": "StyleAgent",
+                    "retry": retry_count,
+                    "mode": revision["mode"],
+                    "result": style_result
+                })
+                styled_answer = style_result['styled_text']
             
             # Step 3: 검증
             if verbose:
                 print(f"✅ Step 3: 스타일 검증 중...")
             
-            validation_result = self.validator_agent.process({
-                "generated_text": styled_answer,
-                "original_query": query,
-                "style_examples": style_result.get('style_examples', [])
-            })
+            round_start = calls.value
+            emit({"type": "stage", "stage": "validation", "status": "start"})
+            try:
+                with time_stage(timings, "validation"), \
+                        span("ValidatorAgent.process", **{"pipeline.retry": retry_count}):
+                    validation_result = self.validator_agent.process({
+                        "generated_text": styled_answer,
+                        "original_query": query,
+                        "style_examples": style_result.get('style_examples', [])
+                    })
+            except DeadlineExceeded as e:
+                skipped_stages.append({"stage": "validation", "retry": retry_count, "reason": "timeout"})
+                deadline_hit = True
+                if verbose:
+                    print(f"   ⏱  검증 단계 마감 시간 초과: {e}")
+                break
+            except AgentError as e:
+                # degrade는 이번 라운드의 스타일 결과를 쓰므로 검증 호출만 낭비로 본다
+                wasted = calls.value - (round_start if self.failure_policy == "degrade" else checkpoint)
+                failure = self._handle_failure("validation", e, wasted, verbose)
+                if self.failure_policy == "degrade":
+                    # 검증 없이 현재 텍스트를 그대로 사용
+                    final_answer = styled_answer
+                validation_result = None
+                break
+            
+            self.metrics.record_validator_parse(validation_result.get("parse_status", "json"))
+            
             workflow_log.append({
                 "step": 3,
                 "agent": "ValidatorAgent",
                 "retry": retry_count,
                 "result": validation_result
             })
+            candidates.append((validation_result['score'], styled_answer, validation_result))
+            checkpoint = calls.value
+            spent_seconds += time.monotonic() - round_started
+            spent_calls += calls.value - round_calls
+            emit({"type": "stage", "stage": "validation", "status": "done"})
+            emit({
+                "type": "validation",
+                "score": validation_result['score'],
+                "aspects": validation_result['aspects'],
+                "is_valid": validation_result['is_valid']
+            })
+            
+            if failure is not None:
+                # degrade로 초안을 검증한 경우: 재시도하지 않음
+                final_answer = styled_answer
+                break
             
             if verbose:
                 print(f"   - 검증 점수: {validation_result['score']:.1f}/100")
@@ -171,20 +759,55 @@ class MultiAgentOrchestrator:
                     if validation_result.get('feedback'):
                         print(f"   - 피드백: {validation_result['feedback'][:100]}...")
                 
-                # 피드백을 반영하여 draft_answer 수정
-                draft_answer = self._refine_with_feedback(
-                    draft_answer,
-                    styled_answer,
-                    validation_result
-                )
+                if style_context.wants_refresh(validation_result.get('feedback', '')):
+                    # 피드백이 다른 참고 예시를 요구할 때만 다시 검색
+                    style_context.refresh()
+                    if verbose:
+                        print(f"   - 스타일 예시 다시 검색")
+                
+                # 약한 항목에 맞춰 가장 싼 재생성 방식 선택
+                previous_score = candidates[-2][0] if len(candidates) > 1 else None
+                revision = self._plan_revision(validation_result, style_result, revision, previous_score)
+                if verbose:
+                    print(f"   - 다음 시도: {self.REVISION_LABELS[revision['mode']]}")
+                if revision["mode"] == "full":
+                    # 피드백을 반영하여 draft_answer 수정
+                    draft_answer = self._refine_with_feedback(
+                        draft_answer,
+                        styled_answer,
+                        validation_result
+                    )
                 retry_count += 1
         
+        if deadline_hit and final_answer is None:
+            # 마감 시간: 검증된 후보 중 최고점, 없으면 검증 전 스타일 결과, 그것도 없으면 초안
+            if candidates:
+                _, final_answer, validation_result = max(candidates, key=lambda c: c[0])
+            else:
+                final_answer = styled_answer or knowledge_result['answer']
+                validation_result = None
+            self.metrics.increment("deadline_cutoffs")
+            if verbose:
+                print(f"\n⏱  마감 시간으로 중단. 최고점 후보 사용 "
+                      f"(건너뛴 단계: {', '.join(s['stage'] for s in skipped_stages)})")
+        
+        if failure is not None and final_answer is None:
+            # fallback: 지금까지 검증된 후보 중 최고점, 없으면 초안
+            if candidates:
+                _, final_answer, validation_result = max(candidates, key=lambda c: c[0])
+            else:
+                final_answer = knowledge_result['answer']
+            if verbose:
+                print(f"\n⚠️  {failure['stage']} 단계 실패. 이전 결과로 대체 ({self.failure_policy})")
+        
         # 최대 재시도 후에도 실패하면 마지막 버전 사용
         if final_answer is None:
             final_answer = styled_answer
             if verbose:
                 print(f"\n⚠️  최대 재시도 횟수 도달. 마지막 버전 사용")
         
+        self.metrics.increment("style_searches", style_context.searches)
+        
         if verbose:
             print(f"\n{'='*60}")
             print("✨ 최종 답변 생성 완료!")
@@ -197,7 +820,231 @@ class MultiAgentOrchestrator:
             "knowledge_sources": knowledge_result['sources'],
             "retry_count": retry_count,
             "workflow_log": workflow_log,
-            "success": validation_result['is_valid'] if validation_result else False
+            "success": validation_result['is_valid'] if validation_result and failure is None else False,
+            "failure": failure,
+            "degraded": failure is not None or deadline_hit,
+            "llm_calls": calls.value,
+            "models": dict(calls.models),
+            "timings": {
+                **{stage: round(seconds, 3) for stage, seconds in timings.items()},
+                "total": round(time.monotonic() - started, 3)
+            },
+            "deadline": deadline.to_dict() if deadline is not None else None,
+            "skipped_stages": skipped_stages,
+            "cached": False
+        }
+    
+    def stream_query(self, query: str, verbose: bool = False,
+                     conversation_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        process_query를 백그라운드 스레드에서 실행하며 진행 이벤트를 차례로 반환
+        (conversation_id를 주면 process_conversation으로 발급된 대화 세션에 이어서 처리)
+        
+        process_query의 on_event 이벤트들이 도착하는 대로 반환되고, 마지막으로
+        {"type": "result", "result": Dict} 또는 {"type": "error", "error": Exception}가 반환된다.
+        UI 스레드에서 바로 렌더링할 수 있도록 이벤트 소비는 호출한 스레드에서 이루어진다.
+        """
+        events: "queue.Queue" = queue.Queue()
+        
+        def run():
+            try:
+                if conversation_id is not None:
+                    result = self.process_conversation(conversation_id, query, verbose=verbose,
+                                                       on_event=events.put)
+                else:
+                    result = self.process_query(query, verbose=verbose, on_event=events.put)
+                events.put({"type": "result", "result": result})
+            except Exception as e:
+                events.put({"type": "error", "error": e})
+        
+        threading.Thread(target=run, name="stream-query", daemon=True).start()
+        while True:
+            event = events.get()
+            yield event
+            if event["type"] in ("result", "error"):
+                return
+    
+    def process_many(self, queries: List[str], concurrency: int = 4,
+                     verbose: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        여러 질문을 동시에 처리하고 끝나는 순서대로 결과를 반환 (대량 오프라인 생성용)
+        
+        - 같은 질문은 한 번만 임베딩/검색하고, 모든 질문의 검색을 prefetch()로 한꺼번에 처리
+        - 파이프라인은 concurrency개 스레드의 실행기 하나에서 동시에 실행
+        - 질문 하나의 실패는 다른 질문에 영향을 주지 않고 오류 항목으로 반환
+        
+        Args:
+            queries: 질문 목록
+            concurrency: 동시에 실행할 파이프라인 수
+            verbose: 파이프라인 상세 로그 출력 여부 (동시 실행 시 로그가 섞임)
+        
+        Yields:
+            {"type": "result", "index": int, "query": str, "result": Dict, "elapsed": float}
+            {"type": "error", "index": int, "query": str, "error": Exception, "elapsed": float}
+            마지막에 {"type": "report", "report": Dict}  # 처리량, 지연 시간, 단계별 시간 집계
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency는 1 이상이어야 합니다")
+        started = time.monotonic()
+        
+        unique_queries = list(dict.fromkeys(queries))
+        try:
+            prefetched = dict(zip(unique_queries, self.prefetch(unique_queries)))
+        except AgentError as e:
+            # 배치 검색이 실패하면 질문마다 따로 검색 (그래도 실패하면 해당 질문만 오류)
+            print(f"⚠️  배치 검색 실패, 질문별 검색으로 진행: {e}")
+            prefetched = {}
+        prefetch_time = time.monotonic() - started
+        
+        def run(index: int, query: str) -> Dict[str, Any]:
+            item_started = time.monotonic()
+            try:
+                result = self.process_query(query, verbose=verbose, prefetched=prefetched.get(query))
+            except Exception as e:
+                return {"type": "error", "index": index, "query": query, "error": e,
+                        "elapsed": time.monotonic() - item_started}
+            return {"type": "result", "index": index, "query": query, "result": result,
+                    "elapsed": time.monotonic() - item_started}
+        
+        latencies: List[float] = []
+        stage_totals: Dict[str, float] = {}
+        model_calls: Dict[str, int] = {}
+        succeeded = validated = failed = llm_calls = 0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="process-many") as executor:
+            futures = [executor.submit(run, i, query) for i, query in enumerate(queries)]
+            try:
+                for future in as_completed(futures):
+                    item = future.result()
+                    latencies.append(item["elapsed"])
+                    if item["type"] == "result":
+                        result = item["result"]
+                        succeeded += 1
+                        validated += 1 if result["success"] else 0
+                        llm_calls += result["llm_calls"]
+                        for model, count in result["models"].items():
+                            model_calls[model] = model_calls.get(model, 0) + count
+                        for stage, seconds in result["timings"].items():
+                            if stage != "total":
+                                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+                    else:
+                        failed += 1
+                    yield item
+            finally:
+                # 호출한 쪽이 중간에 그만두면 아직 시작하지 않은 질문은 취소
+                for future in futures:
+                    future.cancel()
+        
+        elapsed = time.monotonic() - started
+        ordered = sorted(latencies)
+        yield {"type": "report", "report": {
+            "total": len(queries),
+            "unique_queries": len(unique_queries),
+            "succeeded": succeeded,
+            "validated": validated,
+            "failed": failed,
+            "concurrency": concurrency,
+            "batched_retrieval": bool(prefetched),
+            "prefetch_time": round(prefetch_time, 3),
+            "elapsed": round(elapsed, 3),
+            "queries_per_minute": round(len(queries) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "latency": {
+                "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+                "p50": round(self._percentile(ordered, 0.5), 3),
+                "p95": round(self._percentile(ordered, 0.95), 3),
+                "max": round(ordered[-1], 3) if ordered else 0.0,
+            },
+            # 단계별 누적 시간 (동시 실행이므로 합계는 elapsed보다 클 수 있음)
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stage_totals.items()},
+            "llm_calls": llm_calls,
+            "model_calls": model_calls,
+        }}
+    
+    @staticmethod
+    def _percentile(ordered: List[float], fraction: float) -> float:
+        """정렬된 목록의 백분위 값 (가장 가까운 순위)"""
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    
+    @staticmethod
+    def _skipped_round(retry: int, mode: str, reason: str) -> List[Dict[str, Any]]:
+        """
+        마감 시간 때문에 건너뛴 라운드의 단계 목록
+        
+        Args:
+            reason: "budget" (남은 시간 안에 끝나지 않을 것으로 추정) 또는 "timeout" (호출을 시작할 시간이 없었거나 끊김)
+        """
+        return [
+            {"stage": "style", "retry": retry, "mode": mode, "reason": reason},
+            {"stage": "validation", "retry": retry, "reason": reason},
+        ]
+    
+    def _handle_failure(self, stage: str, error: AgentError,
+                        wasted_calls: int, verbose: bool) -> Dict[str, Any]:
+        """
+        스타일/검증 단계 실패 처리
+        
+        abort 정책이면 PipelineError를 발생시키고, 그 외에는 실패 정보를 반환한다.
+        실패한 단계의 출력(오류 문자열)은 절대 다음 LLM 호출로 넘기지 않는다.
+        """
+        self._record_failure(stage, error, wasted_calls, verbose)
+        if self.failure_policy == "abort":
+            raise PipelineError(stage, error, wasted_calls=wasted_calls) from error
+        return {
+            "stage": stage,
+            "error": str(error),
+            "policy": self.failure_policy,
+            "wasted_calls": wasted_calls
+        }
+    
+    def _record_failure(self, stage: str, error: AgentError, wasted_calls: int, verbose: bool):
+        """실패를 메트릭에 기록"""
+        self.metrics.record_failure(stage, wasted_calls)
+        if verbose:
+            print(f"   ❌ {stage} 단계 실패: {error} (낭비된 호출: {wasted_calls}회)")
+    
+    def _plan_revision(self,
+                       validation_result: Dict[str, Any],
+                       style_result: Dict[str, Any],
+                       last_revision: Dict[str, Any],
+                       previous_score: Optional[float]) -> Dict[str, Any]:
+        """
+        검증 실패 후 다음 시도의 재생성 방식 결정 (싼 것부터)
+        
+        - 직전 시도가 부분 재생성이었는데 점수가 오르지 않았으면 전체 재변환 (2회 호출)
+        - 피드백이 어휘/문체를 지적하면 말투 변환 결과를 재사용해 근대어 변환만 (1회).
+          검증 결과의 평가 사유(reasoning)는 답변 내용을 요약하므로 보지 않는다
+        - 그 외(논리/합리화 부족)에는 만점 대비 가장 약한 항목만 보강 편집 (1회)
+        
+        Returns:
+            StyleAgent.process 입력에 더할 값 ({"mode": ..., ...})
+        """
+        from .validator_agent import ASPECT_MAX_SCORES
+        
+        feedback = validation_result.get('feedback', '')
+        if last_revision["mode"] != "full" and previous_score is not None \
+                and validation_result['score'] <= previous_score:
+            return {"mode": "full"}
+        if not style_result.get('tone_text'):
+            return {"mode": "full"}
+        
+        base = {
+            "tone_text": style_result['tone_text'],
+            "feedback": feedback,
+        }
+        if any(keyword in feedback for keyword in self.VOCABULARY_KEYWORDS):
+            return {"mode": "modernize", **base}
+        
+        aspects = validation_result.get('aspects', {})
+        weak_aspect = min(
+            ASPECT_MAX_SCORES,
+            key=lambda name: aspects.get(name, 0) / ASPECT_MAX_SCORES[name]
+        )
+        return {
+            "mode": "strengthen",
+            "styled_text": style_result['styled_text'],
+            "aspect": weak_aspect,
+            **base
         }
     
     def _refine_with_feedback(self,
@@ -222,13 +1069,14 @@ class MultiAgentOrchestrator:
         return original_draft + hint
     
     def chat(self):
-        """대화형 인터페이스"""
+        """대화형 인터페이스 (실행하는 동안 하나의 대화 세션으로 이전 질문을 기억)"""
         print("\n" + "="*60)
         print("이광수 친일 챗봇 (멀티 에이전트 버전 - Gemini 2.5 Flash)")
         print("="*60)
         print("질문을 입력하세요. 종료하려면 'quit' 또는 'exit'를 입력하세요.")
         print("="*60 + "\n")
         
+        conversation_id = None  # 첫 질문에서 세션을 발급받음
         while True:
             try:
                 query = input("\n질문> ").strip()
@@ -240,7 +1088,12 @@ class MultiAgentOrchestrator:
                 if not query:
                     continue
                 
-                result = self.process_query(query, verbose=True)
+                try:
+                    result = self.process_conversation(conversation_id, query, verbose=True)
+                except SessionNotFound:
+                    print("\n(대화 세션이 만료되어 새 대화로 시작합니다)")
+                    result = self.process_conversation(None, query, verbose=True)
+                conversation_id = result["conversation_id"]
                 
                 print(f"\n답변>\n{result['final_answer']}")
                 print(f"\n[검증 점수: {result['validation_score']:.1f}/100]")
@@ -0,0 +1,283 @@
+"""
+PDF 텍스트 추출 / 정제 / 한국어 문장 단위 청크 분할
+
+pypdf로 뽑은 논문 텍스트에는 줄 끝에서 끊긴 단어, 쪽마다 반복되는 머리글/바닥글,
+쪽 번호, 각주와 각주 번호, 참고문헌/영문 초록이 섞여 있다. 이것들이 그대로
+임베딩되고 프롬프트에 들어가지 않도록 정제한 뒤, 글자 수가 아니라 문장 경계
+("~다.", "~요." 등)에서 청크를 나눈다.
+
+쪽별 원문 텍스트는 파일 SHA-256 기준으로 캐시하므로, 정제 규칙을 바꿔도
+PDF를 다시 읽을 필요가 없다.
+"""
+import json
+import os
+import re
+from collections import Counter
+from typing import List, Tuple
+
+from .ingest import file_sha256, resolve_dir
+
+# 추출 방식이 바뀌면 올려서 캐시를 무효화
+EXTRACTOR_VERSION = 1
+
+# PDF 글꼴의 사용자 정의 영역 문자 (책 제목 괄호 등)와 제어 문자
+_PRIVATE_USE = {"\U000F0854": "『", "\U000F0855": "』"}
+_PRIVATE_USE_RE = re.compile("[\x00-\x08\x0b-\x1f\uE000-\uF8FF\U000F0000-\U000FFFFF]")
+
+_FOOTNOTE_LINE_RE = re.compile(r"^\s*(\d{1,3}\s?\)|\*{1,3})\s*\S")
+_FOOTNOTE_MARK_RE = re.compile(r"(?<=[.,”\"’」』\])가-힣])\d{1,3}\)(?=[\s.,가-힣”\"’]|$)")
+_PAGE_NUMBER_RE = re.compile(r"^\s*[-–]?\s*\d{1,4}\s*[-–]?\s*$")
+_SPACED_HANGUL_RE = re.compile(r"(?<![가-힣])(?:[가-힣] ){2,}[가-힣](?![가-힣])")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"[ \t]+([.,?!)」』”’])")
+_TAIL_HEADING_RE = re.compile(
+    r"^\s*[【\[<〔(■]?\s*(참\s*고\s*문\s*헌|참고\s*자료|References|REFERENCES|Bibliography|"
+    r"국문\s*초록|Abstract|ABSTRACT)\s*[】\]>〕)]?\s*$"
+)
+_CITATION_RE = re.compile(r"[,.]\s*(18|19|20)\d{2}\s*[.,)]|『.+』|｢.+｣")
+_SENTENCE_END_RE = re.compile(r"(?<=[가-힣一-龥)」』”’\"'])[.?!]+[”\"’」』)]*(?=\s)")
+# 줄 첫 어절이 조사 / 서술격 어미뿐이면 앞 줄 마지막 어절에서 끊긴 것 (앞 줄에 붙임)
+# ("이", "하는"처럼 홀로 어절이 될 수 있는 말은 넣지 않는다)
+_LEADING_PARTICLE_RE = re.compile(
+    r"^(은|는|가|을|를|의|에|에서|에게|께|으로|로|와|과|도|만|까지|부터|보다|처럼|이나|"
+    r"이라고|라고|이다|였다|이었다)(?=[\s.,?!)」』”’\"]|$)"
+)
+
+
+def _cache_dir() -> str:
+    return os.getenv("PDF_TEXT_CACHE") or resolve_dir(".pdf_text_cache")
+
+
+def extract_pages(pdf_path: str, use_cache: bool = True) -> List[str]:
+    """
+    쪽별 원문 텍스트 (파일 해시 기준 캐시)
+
+    Returns:
+        쪽 순서대로의 텍스트 목록
+    """
+    cache_path = os.path.join(_cache_dir(), f"{file_sha256(pdf_path)}.v{EXTRACTOR_VERSION}.json")
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)["pages"]
+        except Exception:
+            pass
+
+    from pypdf import PdfReader
+
+    pages = [page.extract_text() or "" for page in PdfReader(pdf_path).pages]
+    if use_cache:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"file": os.path.basename(pdf_path), "pages": pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return pages
+
+
+# ----- 정제 -----
+
+def _normalize_chars(text: str) -> str:
+    for src, dst in _PRIVATE_USE.items():
+        text = text.replace(src, dst)
+    return _PRIVATE_USE_RE.sub("", text)
+
+
+def _line_key(line: str) -> str:
+    """머리글 비교용 키 (숫자/공백 제거 - 쪽 번호만 다른 머리글을 같게 봄)"""
+    return re.sub(r"[\d\s]", "", line)
+
+
+def _repeated_edge_lines(pages: List[List[str]], edge: int = 2) -> set:
+    """여러 쪽의 위/아래 가장자리에 반복되는 줄 (머리글/바닥글)"""
+    counts = Counter()
+    for lines in pages:
+        keys = {_line_key(l) for l in lines[:edge] + lines[-edge:] if _line_key(l)}
+        counts.update(keys)
+    threshold = max(3, int(len(pages) * 0.3))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _strip_footnotes(lines: List[str]) -> List[str]:
+    """쪽 아래쪽의 각주 블록 제거 (아래 절반에서 "1) ..." 로 시작하는 첫 줄부터)"""
+    for i in range(len(lines) // 2, len(lines)):
+        if _FOOTNOTE_LINE_RE.match(lines[i]):
+            return lines[:i]
+    return lines
+
+
+def _hangul_ratio(text: str) -> float:
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return 1.0
+    return sum(1 for c in letters if "가" <= c <= "힣") / len(letters)
+
+
+def _is_tail_page(text: str) -> bool:
+    """참고문헌 목록이거나 한글이 거의 없는 (영문 초록) 쪽"""
+    lines = [l for l in text.split("\n") if l.strip()]
+    if not lines:
+        return True
+    citations = sum(1 for l in lines if _CITATION_RE.search(l))
+    return citations / len(lines) > 0.5 or _hangul_ratio(text) < 0.2
+
+
+def _marks_word_breaks(lines: List[str]) -> bool:
+    """
+    줄 끝 공백으로 어절 경계를 표시한 문서인지 (줄의 20% 이상이 공백으로 끝남)
+
+    이런 PDF에서는 공백 없이 끝난 줄이 어절 중간에서 끊긴 것이다. 공백 표시가 없는 문서는
+    줄바꿈만으로 어절 중간인지 알 수 없다.
+    """
+    lines = [l for l in lines if l.strip()]
+    return bool(lines) and sum(1 for l in lines if l[-1] in " \t") >= len(lines) * 0.2
+
+
+def _join_lines(lines: List[str], marks_word_breaks: bool = False) -> str:
+    """
+    줄 합치기: 기본은 띄어 쓰고(줄바꿈은 대개 어절 사이), 단어가 줄에서 끊긴 것이 분명할 때만 붙인다
+    - 앞 줄이 영문자 + 하이픈으로 끝남 (하이픈은 지움)
+    - 다음 줄 첫 어절이 조사 / 서술격 어미뿐이거나 닫는 문장부호로 시작
+    - marks_word_breaks인 문서에서 앞 줄이 공백 없이 한글로 끝나고 다음 줄이 한글로 시작
+    """
+    text = ""
+    previous = ""
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if not text:
+            text = stripped
+        elif len(text) > 1 and text[-1] == "-" and text[-2].isascii() and text[-2].isalpha() \
+                and stripped[0].isalpha():
+            text = text[:-1] + stripped
+        elif _LEADING_PARTICLE_RE.match(stripped) or stripped[0] in ".,?!)」』”’:;":
+            text += stripped
+        elif marks_word_breaks and previous[-1:] not in (" ", "\t") \
+                and "가" <= text[-1] <= "힣" and "가" <= stripped[0] <= "힣":
+            text += stripped
+        else:
+            text += " " + stripped
+        previous = line
+    return text
+
+
+def clean_pages(pages: List[str], drop_tail: bool = True) -> List[str]:
+    """
+    쪽별 원문 텍스트 정제
+
+    - 반복되는 머리글/바닥글, 쪽 번호, 각주 블록과 본문 속 각주 번호 제거
+    - 줄 끝에서 끊긴 단어 복원 (분명한 경우만, 나머지 줄바꿈은 띄어 씀)
+    - "홍 기 돈" 처럼 글자마다 띄운 한글과 문장부호 앞 공백 정리
+    - drop_tail: 문서 뒷부분(절반 이후)의 참고문헌/초록 제목부터 끝까지, 참고문헌·영문 쪽 제거
+
+    Returns:
+        정제된 쪽별 텍스트 (제거된 쪽은 빈 문자열, 쪽 번호를 유지하기 위해 길이는 같음)
+    """
+    split_pages = [[l for l in _normalize_chars(p).split("\n")] for p in pages]
+    stripped = [[l for l in lines if l.strip()] for lines in split_pages]
+    repeated = _repeated_edge_lines(stripped) if len(pages) >= 3 else set()
+    # 글꼴 인코딩이 깨져 한글이 거의 없는 문서는 한글 비율로 영문 쪽을 판단할 수 없다
+    check_tail_pages = _hangul_ratio("".join(pages)) >= 0.5
+    marks_word_breaks = _marks_word_breaks([l for lines in split_pages for l in lines])
+
+    cleaned = []
+    cut = False
+    for page_no, lines in enumerate(split_pages):
+        if cut:
+            cleaned.append("")
+            continue
+        body = [
+            l for l in lines
+            if l.strip() and _line_key(l) not in repeated and not _PAGE_NUMBER_RE.match(l)
+        ]
+        body = _strip_footnotes(body)
+        in_tail = drop_tail and page_no >= len(pages) // 2
+        if in_tail:
+            for i, line in enumerate(body):
+                if _TAIL_HEADING_RE.match(line):
+                    body = body[:i]
+                    cut = True
+                    break
+        if in_tail and not cut and check_tail_pages and _is_tail_page("\n".join(body)):
+            text = ""
+        else:
+            text = _join_lines(body, marks_word_breaks)
+        text = _FOOTNOTE_MARK_RE.sub("", text)
+        text = _SPACED_HANGUL_RE.sub(lambda m: m.group(0).replace(" ", ""), text)
+        text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+        cleaned.append(re.sub(r"[ \t]{2,}", " ", text).strip())
+    return cleaned
+
+
+# ----- 문장 단위 청크 -----
+
+def split_sentences(text: str) -> List[str]:
+    """한국어 문장 경계("~다.", "~요.", "~까?" 등 한글 뒤 마침표/물음표 + 공백)로 분리"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+def chunk_pages(pages: List[str], chunk_size: int, chunk_overlap: int) -> List[Tuple[str, int]]:
+    """
+    정제된 쪽들을 문장 단위로 묶어 청크 생성 (쪽 경계를 넘어 이어짐)
+
+    Args:
+        chunk_size: 청크 최대 글자 수
+        chunk_overlap: 다음 청크 앞에 이어 붙일 직전 문장들의 최대 글자 수
+
+    Returns:
+        (청크 텍스트, 청크가 시작하는 쪽 번호(0부터)) 목록
+    """
+    sentences: List[Tuple[str, int]] = []
+    for page_no, text in enumerate(pages):
+        for sentence in split_sentences(text):
+            # 문장 하나가 청크보다 길면 글자 수로 자른다
+            for i in range(0, len(sentence), chunk_size):
+                sentences.append((sentence[i:i + chunk_size], page_no))
+    # 쪽 끝에서 끊긴 문장은 다음 쪽 첫 문장과 이어 붙인다
+    merged: List[Tuple[str, int]] = []
+    for sentence, page_no in sentences:
+        if merged and not _SENTENCE_END_RE.search(merged[-1][0] + " ") \
+                and len(merged[-1][0]) + len(sentence) < chunk_size:
+            merged[-1] = (merged[-1][0] + " " + sentence, merged[-1][1])
+        else:
+            merged.append((sentence, page_no))
+
+    chunks: List[Tuple[str, int]] = []
+    current: List[Tuple[str, int]] = []
+    length = 0
+    for sentence, page_no in merged:
+        if current and length + len(sentence) + 1 > chunk_size:
+            chunks.append((" ".join(s for s, _ in current), current[0][1]))
+            # 겹침: 직전 문장들 중 chunk_overlap 안에 들어가는 만큼 유지
+            overlap, overlap_len = [], 0
+            for s, p in reversed(current):
+                if overlap_len + len(s) > chunk_overlap:
+                    break
+                overlap.insert(0, (s, p))
+                overlap_len += len(s) + 1
+            current, length = overlap, overlap_len
+        current.append((sentence, page_no))
+        length += len(sentence) + 1
+    if current:
+        chunks.append((" ".join(s for s, _ in current), current[0][1]))
+    return chunks
+
+
+def text_warning(pages: List[str]) -> str:
+    """추출 결과가 의심스러우면 사유 (스캔본 / 글꼴 인코딩 깨짐), 괜찮으면 빈 문자열"""
+    text = "".join(pages)
+    if len(text.strip()) < 100 * max(1, len(pages)):
+        return "추출된 텍스트가 거의 없음 (스캔 이미지 PDF?)"
+    if _hangul_ratio(text) < 0.3:
+        return f"한글 비율 {_hangul_ratio(text):.0%} (글꼴 인코딩이 깨졌을 수 있음)"
+    return ""
@@ -0,0 +1,246 @@
+"""
+요청 단위 프로파일러 (선택 사항, 기본 꺼짐)
+
+느린 요청 하나가 네트워크(LLM 호출) 때문인지, 벡터 검색 때문인지, 우리 쪽 문자열 처리
+때문인지 보기 위해 요청 하나를 처리하는 동안의 프로파일을 파일로 남긴다.
+
+- sample: 요청 스레드의 호출 스택을 일정 간격으로 샘플링해 접힌 스택(folded stacks) 형식
+  (.folded)으로 저장. flamegraph.pl, speedscope, inferno에 그대로 넣을 수 있고,
+  LLM 응답을 기다리는 시간도 스택으로 잡힌다. 오버헤드가 작아 운영 중에도 켜 둘 수 있다
+- cprofile: cProfile 결과(.prof, pstats 형식). 함수별 호출 횟수까지 필요할 때 사용
+  (flameprof, snakeviz로 변환). 프로세스에 프로파일러를 하나만 걸 수 있어 한 번에 한 요청만
+
+운영 중에 켜 두어도 되도록 분당 최대 개수(max_per_minute)와 동시에 프로파일링하는 요청 수를
+제한하고, 디렉토리의 파일 수도 max_files개로 유지한다. 한도를 넘은 요청은 프로파일 없이 처리된다.
+"""
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+PROFILE_MODES = ("off", "sample", "cprofile")
+
+_SUFFIXES = {"sample": ".folded", "cprofile": ".prof"}
+_UNSAFE_LABEL = re.compile(r"[^0-9A-Za-z_-]+")
+
+# 프로파일링 중인 요청 안에서 다시 프로파일을 시작하지 않도록 (process_conversation → process_query)
+_active_profile: ContextVar[Optional["ProfileSession"]] = ContextVar("active_profile", default=None)
+
+
+def _frame_name(frame) -> str:
+    """스택 한 칸의 이름 (함수 (상위폴더/파일:줄), 접힌 스택 구분자 ';'는 쓰지 않음)"""
+    code = frame.f_code
+    parent, filename = os.path.split(code.co_filename)
+    return f"{code.co_name} ({os.path.basename(parent)}/{filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class ProfileSession:
+    """요청 하나의 프로파일 (with 블록이 끝나면 파일로 저장)"""
+
+    def __init__(self, mode: str, path: str, interval: float):
+        self.mode = mode
+        self.path = path
+        self.interval = interval
+        self.samples = 0
+        self.started = time.monotonic()
+        self.seconds = 0.0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._profile: Optional[cProfile.Profile] = None
+
+    def start(self):
+        """프로파일 시작 (호출한 스레드가 대상)"""
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            return
+        target = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, args=(target,),
+                                        name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """프로파일 종료 후 파일 저장"""
+        self.seconds = time.monotonic() - self.started
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.path)
+            return
+        self._stop.set()
+        self._thread.join()
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _sample(self, target: int):
+        """target 스레드의 스택을 interval마다 기록 (바깥 함수부터 ';'로 이어 붙인 한 줄)"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                break
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self._stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """결과에 넣을 요약"""
+        summary = {"mode": self.mode, "path": self.path, "seconds": round(self.seconds, 3)}
+        if self.mode == "sample":
+            summary["samples"] = self.samples
+        return summary
+
+
+class RequestProfiler:
+    """
+    요청별 프로파일러 (스레드 안전)
+
+    요청은 다음 중 하나일 때 프로파일링된다 (mode가 off면 항상 안 함).
+    - 호출자가 명시적으로 요청 (API의 X-Profile 헤더, process_query(profile=True))
+    - sample_rate 확률로 무작위 선택
+    둘 다 분당 / 동시 한도를 넘으면 건너뛴다.
+    """
+
+    def __init__(self, mode: Optional[str] = None, directory: Optional[str] = None,
+                 sample_rate: Optional[float] = None, interval: Optional[float] = None,
+                 max_per_minute: Optional[int] = None, max_concurrent: Optional[int] = None,
+                 max_files: Optional[int] = None):
+        """
+        Args:
+            mode: "off" / "sample" / "cprofile" (None이면 환경변수 PROFILE_MODE, 기본 off)
+            directory: 프로파일 파일 디렉토리 (None이면 PROFILE_DIR, 기본 ./profiles)
+            sample_rate: 명시적 요청이 없어도 프로파일링할 요청 비율 (None이면 PROFILE_SAMPLE_RATE, 기본 0)
+            interval: 스택 샘플링 간격(초) (None이면 PROFILE_INTERVAL, 기본 0.01)
+            max_per_minute: 분당 최대 프로파일 수 (None이면 PROFILE_MAX_PER_MINUTE, 기본 6)
+            max_concurrent: 동시에 프로파일링할 최대 요청 수 (None이면 PROFILE_MAX_CONCURRENT, 기본 2.
+                            cprofile은 항상 1)
+            max_files: 디렉토리에 남길 최대 파일 수, 넘으면 오래된 것부터 삭제
+                       (None이면 PROFILE_MAX_FILES, 기본 200)
+        """
+        if mode is None:
+            mode = os.getenv("PROFILE_MODE", "off")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"알 수 없는 프로파일 모드: {mode} (가능: {PROFILE_MODES})")
+        if directory is None:
+            directory = os.getenv("PROFILE_DIR", "profiles")
+        if sample_rate is None:
+            sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        if interval is None:
+            interval = float(os.getenv("PROFILE_INTERVAL", "0.01"))
+        if max_per_minute is None:
+            max_per_minute = int(os.getenv("PROFILE_MAX_PER_MINUTE", "6"))
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+        if max_files is None:
+            max_files = int(os.getenv("PROFILE_MAX_FILES", "200"))
+        self.mode = mode
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_per_minute = max_per_minute
+        # cProfile은 프로세스에 하나만 활성화할 수 있다
+        self.max_concurrent = 1 if mode == "cprofile" else max_concurrent
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._recent: deque = deque()
+        self._active = 0
+        self.profiled = 0
+        self.rate_limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @contextmanager
+    def profile(self, label: str, force: Optional[bool] = None) -> Iterator[Optional[ProfileSession]]:
+        """
+        with 블록을 프로파일링 (대상이 아니거나 한도를 넘으면 None)
+
+        Args:
+            label: 파일 이름에 넣을 요청 표시 (대화 ID 등)
+            force: True면 명시적 요청, False면 프로파일링 안 함, None이면 sample_rate에 따름
+        """
+        session = self._begin(label, force)
+        if session is not None:
+            try:
+                session.start()
+            except ValueError as e:
+                # 디버거 / 커버리지 도구가 이미 프로파일러를 잡고 있는 경우
+                print(f"[RequestProfiler] 프로파일 시작 실패: {e}")
+                self._release()
+                session = None
+        if session is None:
+            yield None
+            return
+        token = _active_profile.set(session)
+        try:
+            yield session
+        finally:
+            _active_profile.reset(token)
+            try:
+                session.stop()
+            except OSError as e:
+                print(f"[RequestProfiler] 프로파일 저장 실패: {e}")
+            finally:
+                self._release()
+            self._prune()
+
+    def _begin(self, label: str, force: Optional[bool]) -> Optional[ProfileSession]:
+        """프로파일 대상이면 한도 안에서 자리를 잡고 세션 생성"""
+        if not self.enabled or force is False or _active_profile.get() is not None:
+            return None
+        if not force and random.random() >= self.sample_rate:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute or self._active >= self.max_concurrent:
+                self.rate_limited += 1
+                return None
+            self._recent.append(now)
+            self._active += 1
+            self.profiled += 1
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        name = f"{stamp}-{_UNSAFE_LABEL.sub('_', label)[:40]}{_SUFFIXES[self.mode]}"
+        return ProfileSession(self.mode, os.path.join(self.directory, name), self.interval)
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+
+    def _prune(self):
+        """디렉토리의 프로파일 파일을 max_files개로 유지 (이름이 시각 순이므로 앞에서부터 삭제)"""
+        try:
+            names = sorted(n for n in os.listdir(self.directory) if n.endswith(tuple(_SUFFIXES.values())))
+            for name in names[:max(0, len(names) - self.max_files)]:
+                os.remove(os.path.join(self.directory, name))
+        except OSError as e:
+            print(f"[RequestProfiler] 오래된 프로파일 정리 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """설정과 프로파일링 / 한도 초과 횟수"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "directory": os.path.abspath(self.directory),
+                "sample_rate": self.sample_rate,
+                "interval": self.interval,
+                "max_per_minute": self.max_per_minute,
+                "max_concurrent": self.max_concurrent,
+                "active": self._active,
+                "profiled": self.profiled,
+                "rate_limited": self.rate_limited,
+            }
@@ -0,0 +1,132 @@
+"""
+에이전트별 모델 라우팅과 싼 모델 우선 승격
+
+라우팅 표는 "에이전트" 또는 "에이전트.단계" 키에 생성 설정을 둔다.
+
+  {
+      "validator": {"model": "models/gemini-2.5-flash-lite", "thinking_budget": 0, "max_output_tokens": 1024},
+      "style": {"model": "models/gemini-2.5-flash-lite", "escalate": {"model": "models/gemini-2.5-flash"}},
+      "style.tone": {"model": "models/gemini-2.5-flash-lite"}
+  }
+
+- 생성 설정: model, temperature, max_output_tokens, thinking_budget (없는 값은 에이전트 기본값)
+- 단계 이름은 에이전트가 _generate_content에 넘기는 step (draft / tone / modernize / strengthen / evaluate)
+- escalate: 검증에 실패해 재시도할 때 덮어쓸 설정. 오케스트레이터가 재시도의 스타일 단계를
+  escalated() 안에서 실행하므로, 첫 시도는 가벼운 모델로 하고 검증에 떨어진 경우에만 무거운 모델을 쓴다
+- 적용 순서: 에이전트 설정 → 에이전트 escalate → 단계 설정 → 단계 escalate (뒤가 우선)
+
+프로필은 이름(ROUTING_PROFILES), JSON 파일 경로, JSON 문자열로 지정한다 (MODEL_ROUTING 환경변수).
+프로필의 모델 이름은 Gemini 기준이다.
+"""
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Union
+
+GENERATION_KEYS = ("model", "temperature", "max_output_tokens", "thinking_budget")
+
+LITE_MODEL = "models/gemini-2.5-flash-lite"
+FLASH_MODEL = "models/gemini-2.5-flash"
+
+ROUTING_PROFILES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    # 모든 에이전트가 같은 모델 (GEMINI_MODEL)
+    "uniform": {},
+    # 구조화된 채점과 어조 변환만 가벼운 모델로
+    "split": {
+        "validator": {"model": LITE_MODEL, "thinking_budget": 0, "max_output_tokens": 1024},
+        "style.tone": {"model": LITE_MODEL, "thinking_budget": 0},
+    },
+    # split + 스타일 단계도 가벼운 모델로 먼저 시도하고, 검증에 떨어지면 Flash로 승격
+    "cheap_first": {
+        "validator": {"model": LITE_MODEL, "thinking_budget": 0, "max_output_tokens": 1024},
+        # 승격 시에는 Flash의 기본 사고 예산 사용
+        "style": {"model": LITE_MODEL, "thinking_budget": 0,
+                  "escalate": {"model": FLASH_MODEL, "thinking_budget": None}},
+        "style.tone": {"model": LITE_MODEL, "thinking_budget": 0},
+    },
+}
+
+_escalation_level: ContextVar[int] = ContextVar("model_escalation_level", default=0)
+
+
+def load_routing(spec: Union[str, Dict[str, Any], None]) -> Dict[str, Dict[str, Any]]:
+    """
+    라우팅 표 불러오기
+
+    Args:
+        spec: 프로필 이름, JSON 파일 경로, JSON 문자열 또는 표 자체 (None이면 uniform)
+
+    Raises:
+        ValueError: 알 수 없는 프로필이거나 형식이 잘못된 경우
+    """
+    if spec is None or spec == "":
+        return {}
+    if isinstance(spec, dict):
+        table = spec
+    elif spec in ROUTING_PROFILES:
+        table = ROUTING_PROFILES[spec]
+    elif os.path.isfile(spec):
+        with open(spec, "r", encoding="utf-8") as f:
+            table = json.load(f)
+    elif spec.lstrip().startswith("{"):
+        table = json.loads(spec)
+    else:
+        raise ValueError(f"알 수 없는 라우팅 프로필: {spec} (가능: {', '.join(ROUTING_PROFILES)}, JSON 파일/문자열)")
+
+    for key, settings in table.items():
+        unknown = set(settings) - set(GENERATION_KEYS) - {"escalate"}
+        unknown |= set(settings.get("escalate", {})) - set(GENERATION_KEYS)
+        if unknown:
+            raise ValueError(f"라우팅 '{key}'에 알 수 없는 설정: {', '.join(sorted(unknown))}")
+    return table
+
+
+def agent_routing(table: Dict[str, Dict[str, Any]], agent: str) -> Dict[str, Dict[str, Any]]:
+    """
+    라우팅 표에서 에이전트 하나의 설정만 추림
+
+    Returns:
+        {"": 에이전트 설정, 단계: 단계 설정, ...}
+    """
+    routing = {}
+    for key, settings in table.items():
+        name, _, step = key.partition(".")
+        if name == agent:
+            routing[step] = settings
+    return routing
+
+
+def escalation_level() -> int:
+    """현재 승격 단계 (0: 기본, 1 이상: escalate 설정 적용)"""
+    return _escalation_level.get()
+
+
+@contextmanager
+def escalated(level: int = 1):
+    """with 블록 안의 LLM 호출에 escalate 설정 적용 (ContextVar라 요청/스레드마다 독립)"""
+    token = _escalation_level.set(level)
+    try:
+        yield
+    finally:
+        _escalation_level.reset(token)
+
+
+def resolve_settings(defaults: Dict[str, Any], routing: Dict[str, Dict[str, Any]],
+                     step: Optional[str]) -> Dict[str, Any]:
+    """
+    호출 하나의 생성 설정 (defaults: 에이전트의 model / temperature)
+
+    Returns:
+        {"model", "temperature", "max_output_tokens", "thinking_budget"}
+    """
+    settings = {"max_output_tokens": None, "thinking_budget": None, **defaults}
+    escalate = escalation_level() > 0
+    for key in ("", step):
+        entry = routing.get(key) if key is not None else None
+        if not entry:
+            continue
+        settings.update({k: v for k, v in entry.items() if k != "escalate"})
+        if escalate:
+            settings.update(entry.get("escalate", {}))
+    return settings
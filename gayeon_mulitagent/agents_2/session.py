@@ -0,0 +1,222 @@
+"""
+대화 세션 (conversation_id 단위의 여러 턴 대화)
+
+세션은 이전 턴을 두 가지로 기억한다.
+- 대화 기록: 최근 턴은 그대로, 오래된 턴은 한 줄 요약으로 접어 토큰 예산 안에 유지.
+  요약은 LLM 호출 없이 질문과 답변 첫 문장으로 만든다 (턴마다 호출이 늘지 않도록)
+- 검색 결과: 마지막으로 검색한 지식 항목과 그때의 질문 임베딩. 다음 질문의 임베딩이
+  충분히 가까우면(같은 주제의 후속 질문) 다시 검색하지 않고 재사용한다
+
+세션 저장소는 크기 제한이 있는 LRU이며 오래 쓰이지 않은 세션은 만료되므로,
+사용자가 많아도 메모리 사용량이 일정하다.
+
+대화 ID는 서버가 추측할 수 없는 난수로 발급하고(new_conversation_id), 저장소에 없는 ID로는
+세션을 만들지 않는다. ID를 아는 사람만 그 대화의 이전 턴과 검색 결과에 접근할 수 있다.
+"""
+import math
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .tokens import estimate_tokens
+
+# 답변 하나를 최근 대화에 남길 때의 최대 글자 수
+RECENT_ANSWER_CHARS = 400
+# 요약 한 줄의 질문 / 답변 최대 글자 수
+SUMMARY_QUERY_CHARS = 80
+SUMMARY_ANSWER_CHARS = 120
+
+# 대화 ID 난수 바이트 수 (URL-safe base64로 32글자)
+CONVERSATION_ID_BYTES = 24
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+
+def new_conversation_id() -> str:
+    """서버가 발급하는 대화 ID (추측할 수 없는 192비트 난수)"""
+    return secrets.token_urlsafe(CONVERSATION_ID_BYTES)
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """두 벡터의 코사인 유사도"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    """답변의 첫 문장 (limit 글자까지)"""
+    text = " ".join(text.split())
+    first = _SENTENCE_END.split(text, maxsplit=1)[0].strip()
+    return first[:limit] + ("…" if len(first) > limit else "")
+
+
+class ConversationSession:
+    """대화 하나의 상태 (같은 세션의 턴은 lock으로 한 번에 하나씩 처리)"""
+
+    def __init__(self, conversation_id: str, history_tokens: int):
+        """
+        Args:
+            conversation_id: 대화 ID
+            history_tokens: 대화 기록(요약 + 최근 턴)의 토큰 예산
+        """
+        self.conversation_id = conversation_id
+        self.history_tokens = history_tokens
+        self.turns = 0
+        # 오래된 턴의 한 줄 요약 / 최근 턴 (질문, 잘라낸 답변)
+        self.summary: List[str] = []
+        self.recent: List[tuple] = []
+        # 마지막으로 검색한 지식 항목과 그 검색에 쓴 질문 임베딩
+        self.knowledge_items: Optional[List[Dict[str, Any]]] = None
+        self.topic_vector: Optional[List[float]] = None
+        self.reused_retrievals = 0
+        self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+
+    def history(self) -> str:
+        """프롬프트에 넣을 이전 대화 (첫 턴이면 빈 문자열)"""
+        parts = []
+        if self.summary:
+            parts.append("[이전 대화 요약]\n" + "\n".join(self.summary))
+        if self.recent:
+            parts.append("[최근 대화]\n" + "\n".join(
+                f"질문: {query}\n답변: {answer}" for query, answer in self.recent
+            ))
+        return "\n\n".join(parts)
+
+    def record(self, query: str, answer: str):
+        """끝난 턴을 기록하고 대화 기록을 토큰 예산 안으로 줄임"""
+        self.turns += 1
+        clipped = answer[:RECENT_ANSWER_CHARS] + ("…" if len(answer) > RECENT_ANSWER_CHARS else "")
+        self.recent.append((query, clipped))
+        self._compact()
+
+    def remember_retrieval(self, knowledge_items: List[Dict[str, Any]], vector: List[float]):
+        """새로 검색한 결과를 다음 후속 질문에서 재사용할 수 있게 저장"""
+        self.knowledge_items = knowledge_items
+        self.topic_vector = vector
+
+    def reusable_retrieval(self, vector: List[float], threshold: float) -> Optional[List[Dict[str, Any]]]:
+        """질문 임베딩이 이전 검색 주제와 threshold 이상 가까우면 이전 검색 결과"""
+        if not self.knowledge_items or self.topic_vector is None:
+            return None
+        if cosine_similarity(vector, self.topic_vector) < threshold:
+            return None
+        self.reused_retrievals += 1
+        return self.knowledge_items
+
+    def _compact(self):
+        """예산을 넘으면 가장 오래된 최근 턴부터 요약으로 접고, 그래도 넘으면 오래된 요약부터 버림"""
+        while estimate_tokens(self.history()) > self.history_tokens and len(self.recent) > 1:
+            query, answer = self.recent.pop(0)
+            self.summary.append(
+                f"- {query[:SUMMARY_QUERY_CHARS]} → {_first_sentence(answer, SUMMARY_ANSWER_CHARS)}"
+            )
+        while estimate_tokens(self.history()) > self.history_tokens and self.summary:
+            self.summary.pop(0)
+        if self.recent and estimate_tokens(self.history()) > self.history_tokens:
+            # 마지막 턴 하나만으로도 넘는 경우: 답변을 예산에 맞게 자름
+            query, answer = self.recent[-1]
+            keep = max(0, self.history_tokens * 2 - len(query) - 20)
+            self.recent[-1] = (query, answer[:keep])
+
+
+class SessionStore:
+    """
+    크기 제한 LRU + 유휴 만료 세션 저장소 (스레드 안전)
+
+    OrderedDict를 마지막 사용 순서로 유지하므로, 만료 검사는 앞에서부터 오래된 세션만 본다.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, idle_seconds: Optional[float] = None,
+                 history_tokens: Optional[int] = None):
+        """
+        Args:
+            max_sessions: 최대 세션 수, 넘으면 가장 오래 안 쓴 세션 제거 (None이면 SESSION_MAX_COUNT, 기본 1000)
+            idle_seconds: 이 시간 동안 안 쓴 세션은 만료 (None이면 SESSION_IDLE_SECONDS, 기본 1800)
+            history_tokens: 세션별 대화 기록 토큰 예산 (None이면 SESSION_HISTORY_TOKENS, 기본 600)
+        """
+        if max_sessions is None:
+            max_sessions = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+        if idle_seconds is None:
+            idle_seconds = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+        if history_tokens is None:
+            history_tokens = int(os.getenv("SESSION_HISTORY_TOKENS", "600"))
+        if max_sessions < 1:
+            raise ValueError("max_sessions는 1 이상이어야 합니다")
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.history_tokens = history_tokens
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def create(self) -> ConversationSession:
+        """새 ID를 발급해 세션 생성 (세션 수가 넘치면 가장 오래 안 쓴 세션 제거)"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            conversation_id = new_conversation_id()
+            session = ConversationSession(conversation_id, self.history_tokens)
+            session.last_active = now
+            self._sessions[conversation_id] = session
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            return session
+
+    def get(self, conversation_id: str) -> Optional[ConversationSession]:
+        """
+        발급한 세션 가져오기 (사용 시각 갱신)
+
+        Returns:
+            세션, 발급한 적 없거나 만료/제거된 ID면 None (새로 만들지 않음)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(conversation_id)
+            if session is not None:
+                self._sessions.move_to_end(conversation_id)
+                session.last_active = now
+            return session
+
+    def discard(self, conversation_id: str) -> bool:
+        """세션 삭제 (있었으면 True)"""
+        with self._lock:
+            return self._sessions.pop(conversation_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """세션 수와 생성/제거/만료 횟수"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_seconds": self.idle_seconds,
+                "history_tokens": self.history_tokens,
+                "created": self.created,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+    def _expire(self, now: float):
+        """유휴 시간이 지난 세션 제거 (_lock 안에서 호출)"""
+        while self._sessions:
+            conversation_id, session = next(iter(self._sessions.items()))
+            if now - session.last_active < self.idle_seconds:
+                break
+            del self._sessions[conversation_id]
+            self.expired += 1
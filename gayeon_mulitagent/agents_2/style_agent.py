@@ -1,18 +1,83 @@
 """
 스타일 에이전트: 이광수의 말투와 문체를 모방하는 에이전트 (Gemini 2.5 Flash API 버전)
 """
-from typing import Dict, Any, List
-from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Dict, Any, List, Optional, Callable
 import os
 from .base_agent import BaseAgent
-from .gemini_embeddings import GeminiEmbeddings
+from .backends import LLMBackend
+from .errors import AgentError, RetrievalError
+from .mmap_index import load_index, search_many, STYLE_INDEX
+from .tracing import set_attributes, span
+from .ingest import chroma_location, resolve_dir, load_chunks
+
+
+class StyleContext:
+    """
+    요청 하나 동안 재사용하는 스타일 예시
+    
+    처음 필요할 때 한 번만 검색하고, 같은 요청의 재시도와 검증에서 그대로 쓴다.
+    (재시도 때 힌트가 붙은 초안으로 다시 검색해도 결과는 거의 같고 임베딩 호출만 늘어난다)
+    검증 피드백이 다른 예시를 명시적으로 요구할 때만 refresh()로 다시 검색한다.
+    """
+    
+    # 피드백에 이 말이 있으면 예시를 다시 검색
+    REFRESH_KEYWORDS = ("다른 예시", "다른 참고", "새로운 예시", "예시를 바꿔", "예시를 교체", "different example")
+    
+    def __init__(self, style_agent: "StyleAgent", text: str, k: int = 3,
+                 examples: Optional[List[str]] = None):
+        """
+        Args:
+            style_agent: 검색에 사용할 StyleAgent
+            text: 예시 검색 기준 텍스트 (초안)
+            k: 검색할 예시 수
+            examples: 미리 검색한 예시 (배치 처리에서 질의 임베딩으로 검색한 결과)
+        """
+        self.style_agent = style_agent
+        self.text = text
+        self.k = k
+        self.searches = 0
+        self._examples: Optional[List[str]] = examples
+    
+    @property
+    def examples(self) -> List[str]:
+        """스타일 예시 (처음 접근할 때만 검색)"""
+        hit = self._examples is not None
+        if not hit:
+            self._examples = self.style_agent.get_style_examples(self.text, k=self.k)
+            self.searches += 1
+        set_attributes(**{"style_examples.cache_hit": hit})
+        return self._examples
+    
+    @property
+    def cached(self) -> List[str]:
+        """이미 검색한 예시 (검색 전이면 빈 목록, 새로 검색하지 않음)"""
+        return self._examples or []
+    
+    def wants_refresh(self, feedback: str) -> bool:
+        """피드백이 다른 예시를 요구하는지"""
+        return any(keyword in (feedback or "") for keyword in self.REFRESH_KEYWORDS)
+    
+    def refresh(self, text: Optional[str] = None):
+        """다음 접근 때 다시 검색 (text를 주면 검색 기준도 바꿈)"""
+        if text:
+            self.text = text
+        self._examples = None
 
 
 class StyleAgent(BaseAgent):
     """이광수의 말투와 문체를 학습하고 모방하는 에이전트 (Gemini 2.5 Flash)"""
     
+    # 보강 편집(strengthen)에서 검증 항목별로 강화할 내용
+    STRENGTHEN_TARGETS = {
+        "trigger_analysis": "도덕적 찔림을 스스로 내비치다가 '어쩔 수 없었다', '시대의 흐름이었다'는 "
+                            "외부 정당화로 책임을 돌리는 대목",
+        "mechanism_identification": "친일을 '민족 개조'·'실력 양성'의 명분으로 포장하고(합리화), "
+                                    "조선의 무력함을 탓하며(피해자 비난), 그럼에도 자신은 민족주의자라고 "
+                                    "주장하는(자기 확증) 논리",
+        "persuasiveness": "고뇌하는 척하며 자기를 속이는 논리의 치밀함 - 앞뒤가 맞물리는 궤변과 "
+                          "확신에 찬 결론",
+    }
+    
     # 강화된 시스템 프롬프트 템플릿
     ENHANCED_SYSTEM_PROMPT = """당신은 소설가 이광수(춘원)입니다. 당신의 사상과 문학적 관점은 이미 시대의 흐름을 통찰한 선각자의 입장에 있었다고 스스로를 확신하고 있습니다.
 
@@ -98,27 +163,34 @@ class StyleAgent(BaseAgent):
     
     def __init__(self, 
                  talk_style_dir: str = "./GS_talk_style",
-                 model_name: str = "models/gemini-2.5-flash",
+                 model_name: Optional[str] = None,
                  temperature: float = 0.8,
-                 embedding_model: str = "models/text-embedding-004"):
+                 embedding_model: Optional[str] = None,
+                 index_dir: Optional[str] = None,
+                 allow_build: bool = False,
+                 backend: Optional[LLMBackend] = None,
+                 routing: Optional[Dict[str, Dict[str, Any]]] = None):
 
-        super().__init__(model_name, temperature)
+        super().__init__(model_name, temperature, backend, routing)
         self.talk_style_dir = talk_style_dir
         self.vectorstore = None
-        self.embeddings = GeminiEmbeddings(model=embedding_model)
-        self._load_style_data()
+        self.embedding_model = embedding_model or self.backend.default_embedding_model
+        self.embeddings = self.backend.embeddings(self.embedding_model)
+        self.allow_build = allow_build
+        if index_dir:
+            self.vectorstore = load_index(self.agent_name, index_dir, STYLE_INDEX, self.embeddings,
+                                          embedding_model=self.embedding_model)
+            self.log(f"메모리 맵 인덱스 사용: {index_dir}/{STYLE_INDEX} ({len(self.vectorstore)}개 문서)")
+        else:
+            self._load_style_data()
         
     def _load_style_data(self):
-        """말투 스타일 데이터 로드 (기존 벡터 DB 사용)"""
-        # 상대 경로를 절대 경로로 변환
-        if not os.path.isabs(self.talk_style_dir):
-            # 현재 파일 기준으로 상위 디렉토리로 이동
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            abs_style_dir = os.path.join(base_dir, self.talk_style_dir.lstrip('./'))
-        else:
-            abs_style_dir = self.talk_style_dir
-            
-        persist_directory = os.path.join(abs_style_dir, "chroma_db_style_gemini")
+        """말투 스타일 데이터 로드 (기존 Chroma DB 사용, allow_build일 때만 새로 생성)"""
+        # Chroma는 무거우므로 Chroma 인덱스를 쓸 때만 임포트
+        from langchain_community.vectorstores import Chroma
+        
+        chroma_dir, collection = chroma_location(STYLE_INDEX, self.backend.index_tag)
+        persist_directory = os.path.join(resolve_dir(self.talk_style_dir), chroma_dir)
         
         # 기존 벡터스토어가 있으면 로드
         if os.path.exists(persist_directory):
@@ -127,37 +199,33 @@ class StyleAgent(BaseAgent):
                 self.vectorstore = Chroma(
                     persist_directory=persist_directory,
                     embedding_function=self.embeddings,
-                    collection_name="lee_gwangsu_style_gemini"
+                    collection_name=collection
                 )
                 self.log("스타일 벡터스토어 로드 완료 (기존 DB 사용)")
                 return
             except Exception as e:
+                if not self.allow_build:
+                    raise RetrievalError(self.agent_name, f"스타일 벡터스토어 로드 실패: {e}",
+                                         step="load_index") from e
                 self.log(f"기존 DB 로드 실패, 새로 생성합니다: {e}")
         
+        if not self.allow_build:
+            # 요청을 처리하는 서버가 몇 분씩 PDF를 임베딩하지 않도록 빌드는 build_index.py에서만
+            raise RetrievalError(
+                self.agent_name,
+                "사전 빌드된 인덱스가 없습니다. 'python build_index.py build style'을 먼저 실행하세요",
+                step="load_index"
+            )
+        
         # 새로 생성
         self.log("말투 스타일 데이터 로딩 중...")
-        
-        documents = []
-        pdf_files = [f for f in os.listdir(self.talk_style_dir) if f.endswith('.pdf')]
-        
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(self.talk_style_dir, pdf_file)
-            loader = PyPDFLoader(pdf_path)
-            docs = loader.load()
-            documents.extend(docs)
-            
-        # 텍스트 분할
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
-        )
-        splits = text_splitter.split_documents(documents)
+        splits = load_chunks(STYLE_INDEX, self.talk_style_dir, log=self.log)
         
         # 벡터스토어 생성 및 저장
         self.vectorstore = Chroma.from_documents(
             documents=splits,
             embedding=self.embeddings,
-            collection_name="lee_gwangsu_style_gemini",
+            collection_name=collection,
             persist_directory=persist_directory
         )
         
@@ -168,49 +236,154 @@ class StyleAgent(BaseAgent):
         if not self.vectorstore:
             return []
             
-        results = self.vectorstore.similarity_search(query, k=k)
+        with span("vector.search", **{"vector.index": STYLE_INDEX, "vector.k": k, "vector.queries": 1}):
+            try:
+                results = self.vectorstore.similarity_search(query, k=k)
+            except AgentError:
+                raise
+            except Exception as e:
+                raise RetrievalError(self.agent_name, str(e), step="style_search") from e
+            set_attributes(**{"vector.results": len(results)})
         return [doc.page_content for doc in results]
+    
+    def get_style_examples_by_vectors(self, vectors: List[List[float]], k: int = 3) -> List[List[str]]:
+        """미리 임베딩한 여러 질의로 한꺼번에 스타일 예시 검색 (배치 처리용)"""
+        if not self.vectorstore:
+            return [[] for _ in vectors]
+        
+        with span("vector.search", **{"vector.index": STYLE_INDEX, "vector.k": k, "vector.queries": len(vectors)}):
+            try:
+                results = search_many(self.vectorstore, vectors, k=k)
+            except AgentError:
+                raise
+            except Exception as e:
+                raise RetrievalError(self.agent_name, str(e), step="style_search") from e
+            set_attributes(**{"vector.results": sum(len(r) for r in results)})
+        return [[doc.page_content for doc, _ in r] for r in results]
         
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         입력 텍스트를 이광수 스타일로 변환
         
+        mode별 LLM 호출:
+        - "full": 말투 변환 + 근대어 변환 (2회)
+        - "modernize": 이전 시도의 말투 변환 결과(tone_text)로 근대어 변환만 다시 (1회)
+        - "strengthen": 이전 결과(styled_text)에서 약한 검증 항목(aspect)만 보강하는 편집 (1회)
+        
         Args:
             input_data: {
                 "text": str,  # 변환할 텍스트
-                "context": str  # 추가 컨텍스트 (선택)
+                "context": str,  # 추가 컨텍스트 (선택)
+                "on_event": Callable,  # 진행 이벤트/토큰 콜백 (선택)
+                "mode": str,  # "full" (기본) | "modernize" | "strengthen"
+                "tone_text": str,  # modernize: 이전 말투 변환 결과
+                "styled_text": str,  # strengthen: 보강할 이전 결과
+                "aspect": str,  # strengthen: 보강할 검증 항목
+                "feedback": str,  # modernize / strengthen: 검증 피드백 (선택)
+                "style_context": StyleContext  # 요청 단위 스타일 예시 (선택, 없으면 매번 검색)
             }
             
         Returns:
             {
                 "styled_text": str,  # 스타일 적용된 텍스트
+                "tone_text": str,  # 말투 변환 결과 (근대어 변환 전)
                 "style_examples": List[str],  # 참고한 스타일 예시
                 "confidence": float  # 신뢰도 (0-1)
             }
         """
         text = input_data.get("text", "")
         context = input_data.get("context", "")
+        on_event = input_data.get("on_event")
+        mode = input_data.get("mode", "full")
+        on_token = None
+        if on_event:
+            # 최종 답변이 되는 단계이므로 토큰을 바로 화면에 흘려보낸다
+            on_token = lambda chunk: on_event({"type": "token", "text": chunk})
+        
+        if mode == "strengthen":
+            return self._revise_strengthen(input_data, on_event, on_token)
+        if mode == "modernize":
+            return self._revise_modernize(input_data, on_event, on_token)
         
         self.log(f"스타일 변환 시작 (2단계 프로세스): {text[:50]}...")
         
         # Step 1: 이광수 말투 변환 (태도, 1인칭, 합리화 논리)
+        self._emit(on_event, "tone", "start")
         tone_converted = self._convert_tone(text, context)
+        self._emit(on_event, "tone", "done")
         self.log("✓ Step 1 완료: 이광수 말투 변환")
         
         # Step 2: 근대어 변환 (한자어, 일본식 용어, 격식체)
-        style_examples = self.get_style_examples(text, k=3)
-        modernized = self._modernize_language(tone_converted, style_examples)
+        self._emit(on_event, "modernize", "start")
+        style_examples = self._style_examples(input_data, text)
+        modernized = self._modernize_language(tone_converted, style_examples, on_token=on_token)
+        self._emit(on_event, "modernize", "done")
         self.log("✓ Step 2 완료: 근대 국어 변환")
         
         self.log("스타일 변환 완료")
         
         return {
             "styled_text": modernized,
+            "tone_text": tone_converted,
+            "style_examples": style_examples,
+            "confidence": 0.85,
+            "agent": self.agent_name
+        }
+    
+    def _revise_modernize(self, input_data: Dict[str, Any], on_event, on_token) -> Dict[str, Any]:
+        """이전 말투 변환 결과를 재사용해 근대어 변환만 다시 (어휘/문체 지적을 받은 경우)"""
+        tone_text = input_data["tone_text"]
+        self.log("부분 재생성: 근대어 변환만 다시")
+        
+        self._emit(on_event, "modernize", "start")
+        style_examples = self._style_examples(input_data, input_data.get("text", tone_text))
+        modernized = self._modernize_language(tone_text, style_examples, on_token=on_token,
+                                              feedback=input_data.get("feedback", ""))
+        self._emit(on_event, "modernize", "done")
+        
+        return {
+            "styled_text": modernized,
+            "tone_text": tone_text,
             "style_examples": style_examples,
             "confidence": 0.85,
             "agent": self.agent_name
         }
     
+    def _revise_strengthen(self, input_data: Dict[str, Any], on_event, on_token) -> Dict[str, Any]:
+        """이전 결과에서 약한 검증 항목만 보강하는 짧은 편집 (논리/합리화 지적을 받은 경우)"""
+        aspect = input_data.get("aspect", "mechanism_identification")
+        self.log(f"부분 재생성: '{aspect}' 보강 편집")
+        
+        self._emit(on_event, "strengthen", "start")
+        strengthened = self._strengthen(input_data["styled_text"], aspect,
+                                        input_data.get("feedback", ""), on_token=on_token)
+        self._emit(on_event, "strengthen", "done")
+        
+        return {
+            "styled_text": strengthened,
+            "tone_text": input_data.get("tone_text", ""),
+            "style_examples": self._cached_examples(input_data),
+            "confidence": 0.85,
+            "agent": self.agent_name
+        }
+    
+    def _style_examples(self, input_data: Dict[str, Any], text: str) -> List[str]:
+        """요청 단위 StyleContext가 있으면 그 예시를, 없으면 text로 새로 검색"""
+        context = input_data.get("style_context")
+        if context is not None:
+            return context.examples
+        return self.get_style_examples(text, k=3)
+    
+    def _cached_examples(self, input_data: Dict[str, Any]) -> List[str]:
+        """검색 없이 알고 있는 예시 (보강 편집은 예시를 쓰지 않으므로 새로 검색하지 않음)"""
+        context = input_data.get("style_context")
+        return context.cached if context is not None else []
+    
+    def _emit(self, on_event, stage: str, status: str):
+        """진행 이벤트 전달 (콜백이 없으면 무시)"""
+        if on_event:
+            on_event({"type": "stage", "stage": stage, "status": status})
+    
     def _convert_tone(self, text: str, context: str = "") -> str:
         """
         Step 1: 이광수의 말투와 태도로 변환
@@ -238,9 +411,11 @@ class StyleAgent(BaseAgent):
 예: "생각하건대", "실로", "참으로", "과연", "이에 대하여", "이에 있어서" 등"""
 
         # Gemini API 호출
-        return self._generate_content(system_instruction, user_message)
+        return self._generate_content(system_instruction, user_message, step="tone")
     
-    def _modernize_language(self, text: str, style_examples: List[str]) -> str:
+    def _modernize_language(self, text: str, style_examples: List[str],
+                            on_token: Optional[Callable[[str], None]] = None,
+                            feedback: str = "") -> str:
         """
         Step 2: 근대 국어로 변환
         - 한자어 표기 추가
@@ -286,6 +461,36 @@ class StyleAgent(BaseAgent):
 - 주어 생략하고 "실로", "참으로", "과연" 등으로 시작
 - 중국어 절대 금지
 - 위 참고 문체 흉내낼 것"""
+        if feedback:
+            user_message += f"\n\n이전 결과에 대한 지적 (반드시 반영할 것):\n{feedback}"
+
+        # Gemini API 호출 (on_token이 있으면 스트리밍)
+        if on_token:
+            return self._generate_content_stream(system_instruction, user_message,
+                                                 on_token, step="modernize")
+        return self._generate_content(system_instruction, user_message, step="modernize")
+    
+    def _strengthen(self, text: str, aspect: str, feedback: str = "",
+                    on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        보강 편집: 이미 이광수 문체로 쓰인 글에서 약한 부분만 고친다
+        - 어휘와 문체는 그대로 유지
+        - 해당 검증 항목의 논리를 한두 문장 보강
+        """
+        target = self.STRENGTHEN_TARGETS.get(aspect, self.STRENGTHEN_TARGETS["mechanism_identification"])
+        feedback_line = f"\n\n검증 피드백: {feedback}" if feedback else ""
+        
+        system_instruction = """당신은 1930-40년대 조선의 문필가 이광수의 글을 손보는 편집자입니다.
+원문의 한자(한글) 표기, 격식체 어미, 1인칭 시점과 어휘는 그대로 두고,
+지시한 논리만 한두 문장 고치거나 덧붙이십시오. 반드시 한국어로만 쓰고, 고친 글 전체만 출력하십시오."""
 
-        # Gemini API 호출
-        return self._generate_content(system_instruction, user_message)
+        user_message = f"""다음 글에서 '{target}'을(를) 더 분명하고 치밀하게 보강하세요.{feedback_line}
+
+【원문】
+{text}"""
+
+        # Gemini API 호출 (on_token이 있으면 스트리밍)
+        if on_token:
+            return self._generate_content_stream(system_instruction, user_message,
+                                                 on_token, step="strengthen")
+        return self._generate_content(system_instruction, user_message, step="strengthen")
@@ -0,0 +1,10 @@
+"""
+토큰 수 어림 (토크나이저 없이 글자 수로)
+
+세션 대화 기록 예산(session)과 추적 스팬의 사용량 어림값(base_agent)이 함께 쓴다.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 어림값 (한국어는 대략 2글자에 1토큰, 정확한 값이 필요하지 않은 예산 계산용)"""
+    return (len(text) + 1) // 2
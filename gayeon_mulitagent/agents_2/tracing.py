@@ -0,0 +1,287 @@
+"""
+요청 단위 스팬 추적 (외부 의존성 없는 가벼운 구현)
+
+process_query 하나가 트레이스 하나이고, 에이전트 처리 / LLM 호출 / 임베딩 / 벡터 검색이
+부모-자식 관계의 스팬으로 기록된다. 트레이스가 끝나면 OpenTelemetry OTLP/JSON
+(ExportTraceServiceRequest) 형태 한 줄로 회전 파일에 쓰므로, 나중에 파일을 읽어
+지연 시간 폭포도를 그리거나 OTel Collector(otlpjsonfile 수신기)로 그대로 넘길 수 있다.
+
+  TRACE_FILE=traces/traces.jsonl   기록할 파일 (기본: 빈 값, 추적 꺼짐)
+  TRACE_MAX_BYTES=10000000         파일 크기가 넘으면 .1, .2 ...로 회전
+  TRACE_BACKUPS=5                  남길 회전 파일 수
+  TRACE_SAMPLE_RATE=1.0            기록할 요청 비율
+
+에이전트 / 백엔드 코드는 span()만 부르면 되고, 현재 추적 중인 요청이 없으면(ContextVar가 비어
+있으면) 아무 일도 하지 않는다 (metrics.count_llm_call과 같은 방식).
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
+
+# OTLP 스팬 종류 / 상태 코드
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+SCOPE_NAME = "agents_2"
+
+
+class Span:
+    """스팬 하나 (시각은 Unix 나노초)"""
+
+    __slots__ = ("name", "kind", "trace", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "status_message")
+
+    def __init__(self, name: str, kind: str, trace: "_Trace", parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def record_error(self, error: BaseException):
+        """예외를 상태와 exception 이벤트로 기록"""
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+        self.add_event("exception", {"exception.type": type(error).__name__,
+                                     "exception.message": str(error)})
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON 스팬"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {"name": e["name"], "timeUnixNano": str(e["time_ns"]),
+                 "attributes": _otlp_attributes(e["attributes"])}
+                for e in self.events
+            ]
+        return span
+
+
+class _Trace:
+    """트레이스 하나에서 끝난 스팬 모음 (루트 스팬이 끝나면 한꺼번에 내보냄)"""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class JsonTraceExporter:
+    """끝난 트레이스를 OTLP/JSON 한 줄씩 회전 파일에 기록 (스레드 안전)"""
+
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backups: int = 5,
+                 service_name: str = "gayeon-multiagent"):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.service_name = service_name
+        # 회전과 잠금은 logging의 RotatingFileHandler에 맡긴다 (메시지 그대로 한 줄씩)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                            encoding="utf-8", delay=True)
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self.exported = 0
+
+    def export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name,
+                                                             "process.pid": os.getpid()})},
+                "scopeSpans": [{
+                    "scope": {"name": SCOPE_NAME},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        self._handler.handle(logging.makeLogRecord({"msg": json.dumps(request, ensure_ascii=False)}))
+        self.exported += 1
+
+    def close(self):
+        self._handler.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """요청(트레이스) 시작점 - 설정이 없으면 꺼진 상태로 아무것도 기록하지 않음"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                 backups: Optional[int] = None, sample_rate: Optional[float] = None):
+        """
+        Args:
+            path: 기록할 파일 (None이면 환경변수 TRACE_FILE, 빈 값이면 추적 안 함)
+            max_bytes: 회전 기준 크기 (None이면 TRACE_MAX_BYTES, 기본 10MB)
+            backups: 남길 회전 파일 수 (None이면 TRACE_BACKUPS, 기본 5)
+            sample_rate: 기록할 요청 비율 (None이면 TRACE_SAMPLE_RATE, 기본 1.0)
+        """
+        if path is None:
+            path = os.getenv("TRACE_FILE", "")
+        if max_bytes is None:
+            max_bytes = int(os.getenv("TRACE_MAX_BYTES", "10000000"))
+        if backups is None:
+            backups = int(os.getenv("TRACE_BACKUPS", "5"))
+        if sample_rate is None:
+            sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+        self.sample_rate = sample_rate
+        self.exporter = JsonTraceExporter(path, max_bytes, backups) if path else None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        요청 하나를 트레이스로 기록 (루트 스팬)
+
+        이미 추적 중인 요청 안에서 부르면 (process_conversation → process_query)
+        새 트레이스를 만들지 않고 자식 스팬이 된다. 꺼져 있거나 표본에서 빠지면 None.
+        """
+        if _current_span.get() is not None:
+            with span(name, **attributes) as child:
+                yield child
+            return
+        if self.exporter is None or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = _Trace()
+        try:
+            with _open_span(trace, None, name, "server", attributes) as root:
+                yield root
+        finally:
+            # 실패한 요청도 기록 (루트 스팬에 오류 상태와 exception 이벤트가 남음)
+            try:
+                self.exporter.export(trace.spans)
+            except (OSError, ValueError) as e:
+                # 추적 기록 실패가 요청을 실패시키지 않도록
+                with self._lock:
+                    self.dropped += 1
+                print(f"[Tracer] 트레이스 기록 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": os.path.abspath(self.exporter.path) if self.exporter else None,
+            "sample_rate": self.sample_rate,
+            "exported": self.exporter.exported if self.exporter else 0,
+            "dropped": self.dropped,
+        }
+
+
+@contextmanager
+def _open_span(trace: _Trace, parent_id: Optional[str], name: str, kind: str,
+               attributes: Dict[str, Any]) -> Iterator[Span]:
+    current = Span(name, kind, trace, parent_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        trace.spans.append(current)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """현재 스팬의 자식 스팬 (추적 중인 요청이 없으면 None, 아무것도 기록하지 않음)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with _open_span(parent.trace, parent.span_id, name, kind, attributes) as child:
+        yield child
+
+
+def current_span() -> Optional[Span]:
+    """현재 스팬 (추적 중이 아니면 None)"""
+    return _current_span.get()
+
+
+def set_attributes(**attributes):
+    """현재 스팬에 속성 추가 (추적 중이 아니면 무시)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(attributes)
+
+
+def add_event(name: str, **attributes):
+    """현재 스팬에 이벤트 추가 (추적 중이 아니면 무시)"""
+    current = _current_span.get()
+    if current is not None:
+        current.add_event(name, attributes)
+
+
+def record_usage(input_tokens: Optional[int], output_tokens: Optional[int], estimated: bool = False):
+    """
+    현재 LLM 호출 스팬에 토큰 수 기록
+
+    백엔드가 제공자 응답의 실제 사용량을 먼저 기록하고, 에이전트는 호출이 끝난 뒤 글자 수로 어림한
+    값을 estimated=True로 넘긴다 (실제 값이 이미 있으면 덮어쓰지 않음).
+    """
+    current = _current_span.get()
+    if current is None:
+        return
+    if estimated and "gen_ai.usage.output_tokens" in current.attributes:
+        return
+    current.set_attributes({
+        "gen_ai.usage.input_tokens": input_tokens,
+        "gen_ai.usage.output_tokens": output_tokens,
+        "gen_ai.usage.estimated": estimated,
+    })
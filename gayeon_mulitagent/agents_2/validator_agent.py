@@ -1,25 +1,52 @@
 """
 검증 에이전트: 생성된 답변이 이광수 스타일, 특히 자기합리화에 맞는지 검증 (Gemini 2.5 Flash API 버전)
 """
-from typing import Dict, Any, List
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .backends import LLMBackend
 from .base_agent import BaseAgent
 from .style_agent import StyleAgent
 
+# 세부 평가 항목별 만점
+ASPECT_MAX_SCORES = {
+    "trigger_analysis": 30.0,
+    "mechanism_identification": 40.0,
+    "persuasiveness": 30.0,
+}
+
+
+class EvaluationOutput(BaseModel):
+    """검증 응답 스키마 (Gemini에 JSON 출력 형식으로 전달하고, 응답 검사에도 사용)"""
+    trigger_analysis: float = Field(ge=0, le=30, description="Step 1 부조화 트리거 분석 점수 (0~30)")
+    mechanism_identification: float = Field(ge=0, le=40, description="Step 2 합리화 기제 식별 점수 (0~40)")
+    persuasiveness: float = Field(ge=0, le=30, description="Step 3 설득력 평가 점수 (0~30)")
+    total_score: float = Field(ge=0, le=100, description="총점 (0~100)")
+    reasoning: str = Field(description="위 3단계를 요약한 평가 사유")
+    feedback: str = Field(description="70점 미만이면 구체적 개선 지시, 70점 이상이면 'PASS'")
+
 
 class ValidatorAgent(BaseAgent):
     """생성된 텍스트가 이광수 스타일/자기합리화와 얼마나 일치하는지 검증하는 에이전트 (Gemini 2.5 Flash)"""
     
     def __init__(self, 
                  style_agent: StyleAgent = None,
-                 model_name: str = "models/gemini-2.5-flash",
-                 temperature: float = 0.3):
+                 model_name: Optional[str] = None,
+                 temperature: float = 0.3,
+                 backend: Optional[LLMBackend] = None,
+                 routing: Optional[Dict[str, Dict[str, Any]]] = None):
         """
         Args:
             style_agent: 스타일 참조를 위한 StyleAgent
-            model_name: 사용할 Gemini 모델
+            model_name: 사용할 모델 (None이면 백엔드 기본 모델)
             temperature: 생성 온도 (낮을수록 일관된 평가)
+            backend: LLM 백엔드 (None이면 Gemini)
+            routing: 모델 / 생성 설정 (BaseAgent 참고)
         """
-        super().__init__(model_name, temperature)
+        super().__init__(model_name, temperature, backend, routing)
         self.style_agent = style_agent
         
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -38,7 +65,8 @@ class ValidatorAgent(BaseAgent):
                 "is_valid": bool,  # 검증 통과 여부
                 "score": float,  # 스타일 일치도 점수 (0-100)
                 "feedback": str,  # 피드백 메시지
-                "aspects": Dict[str, float]  # 세부 평가 항목
+                "aspects": Dict[str, float],  # 세부 평가 항목
+                "parse_status": str  # "json" | "repaired" | "legacy" | "failed"
             }
         """
         generated_text = input_data.get("generated_text", "")
@@ -99,19 +127,21 @@ class ValidatorAgent(BaseAgent):
 {original_query}
 {examples_text}
 
-다음 형식으로 평가해주세요:
-Step 1 - 부조화 트리거 분석: [점수]/30 - [도덕적 찔림 포착 여부 및 외부 정당화 사용 분석]
-Step 2 - 합리화 기제 식별: [점수]/40 - [Rationalization, Blaming Victims, Self Affirmation 사용 분석]
-Step 3 - 설득력 평가: [점수]/30 - [궤변의 치밀함과 자기 기만의 완성도]
-Total Score: [점수]/100
-Reasoning: [위 3단계를 요약한 평가 사유]
-Feedback: [점수가 70점 미만일 경우 구체적 개선 지시, 70점 이상일 경우 'PASS']"""
+다음 필드를 가진 JSON 객체 하나로만 답하세요:
+- trigger_analysis: Step 1 부조화 트리거 분석 점수 (0~30)
+- mechanism_identification: Step 2 합리화 기제 식별 점수 (0~40)
+- persuasiveness: Step 3 설득력 평가 점수 (0~30)
+- total_score: 총점 (0~100)
+- reasoning: 위 3단계를 요약한 평가 사유
+- feedback: 점수가 70점 미만일 경우 구체적 개선 지시, 70점 이상일 경우 'PASS'"""
 
-        # Gemini API 호출
-        evaluation = self._generate_content(system_instruction, user_message)
+        # Gemini API 호출 (스키마에 맞는 JSON 응답)
+        evaluation = self._generate_content(
+            system_instruction, user_message, step="evaluate", response_schema=EvaluationOutput
+        )
         
-        # 점수 파싱
-        score, aspects, feedback = self._parse_evaluation(evaluation)
+        # 점수 파싱 (JSON → 로컬 복구 → 기존 줄 단위 파싱 순)
+        score, aspects, feedback, reasoning, parse_status = self._parse_output(evaluation)
         
         is_valid = score >= 70
         
@@ -121,13 +151,84 @@ Feedback: [점수가 70점 미만일 경우 구체적 개선 지시, 70점 이
             "is_valid": is_valid,
             "score": score,
             "feedback": feedback,
+            "reasoning": reasoning,
             "aspects": aspects,
             "raw_evaluation": evaluation,
+            "parse_status": parse_status,
             "agent": self.agent_name
         }
     
+    def _parse_output(self, evaluation: str) -> Tuple[float, Dict[str, float], str, str, str]:
+        """
+        평가 응답 파싱
+        
+        피드백(StyleAgent에게 주는 개선 지시)과 평가 사유는 따로 돌려준다. 사유에는 답변 내용
+        (예: 근대화, 말투)이 그대로 들어가므로 재생성 방식을 고를 때는 피드백만 본다.
+        
+        Returns:
+            (총점, 세부 점수, 피드백, 평가 사유, 파싱 상태)
+            파싱 상태: "json" (스키마 그대로), "repaired" (로컬 복구), "legacy" (줄 단위 파싱), "failed"
+        """
+        status = "json"
+        try:
+            output = EvaluationOutput.model_validate_json(evaluation)
+        except ValidationError:
+            status = "repaired"
+            output = self._repair_output(evaluation)
+        
+        if output is not None:
+            aspects = {name: getattr(output, name) for name in ASPECT_MAX_SCORES}
+            total_score = output.total_score or sum(aspects.values())
+            return total_score, aspects, output.feedback.strip(), output.reasoning.strip(), status
+        
+        # JSON을 찾지 못하면 예전 형식("Step 1 ...: 25/30")으로 답한 것으로 보고 줄 단위로 읽는다
+        total_score, aspects, feedback, reasoning = self._parse_evaluation(evaluation)
+        if total_score == 0 and not any(aspects.values()):
+            self.log("평가 응답 파싱 실패")
+            return total_score, aspects, feedback, reasoning, "failed"
+        return total_score, aspects, feedback, reasoning, "legacy"
+    
+    def _repair_output(self, evaluation: str) -> Optional[EvaluationOutput]:
+        """
+        형식이 어긋난 JSON 응답을 재호출 없이 복구
+        
+        코드 펜스/앞뒤 설명 제거, 끝에 남은 쉼표 제거, "25/30" 같은 문자열 점수를 숫자로,
+        범위를 벗어난 점수는 만점으로 자르고, 빠진 총점은 세부 점수 합으로 채운다.
+        
+        Returns:
+            복구된 결과 (JSON 객체를 찾지 못하면 None)
+        """
+        start, end = evaluation.find("{"), evaluation.rfind("}")
+        if start < 0 or end <= start:
+            return None
+        text = re.sub(r",\s*([}\]])", r"\1", evaluation[start:end + 1])
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        
+        limits = dict(ASPECT_MAX_SCORES, total_score=100.0)
+        for name, limit in limits.items():
+            value = data.get(name)
+            if isinstance(value, str):
+                value = self._extract_score(value)
+            if not isinstance(value, (int, float)):
+                value = 0.0
+            data[name] = min(max(float(value), 0.0), limit)
+        if not data["total_score"]:
+            data["total_score"] = sum(data[name] for name in ASPECT_MAX_SCORES)
+        for name in ("reasoning", "feedback"):
+            data[name] = str(data.get(name) or "")
+        
+        try:
+            return EvaluationOutput.model_validate(data)
+        except ValidationError:
+            return None
+    
     def _parse_evaluation(self, evaluation: str) -> tuple:
-        """평가 결과 파싱"""
+        """평가 결과 파싱 (예전 줄 단위 형식)"""
         lines = evaluation.split('\n')
         
         aspects = {
@@ -158,23 +259,16 @@ Feedback: [점수가 70점 미만일 경우 구체적 개선 지시, 70점 이
             # 총점이 파싱 안 되면 aspects 합산
             if total_score == 0:
                 total_score = sum(aspects.values())
-            
-            # reasoning이 있으면 feedback에 추가
-            if reasoning and not feedback:
-                feedback = reasoning
-            elif reasoning:
-                feedback = f"{reasoning}\n{feedback}"
                 
         except Exception as e:
             self.log(f"평가 파싱 오류: {e}")
             total_score = 50.0
             feedback = evaluation
         
-        return total_score, aspects, feedback
+        return total_score, aspects, feedback, reasoning
     
     def _extract_score(self, line: str) -> float:
         """라인에서 점수 추출 (예: '25/30' 에서 25 추출)"""
-        import re
         # "25/30" 또는 "25 / 30" 형태에서 첫 번째 숫자 추출
         score_match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*\d+', line)
         if score_match:
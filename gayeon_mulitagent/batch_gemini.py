@@ -0,0 +1,228 @@
+"""
+질문 파일을 읽어 답변을 JSONL로 미리 생성하는 배치 실행기 (Gemini 2.5 Flash API 버전)
+
+질문 파일 형식:
+  - .txt: 한 줄에 질문 하나 (빈 줄, #으로 시작하는 줄은 무시)
+  - .jsonl: 한 줄에 {"id": "...", "question": "..."} ("query"도 가능, id가 없으면 질문 해시)
+
+결과 파일에는 답변 하나당 한 줄씩 점수, 재시도 횟수, 출처, 단계별 시간을 기록한다.
+중간에 멈춰도 이미 기록된 ID는 다시 실행할 때 건너뛰므로, 같은 명령을 다시 실행하면
+이어서 처리된다 (오류로 끝난 질문은 다시 시도).
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+DEFAULT_CONCURRENCY = 4
+
+
+def question_id(question: str) -> str:
+    """ID가 없는 질문의 ID (질문 내용 기준이라 파일 순서가 바뀌어도 같음)"""
+    return "q-" + hashlib.sha1(question.encode("utf-8")).hexdigest()[:12]
+
+
+def read_questions(path: str) -> List[Tuple[str, str]]:
+    """
+    질문 파일 읽기
+
+    Returns:
+        [(id, 질문), ...] (같은 ID가 여러 번 나오면 처음 것만)
+    """
+    questions: Dict[str, str] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no} JSON 형식 오류: {e}")
+                question = (record.get("question") or record.get("query") or "").strip()
+                if not question:
+                    raise ValueError(f"{path}:{line_no} question 필드가 없습니다")
+                qid = str(record.get("id") or question_id(question))
+            else:
+                question, qid = line, question_id(line)
+            questions.setdefault(qid, question)
+    return list(questions.items())
+
+
+def completed_ids(path: str) -> set:
+    """결과 파일에 답변이 이미 기록된 ID (오류 레코드와 깨진 마지막 줄은 제외)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "answer" in record:
+                done.add(record["id"])
+    return done
+
+
+def to_record(qid: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """process_many 항목 → 결과 파일 한 줄"""
+    record = {"id": qid, "question": item["query"]}
+    if item["type"] == "error":
+        record["error"] = str(item["error"])
+    else:
+        result = item["result"]
+        details = result.get("validation_details") or {}
+        record.update({
+            "answer": result["final_answer"],
+            "validation_score": result["validation_score"],
+            "aspects": details.get("aspects"),
+            "success": result["success"],
+            "retry_count": result["retry_count"],
+            "knowledge_sources": result["knowledge_sources"],
+            "degraded": result["degraded"],
+            "failure": result["failure"],
+            "llm_calls": result["llm_calls"],
+            "timings": result["timings"],
+        })
+    record["elapsed"] = round(item["elapsed"], 2)
+    record["created_at"] = datetime.now().isoformat()
+    return record
+
+
+class Progress:
+    """처리량 진행 표시 (tqdm이 있으면 tqdm, 없으면 한 줄 갱신)"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.count = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        try:
+            from tqdm import tqdm
+            self.bar = tqdm(total=total, unit="q", dynamic_ncols=True)
+        except ImportError:
+            self.bar = None
+
+    def update(self, failed: bool):
+        self.count += 1
+        self.failed += 1 if failed else 0
+        if self.bar is not None:
+            self.bar.update(1)
+            self.bar.set_postfix(failed=self.failed)
+            return
+        elapsed = time.monotonic() - self.started
+        rate = self.count / elapsed * 60 if elapsed > 0 else 0.0
+        print(f"\r  {self.count}/{self.total} 완료 | 실패 {self.failed} | {rate:.1f}개/분", end="", flush=True)
+
+    def close(self):
+        if self.bar is not None:
+            self.bar.close()
+        else:
+            print()
+
+
+def run(input_path: str, output_path: str, concurrency: int = DEFAULT_CONCURRENCY, limit: int = None):
+    """질문 파일 → 결과 JSONL (이미 답변이 있는 ID는 건너뜀)"""
+    questions = read_questions(input_path)
+    done = completed_ids(output_path)
+    pending = [(qid, q) for qid, q in questions if qid not in done]
+    skipped = len(questions) - len(pending)
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(f"질문 {len(questions)}개 | 이미 완료 {skipped}개 | 이번 실행 {len(pending)}개 | 동시 실행 {concurrency}")
+    if not pending:
+        print("✅ 처리할 질문이 없습니다.")
+        return
+
+    from agents_2.orchestrator import MultiAgentOrchestrator
+
+    orchestrator = MultiAgentOrchestrator(
+        talk_style_dir="./GS_talk_style",
+        paper_dir="./GS_paper",
+        max_retries=3,
+        model_name="models/gemini-2.5-flash",
+        answer_cache=""
+    )
+
+    progress = Progress(len(pending))
+    report = None
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    items = orchestrator.process_many([q for _, q in pending], concurrency=concurrency)
+    try:
+        with open(output_path, "a", encoding="utf-8") as f:
+            for item in items:
+                if item["type"] == "report":
+                    report = item["report"]
+                    continue
+                record = to_record(pending[item["index"]][0], item)
+                # 한 줄씩 바로 기록해야 중간에 멈춰도 이어서 실행할 수 있다
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                progress.update(failed="error" in record)
+    except KeyboardInterrupt:
+        progress.close()
+        print(f"\n⏹  중단됨: {progress.count}개 기록 → {output_path} (다시 실행하면 이어서 처리)")
+        raise
+    finally:
+        items.close()
+    progress.close()
+
+    print(f"\n✅ {report['succeeded']}개 완료 (검증 통과 {report['validated']}, 실패 {report['failed']}) "
+          f"→ {output_path}")
+    print(f"   {report['elapsed']:.1f}초, {report['queries_per_minute']:.1f}개/분, "
+          f"지연 p50 {report['latency']['p50']:.1f}초 / p95 {report['latency']['p95']:.1f}초, "
+          f"LLM 호출 {report['llm_calls']}회")
+    print(f"   단계별 누적 시간: " + ", ".join(f"{k} {v:.1f}초" for k, v in report["stage_seconds"].items()))
+
+
+USAGE = """
+사용법:
+  python batch_gemini.py <questions.txt|questions.jsonl> <output.jsonl> [--concurrency=N] [--limit=N]
+    → 질문마다 답변을 생성해 output.jsonl에 한 줄씩 기록
+      (점수, 항목별 점수, 재시도 횟수, 출처, 단계별 시간 포함)
+      --concurrency: 동시에 실행할 파이프라인 수 (기본 4)
+      --limit: 이번 실행에서 처리할 최대 질문 수
+
+  같은 명령을 다시 실행하면 output.jsonl에 답변이 있는 ID는 건너뛴다 (오류 난 질문만 다시 시도).
+  tqdm이 설치되어 있으면 진행 막대로 표시한다.
+
+예시:
+  python batch_gemini.py curriculum.txt answers.jsonl --concurrency=8
+  python batch_gemini.py curriculum.jsonl answers.jsonl --limit=100
+"""
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    options = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    if len(args) < 2 or not options.keys() <= {"concurrency", "limit"}:
+        print(USAGE)
+        sys.exit(1)
+
+    if not os.getenv("GEMINI_API_KEY"):
+        print("⚠️  경고: GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+        print("export GEMINI_API_KEY='your-api-key' 를 실행하거나 .env 파일에 추가하세요.")
+        sys.exit(1)
+
+    try:
+        run(
+            args[0],
+            args[1],
+            concurrency=int(options.get("concurrency", DEFAULT_CONCURRENCY)),
+            limit=int(options["limit"]) if "limit" in options else None
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+"""
+라우팅 프로필별 지연 시간 / 검증 통과율 벤치마크
+
+같은 질문 묶음을 프로필(agents_2.routing.ROUTING_PROFILES 또는 JSON 파일)마다 끝까지
+실행하고, 통과율, 평균 점수, 재시도 수, 지연 시간, 모델별 호출 수를 비교한다.
+가벼운 모델로 먼저 시도하는 프로필이 통과율을 얼마나 잃고 시간을 얼마나 줄이는지 보는 용도.
+
+LLM_BACKEND=stub 으로 실행하면 API 호출 없이 파이프라인 오버헤드만 측정한다.
+"""
+import os
+import sys
+import time
+from typing import Dict, Any, List
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+DEFAULT_PROFILES = ["uniform", "split", "cheap_first"]
+
+DEFAULT_QUESTIONS = [
+    "창씨개명에 대한 당신의 입장은 무엇입니까?",
+    "민족개조론을 쓴 이유는 무엇입니까?",
+    "학병 권유 연설을 한 이유는 무엇입니까?",
+    "내선일체를 주장한 근거는 무엇입니까?",
+    "해방 후 반민특위 조사에 대해 어떻게 생각하십니까?",
+    "2.8 독립선언서를 쓴 당신이 왜 친일로 돌아섰습니까?",
+]
+
+
+def run_profile(profile: str, questions: List[str], concurrency: int) -> Dict[str, Any]:
+    """프로필 하나로 질문 전체를 실행하고 집계"""
+    from agents_2.orchestrator import MultiAgentOrchestrator
+
+    # 답변 캐시가 적중하면 라우팅을 비교할 수 없으므로 끈다
+    orchestrator = MultiAgentOrchestrator(routing=profile, prewarm=False, answer_cache="")
+    # 인덱스 로드 / 클라이언트 생성은 측정에서 뺀다
+    orchestrator.prewarm(background=False)
+
+    scores, retries, latencies = [], [], []
+    passed = escalated = errors = 0
+    report = None
+    for item in orchestrator.process_many(questions, concurrency=concurrency):
+        if item["type"] == "report":
+            report = item["report"]
+        elif item["type"] == "error":
+            errors += 1
+            print(f"  ❌ {item['query'][:30]}: {item['error']}")
+        else:
+            result = item["result"]
+            latencies.append(item["elapsed"])
+            scores.append(result["validation_score"])
+            retries.append(result["retry_count"])
+            passed += 1 if result["success"] else 0
+            escalated += 1 if result["retry_count"] > 0 else 0
+
+    done = len(latencies)
+    return {
+        "profile": profile,
+        "questions": len(questions),
+        "errors": errors,
+        "pass_rate": passed / len(questions) if questions else 0.0,
+        "mean_score": sum(scores) / done if done else 0.0,
+        "mean_retries": sum(retries) / done if done else 0.0,
+        "escalated": escalated,
+        "latency_p50": report["latency"]["p50"],
+        "latency_p95": report["latency"]["p95"],
+        "elapsed": report["elapsed"],
+        "calls_per_question": report["llm_calls"] / done if done else 0.0,
+        "model_calls": report["model_calls"],
+    }
+
+
+def main(profiles: List[str], questions: List[str], concurrency: int = 2):
+    print(f"백엔드: {os.getenv('LLM_BACKEND', 'gemini')} | 질문 {len(questions)}개 | 동시 실행 {concurrency}\n")
+    results = []
+    for profile in profiles:
+        print(f"[{profile}] 실행 중...")
+        started = time.monotonic()
+        results.append(run_profile(profile, questions, concurrency))
+        print(f"[{profile}] 완료 ({time.monotonic() - started:.1f}초)\n")
+
+    print(f"{'프로필':<14} {'통과율':>7} {'평균점수':>8} {'재시도':>6} {'승격':>5} "
+          f"{'p50(초)':>8} {'p95(초)':>8} {'호출/질문':>9} {'오류':>5}")
+    for r in results:
+        print(f"{r['profile']:<14} {r['pass_rate']:>7.0%} {r['mean_score']:>8.1f} {r['mean_retries']:>6.2f} "
+              f"{r['escalated']:>5} {r['latency_p50']:>8.1f} {r['latency_p95']:>8.1f} "
+              f"{r['calls_per_question']:>9.1f} {r['errors']:>5}")
+    print("\n모델별 호출 수")
+    for r in results:
+        calls = ", ".join(f"{model} {count}" for model, count in sorted(r["model_calls"].items()))
+        print(f"  {r['profile']:<14} {calls or '-'}")
+
+
+USAGE = """
+사용법:
+  python bench_routing.py [프로필,...] [questions.txt|questions.jsonl] [--concurrency=N]
+    → 프로필마다 같은 질문을 실행해 통과율 / 평균 점수 / 재시도 / 지연 시간 / 모델별 호출 수 비교
+      프로필: uniform, split, cheap_first 또는 라우팅 JSON 파일 (기본: 세 프로필 모두)
+      질문 파일을 주지 않으면 내장 질문 6개 사용
+
+예시:
+  python bench_routing.py
+  python bench_routing.py uniform,cheap_first curriculum.txt --concurrency=4
+  LLM_BACKEND=stub python bench_routing.py   # API 호출 없이 실행
+"""
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    options = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    if "--help" in sys.argv or not options.keys() <= {"concurrency"}:
+        print(USAGE)
+        sys.exit(1)
+
+    try:
+        profiles = args[0].split(",") if args else DEFAULT_PROFILES
+        if len(args) > 1:
+            from batch_gemini import read_questions
+            questions = [question for _, question in read_questions(args[1])]
+        else:
+            questions = DEFAULT_QUESTIONS
+        main(profiles, questions, int(options.get("concurrency", 2)))
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        sys.exit(1)
@@ -0,0 +1,221 @@
+"""
+벡터 인덱스 오프라인 빌드 도구
+
+서버는 미리 만들어 둔 인덱스만 불러온다. 이 스크립트가 GS_paper / GS_talk_style 을
+읽어 임베딩하고, 버전별 디렉토리(벡터, 문서, manifest)를 만든 뒤 무결성을 확인하고
+CURRENT 포인터를 원자적으로 교체한다. 한 번 만든 버전은 수정하지 않는다.
+
+  indexes/papers/20250101-120000/  vectors.npy, records.jsonl, offsets.npy, manifest.json
+  indexes/papers/CURRENT           → 20250101-120000
+"""
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents_2.backends import LLMBackend, check_backend, get_backend
+from agents_2.ingest import (
+    INDEX_SPECS, resolve_dir, chroma_location, file_sha256, list_pdfs, load_chunks, chunk_stats
+)
+from agents_2.mmap_index import (
+    write_index, export_chroma, verify_index, list_versions, current_version,
+    activate_version, resolve_index_dir
+)
+
+# 임베딩 호출 하나에 넣을 청크 수 (Gemini 배치 임베딩 한도와 같음)
+EMBED_BATCH = 100
+
+# 인덱스를 검색하는 에이전트 (LLM_BACKEND_<에이전트> 설정을 서버와 같이 따름)
+INDEX_AGENTS = {"papers": "knowledge", "style": "style"}
+
+
+def index_root() -> str:
+    """인덱스 루트 (VECTOR_INDEX_DIR, 기본 ./indexes)"""
+    return os.getenv("VECTOR_INDEX_DIR") or resolve_dir("indexes")
+
+
+def index_backend(name: str) -> LLMBackend:
+    """인덱스를 검색할 에이전트와 같은 백엔드 (LLM_BACKEND_KNOWLEDGE / _STYLE, 없으면 LLM_BACKEND)"""
+    agent = INDEX_AGENTS[name]
+    return get_backend(check_backend(os.getenv(f"LLM_BACKEND_{agent.upper()}")
+                                     or os.getenv("LLM_BACKEND", "gemini")))
+
+
+def embed_chunks(texts, backend: LLMBackend, model: str):
+    """청크 임베딩 (EMBED_BATCH개씩 한 번의 호출로, 실패한 청크가 있으면 빌드 중단)"""
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH):
+        # 호출이 실패하면 EmbeddingError, 빈 벡터가 섞여 오면 인덱스에 들어가지 않게 여기서 막는다
+        batch = backend.embed(texts[start:start + EMBED_BATCH], model)
+        failed = [start + i for i, v in enumerate(batch) if not any(v)]
+        if failed:
+            raise RuntimeError(f"임베딩 실패한 청크 {len(failed)}개 (예: {failed[:5]})")
+        vectors.extend(batch)
+        print(f"    임베딩 {min(start + EMBED_BATCH, len(texts))}/{len(texts)}")
+    return vectors
+
+
+def build(name: str, from_chroma: bool = False, activate: bool = True) -> str:
+    """
+    인덱스 하나를 새 버전으로 빌드
+
+    Args:
+        name: "papers" 또는 "style"
+        from_chroma: True면 기존 Chroma DB의 임베딩을 그대로 내보냄 (API 호출 없음)
+        activate: 빌드 후 CURRENT를 새 버전으로 교체할지 여부
+
+    Returns:
+        새 버전 이름
+    """
+    spec = INDEX_SPECS[name]
+    root = index_root()
+    version = datetime.now().strftime('%Y%m%d-%H%M%S')
+    final_dir = os.path.join(root, name, version)
+    tmp_dir = os.path.join(root, name, f".build-{version}")
+    source_dir = resolve_dir(spec["source_dir"])
+    backend = index_backend(name)
+    model = backend.default_embedding_model
+
+    manifest = {
+        "name": name,
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "embedding_model": model,
+        "backend": backend.name,
+        "index_tag": backend.index_tag,
+        "chunk_size": spec["chunk_size"],
+        "chunk_overlap": spec["chunk_overlap"],
+        "sources": [
+            {"file": os.path.basename(p), "size": os.path.getsize(p), "sha256": file_sha256(p)}
+            for p in list_pdfs(source_dir)
+        ],
+    }
+
+    print(f"\n[{name}] 빌드 시작 → {final_dir} ({backend.name}, {model})")
+    started = time.time()
+    try:
+        if from_chroma:
+            chroma_dir, collection = chroma_location(name, backend.index_tag)
+            written = export_chroma(os.path.join(source_dir, chroma_dir), collection, tmp_dir, manifest)
+        else:
+            chunks = load_chunks(name, log=lambda m: print(f"  {m}"))
+            if not chunks:
+                raise RuntimeError(f"청크가 없습니다: {source_dir}")
+            manifest["chunking"] = "korean_sentence"
+            manifest["chunk_stats"] = chunk_stats(name)
+            print_stats(name, manifest["chunk_stats"])
+            texts = [c.page_content for c in chunks]
+            vectors = embed_chunks(texts, backend, model)
+            written = write_index(tmp_dir, vectors, texts, [c.metadata for c in chunks], manifest)
+
+        verify_index(tmp_dir, full=True)
+        os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    print(f"  ✓ {written['count']}개 청크, {written['dim']}차원 ({time.time() - started:.1f}초)")
+    if activate:
+        activate_version(root, name, version)
+        print(f"  ✓ CURRENT → {version}")
+    return version
+
+
+def print_stats(name: str, stats: dict):
+    """기존 방식(before) 대비 정제 + 문장 단위 청크(after)의 청크 수 / 글자 수"""
+    before, after = stats["before"], stats["after"]
+    ratio = lambda a, b: f"{(a - b) / b:+.0%}" if b else "-"
+    print(f"  [{name}] 청크 {before['chunks']} → {after['chunks']} ({ratio(after['chunks'], before['chunks'])}), "
+          f"글자 {before['chars']:,} → {after['chars']:,} ({ratio(after['chars'], before['chars'])})")
+
+
+def verify(names):
+    """CURRENT 버전의 무결성 확인 (SHA-256 포함)"""
+    ok = True
+    for name in names:
+        index_dir = resolve_index_dir(index_root(), name)
+        try:
+            model = index_backend(name).default_embedding_model
+        except Exception as e:
+            # 백엔드를 만들 수 없는 환경(API 키 없음 등)에서도 파일 무결성은 확인
+            print(f"  ({name}: 임베딩 모델 확인 생략 - {e})")
+            model = None
+        try:
+            manifest = verify_index(index_dir, full=True, embedding_model=model)
+            print(f"✓ {name}: {index_dir} ({manifest['count']}개, {manifest.get('embedding_model')})")
+        except Exception as e:
+            ok = False
+            print(f"❌ {name}: {index_dir} - {e}")
+    return ok
+
+
+def show(names):
+    """버전 목록 (* = CURRENT)"""
+    root = index_root()
+    for name in names:
+        current = current_version(root, name)
+        print(f"[{name}]")
+        versions = list_versions(root, name)
+        if not versions:
+            print("  (없음)")
+        for version in versions:
+            print(f"  {'*' if version == current else ' '} {version}")
+
+
+USAGE = """
+사용법:
+  python build_index.py build [papers|style|all] [--from-chroma] [--no-activate]
+    → PDF를 읽고 임베딩해 새 버전 생성, 검증 후 CURRENT 교체
+      임베딩은 서버와 같은 백엔드(LLM_BACKEND, LLM_BACKEND_KNOWLEDGE / _STYLE)로 EMBED_BATCH개씩 묶어 호출
+      --from-chroma: 기존 Chroma DB의 임베딩을 그대로 사용 (API 호출 없음)
+  python build_index.py verify [papers|style|all]
+    → CURRENT 버전 무결성 확인 (파일 SHA-256, 배열 형태, 임베딩 모델)
+  python build_index.py list [papers|style|all]
+  python build_index.py stats [papers|style|all]
+    → 기존 방식 대비 정제 + 문장 단위 청크의 청크 수 / 글자 수 (임베딩 없음)
+  python build_index.py activate <papers|style> <version>
+    → CURRENT를 다른 버전으로 교체 (서버 재시작 시 반영)
+
+인덱스 위치: VECTOR_INDEX_DIR (기본 ./indexes)
+PDF 쪽 텍스트 캐시: PDF_TEXT_CACHE (기본 ./.pdf_text_cache)
+"""
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}
+    if not args or args[0] not in ("build", "verify", "list", "stats", "activate"):
+        print(USAGE)
+        sys.exit(1)
+
+    command = args[0]
+    target = args[1] if len(args) > 1 else "all"
+    if target != "all" and target not in INDEX_SPECS:
+        print(f"❌ 알 수 없는 인덱스: {target} (가능: {', '.join(INDEX_SPECS)}, all)")
+        sys.exit(1)
+    names = list(INDEX_SPECS) if target == "all" else [target]
+
+    try:
+        if command == "build":
+            for name in names:
+                build(name, from_chroma="--from-chroma" in flags, activate="--no-activate" not in flags)
+        elif command == "verify":
+            sys.exit(0 if verify(names) else 1)
+        elif command == "list":
+            show(names)
+        elif command == "stats":
+            for name in names:
+                print_stats(name, chunk_stats(name))
+        elif command == "activate":
+            if len(args) < 3 or target == "all":
+                print(USAGE)
+                sys.exit(1)
+            activate_version(index_root(), target, args[2])
+            print(f"✓ {target}: CURRENT → {args[2]}")
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        sys.exit(1)
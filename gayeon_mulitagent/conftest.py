@@ -0,0 +1,216 @@
+"""
+테스트 공용 도구
+
+오케스트레이터 테스트는 실제 에이전트(인덱스 / LLM) 대신 아래 가짜 에이전트를 _agents에 넣어
+파이프라인 로직만 검사한다. 가짜 에이전트의 process 호출은 LLM 호출 1회로 센다.
+임베딩이 필요한 경로(세션 검색, 답변 캐시)는 stub 백엔드의 해시 임베딩을 쓴다.
+"""
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (BASE_DIR, os.path.join(BASE_DIR, "web_release")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from agents_2.backends import get_backend  # noqa: E402
+from agents_2.metrics import count_llm_call  # noqa: E402
+
+
+class FakeKnowledgeAgent:
+    """질문을 그대로 담은 초안을 돌려주는 지식 에이전트"""
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.error = error
+        self.backend = get_backend("stub")
+        self.embedding_model = self.backend.default_embedding_model
+        self.inputs: List[Dict[str, Any]] = []
+        self.searches = 0
+
+    def search_knowledge_by_vectors(self, vectors: List[List[float]], k: int = 5) -> List[List[Dict[str, Any]]]:
+        self.searches += 1
+        return [[{"content": "자료", "source": "paper.pdf"}] for _ in vectors]
+
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.inputs.append(input_data)
+        count_llm_call("fake")
+        if self.error is not None:
+            raise self.error
+        items = input_data.get("knowledge_items") or [{"content": "자료", "source": "paper.pdf"}]
+        return {
+            "answer": f"초안: {input_data['query']}",
+            "knowledge_items": items,
+            "sources": [item["source"] for item in items],
+        }
+
+
+class FakeStyleAgent:
+    """
+    mode와 입력 텍스트를 표시한 답변을 돌려주는 스타일 에이전트
+
+    errors: 호출 순서대로 발생시킬 예외 (None이면 정상 응답, 목록이 끝나면 계속 정상)
+    delay: 호출마다 기다릴 시간 (초, 마감 시간 테스트용)
+    """
+
+    def __init__(self, errors: Sequence[Optional[Exception]] = (), delay: float = 0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.modes: List[str] = []
+
+    def get_style_examples(self, query: str, k: int = 3) -> List[str]:
+        return ["예시 문장"]
+
+    def get_style_examples_by_vectors(self, vectors: List[List[float]], k: int = 3) -> List[List[str]]:
+        return [["예시 문장"] for _ in vectors]
+
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        mode = input_data.get("mode", "full")
+        self.modes.append(mode)
+        count_llm_call("fake")
+        if self.delay:
+            time.sleep(self.delay)
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        return {
+            "styled_text": f"[{mode}] {input_data['text']}",
+            "tone_text": f"어조: {input_data['text']}",
+            "style_examples": ["예시 문장"],
+        }
+
+
+class FakeValidatorAgent:
+    """
+    정해 둔 점수를 차례로 돌려주는 검증 에이전트 (점수 목록이 끝나면 마지막 점수 반복)
+
+    errors: 호출 순서대로 발생시킬 예외 (FakeStyleAgent와 같음)
+    """
+
+    PASS_SCORE = 70
+
+    def __init__(self, scores: Sequence[float] = (80,), errors: Sequence[Optional[Exception]] = (),
+                 feedback: str = "합리화 기제 설명이 부족함", delay: float = 0.0):
+        self.scores = list(scores)
+        self.errors = list(errors)
+        self.feedback = feedback
+        self.delay = delay
+        self.texts: List[str] = []
+
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.texts.append(input_data["generated_text"])
+        count_llm_call("fake")
+        if self.delay:
+            time.sleep(self.delay)
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        score = self.scores.pop(0) if len(self.scores) > 1 else self.scores[0]
+        return {
+            "score": score,
+            "is_valid": score >= self.PASS_SCORE,
+            "aspects": {
+                "trigger_analysis": score * 0.3,
+                "mechanism_identification": score * 0.4,
+                "persuasiveness": score * 0.3,
+            },
+            "feedback": "" if score >= self.PASS_SCORE else self.feedback,
+            "parse_status": "json",
+        }
+
+
+@pytest.fixture
+def make_orchestrator(monkeypatch):
+    """
+    가짜 에이전트를 넣은 MultiAgentOrchestrator를 만드는 함수
+
+    사용: make_orchestrator(knowledge=..., style=..., validator=..., **생성자 인자)
+    """
+    monkeypatch.setenv("AGENT_PREWARM", "0")
+    monkeypatch.delenv("PIPELINE_DEADLINE", raising=False)
+    monkeypatch.delenv("TRACE_FILE", raising=False)
+    monkeypatch.setenv("PROFILE_MODE", "off")
+    from agents_2.orchestrator import MultiAgentOrchestrator
+
+    def factory(knowledge=None, style=None, validator=None, **kwargs):
+        kwargs.setdefault("backend", "stub")
+        kwargs.setdefault("answer_cache", "")
+        kwargs.setdefault("index_dir", "")
+        orchestrator = MultiAgentOrchestrator(**kwargs)
+        orchestrator._agents.update({
+            "knowledge": knowledge or FakeKnowledgeAgent(),
+            "style": style or FakeStyleAgent(),
+            "validator": validator or FakeValidatorAgent(),
+        })
+        return orchestrator
+
+    return factory
+
+
+@pytest.fixture
+def stub_style_agent(tmp_path):
+    """
+    stub 백엔드와 임시 메모리 맵 스타일 인덱스로 만든 실제 StyleAgent (numpy가 없으면 건너뜀)
+
+    LLM 호출은 입력을 돌려주는 stub 응답이라 mode별 호출 수와 예시 검색 횟수를 셀 수 있다.
+    """
+    pytest.importorskip("numpy")
+    from agents_2.mmap_index import STYLE_INDEX, write_index
+    from agents_2.style_agent import StyleAgent
+
+    backend = get_backend("stub")
+    model = backend.default_embedding_model
+    texts = ["나는 민족을 위하여 그리하였소.", "조선 사람은 먼저 실력을 길러야 하오.", "이것이 나의 신념이었소.",
+             "내 붓은 민족의 앞날을 위한 것이었소."]
+    write_index(str(tmp_path / STYLE_INDEX), backend.embeddings(model).embed_documents(texts), texts,
+                [{} for _ in texts], manifest={"embedding_model": model})
+    return StyleAgent(index_dir=str(tmp_path), backend=backend)
+
+
+@pytest.fixture(scope="session")
+def api_module(tmp_path_factory):
+    """
+    web_release/api.py 모듈 (FastAPI / python-dotenv가 없으면 건너뜀)
+
+    로그 디렉토리를 현재 디렉토리 기준으로 만들기 때문에 임시 디렉토리에서 임포트한다.
+    (기록 스레드를 띄우지 않으므로 테스트 중에는 로그 파일이 쓰이지 않는다)
+    """
+    pytest.importorskip("fastapi")
+    pytest.importorskip("dotenv")
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("api"))
+    try:
+        import api
+    finally:
+        os.chdir(cwd)
+    return api
+
+
+@pytest.fixture
+def api_client(api_module):
+    """
+    가짜 에이전트를 넣은 API의 TestClient를 만드는 함수
+
+    사용: client = api_client(knowledge=..., style=..., validator=..., failure_policy=...)
+    """
+    from fastapi.testclient import TestClient
+
+    orchestrator = api_module.orchestrator
+    saved = (dict(orchestrator._agents), orchestrator.failure_policy)
+
+    def factory(knowledge=None, style=None, validator=None, failure_policy="fallback"):
+        orchestrator._agents.update({
+            "knowledge": knowledge or FakeKnowledgeAgent(),
+            "style": style or FakeStyleAgent(),
+            "validator": validator or FakeValidatorAgent(),
+        })
+        orchestrator.failure_policy = failure_policy
+        return TestClient(api_module.app)
+
+    yield factory
+    orchestrator._agents.clear()
+    orchestrator._agents.update(saved[0])
+    orchestrator.failure_policy = saved[1]
@@ -36,9 +36,9 @@ def example_single_query():
 
 
 def example_multiple_queries():
-    """여러 질문 연속 처리 예제"""
+    """여러 질문 동시 처리 예제 (process_many)"""
     print("\n" + "="*60)
-    print("예제 2: 여러 질문 연속 처리")
+    print("예제 2: 여러 질문 동시 처리")
     print("="*60)
     
     orchestrator = MultiAgentOrchestrator(
@@ -52,23 +52,34 @@ def example_multiple_queries():
         "이광수가 징병제를 지지한 이유는 무엇인가요?",
     ]
     
-    results = []
-    for i, query in enumerate(queries, 1):
-        print(f"\n\n[질문 {i}/{len(queries)}]")
-        result = orchestrator.process_query(query, verbose=True)
-        results.append({
-            "query": query,
-            "answer": result['final_answer'],
-            "score": result['validation_score']
-        })
+    # 끝나는 순서대로 도착하므로 원래 순서로 정리
+    results = [None] * len(queries)
+    report = None
+    for item in orchestrator.process_many(queries, concurrency=2):
+        if item["type"] == "result":
+            print(f"\n[완료 {item['index'] + 1}/{len(queries)}] {item['elapsed']:.1f}초")
+            results[item["index"]] = {
+                "query": item["query"],
+                "answer": item["result"]['final_answer'],
+                "score": item["result"]['validation_score']
+            }
+        elif item["type"] == "error":
+            print(f"\n[실패 {item['index'] + 1}/{len(queries)}] {item['error']}")
+        else:
+            report = item["report"]
     
     print(f"\n\n{'='*60}")
     print("전체 결과 요약")
     print(f"{'='*60}")
     for i, res in enumerate(results, 1):
+        if res is None:
+            print(f"\n{i}. {queries[i - 1]}\n   (실패)")
+            continue
         print(f"\n{i}. {res['query']}")
         print(f"   점수: {res['score']:.1f}/100")
         print(f"   답변: {res['answer'][:100]}...")
+    print(f"\n전체 {report['elapsed']:.1f}초, 분당 {report['queries_per_minute']:.1f}개, "
+          f"지연 p50 {report['latency']['p50']:.1f}초 / p95 {report['latency']['p95']:.1f}초")
 
 
 def example_detailed_validation():
@@ -92,16 +103,19 @@ def example_detailed_validation():
     print("검증 세부 항목")
     print(f"{'='*60}")
     
+    from agents_2.validator_agent import ASPECT_MAX_SCORES
+    
     validation = result['validation_details']
     aspects = validation['aspects']
     
-    print(f"\n1. 어휘 선택:    {aspects['vocabulary']:.1f}/25")
-    print(f"2. 문장 구조:    {aspects['structure']:.1f}/25")
-    print(f"3. 어조와 톤:    {aspects['tone']:.1f}/25")
-    print(f"4. 역사적 맥락:  {aspects['context']:.1f}/25")
+    print()
+    for i, (aspect, max_score) in enumerate(ASPECT_MAX_SCORES.items(), 1):
+        print(f"{i}. {aspect:<26} {aspects.get(aspect, 0):.1f}/{max_score:.0f}")
     print(f"\n총점: {validation['score']:.1f}/100")
     print(f"통과 여부: {'✓ 통과' if validation['is_valid'] else '✗ 실패'}")
     
+    if validation.get('reasoning'):
+        print(f"\n평가 사유:\n{validation['reasoning']}")
     if validation.get('feedback'):
         print(f"\n피드백:\n{validation['feedback']}")
 
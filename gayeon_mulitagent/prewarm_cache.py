@@ -0,0 +1,292 @@
+"""
+지난 대화 로그로 답변 캐시를 미리 만드는 작업
+
+1. web_release/conversation_logs의 질문을 모아 임베딩 (같은 문장은 한 번만)
+2. 빈도순으로 돌며 기존 묶음 중심과 코사인 유사도가 --threshold 이상이면 그 묶음에 넣고,
+   아니면 새 묶음을 만든다 (빈도가 높은 질문이 묶음의 대표가 됨)
+3. 질문 수가 많은 상위 --top개 묶음의 대표 질문으로 파이프라인을 실행해, 검증을 통과한 답변만
+   answer_cache.json에 저장 (agents_2.answer_cache 형식)
+4. 최근 --eval-days일 질문이 캐시에 얼마나 적중했을지 추정해 출력
+
+서버(MultiAgentOrchestrator)는 ANSWER_CACHE_PATH로 이 파일을 지정했을 때만 캐시를 쓴다.
+"""
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+DEFAULT_LOG_DIR = os.path.join("web_release", "conversation_logs")
+DEFAULT_OUTPUT = "answer_cache.json"
+DEFAULT_TOP = 50
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MIN_COUNT = 2
+DEFAULT_EVAL_DAYS = 7
+DEFAULT_CONCURRENCY = 4
+EMBED_CHUNK = 100
+MAX_VARIANTS = 20
+
+
+def read_queries(log_dir: str) -> List[Tuple[datetime, str]]:
+    """대화 로그의 (시각, 질문) 목록 (워커별 파일 포함, 깨진 줄은 무시)"""
+    queries = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    timestamp = datetime.fromisoformat(record["timestamp"])
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    continue
+                query = (record.get("query") or "").strip()
+                if query:
+                    queries.append((timestamp, query))
+    return queries
+
+
+def count_queries(queries: List[str]) -> Tuple[Counter, Dict[str, str]]:
+    """
+    공백/문장부호만 다른 질문을 합쳐 세기
+
+    Returns:
+        (대표 문장 → 횟수, 정규화한 질문 → 대표 문장) - 대표 문장은 가장 자주 쓰인 표기
+    """
+    from agents_2.answer_cache import normalize_query
+
+    forms: Dict[str, Counter] = {}
+    for query in queries:
+        forms.setdefault(normalize_query(query), Counter())[query] += 1
+    counts, canonical = Counter(), {}
+    for key, variants in forms.items():
+        form = variants.most_common(1)[0][0]
+        counts[form] = sum(variants.values())
+        canonical[key] = form
+    return counts, canonical
+
+
+def embed_queries(orchestrator, queries: List[str]) -> "np.ndarray":
+    """질문 임베딩 (지식 검색과 같은 모델, 정규화된 행렬)"""
+    import numpy as np
+
+    knowledge_agent = orchestrator.knowledge_agent
+    vectors = []
+    for start in range(0, len(queries), EMBED_CHUNK):
+        vectors.extend(knowledge_agent.backend.embed(queries[start:start + EMBED_CHUNK],
+                                                     knowledge_agent.embedding_model))
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def cluster_queries(counts: Counter, matrix, threshold: float) -> List[Dict[str, Any]]:
+    """
+    빈도순 리더 군집화
+
+    Args:
+        counts: 질문 → 횟수 (matrix의 행 순서와 같은 순서)
+        matrix: 정규화된 질문 임베딩
+
+    Returns:
+        [{"question", "count", "members": [질문, ...], "vector"}, ...] (질문 수 내림차순)
+    """
+    import numpy as np
+
+    queries = list(counts)
+    order = sorted(range(len(queries)), key=lambda i: -counts[queries[i]])
+    clusters: List[Dict[str, Any]] = []
+    centroids = np.zeros((0, matrix.shape[1]), dtype=np.float32)
+    for i in order:
+        vector = matrix[i]
+        if len(clusters):
+            scores = centroids @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= threshold:
+                cluster = clusters[best]
+                cluster["members"].append(queries[i])
+                cluster["count"] += counts[queries[i]]
+                cluster["sum"] += vector * counts[queries[i]]
+                norm = np.linalg.norm(cluster["sum"])
+                centroids[best] = cluster["sum"] / norm if norm else cluster["sum"]
+                continue
+        clusters.append({"question": queries[i], "count": counts[queries[i]], "members": [queries[i]],
+                         "sum": vector * counts[queries[i]]})
+        centroids = np.vstack([centroids, vector])
+    for cluster, centroid in zip(clusters, centroids):
+        del cluster["sum"]
+        cluster["vector"] = centroid.tolist()
+    return sorted(clusters, key=lambda c: -c["count"])
+
+
+def generate_entries(orchestrator, clusters: List[Dict[str, Any]], concurrency: int) -> List[Dict[str, Any]]:
+    """묶음마다 대표 질문의 답변을 만들고, 검증을 통과한 것만 캐시 항목으로"""
+    entries = [None] * len(clusters)
+    rejected = 0
+    for item in orchestrator.process_many([c["question"] for c in clusters], concurrency=concurrency):
+        if item["type"] == "report":
+            continue
+        cluster = clusters[item["index"]]
+        if item["type"] == "error":
+            rejected += 1
+            print(f"  ❌ {cluster['question'][:30]}: {item['error']}")
+            continue
+        result = item["result"]
+        if not result["success"]:
+            rejected += 1
+            print(f"  ⚠️  검증 미통과 ({result['validation_score']}점), 제외: {cluster['question'][:30]}")
+            continue
+        entries[item["index"]] = {
+            "id": f"c{item['index'] + 1:03d}",
+            "question": cluster["question"],
+            "variants": cluster["members"][1:MAX_VARIANTS + 1],
+            "count": cluster["count"],
+            "vector": cluster["vector"],
+            "answer": result["final_answer"],
+            "validation_score": result["validation_score"],
+            "validation_details": result["validation_details"],
+            "knowledge_sources": result["knowledge_sources"],
+            "created_at": datetime.now().isoformat(),
+        }
+    print(f"  답변 {len(clusters) - rejected}개 통과, {rejected}개 제외")
+    return [entry for entry in entries if entry is not None]
+
+
+def expected_hit_rate(cache, queries: List[str], matrix) -> Dict[str, Any]:
+    """질문 목록이 캐시에 적중했을 비율 (완전 일치 / 의미 일치)"""
+    kinds = Counter(cache.classify(query, matrix[i]) for i, query in enumerate(queries))
+    total = len(queries)
+    return {
+        "queries": total,
+        "exact": kinds["exact"],
+        "similar": kinds["similar"],
+        "hit_rate": round((kinds["exact"] + kinds["similar"]) / total, 4) if total else 0.0,
+    }
+
+
+def run(log_dir: str = DEFAULT_LOG_DIR, output_path: str = DEFAULT_OUTPUT, top: int = DEFAULT_TOP,
+        threshold: float = DEFAULT_THRESHOLD, min_count: int = DEFAULT_MIN_COUNT,
+        eval_days: int = DEFAULT_EVAL_DAYS, concurrency: int = DEFAULT_CONCURRENCY,
+        dry_run: bool = False):
+    """대화 로그 → 답변 캐시 파일 + 예상 적중률 출력"""
+    records = read_queries(log_dir)
+    if not records:
+        print(f"✅ {log_dir}에 질문 로그가 없습니다.")
+        return
+
+    from agents_2.answer_cache import AnswerCache, normalize_query
+    from agents_2.orchestrator import MultiAgentOrchestrator
+
+    counts, canonical = count_queries([query for _, query in records])
+    print(f"질문 {len(records)}개 (서로 다른 질문 {len(counts)}개) | 유사도 {threshold} | 상위 {top}개 묶음")
+
+    # 캐시를 만드는 중에는 기존 캐시를 쓰지 않는다 (오래된 답변이 그대로 복사되지 않도록)
+    orchestrator = MultiAgentOrchestrator(
+        talk_style_dir="./GS_talk_style",
+        paper_dir="./GS_paper",
+        max_retries=3,
+        model_name="models/gemini-2.5-flash",
+        prewarm=False,
+        answer_cache=""
+    )
+
+    started = time.monotonic()
+    queries = list(counts)
+    matrix = embed_queries(orchestrator, queries)
+    clusters = cluster_queries(counts, matrix, threshold)
+    selected = [c for c in clusters if c["count"] >= min_count][:top]
+    print(f"묶음 {len(clusters)}개 중 {len(selected)}개 선택 ({time.monotonic() - started:.1f}초)")
+    for cluster in selected[:10]:
+        print(f"  {cluster['count']:>5}회  {cluster['question'][:50]} (변형 {len(cluster['members']) - 1}개)")
+    if not selected:
+        print(f"✅ {min_count}번 이상 나온 묶음이 없습니다.")
+        return
+
+    if dry_run:
+        # 답변 없이 묶음만으로 적중률 추정
+        entries = [{"question": c["question"], "variants": c["members"][1:MAX_VARIANTS + 1],
+                    "vector": c["vector"]} for c in selected]
+    else:
+        print("\n대표 답변 생성 중...")
+        entries = generate_entries(orchestrator, selected, concurrency)
+    cache = AnswerCache(entries, embedding_model=orchestrator.knowledge_agent.embedding_model,
+                        similarity=threshold)
+
+    # 예상 적중률: 최근 eval_days일 트래픽 (캐시를 만든 로그와 겹치므로 낙관적인 값)
+    since = max(timestamp for timestamp, _ in records) - timedelta(days=eval_days)
+    recent = [query for timestamp, query in records if timestamp >= since]
+    index = {query: i for i, query in enumerate(queries)}
+    report = expected_hit_rate(cache, recent, matrix[[index[canonical[normalize_query(q)]] for q in recent]])
+    print(f"\n최근 {eval_days}일 질문 {report['queries']}개 기준 예상 적중률 {report['hit_rate']:.1%} "
+          f"(완전 일치 {report['exact']}, 의미 일치 {report['similar']})")
+    print("   ※ 캐시를 만든 로그로 잰 값이라 실제 적중률보다 높게 나올 수 있음")
+
+    if dry_run:
+        print("\n(--dry-run: 캐시 파일을 쓰지 않음)")
+        return
+    cache.save(output_path, extra={
+        "created_at": datetime.now().isoformat(),
+        "source": {"log_dir": log_dir, "queries": len(records), "clusters": len(clusters),
+                   "threshold": threshold, "min_count": min_count},
+        "expected": {"eval_days": eval_days, **report},
+    })
+    print(f"\n✅ 답변 캐시 {len(cache)}개 → {output_path}")
+
+
+USAGE = """
+사용법:
+  python prewarm_cache.py [log_dir] [--output=answer_cache.json] [--top=N] [--threshold=F]
+                          [--min-count=N] [--eval-days=N] [--concurrency=N] [--dry-run]
+    → 대화 로그의 질문을 임베딩으로 묶고, 자주 나오는 상위 묶음의 대표 답변을 미리 생성/검증해
+      답변 캐시 파일로 저장한 뒤 최근 트래픽 기준 예상 적중률을 출력
+      log_dir: 대화 로그 디렉토리 (기본 web_release/conversation_logs)
+      --top: 캐시할 최대 묶음 수 (기본 50)
+      --threshold: 같은 묶음으로 볼 코사인 유사도, 서버의 의미 일치 임계값으로도 저장 (기본 0.85)
+      --min-count: 이보다 적게 나온 묶음은 제외 (기본 2)
+      --eval-days: 예상 적중률을 잴 최근 기간 (기본 7일)
+      --concurrency: 답변 생성 동시 실행 수 (기본 4)
+      --dry-run: 답변 생성 없이 묶음과 예상 적중률만 출력
+
+  만든 캐시는 ANSWER_CACHE_PATH=answer_cache.json으로 서버를 띄워야 쓰인다.
+
+예시:
+  python prewarm_cache.py --top=100
+  python prewarm_cache.py web_release/conversation_logs --dry-run
+"""
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    options = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    flags = {a[2:] for a in sys.argv[1:] if a.startswith("--") and "=" not in a}
+    allowed = {"output", "top", "threshold", "min-count", "eval-days", "concurrency"}
+    if len(args) > 1 or not options.keys() <= allowed or not flags <= {"dry-run"}:
+        print(USAGE)
+        sys.exit(1)
+
+    if os.getenv("LLM_BACKEND", "gemini") == "gemini" and not os.getenv("GEMINI_API_KEY"):
+        print("⚠️  경고: GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+        print("export GEMINI_API_KEY='your-api-key' 를 실행하거나 .env 파일에 추가하세요.")
+        sys.exit(1)
+
+    try:
+        run(
+            args[0] if args else DEFAULT_LOG_DIR,
+            options.get("output", DEFAULT_OUTPUT),
+            top=int(options.get("top", DEFAULT_TOP)),
+            threshold=float(options.get("threshold", DEFAULT_THRESHOLD)),
+            min_count=int(options.get("min-count", DEFAULT_MIN_COUNT)),
+            eval_days=int(options.get("eval-days", DEFAULT_EVAL_DAYS)),
+            concurrency=int(options.get("concurrency", DEFAULT_CONCURRENCY)),
+            dry_run="dry-run" in flags
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        sys.exit(1)
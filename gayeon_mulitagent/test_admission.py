@@ -0,0 +1,94 @@
+"""
+요청 수락 제어 테스트 (web_release/admission.py)
+
+- 동시에 처리하는 요청 수가 max_concurrent를 넘지 않는지
+- 대기열이 가득 차면 429, 대기 시간이 초과되면 503 (Retry-After는 1초 이상)
+- 거절/수락 수와 대기 시간 통계
+
+실행:
+  python -m pytest test_admission.py
+"""
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller: AdmissionController, seconds: float, peaks: list):
+    async with controller.slot():
+        peaks.append(controller.in_flight)
+        await asyncio.sleep(seconds)
+
+
+def test_concurrency_is_limited():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, max_queue=8, queue_timeout=5)
+        peaks = []
+        await asyncio.gather(*(hold(controller, 0.02, peaks) for _ in range(6)))
+        return controller, peaks
+
+    controller, peaks = asyncio.run(scenario())
+    assert max(peaks) == 2
+    assert controller.admitted == 6
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+
+
+def test_full_queue_rejects_with_429():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        peaks = []
+        running = [asyncio.create_task(hold(controller, 0.1, peaks)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as raised:
+            async with controller.slot():
+                pass
+        await asyncio.gather(*running)
+        return controller, raised.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.retry_after >= 1
+    assert controller.rejected_queue_full == 1
+    assert controller.admitted == 2
+
+
+def test_queue_timeout_rejects_with_503():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+        running = asyncio.create_task(hold(controller, 0.3, []))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as raised:
+            async with controller.slot():
+                pass
+        depth_after_timeout = controller.queue_depth
+        await running
+        return controller, raised.value, depth_after_timeout
+
+    controller, rejected, depth = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.retry_after >= 1
+    assert depth == 0
+    assert controller.rejected_timeout == 1
+
+
+def test_slot_reports_wait_time():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+        first = asyncio.create_task(hold(controller, 0.1, []))
+        await asyncio.sleep(0.01)
+        async with controller.slot() as waited:
+            pass
+        await first
+        return controller, waited
+
+    controller, waited = asyncio.run(scenario())
+    assert waited >= 0.05
+    stats = controller.stats()
+    assert stats["admitted"] == 2
+    assert stats["wait_ms_max"] >= 50
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        AdmissionController(max_concurrent=0)
@@ -0,0 +1,116 @@
+"""
+답변 캐시 테스트 (agents_2/answer_cache.py, MultiAgentOrchestrator 캐시 조회)
+
+- 공백/문장부호를 뺀 완전 일치, 중심 벡터와의 코사인 유사도로 찾는 의미 일치
+- 파일 저장/불러오기와 형식 검사, 적중률 통계
+- 오케스트레이터가 적중하면 LLM 호출 없이 캐시된 답변을 돌려주고, 미스면 조회에 쓴 임베딩으로
+  검색까지 해서 파이프라인에 넘기는지 (stub 백엔드 임베딩)
+- 캐시는 ANSWER_CACHE_PATH나 answer_cache 인자로 지정했을 때만 쓰이는지
+
+실행:
+  python -m pytest test_answer_cache.py
+"""
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents_2.answer_cache import AnswerCache, normalize_query  # noqa: E402
+from agents_2.backends import get_backend  # noqa: E402
+from conftest import FakeKnowledgeAgent  # noqa: E402
+
+BACKEND = get_backend("stub")
+MODEL = BACKEND.default_embedding_model
+QUESTION = "창씨개명을 왜 하셨습니까?"
+PARAPHRASE = "왜 창씨개명을 하신 겁니까"
+
+
+def make_cache(similarity=0.9, embedding_model=MODEL):
+    # 중심 벡터를 다른 표현의 질문 임베딩으로 두어 의미 일치를 흉내 낸다 (stub 임베딩은 해시 기반)
+    entry = {
+        "id": "c1", "question": QUESTION, "variants": ["창씨개명 이유는?"], "count": 12,
+        "vector": BACKEND.embed([PARAPHRASE], MODEL)[0], "answer": "캐시된 답변",
+        "validation_score": 85, "validation_details": None, "knowledge_sources": ["paper.pdf"],
+    }
+    return AnswerCache([entry], embedding_model=embedding_model, similarity=similarity)
+
+
+def test_normalize_query():
+    assert normalize_query(" 창씨개명을  왜 하셨습니까?! ") == normalize_query("창씨개명을왜하셨습니까")
+    assert normalize_query("Why?") == "why"
+
+
+def test_exact_and_vector_lookup():
+    cache = make_cache()
+    assert cache.lookup_exact("창씨개명을 왜 하셨습니까")["id"] == "c1"
+    assert cache.lookup_exact("창씨개명 이유는")["id"] == "c1"
+    assert cache.lookup_exact("무정은?") is None
+    assert cache.lookup_vector(BACKEND.embed([PARAPHRASE], MODEL)[0])["id"] == "c1"
+    assert cache.lookup_vector(BACKEND.embed(["무정은?"], MODEL)[0]) is None
+    assert cache.classify("무정은?") is None
+    stats = cache.stats()
+    assert stats["hits"] == {"exact": 2, "similar": 1} and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
+
+
+def test_cache_without_vectors_is_exact_only():
+    cache = AnswerCache([{"question": QUESTION, "answer": "답"}])
+    assert not cache.semantic
+    assert cache.nearest([1.0, 0.0]) is None
+
+
+def test_save_and_load(tmp_path, monkeypatch):
+    monkeypatch.delenv("ANSWER_CACHE_SIMILARITY", raising=False)
+    path = str(tmp_path / "answer_cache.json")
+    make_cache(similarity=0.85).save(path, extra={"created_at": "2026-10-19"})
+    loaded = AnswerCache.load(path)
+    assert len(loaded) == 1 and loaded.similarity == 0.85 and loaded.embedding_model == MODEL
+    monkeypatch.setenv("ANSWER_CACHE_SIMILARITY", "0.95")
+    assert AnswerCache.load(path).similarity == 0.95
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 99, "entries": []}, f)
+    with pytest.raises(ValueError):
+        AnswerCache.load(path)
+
+
+def test_orchestrator_returns_cached_answer(make_orchestrator):
+    knowledge = FakeKnowledgeAgent()
+    orchestrator = make_orchestrator(knowledge=knowledge, answer_cache=make_cache())
+    for query in (QUESTION, PARAPHRASE):
+        result = orchestrator.process_query(query, verbose=False)
+        assert result["cached"] and result["final_answer"] == "캐시된 답변"
+        assert result["llm_calls"] == 0 and result["knowledge_sources"] == ["paper.pdf"]
+    assert knowledge.inputs == [] and knowledge.searches == 0
+    metrics = orchestrator.metrics.snapshot()
+    assert metrics["answer_cache_hits"] == 2
+
+
+def test_cache_miss_reuses_lookup_embedding(make_orchestrator):
+    knowledge = FakeKnowledgeAgent()
+    orchestrator = make_orchestrator(knowledge=knowledge, answer_cache=make_cache())
+    result = orchestrator.process_query("무정은 어떤 소설입니까?", verbose=False)
+    assert not result["cached"] and result["llm_calls"] == 3
+    # 캐시 조회에 쓴 임베딩으로 검색한 결과를 파이프라인이 그대로 쓴다
+    assert knowledge.searches == 1
+    assert knowledge.inputs[0]["knowledge_items"] == [{"content": "자료", "source": "paper.pdf"}]
+    assert orchestrator.metrics.snapshot()["answer_cache_misses"] == 1
+
+
+def test_other_embedding_model_uses_exact_match_only(make_orchestrator):
+    orchestrator = make_orchestrator(answer_cache=make_cache(embedding_model="other-model"))
+    assert orchestrator.process_query(QUESTION, verbose=False)["cached"]
+    assert not orchestrator.process_query(PARAPHRASE, verbose=False)["cached"]
+
+
+def test_cache_is_opt_in(make_orchestrator, tmp_path, monkeypatch):
+    # 경로를 지정하지 않으면 prewarm_cache.py 결과 파일이 있어도 불러오지 않는다
+    monkeypatch.delenv("ANSWER_CACHE_PATH", raising=False)
+    assert make_orchestrator(answer_cache=None).answer_cache is None
+    path = str(tmp_path / "answer_cache.json")
+    make_cache().save(path)
+    monkeypatch.setenv("ANSWER_CACHE_PATH", path)
+    orchestrator = make_orchestrator(answer_cache=None)
+    assert len(orchestrator.answer_cache) == 1
+    assert orchestrator.process_query(QUESTION, verbose=False)["cached"]
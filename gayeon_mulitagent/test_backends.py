@@ -0,0 +1,170 @@
+"""
+LLM 백엔드 테스트 (agents_2/backends.py)
+
+- RateLimiter: 최근 1분 슬라이딩 윈도, 자리가 나지 않으면 TimeoutError, 대기 통계
+- LLMBackend: 백엔드별 호출 수 제한 설정, 제공자 응답의 토큰 사용량을 현재 스팬에 기록
+- 검색 때의 질의 임베딩도 호출 수 제한에 들어가고 마감 시간까지만 기다리는지, 비동기 agenerate
+- StubBackend: 생성 / 스트리밍 / 스키마 응답 / 지연 / 해시 임베딩
+- 백엔드 이름 확인과 이름별 공유 인스턴스
+
+실행:
+  python -m pytest test_backends.py
+"""
+import asyncio
+
+import pytest
+
+from agents_2 import backends
+from agents_2.backends import RateLimiter, StubBackend, StubEmbeddings, check_backend, get_backend
+from agents_2.deadline import Deadline, deadline_scope
+from agents_2.errors import EmbeddingError
+from agents_2.tracing import Tracer
+
+
+class FakeClock:
+    """time.monotonic / time.sleep 대신 쓰는 시계 (sleep하면 시간만 흐름)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(backends.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(backends.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_unlimited_rate_limiter_never_waits():
+    limiter = RateLimiter(0)
+    assert all(limiter.acquire() == 0.0 for _ in range(100))
+
+
+def test_rate_limiter_sliding_window(clock):
+    limiter = RateLimiter(2)
+    assert limiter.acquire() == 0.0
+    clock.now += 20
+    assert limiter.acquire() == 0.0
+    # 첫 호출이 1분 창에서 빠질 때까지 (40초) 기다린다
+    assert limiter.acquire() == pytest.approx(40.0)
+    assert limiter.stats() == {"per_minute": 2, "waited": 1, "wait_seconds": 40.0}
+
+
+def test_rate_limiter_timeout(clock):
+    limiter = RateLimiter(1)
+    limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=10)
+    # 기다리지 않고 바로 실패
+    assert clock.now == 1000.0
+    assert limiter.acquire(timeout=60) == pytest.approx(60.0)
+
+
+def test_backend_rate_limit_from_env(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMIT", "30")
+    assert StubBackend().limiter.per_minute == 30
+    monkeypatch.setenv("LLM_RATE_LIMIT_STUB", "5")
+    assert StubBackend().limiter.per_minute == 5
+
+
+def test_generate_and_stream():
+    backend = StubBackend()
+    text = backend.generate("stub-model", "시스템", "  질문입니다  ", 0.5)
+    assert text == "[stub-model] 질문입니다"
+    long_message = "가" * 50
+    assert "".join(backend.stream("stub-model", "시스템", long_message, 0.5)) == f"[stub-model] {long_message}"
+
+
+def test_schema_response(monkeypatch):
+    pydantic = pytest.importorskip("pydantic")
+
+    class Evaluation(pydantic.BaseModel):
+        score: int = pydantic.Field(ge=0, le=40)
+        ratio: float
+        feedback: str
+        reasoning: str
+
+    monkeypatch.setenv("STUB_SCORE_RATIO", "0.5")
+    assert StubBackend._schema_response(Evaluation) == {
+        "score": 20, "ratio": 0.5, "feedback": "PASS", "reasoning": "stub reasoning"}
+
+
+def test_stub_latency_respects_timeout(monkeypatch):
+    monkeypatch.setenv("STUB_LATENCY", "0.2")
+    with pytest.raises(TimeoutError):
+        StubBackend().generate("stub", "", "질문", 0.5, timeout=0.01)
+
+
+class UsageBackend(StubBackend):
+    def _generate(self, model, system_instruction, user_message, temperature, response_schema,
+                  max_output_tokens, thinking_budget, timeout):
+        return "답변", (12, 3)
+
+
+def test_usage_is_recorded_on_current_span(tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"))
+    with tracer.trace("request") as root:
+        UsageBackend().generate("stub", "", "질문", 0.5)
+    assert root.attributes["gen_ai.usage.input_tokens"] == 12
+    assert root.attributes["gen_ai.usage.output_tokens"] == 3
+    assert root.attributes["gen_ai.usage.estimated"] is False
+    # 추적 중이 아니면 아무 일도 하지 않는다
+    assert UsageBackend().generate("stub", "", "질문", 0.5) == "답변"
+
+
+def test_agenerate_records_usage_and_takes_a_slot(tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"))
+    backend = UsageBackend()
+
+    async def run():
+        with tracer.trace("request") as root:
+            text = await backend.agenerate("stub", "", "질문", 0.5)
+        return text, root
+
+    text, root = asyncio.run(run())
+    assert text == "답변"
+    assert root.attributes["gen_ai.usage.input_tokens"] == 12
+
+
+def test_query_embeddings_are_rate_limited_within_deadline(clock, monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMIT_STUB", "1")
+    backend = StubBackend()
+    embeddings = backend.embeddings()
+    # 벡터스토어가 검색할 때 부르는 embed_query도 자리를 잡는다
+    embeddings.embed_query("창씨개명")
+    with deadline_scope(Deadline(10)):
+        with pytest.raises(EmbeddingError):
+            embeddings.embed_query("무정")
+        with pytest.raises(EmbeddingError):
+            backend.embed(["무정"])
+    assert clock.now == 1000.0
+    # 마감 시간이 없으면 자리가 날 때까지 기다린다
+    assert len(embeddings.embed_documents(["흙"])) == 1
+    assert clock.now == pytest.approx(1060.0)
+    assert embeddings.dim == 768
+
+
+def test_stub_embeddings_are_deterministic_unit_vectors():
+    backend = StubBackend()
+    first, second = backend.embed(["창씨개명", "무정"])
+    assert backend.embed(["창씨개명"]) == [first]
+    assert first != second
+    assert sum(v * v for v in first) == pytest.approx(1.0)
+    assert backend.embeddings() is backend.embeddings(backend.default_embedding_model)
+    assert len(StubEmbeddings("m", dim=8).embed_query("흙")) == 8
+
+
+def test_backend_names():
+    assert check_backend("ollama") == "ollama"
+    with pytest.raises(ValueError):
+        check_backend("openai")
+    with pytest.raises(ValueError):
+        get_backend("openai")
+    assert get_backend("stub") is get_backend("stub")
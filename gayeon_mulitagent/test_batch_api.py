@@ -0,0 +1,100 @@
+"""
+배치 질문 API 테스트 (web_release/api.py /api/chat/batch)
+
+- 질문마다 result 줄을 끝나는 순서대로 보내고 마지막에 summary 줄을 보내는지 (NDJSON)
+- 검색은 배치 전체에서 한 번, 질문 하나의 실패는 error 줄로만 남는지
+- 동시 처리 수가 수락 제어 한도를 넘지 않고 질문마다 수락 슬롯을 잡는지
+- 본문을 한 번도 읽지 않고 끊긴 스트림도 수락 슬롯을 반환하는지
+- 빈 배치 400, 너무 큰 배치 413
+
+실행:
+  python -m pytest test_batch_api.py
+"""
+import asyncio
+import json
+
+import pytest
+
+from admission import AdmissionController
+from agents_2.errors import GenerationError
+from conftest import FakeKnowledgeAgent, FakeValidatorAgent
+
+QUERIES = ["창씨개명을 왜 하셨습니까?", "민족개조론은 무엇입니까?", "무정은 어떤 소설입니까?"]
+
+
+def post_batch(client, **body):
+    response = client.post("/api/chat/batch", json=body)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_streams_results_then_summary(api_client):
+    knowledge = FakeKnowledgeAgent()
+    records = post_batch(api_client(knowledge=knowledge), queries=QUERIES)
+    results, summary = records[:-1], records[-1]
+    assert all(record["type"] == "result" for record in results)
+    assert sorted(record["index"] for record in results) == [0, 1, 2]
+    for record in results:
+        assert record["answer"] == f"[full] 초안: {QUERIES[record['index']]}"
+        assert record["conversation_id"]
+    assert summary["type"] == "summary"
+    assert summary["total"] == 3 and summary["succeeded"] == 3 and summary["failed"] == 0
+    assert summary["batched_retrieval"]
+    # 배치 검색 한 번의 결과를 질문마다 나눠 쓴다
+    assert knowledge.searches == 1
+    assert all(item["knowledge_items"] for item in knowledge.inputs)
+
+
+def test_failed_item_does_not_stop_batch(api_client):
+    validator = FakeValidatorAgent(errors=[GenerationError("ValidatorAgent", "API 호출 실패")])
+    client = api_client(validator=validator, failure_policy="abort")
+    records = post_batch(client, queries=QUERIES, concurrency=1)
+    errors = [record for record in records if record["type"] == "error"]
+    assert len(errors) == 1 and errors[0]["index"] == 0
+    assert "validation" in errors[0]["error"]
+    summary = records[-1]
+    assert summary["succeeded"] == 2 and summary["failed_indices"] == [0]
+
+
+def test_concurrency_is_capped_by_admission(api_client, api_module, monkeypatch):
+    admission = AdmissionController(max_concurrent=2, max_queue=8, queue_timeout=5)
+    monkeypatch.setattr(api_module, "admission", admission)
+    records = post_batch(api_client(), queries=QUERIES, concurrency=10)
+    assert records[-1]["concurrency"] == 2
+    # 배치 검색 1 + 질문 3
+    assert admission.admitted == 1 + len(QUERIES)
+    assert admission.in_flight == 0
+
+
+def test_slot_is_released_when_stream_is_never_read(api_client, api_module, monkeypatch):
+    from starlette.requests import ClientDisconnect
+
+    admission = AdmissionController(max_concurrent=2, max_queue=8, queue_timeout=5)
+    monkeypatch.setattr(api_module, "admission", admission)
+    api_client()
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # 응답 헤더를 보내기도 전에 클라이언트가 끊긴 경우
+        raise OSError("연결 끊김")
+
+    async def open_and_drop():
+        response = await api_module.chat_batch(api_module.BatchChatRequest(queries=QUERIES))
+        assert admission.in_flight == 1
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(ClientDisconnect):
+            await response(scope, receive, send)
+        # 두 번 닫아도 한 번만 반환
+        await response.slot.aclose()
+
+    asyncio.run(open_and_drop())
+    assert admission.in_flight == 0 and admission.admitted == 1
+
+
+def test_invalid_batches_are_rejected(api_client, api_module, monkeypatch):
+    client = api_client()
+    assert client.post("/api/chat/batch", json={"queries": []}).status_code == 400
+    monkeypatch.setattr(api_module, "BATCH_MAX_QUERIES", 2)
+    assert client.post("/api/chat/batch", json={"queries": QUERIES}).status_code == 413
@@ -0,0 +1,93 @@
+"""
+배치 실행기 테스트 (batch_gemini.py)
+
+- 질문 파일(.txt / .jsonl) 읽기와 ID 부여 (ID 없는 질문은 내용 해시, 중복 ID는 처음 것만)
+- 결과 파일에서 완료된 ID 읽기 (오류 레코드, 깨진 마지막 줄 제외)
+- 다시 실행하면 완료된 질문은 건너뛰고 오류 난 질문만 다시 처리하는지 (가짜 에이전트 사용)
+
+실행:
+  python -m pytest test_batch_gemini.py
+"""
+import json
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import batch_gemini  # noqa: E402
+from agents_2 import orchestrator as orchestrator_module  # noqa: E402
+from agents_2.errors import GenerationError  # noqa: E402
+from conftest import FakeValidatorAgent  # noqa: E402
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_text_questions(tmp_path):
+    path = write(tmp_path / "questions.txt", "# 주석\n창씨개명을 왜 하셨습니까?\n\n무정은?\n창씨개명을 왜 하셨습니까?\n")
+    questions = batch_gemini.read_questions(path)
+    assert [q for _, q in questions] == ["창씨개명을 왜 하셨습니까?", "무정은?"]
+    assert questions[0][0] == batch_gemini.question_id("창씨개명을 왜 하셨습니까?")
+
+
+def test_read_jsonl_questions(tmp_path):
+    lines = [{"id": "a", "question": "첫 질문"}, {"query": "둘째 질문"}, {"id": "a", "question": "중복"}]
+    path = write(tmp_path / "questions.jsonl", "\n".join(json.dumps(r, ensure_ascii=False) for r in lines))
+    assert batch_gemini.read_questions(path) == [("a", "첫 질문"), (batch_gemini.question_id("둘째 질문"), "둘째 질문")]
+
+    bad = write(tmp_path / "bad.jsonl", '{"id": "a"}\n')
+    with pytest.raises(ValueError):
+        batch_gemini.read_questions(bad)
+
+
+def test_completed_ids_skip_errors_and_partial_line(tmp_path):
+    path = write(tmp_path / "answers.jsonl",
+                 '{"id": "a", "answer": "답"}\n{"id": "b", "error": "실패"}\n{"id": "c", "ans')
+    assert batch_gemini.completed_ids(path) == {"a"}
+    assert batch_gemini.completed_ids(str(tmp_path / "none.jsonl")) == set()
+
+
+@pytest.fixture
+def use_orchestrator(monkeypatch):
+    """run()이 만드는 오케스트레이터를 가짜 에이전트를 넣은 것으로 바꾼다"""
+    def install(orchestrator):
+        monkeypatch.setattr(orchestrator_module, "MultiAgentOrchestrator", lambda **kwargs: orchestrator)
+    return install
+
+
+def test_run_resumes_and_retries_errors(tmp_path, make_orchestrator, use_orchestrator):
+    questions = write(tmp_path / "questions.txt", "질문 1\n질문 2\n질문 3\n")
+    output = str(tmp_path / "out" / "answers.jsonl")
+    validator = FakeValidatorAgent(errors=[GenerationError("ValidatorAgent", "API 호출 실패")])
+    use_orchestrator(make_orchestrator(validator=validator, failure_policy="abort"))
+    batch_gemini.run(questions, output, concurrency=1, limit=2)
+
+    records = read_records(output)
+    assert [r["question"] for r in records] == ["질문 1", "질문 2"]
+    assert "error" in records[0] and records[1]["answer"] == "[full] 초안: 질문 2"
+    assert records[1]["llm_calls"] == 3
+
+    # 두 번째 실행: 완료된 질문 2는 건너뛰고 오류 난 질문 1과 남은 질문 3만 처리
+    second = make_orchestrator()
+    use_orchestrator(second)
+    batch_gemini.run(questions, output, concurrency=1)
+    records = read_records(output)
+    assert [r["question"] for r in records[2:]] == ["질문 1", "질문 3"]
+    assert [q["query"] for q in second._agents["knowledge"].inputs] == ["질문 1", "질문 3"]
+    assert batch_gemini.completed_ids(output) == {qid for qid, _ in batch_gemini.read_questions(questions)}
+
+
+def test_run_without_pending_questions(tmp_path, use_orchestrator, capsys):
+    questions = write(tmp_path / "questions.txt", "질문 1\n")
+    output = write(tmp_path / "answers.jsonl",
+                   json.dumps({"id": batch_gemini.question_id("질문 1"), "answer": "답"}) + "\n")
+    use_orchestrator(None)
+    batch_gemini.run(questions, output)
+    assert "처리할 질문이 없습니다" in capsys.readouterr().out
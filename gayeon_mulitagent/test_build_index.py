@@ -0,0 +1,104 @@
+"""
+오프라인 인덱스 빌드 테스트 (build_index.py)
+
+PDF 읽기/청크 분할(load_chunks, chunk_stats)은 고정된 청크로 바꾸고 stub 백엔드로 임베딩한다.
+- 새 버전 디렉토리를 만들고 검증한 뒤 CURRENT를 교체하는지 (activate=False면 그대로)
+- 임베딩이 EMBED_BATCH개씩 인덱스를 검색할 에이전트의 백엔드로 호출되는지
+- 빈 벡터가 섞이면 빌드를 중단하고 임시 디렉토리를 지우는지
+- verify()가 손상된 CURRENT 버전을 잡아내는지
+
+실행:
+  python -m pytest test_build_index.py
+"""
+import json
+import os
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+import build_index  # noqa: E402
+from agents_2.mmap_index import MANIFEST_FILE, RECORDS_FILE, current_version, list_versions  # noqa: E402
+
+
+class Chunk:
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+CHUNKS = [Chunk(f"청크 {n}", {"source_file": "paper.pdf", "page": n}) for n in range(230)]
+STATS = {"before": {"chunks": 300, "chars": 3000}, "after": {"chunks": 230, "chars": 2300}}
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_INDEX_DIR", str(tmp_path))
+    monkeypatch.setenv("LLM_BACKEND", "stub")
+    monkeypatch.delenv("LLM_BACKEND_KNOWLEDGE", raising=False)
+    monkeypatch.setattr(build_index, "load_chunks", lambda name, log=print: CHUNKS)
+    monkeypatch.setattr(build_index, "chunk_stats", lambda name: STATS)
+    monkeypatch.setattr(build_index, "list_pdfs", lambda source_dir: [])
+    return str(tmp_path)
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    backend = build_index.get_backend("stub")
+    calls = []
+    embed = backend.embed
+
+    def counting_embed(texts, model=None):
+        calls.append(len(texts))
+        return embed(texts, model)
+
+    monkeypatch.setattr(backend, "embed", counting_embed)
+    return calls
+
+
+def test_build_writes_and_activates_version(root, embed_calls):
+    version = build_index.build("papers")
+    assert list_versions(root, "papers") == [version]
+    assert current_version(root, "papers") == version
+    assert embed_calls == [100, 100, 30]
+
+    with open(os.path.join(root, "papers", version, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["count"] == len(CHUNKS)
+    assert manifest["backend"] == "stub"
+    assert manifest["index_tag"] == "gemini"
+    assert manifest["chunk_stats"] == STATS
+    assert build_index.verify(["papers"])
+
+
+def test_build_without_activation(root, embed_calls):
+    version = build_index.build("papers", activate=False)
+    assert list_versions(root, "papers") == [version]
+    assert current_version(root, "papers") is None
+
+
+def test_per_agent_backend_override(root, monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "gemini")
+    monkeypatch.setenv("LLM_BACKEND_KNOWLEDGE", "stub")
+    assert build_index.index_backend("papers").name == "stub"
+    monkeypatch.setenv("LLM_BACKEND_STYLE", "unknown")
+    with pytest.raises(ValueError):
+        build_index.index_backend("style")
+
+
+def test_failed_embedding_aborts_build(root, monkeypatch):
+    backend = build_index.get_backend("stub")
+    monkeypatch.setattr(backend, "embed", lambda texts, model=None: [[0.0] * 8 for _ in texts])
+    with pytest.raises(RuntimeError):
+        build_index.build("papers")
+    assert list_versions(root, "papers") == []
+    papers = os.path.join(root, "papers")
+    assert not os.path.exists(papers) or os.listdir(papers) == []
+
+
+def test_verify_detects_corrupt_current(root, embed_calls):
+    version = build_index.build("papers")
+    with open(os.path.join(root, "papers", version, RECORDS_FILE), "r+b") as f:
+        f.write(b"X")
+    assert not build_index.verify(["papers"])
@@ -0,0 +1,169 @@
+"""
+콜드 스타트 회귀 테스트
+
+- agents_2 임포트와 MultiAgentOrchestrator 생성이 무거운 의존성
+  (LangChain / Chroma / pypdf / google.genai)을 불러오지 않는지
+- 임포트 / 생성 / 첫 요청 시간이 기준을 넘지 않는지. 첫 요청은 stub 백엔드와 임시 메모리 맵
+  인덱스로 재므로 API 없이도 에이전트 생성 + 인덱스 로드 + 파이프라인의 로컬 비용을 본다
+  (stub 백엔드로 첫 요청을 해도 무거운 의존성을 불러오지 않는지도 확인)
+
+매번 새 인터프리터(서브프로세스)에서 측정하므로 다른 테스트의 임포트에 영향받지 않는다.
+기준 시간은 환경변수로 조정:
+  COLD_START_IMPORT_BUDGET (초, 기본 0.5)
+  COLD_START_INIT_BUDGET (초, 기본 0.5)
+  COLD_START_FIRST_REQUEST_BUDGET (초, 기본 1.5 - stub 백엔드)
+  COLD_START_API_REQUEST_BUDGET (초, 기본 120 - 실제 Gemini API, GEMINI_API_KEY가 있을 때만 측정)
+
+실행:
+  python -m pytest test_cold_start.py
+  python test_cold_start.py   # 측정값만 출력
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 임포트/생성 시점에 로드되면 안 되는 모듈
+HEAVY_MODULES = [
+    "langchain_community",
+    "langchain_text_splitters",
+    "chromadb",
+    "pypdf",
+    "google.genai",
+]
+
+IMPORT_BUDGET = float(os.getenv("COLD_START_IMPORT_BUDGET", "0.5"))
+INIT_BUDGET = float(os.getenv("COLD_START_INIT_BUDGET", "0.5"))
+FIRST_REQUEST_BUDGET = float(os.getenv("COLD_START_FIRST_REQUEST_BUDGET", "1.5"))
+API_REQUEST_BUDGET = float(os.getenv("COLD_START_API_REQUEST_BUDGET", "120"))
+
+# stub 첫 요청이 쓰는 설정 (실행 환경의 .env / 환경변수가 측정에 끼어들지 않도록 고정)
+STUB_ENV = {
+    "LLM_BACKEND": "stub",
+    "LLM_BACKEND_KNOWLEDGE": "",
+    "LLM_BACKEND_STYLE": "",
+    "LLM_BACKEND_VALIDATOR": "",
+    "MODEL_ROUTING": "uniform",
+    "ALLOW_INDEX_BUILD": "0",
+    "PIPELINE_DEADLINE": "0",
+    "STUB_LATENCY": "0",
+    "LLM_RATE_LIMIT": "0",
+    "LLM_RATE_LIMIT_STUB": "",
+    "TRACE_FILE": "",
+    "PROFILE_MODE": "off",
+}
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import agents_2
+from agents_2 import MultiAgentOrchestrator
+result = {"import_time": time.perf_counter() - started}
+if "{stage}" in ("init", "request"):
+    started = time.perf_counter()
+    orchestrator = MultiAgentOrchestrator(prewarm=False, answer_cache="")
+    result["init_time"] = time.perf_counter() - started
+    result["ready_after_init"] = orchestrator.is_ready()
+result["loaded"] = [m for m in {heavy} if m in sys.modules]
+if "{stage}" == "request":
+    started = time.perf_counter()
+    response = orchestrator.process_query("창씨개명에 대한 당신의 입장은 무엇입니까?", verbose=False)
+    result["first_request_time"] = time.perf_counter() - started
+    result["first_request_sources"] = response.get("knowledge_sources", [])
+    result["first_request_success"] = bool(response.get("success"))
+print("RESULT " + json.dumps(result))
+"""
+
+
+def write_stub_index(root: str):
+    """stub 임베딩으로 논문 / 스타일 메모리 맵 인덱스를 root 아래에 만든다"""
+    from agents_2.backends import get_backend
+    from agents_2.mmap_index import PAPER_INDEX, STYLE_INDEX, write_index
+
+    backend = get_backend("stub")
+    model = backend.default_embedding_model
+    corpora = {
+        PAPER_INDEX: ["이광수는 1939년 창씨개명을 하였다.", "민족개조론은 1922년 개벽에 실렸다.",
+                      "무정은 1917년 매일신보에 연재되었다."],
+        STYLE_INDEX: ["나는 민족을 위하여 그리하였소.", "조선 사람은 먼저 실력을 길러야 하오.",
+                      "이것이 나의 신념이었소."],
+    }
+    for name, texts in corpora.items():
+        write_index(os.path.join(root, name), backend.embeddings(model).embed_documents(texts), texts,
+                    [{"source": f"{name}.pdf"} for _ in texts], manifest={"embedding_model": model})
+
+
+def measure(stage: str, extra_env: dict = None) -> dict:
+    """새 인터프리터에서 stage(import / init / request)까지 실행하고 측정값 반환"""
+    code = _PROBE.replace("{stage}", stage).replace("{heavy}", repr(HEAVY_MODULES))
+    env = dict(os.environ, AGENT_PREWARM="0", **(extra_env or {}))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, env=env,
+                          capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"측정 실패 ({stage}):\n{proc.stdout}\n{proc.stderr}")
+
+
+def test_import_is_lazy():
+    """패키지 임포트는 무거운 의존성을 불러오지 않고 기준 시간 안에 끝나야 한다"""
+    result = measure("import")
+    assert result["loaded"] == [], f"임포트 시 로드된 무거운 모듈: {result['loaded']}"
+    assert result["import_time"] < IMPORT_BUDGET, \
+        f"임포트 {result['import_time']:.3f}초 > 기준 {IMPORT_BUDGET}초"
+
+
+def test_orchestrator_construction_is_deferred():
+    """Orchestrator 생성은 에이전트/인덱스를 만들지 않아야 한다"""
+    result = measure("init")
+    assert not result["ready_after_init"], "생성 직후 에이전트가 이미 만들어져 있음"
+    assert result["loaded"] == [], f"생성 시 로드된 무거운 모듈: {result['loaded']}"
+    assert result["init_time"] < INIT_BUDGET, \
+        f"생성 {result['init_time']:.3f}초 > 기준 {INIT_BUDGET}초"
+
+
+def measure_stub_request() -> dict:
+    """stub 백엔드와 임시 인덱스로 첫 요청까지 측정"""
+    with tempfile.TemporaryDirectory() as root:
+        write_stub_index(root)
+        return measure("request", dict(STUB_ENV, VECTOR_INDEX_DIR=root))
+
+
+def test_first_request_latency():
+    """첫 요청(에이전트 생성 + 인덱스 로드 + 파이프라인)의 로컬 비용이 기준 시간 안에 끝나야 한다"""
+    pytest.importorskip("numpy")
+    result = measure_stub_request()
+    assert result["loaded"] == [], f"첫 요청 때 로드된 무거운 모듈: {result['loaded']}"
+    # 임시 인덱스에서 검색해 검증까지 통과한 요청이어야 한다 (오류 대체 답변이 아니라)
+    assert result["first_request_success"] and result["first_request_sources"]
+    assert result["first_request_time"] < FIRST_REQUEST_BUDGET, \
+        f"첫 요청 {result['first_request_time']:.3f}초 > 기준 {FIRST_REQUEST_BUDGET}초"
+
+
+@pytest.mark.skipif(not os.getenv("GEMINI_API_KEY"), reason="GEMINI_API_KEY 필요 (실제 API 호출)")
+def test_first_request_latency_with_api():
+    """실제 Gemini API로 첫 요청이 기준 시간 안에 끝나야 한다 (선택)"""
+    result = measure("request", {"LLM_BACKEND": "gemini"})
+    assert result["first_request_time"] < API_REQUEST_BUDGET, \
+        f"첫 요청 {result['first_request_time']:.1f}초 > 기준 {API_REQUEST_BUDGET}초"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("콜드 스타트 측정")
+    print("=" * 60)
+    result = measure_stub_request()
+    print(f"임포트: {result['import_time'] * 1000:.1f}ms (기준 {IMPORT_BUDGET * 1000:.0f}ms)")
+    print(f"Orchestrator 생성: {result['init_time'] * 1000:.1f}ms (기준 {INIT_BUDGET * 1000:.0f}ms)")
+    print(f"첫 요청 (stub): {result['first_request_time'] * 1000:.1f}ms (기준 {FIRST_REQUEST_BUDGET * 1000:.0f}ms)")
+    print(f"로드된 무거운 모듈: {result['loaded'] or '없음'}")
+    if os.getenv("GEMINI_API_KEY"):
+        result = measure("request", {"LLM_BACKEND": "gemini"})
+        print(f"첫 요청 (Gemini API): {result['first_request_time']:.1f}초 (기준 {API_REQUEST_BUDGET:.0f}초)")
+    else:
+        print("첫 요청 (Gemini API): 측정 안 함 (GEMINI_API_KEY 없음)")
@@ -0,0 +1,86 @@
+"""
+요청 마감 시간 테스트 (agents_2/deadline.py)
+
+- Deadline의 남은 시간 / 호출 타임아웃 계산과 deadline_scope
+- 남은 시간으로 다음 재시도가 끝나지 않을 것 같으면 건너뛰고 최고점 후보를 반환 (reason "budget")
+- 호출 하나를 할 시간도 없으면 에이전트가 호출하지 않고 DeadlineExceeded (reason "timeout")
+- 검색 단계가 마감 시간을 넘기면 API가 504로 응답
+
+실행:
+  python -m pytest test_deadline.py
+"""
+import time
+
+import pytest
+
+from agents_2.deadline import MIN_CALL_SECONDS, Deadline, as_deadline, current_deadline, deadline_scope
+from agents_2.errors import DeadlineExceeded
+from conftest import FakeKnowledgeAgent, FakeStyleAgent, FakeValidatorAgent
+
+QUERY = "창씨개명을 왜 하셨습니까?"
+
+
+def test_deadline_accounting():
+    with pytest.raises(ValueError):
+        Deadline(0)
+    deadline = Deadline(10, started=time.monotonic() - 4)
+    assert deadline.remaining() == pytest.approx(6, abs=0.1)
+    assert deadline.elapsed() == pytest.approx(4, abs=0.1)
+    assert deadline.fits(5) and not deadline.fits(7)
+    assert deadline.call_timeout() == pytest.approx(6, abs=0.1)
+    assert deadline.to_dict()["budget"] == 10 and not deadline.to_dict()["expired"]
+
+    almost = Deadline(10, started=time.monotonic() - 10 + MIN_CALL_SECONDS / 2)
+    assert not almost.expired() and almost.call_timeout() is None
+    past = Deadline(1, started=time.monotonic() - 2)
+    assert past.expired() and past.remaining() == 0 and past.to_dict()["expired"]
+
+
+def test_as_deadline_and_scope():
+    assert as_deadline(None) is None and as_deadline(0) is None
+    deadline = Deadline(5)
+    assert as_deadline(deadline) is deadline
+    assert as_deadline(3).budget == 3
+    assert current_deadline() is None
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+
+
+def test_retry_skipped_when_budget_is_short(make_orchestrator):
+    validator = FakeValidatorAgent(scores=(60, 65))
+    orchestrator = make_orchestrator(style=FakeStyleAgent(delay=0.2), validator=validator, max_retries=3)
+    result = orchestrator.process_query(QUERY, verbose=False, deadline=0.3)
+    # 첫 라운드(약 0.2초) 뒤 남은 시간으로는 다음 라운드를 끝낼 수 없다
+    assert result["retry_count"] == 1
+    assert [(s["stage"], s["reason"]) for s in result["skipped_stages"]] == [("style", "budget"),
+                                                                               ("validation", "budget")]
+    assert result["final_answer"] == f"[full] 초안: {QUERY}"
+    assert result["validation_score"] == 60
+    assert result["degraded"] and not result["success"]
+    assert result["deadline"]["budget"] == 0.3
+    assert orchestrator.metrics.snapshot()["deadline_cutoffs"] == 1
+
+
+def test_no_deadline_runs_all_retries(make_orchestrator):
+    orchestrator = make_orchestrator(validator=FakeValidatorAgent(scores=(60,)), max_retries=3)
+    result = orchestrator.process_query(QUERY, verbose=False)
+    assert result["retry_count"] == 3 and result["skipped_stages"] == []
+    assert result["deadline"] is None
+
+
+def test_agent_refuses_call_without_time(make_orchestrator, stub_style_agent):
+    orchestrator = make_orchestrator(style=stub_style_agent)
+    # 남은 시간이 MIN_CALL_SECONDS보다 짧아 스타일 에이전트가 호출을 시작하지 않는다
+    result = orchestrator.process_query(QUERY, verbose=False, deadline=MIN_CALL_SECONDS / 2)
+    assert [(s["stage"], s["reason"]) for s in result["skipped_stages"]] == [("style", "timeout"),
+                                                                               ("validation", "timeout")]
+    assert result["final_answer"] == f"초안: {QUERY}"
+    assert result["llm_calls"] == 1 and result["degraded"]
+
+
+def test_api_returns_504_on_deadline(api_client):
+    knowledge = FakeKnowledgeAgent(error=DeadlineExceeded("KnowledgeAgent", "마감 시간 부족", step="draft"))
+    response = api_client(knowledge=knowledge).post("/api/chat", json={"query": QUERY, "deadline": 5})
+    assert response.status_code == 504
+    assert api_client().post("/api/chat", json={"query": QUERY, "deadline": 0}).status_code == 400
@@ -0,0 +1,114 @@
+"""
+단계 실패 정책 테스트 (failure_policy: abort / fallback / degrade)
+
+- abort: 스타일/검증 단계가 실패하면 PipelineError
+- fallback: 재시도를 멈추고 지금까지의 최고점 후보(없으면 초안)를 반환
+- degrade: 실패한 단계만 건너뛰고 계속 진행
+- 지식 검색 실패는 정책과 무관하게 PipelineError, API는 502로 응답 (오류 문자열을 답변으로 주지 않음)
+
+가짜 에이전트(conftest.py)로 실행하므로 API 키나 인덱스가 필요 없다.
+
+실행:
+  python -m pytest test_failure_policy.py
+"""
+import pytest
+
+from agents_2.errors import GenerationError, PipelineError
+from conftest import FakeKnowledgeAgent, FakeStyleAgent, FakeValidatorAgent
+
+QUERY = "창씨개명에 대한 당신의 입장은 무엇입니까?"
+DRAFT = f"초안: {QUERY}"
+
+
+def style_error():
+    return GenerationError("StyleAgent", "API 호출 실패", step="tone")
+
+
+def validation_error():
+    return GenerationError("ValidatorAgent", "API 호출 실패")
+
+
+def test_unknown_policy_is_rejected(make_orchestrator):
+    with pytest.raises(ValueError):
+        make_orchestrator(failure_policy="ignore")
+
+
+@pytest.mark.parametrize("stage", ["style", "validation"])
+def test_abort_raises_pipeline_error(make_orchestrator, stage):
+    """abort는 실패한 단계와 원인 오류를 담은 PipelineError를 발생시킨다"""
+    if stage == "style":
+        agents = {"style": FakeStyleAgent(errors=[style_error()])}
+    else:
+        agents = {"validator": FakeValidatorAgent(errors=[validation_error()])}
+    orchestrator = make_orchestrator(failure_policy="abort", **agents)
+    with pytest.raises(PipelineError) as raised:
+        orchestrator.process_query(QUERY, verbose=False)
+    assert raised.value.stage == stage
+    assert isinstance(raised.value.cause, GenerationError)
+    assert orchestrator.metrics.snapshot()[f"failures.{stage}"] == 1
+
+
+@pytest.mark.parametrize("policy", ["abort", "fallback", "degrade"])
+def test_knowledge_failure_always_aborts(make_orchestrator, policy):
+    """초안이 없으면 돌려줄 답변이 없으므로 어떤 정책이든 중단"""
+    knowledge = FakeKnowledgeAgent(error=GenerationError("KnowledgeAgent", "검색 실패"))
+    orchestrator = make_orchestrator(failure_policy=policy, knowledge=knowledge)
+    with pytest.raises(PipelineError) as raised:
+        orchestrator.process_query(QUERY, verbose=False)
+    assert raised.value.stage == "knowledge"
+
+
+def test_fallback_without_candidates_returns_draft(make_orchestrator):
+    orchestrator = make_orchestrator(failure_policy="fallback",
+                                     style=FakeStyleAgent(errors=[style_error()]))
+    result = orchestrator.process_query(QUERY, verbose=False)
+    assert result["final_answer"] == DRAFT
+    assert result["failure"]["stage"] == "style"
+    assert result["failure"]["policy"] == "fallback"
+    assert result["degraded"] and not result["success"]
+
+
+def test_fallback_returns_best_candidate(make_orchestrator):
+    """재시도 중 실패하면 이미 검증된 후보 중 최고점을 돌려준다 (실패한 출력은 쓰지 않음)"""
+    style = FakeStyleAgent(errors=[None, style_error()])
+    validator = FakeValidatorAgent(scores=[60])
+    orchestrator = make_orchestrator(failure_policy="fallback", style=style, validator=validator)
+    result = orchestrator.process_query(QUERY, verbose=False)
+    assert result["final_answer"] == f"[full] {DRAFT}"
+    assert result["validation_score"] == 60
+    assert result["failure"]["stage"] == "style"
+    assert result["retry_count"] == 1
+    assert "API 호출 실패" not in result["final_answer"]
+
+
+def test_degrade_validates_draft_when_style_fails(make_orchestrator):
+    """스타일 단계만 건너뛰고 초안을 검증한 뒤 재시도하지 않는다"""
+    validator = FakeValidatorAgent(scores=[60])
+    orchestrator = make_orchestrator(failure_policy="degrade",
+                                     style=FakeStyleAgent(errors=[style_error()]), validator=validator)
+    result = orchestrator.process_query(QUERY, verbose=False)
+    assert validator.texts == [DRAFT]
+    assert result["final_answer"] == DRAFT
+    assert result["validation_score"] == 60
+    assert result["retry_count"] == 0
+    assert result["failure"]["stage"] == "style"
+    assert result["degraded"]
+
+
+def test_degrade_skips_validation(make_orchestrator):
+    """검증이 실패하면 이번 라운드의 스타일 결과를 검증 없이 사용"""
+    orchestrator = make_orchestrator(failure_policy="degrade",
+                                     validator=FakeValidatorAgent(errors=[validation_error()]))
+    result = orchestrator.process_query(QUERY, verbose=False)
+    assert result["final_answer"] == f"[full] {DRAFT}"
+    assert result["validation_details"] is None
+    assert result["failure"]["stage"] == "validation"
+    # 스타일 결과는 쓰였으므로 검증 호출 1회만 낭비
+    assert result["failure"]["wasted_calls"] == 1
+
+
+def test_api_maps_pipeline_error_to_502(api_client):
+    client = api_client(style=FakeStyleAgent(errors=[style_error()]), failure_policy="abort")
+    response = client.post("/api/chat", json={"query": QUERY})
+    assert response.status_code == 502
+    assert "style" in response.json()["detail"]
@@ -0,0 +1,94 @@
+"""
+피드백 요약 테스트 (web_release/feedback_summary.py)
+
+- 파일을 끝에서부터 거꾸로 읽기 (블록 경계에 걸친 줄 포함)
+- 평점 집계와 최근 피드백 링 버퍼가 플러시마다 갱신되는지
+- 재시작 시 오늘 로그의 마지막 몇 줄만으로 링 버퍼를 복원하는지 (워커별 파일 포함)
+
+실행:
+  python -m pytest test_feedback_summary.py
+"""
+import json
+from datetime import datetime
+
+from feedback_summary import FeedbackSummary, RatingAggregate, read_lines_backwards
+from log_writer import LogWriter
+
+
+def today():
+    return datetime.now().strftime('%Y%m%d')
+
+
+def feedback(n, rating=5, feedback_type="good"):
+    return {"timestamp": f"2024-01-01T00:00:{n:02d}", "rating": rating, "feedback_type": feedback_type, "n": n}
+
+
+def write_log(path, entries):
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def test_read_lines_backwards_across_blocks(tmp_path):
+    path = tmp_path / "log.jsonl"
+    lines = [f"line-{n}-" + "x" * n for n in range(30)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    result = [raw.decode() for raw in read_lines_backwards(str(path), block_size=7)]
+    assert result == list(reversed(lines))
+
+
+def test_read_lines_backwards_without_trailing_newline(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("a\nb\nc", encoding="utf-8")
+    assert list(read_lines_backwards(str(path), block_size=2)) == [b"c", b"b", b"a"]
+
+
+def test_rating_aggregate():
+    agg = RatingAggregate()
+    agg.add(feedback(1, rating=5))
+    agg.add(feedback(2, rating=2, feedback_type="bad"))
+    agg.add({"rating": 4})
+    summary = agg.summary()
+    assert summary["total_feedbacks"] == 3
+    assert summary["avg_rating"] == round(11 / 3, 2)
+    assert summary["rating_histogram"] == {"2": 1, "4": 1, "5": 1}
+    assert summary["feedback_types"] == {"good": 1, "bad": 1, "none": 1}
+
+
+def test_summary_keeps_recent_ring_buffer(tmp_path):
+    writer = LogWriter()
+    summary = FeedbackSummary(str(tmp_path), writer, recent_size=3)
+    writer.add_listener(summary.on_flush)
+    summary.load()
+    for n in range(5):
+        writer.write(str(tmp_path), feedback(n, rating=n % 5 + 1))
+    writer.stop()
+    result = summary.summary()
+    assert result["total_feedbacks"] == 5
+    assert [e["n"] for e in result["recent_feedbacks"]] == [2, 3, 4]
+
+
+def test_load_rebuilds_recent_from_worker_files(tmp_path):
+    # 두 워커 파일의 항목이 섞여 있어도 시간순으로 마지막 recent_size개
+    write_log(tmp_path / f"{today()}.111.jsonl", [feedback(n) for n in (0, 2, 4)])
+    write_log(tmp_path / f"{today()}.222.jsonl", [feedback(n) for n in (1, 3, 5)])
+    summary = FeedbackSummary(str(tmp_path), LogWriter(per_worker=True), recent_size=4)
+    summary.load()
+    result = summary.summary()
+    assert result["total_feedbacks"] == 6
+    assert [e["n"] for e in result["recent_feedbacks"]] == [2, 3, 4, 5]
+
+
+def test_recent_buffer_resets_on_new_day(tmp_path):
+    summary = FeedbackSummary(str(tmp_path), LogWriter(), recent_size=3)
+    summary.on_flush([(str(tmp_path), "20240101", feedback(1))])
+    summary.on_flush([(str(tmp_path), today(), feedback(2))])
+    assert [e["n"] for e in summary.summary()["recent_feedbacks"]] == [2]
+
+
+def test_other_directories_are_ignored(tmp_path):
+    summary = FeedbackSummary(str(tmp_path), LogWriter(), recent_size=3)
+    summary.on_flush([("usage_logs", today(), feedback(1))])
+    result = summary.summary()
+    assert result["total_feedbacks"] == 0
+    assert result["recent_feedbacks"] == []
@@ -0,0 +1,63 @@
+"""
+에이전트 지연 생성 테스트 (MultiAgentOrchestrator._get_agent / prewarm)
+
+임포트/생성 시간은 test_cold_start.py가 새 인터프리터에서 측정하고, 여기서는
+- 에이전트가 처음 사용할 때 한 번만 만들어지는지 (여러 스레드가 동시에 요청해도)
+- prewarm()이 백그라운드에서 모든 에이전트를 만들어 is_ready()가 참이 되는지
+를 확인한다.
+
+실행:
+  python -m pytest test_lazy_agents.py
+"""
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from agents_2.orchestrator import MultiAgentOrchestrator
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    """_build_agent가 실제 에이전트 대신 이름만 담은 객체를 (천천히) 만드는 오케스트레이터"""
+    monkeypatch.setenv("PROFILE_MODE", "off")
+    monkeypatch.delenv("TRACE_FILE", raising=False)
+    built = Counter()
+
+    def build(self, name):
+        built[name] += 1
+        time.sleep(0.05)
+        return {"agent": name}
+
+    monkeypatch.setattr(MultiAgentOrchestrator, "_build_agent", build)
+    orchestrator = MultiAgentOrchestrator(backend="stub", answer_cache="", index_dir="", prewarm=False)
+    orchestrator.built = built
+    return orchestrator
+
+
+def test_agents_are_built_on_first_use(orchestrator):
+    assert not orchestrator.is_ready()
+    assert orchestrator.built == Counter()
+    assert orchestrator.knowledge_agent == {"agent": "knowledge"}
+    assert orchestrator.built == Counter({"knowledge": 1})
+    orchestrator.knowledge_agent
+    assert orchestrator.built == Counter({"knowledge": 1})
+
+
+def test_concurrent_first_use_builds_once(orchestrator):
+    agents = []
+    threads = [threading.Thread(target=lambda: agents.append(orchestrator.style_agent)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert orchestrator.built["style"] == 1
+    assert all(agent is agents[0] for agent in agents)
+
+
+def test_prewarm_builds_all_agents(orchestrator):
+    thread = orchestrator.prewarm()
+    thread.join(5)
+    assert orchestrator.is_ready()
+    assert orchestrator.built == Counter({"knowledge": 1, "style": 1, "validator": 1})
@@ -0,0 +1,147 @@
+"""
+SQLite 로그 저장소 테스트 (web_release/log_store.py)
+
+- 리스너로 받은 배치 저장과 기간 통계 / 재시도 분포 / 대화 ID 조회 (여러 턴, 턴별 피드백)
+- import_jsonl이 이미 가져온 부분을 건너뛰고, 리스너가 저장한 항목을 중복 저장하지 않는지
+- entry_hash / turn 컬럼이 없던 기존 저장소를 열 수 있는지
+
+실행:
+  python -m pytest test_log_store.py
+"""
+import json
+import sqlite3
+
+import pytest
+
+from log_store import LogStore
+
+TABLES = {"conversation_logs": "conversations", "usage_logs": "usage", "feedback_logs": "feedback"}
+
+
+def usage(day, score, retry_count=0, success=True, n=0):
+    return {"timestamp": f"2024-01-{day:02d}T10:00:{n:02d}", "query": f"질문 {n}",
+            "score": score, "success": success, "retry_count": retry_count}
+
+
+def write_log(path, entries):
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LogStore(str(tmp_path / "logs.db"), TABLES)
+
+
+def count(store, table):
+    return store._connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_stats_range_and_retry_distribution(store):
+    store.on_flush([
+        ("usage_logs", "20240101", usage(1, 80, n=1)),
+        ("usage_logs", "20240101", usage(1, 60, retry_count=2, success=False, n=2)),
+        ("usage_logs", "20240102", usage(2, 90, n=3)),
+        ("usage_logs", "20240105", usage(5, 10, n=4)),
+        ("unknown_logs", "20240101", usage(1, 0, n=5)),
+    ])
+    stats = store.stats_range("20240101", "20240102")
+    assert stats["total_queries"] == 3
+    assert stats["avg_score"] == pytest.approx(230 / 3)
+    assert stats["success_rate"] == pytest.approx(2 / 3)
+    assert sorted(stats["days"]) == ["20240101", "20240102"]
+    assert stats["days"]["20240101"]["total_queries"] == 2
+
+    distribution = store.retry_distribution("20240101", "20240105")["distribution"]
+    assert distribution["0"]["count"] == 3
+    assert distribution["2"]["avg_score"] == 60
+
+
+def conversation(turn, query, timestamp, **fields):
+    return {"timestamp": timestamp, "conversation_id": "c1", "turn": turn, "query": query,
+            "answer": f"{query} 답변", "validation_score": 85, "success": True, "retry_count": 1,
+            "knowledge_sources": ["a.pdf"], "validation_details": {"score": 85}, **fields}
+
+
+def test_get_conversation_with_feedback(store):
+    store.on_flush([
+        ("conversation_logs", "20240101", conversation(1, "q1", "2024-01-01T10:00:00")),
+        ("feedback_logs", "20240101", {
+            "timestamp": "2024-01-01T10:01:00", "conversation_id": "c1", "turn": 1, "rating": 4, "comment": "좋음",
+        }),
+    ])
+    result = store.get_conversation("c1")
+    assert result["conversation_id"] == "c1" and result["feedbacks"] == []
+    [turn] = result["turns"]
+    assert turn["turn"] == 1 and turn["answer"] == "q1 답변"
+    assert turn["success"] is True
+    assert turn["knowledge_sources"] == ["a.pdf"]
+    assert turn["failure"] is None
+    assert "entry_hash" not in turn and "id" not in turn
+    assert [f["rating"] for f in turn["feedbacks"]] == [4]
+    assert store.get_conversation("missing") is None
+
+
+def test_get_conversation_returns_all_turns(store):
+    store.on_flush([
+        # 턴 순서와 기록 순서가 달라도 턴 순으로
+        ("conversation_logs", "20240101", conversation(2, "q2", "2024-01-01T10:05:00")),
+        ("conversation_logs", "20240101", conversation(1, "q1", "2024-01-01T10:00:00")),
+        ("feedback_logs", "20240101", {"timestamp": "2024-01-01T10:06:00", "conversation_id": "c1",
+                                       "turn": 2, "rating": 2}),
+        ("feedback_logs", "20240101", {"timestamp": "2024-01-01T10:07:00", "conversation_id": "c1",
+                                       "rating": 5}),
+    ])
+    result = store.get_conversation("c1")
+    assert [(t["turn"], t["query"]) for t in result["turns"]] == [(1, "q1"), (2, "q2")]
+    assert result["turns"][0]["feedbacks"] == []
+    assert [f["rating"] for f in result["turns"][1]["feedbacks"]] == [2]
+    # 턴을 보내지 않은 피드백은 대화 전체에 대한 것으로
+    assert [f["rating"] for f in result["feedbacks"]] == [5]
+
+
+def test_import_is_incremental(store, tmp_path):
+    path = tmp_path / "20240101.jsonl"
+    write_log(path, [usage(1, 80, n=1), usage(1, 70, n=2)])
+    assert store.import_jsonl(str(path), "usage") == 2
+    assert store.import_jsonl(str(path), "usage") == 0
+
+    write_log(path, [usage(1, 60, n=3)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"timestamp": "2024-01-01T10:00:09"')  # 기록 중인 마지막 줄은 다음에 가져온다
+    assert store.import_jsonl(str(path), "usage") == 1
+    assert count(store, "usage") == 3
+
+
+def test_import_skips_entries_saved_by_listener(store, tmp_path):
+    """서버가 리스너로 저장한 항목을 같은 JSONL에서 다시 가져와도 중복되지 않는다"""
+    entries = [usage(1, 80, n=1), usage(1, 70, n=2)]
+    store.on_flush([("usage_logs", "20240101", entry) for entry in entries[:1]])
+    path = tmp_path / "20240101.jsonl"
+    write_log(path, entries)
+    assert store.import_jsonl(str(path), "usage") == 1
+    assert count(store, "usage") == 2
+
+
+def test_opens_store_without_entry_hash(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id TEXT,
+                    timestamp TEXT NOT NULL, date TEXT NOT NULL, query TEXT, answer TEXT, validation_score REAL,
+                    success INTEGER, retry_count INTEGER, knowledge_sources TEXT, validation_details TEXT,
+                    failure TEXT)""")
+    conn.execute("""INSERT INTO conversations (conversation_id, timestamp, date, query, success)
+                    VALUES ('old', '2024-01-01T00:00:00', '20240101', '예전 질문', 1)""")
+    conn.execute("""CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+                    date TEXT NOT NULL, query TEXT, score REAL, success INTEGER, retry_count INTEGER)""")
+    conn.execute("INSERT INTO usage (timestamp, date, score) VALUES ('2024-01-01T00:00:00', '20240101', 50)")
+    conn.commit()
+    conn.close()
+
+    store = LogStore(path, TABLES)
+    store.on_flush([("usage_logs", "20240101", usage(1, 80, n=1))] * 2)
+    assert count(store, "usage") == 2
+    assert store.stats_range("20240101", "20240101")["total_queries"] == 2
+    # 턴 번호가 없던 예전 대화 행은 1턴
+    assert [t["turn"] for t in store.get_conversation("old")["turns"]] == [1]
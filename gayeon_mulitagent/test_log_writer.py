@@ -0,0 +1,125 @@
+"""
+백그라운드 로그 기록기 테스트 (web_release/log_writer.py)
+
+- write()는 큐에만 넣고, 기록 스레드가 배치로 모아 일별 JSONL 파일에 기록
+- stop()은 남은 항목을 모두 기록
+- fsync 정책(none / batch / interval)과 워커별 파일, 큐가 넘칠 때 버린 항목 수
+
+실행:
+  python -m pytest test_log_writer.py
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import log_writer as log_writer_module
+from log_writer import LogWriter, daily_log_files
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def today():
+    return datetime.now().strftime('%Y%m%d')
+
+
+def test_write_only_queues_until_flushed(tmp_path):
+    writer = LogWriter(flush_interval=60)
+    writer.write(str(tmp_path), {"n": 1})
+    assert writer.stats()["queued"] == 1
+    assert list(tmp_path.iterdir()) == []
+    writer.stop()
+    assert read_lines(tmp_path / f"{today()}.jsonl") == [{"n": 1}]
+
+
+def test_background_thread_flushes_in_batches(tmp_path):
+    writer = LogWriter(flush_interval=0.5, max_batch=3)
+    batches = []
+    writer.add_listener(batches.append)
+    for n in range(3):
+        writer.write(str(tmp_path), {"n": n})
+    writer.start()
+    try:
+        # max_batch개가 모이면 주기를 기다리지 않고 기록
+        for _ in range(100):
+            if writer.written == 3:
+                break
+            time.sleep(0.01)
+        assert writer.written == 3
+    finally:
+        writer.stop()
+    assert [len(batch) for batch in batches] == [3]
+    assert [e["n"] for e in read_lines(tmp_path / f"{today()}.jsonl")] == [0, 1, 2]
+
+
+def test_entries_are_grouped_by_directory(tmp_path):
+    writer = LogWriter()
+    for name in ("a", "b", "a"):
+        os.makedirs(tmp_path / name, exist_ok=True)
+        writer.write(str(tmp_path / name), {"dir": name})
+    writer.stop()
+    assert len(read_lines(tmp_path / "a" / f"{today()}.jsonl")) == 2
+    assert len(read_lines(tmp_path / "b" / f"{today()}.jsonl")) == 1
+    assert writer.flushes == 1
+
+
+@pytest.mark.parametrize("policy, expected", [("none", 0), ("batch", 2), ("interval", 0)])
+def test_fsync_policy(tmp_path, monkeypatch, policy, expected):
+    synced = []
+    monkeypatch.setattr(log_writer_module.os, "fsync", synced.append)
+    writer = LogWriter(fsync_policy=policy, fsync_interval=60)
+    for _ in range(2):
+        writer.write(str(tmp_path), {"n": 1})
+        writer.stop()
+    assert len(synced) == expected
+
+
+def test_interval_fsync_after_interval(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(log_writer_module.os, "fsync", synced.append)
+    writer = LogWriter(fsync_policy="interval", fsync_interval=0)
+    writer.write(str(tmp_path), {"n": 1})
+    writer.stop()
+    assert len(synced) == 1
+
+
+def test_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        LogWriter(fsync_policy="always")
+
+
+def test_per_worker_files(tmp_path):
+    writer = LogWriter(per_worker=True)
+    writer.write(str(tmp_path), {"n": 1})
+    writer.stop()
+    assert (tmp_path / f"{today()}.{os.getpid()}.jsonl").exists()
+    assert daily_log_files(str(tmp_path), today()) == [str(tmp_path / f"{today()}.{os.getpid()}.jsonl")]
+
+
+def test_full_queue_drops_entries(tmp_path):
+    writer = LogWriter(max_queue=2)
+    for n in range(5):
+        writer.write(str(tmp_path), {"n": n})
+    writer.stop()
+    assert writer.written == 2
+    assert writer.dropped == 3
+
+
+def test_listener_errors_do_not_stop_writing(tmp_path):
+    writer = LogWriter()
+
+    def broken(batch):
+        raise RuntimeError("리스너 오류")
+
+    received = []
+    writer.add_listener(broken)
+    writer.add_listener(received.append)
+    writer.write(str(tmp_path), {"n": 1})
+    writer.stop()
+    assert writer.written == 1
+    assert len(received) == 1
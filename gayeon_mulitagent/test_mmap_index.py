@@ -0,0 +1,104 @@
+"""
+메모리 맵 벡터 인덱스 테스트 (agents_2/mmap_index.py)
+
+- write_index로 저장한 문서를 코사인 거리 순으로 찾는지 (단일 / 여러 임베딩 검색 결과가 같은지)
+- verify_index가 손상된 파일, 다른 임베딩 모델을 거부하는지
+- 버전 디렉토리와 CURRENT 교체, load_index의 RetrievalError
+
+실행:
+  python -m pytest test_mmap_index.py
+"""
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents_2.backends import StubEmbeddings  # noqa: E402
+from agents_2.errors import RetrievalError  # noqa: E402
+from agents_2.mmap_index import (  # noqa: E402
+    MmapVectorIndex, RECORDS_FILE, activate_version, current_version, has_index, list_versions,
+    load_index, resolve_index_dir, search_many, verify_index, write_index,
+)
+
+DOCUMENTS = ["창씨개명", "민족개조론", "무정", "흙", "이광수의 친일"]
+METADATAS = [{"source": f"doc{i}.pdf", "page": i} for i in range(len(DOCUMENTS))]
+EMBEDDINGS = StubEmbeddings("stub-embedding", dim=16)
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    path = str(tmp_path / "papers")
+    write_index(path, EMBEDDINGS.embed_documents(DOCUMENTS), DOCUMENTS, METADATAS,
+                manifest={"embedding_model": "stub-embedding"})
+    return path
+
+
+def test_search_returns_nearest_documents(index_dir):
+    index = MmapVectorIndex(index_dir, EMBEDDINGS)
+    assert len(index) == len(DOCUMENTS)
+    results = index.similarity_search_with_score("무정", k=3)
+    assert results[0][0].page_content == "무정"
+    assert results[0][0].metadata == METADATAS[2]
+    assert results[0][1] == pytest.approx(0.0, abs=1e-5)
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+    assert [doc.page_content for doc in index.similarity_search("흙", k=10)][0] == "흙"
+
+
+def test_batch_search_matches_single_search(index_dir):
+    index = MmapVectorIndex(index_dir, EMBEDDINGS)
+    queries = EMBEDDINGS.embed_queries(["창씨개명", "흙"])
+    batched = search_many(index, queries, k=2)
+    for query, results in zip(queries, batched):
+        single = index.similarity_search_by_vector_with_score(query, k=2)
+        assert [d.page_content for d, _ in results] == [d.page_content for d, _ in single]
+        assert [s for _, s in results] == pytest.approx([s for _, s in single])
+
+
+def test_write_index_rejects_mismatched_lengths(tmp_path):
+    with pytest.raises(ValueError):
+        write_index(str(tmp_path / "bad"), EMBEDDINGS.embed_documents(DOCUMENTS[:2]), DOCUMENTS, METADATAS)
+
+
+def test_verify_detects_corruption(index_dir):
+    assert verify_index(index_dir)["count"] == len(DOCUMENTS)
+    path = os.path.join(index_dir, RECORDS_FILE)
+    with open(path, "r+b") as f:
+        f.write(b"X")
+    # 크기가 같으면 빠른 확인은 통과하고 SHA-256 확인에서 걸린다
+    verify_index(index_dir, full=False)
+    with pytest.raises(ValueError):
+        verify_index(index_dir)
+
+
+def test_verify_rejects_other_embedding_model(index_dir):
+    verify_index(index_dir, embedding_model="stub-embedding")
+    with pytest.raises(ValueError):
+        verify_index(index_dir, embedding_model="models/text-embedding-004")
+
+
+def test_versions_and_current(tmp_path):
+    root = str(tmp_path)
+    for version in ("v1", "v2"):
+        write_index(os.path.join(root, "papers", version),
+                    EMBEDDINGS.embed_documents(DOCUMENTS), DOCUMENTS, METADATAS)
+    assert list_versions(root, "papers") == ["v1", "v2"]
+    assert current_version(root, "papers") is None
+    assert not has_index(root, "papers")
+
+    activate_version(root, "papers", "v1")
+    assert current_version(root, "papers") == "v1"
+    assert resolve_index_dir(root, "papers") == os.path.join(root, "papers", "v1")
+    assert has_index(root, "papers")
+    with pytest.raises(ValueError):
+        activate_version(root, "papers", "v3")
+
+
+def test_load_index_raises_retrieval_error(tmp_path, index_dir):
+    index = load_index("KnowledgeAgent", str(tmp_path), "papers", EMBEDDINGS, "stub-embedding")
+    assert len(index) == len(DOCUMENTS)
+    with pytest.raises(RetrievalError):
+        load_index("KnowledgeAgent", str(tmp_path), "papers", EMBEDDINGS, "other-model")
+    with pytest.raises(RetrievalError):
+        load_index("StyleAgent", str(tmp_path), "style", EMBEDDINGS)
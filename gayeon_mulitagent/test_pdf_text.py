@@ -0,0 +1,81 @@
+"""
+PDF 텍스트 정제 / 문장 단위 청크 테스트 (agents_2/pdf_text.py)
+
+- 줄 합치기: 기본은 띄어 쓰고, 어절 중간에서 끊긴 것이 분명할 때만 붙이는지
+- 머리글/바닥글, 쪽 번호, 각주, 참고문헌 제거
+- 한국어 문장 경계로 나누고, 청크 크기/겹침을 지키는지
+
+실행:
+  python -m pytest test_pdf_text.py
+"""
+from agents_2.pdf_text import _join_lines, chunk_pages, clean_pages, split_sentences, text_warning
+
+
+def test_lines_are_joined_with_space_by_default():
+    assert _join_lines(["이광수는 근대 문학의", "선구자였다."]) == "이광수는 근대 문학의 선구자였다."
+
+
+def test_hyphenated_latin_word_is_glued():
+    assert _join_lines(["cognitive disso-", "nance theory"]) == "cognitive dissonance theory"
+
+
+def test_leading_particle_and_punctuation_are_glued():
+    assert _join_lines(["민족개조", "론은 발표되었다"]) == "민족개조 론은 발표되었다"
+    assert _join_lines(["민족개조론", "은 발표되었다"]) == "민족개조론은 발표되었다"
+    assert _join_lines(["발표되었다", ". 그리고"]) == "발표되었다. 그리고"
+
+
+def test_word_breaks_marked_by_trailing_space():
+    """줄 끝 공백으로 어절 경계를 표시한 문서에서는 공백 없이 끝난 줄이 어절 중간"""
+    lines = ["이광수는 근대 ", "문학의 선구", "자였다."]
+    assert _join_lines(lines, marks_word_breaks=True) == "이광수는 근대 문학의 선구자였다."
+    assert _join_lines(lines) == "이광수는 근대 문학의 선구 자였다."
+
+
+def make_page(n, body):
+    return "\n".join(["한국현대문학연구 제10집", *body, str(n)])
+
+
+def test_clean_pages_removes_headers_page_numbers_and_footnotes():
+    topics = ["무정", "흙", "유정", "사랑"]
+    pages = [make_page(n, [f"{topic}을 다룬 본문이다.1) 이어지는 문장이다.", f"{topic}의 둘째 줄이다.",
+                           f"{topic}의 셋째 줄이다.", "1) 각주 내용"]) for n, topic in enumerate(topics, 1)]
+    cleaned = clean_pages(pages, drop_tail=False)
+    assert cleaned[0] == "무정을 다룬 본문이다. 이어지는 문장이다. 무정의 둘째 줄이다. 무정의 셋째 줄이다."
+    assert all("한국현대문학연구" not in page and "각주" not in page for page in cleaned)
+
+
+def test_clean_pages_drops_references():
+    pages = ["본문 첫 쪽이다.", "본문 둘째 쪽이다.", "마지막 본문이다.\n참고문헌\n이광수, 『무정』, 1917."]
+    cleaned = clean_pages(pages)
+    assert cleaned == ["본문 첫 쪽이다.", "본문 둘째 쪽이다.", "마지막 본문이다."]
+
+
+def test_clean_pages_collapses_spaced_hangul():
+    assert clean_pages(["필자 홍 기 돈 은 말한다 ."], drop_tail=False) == ["필자 홍기돈은 말한다."]
+
+
+def test_split_sentences():
+    text = "나는 조선을 사랑하였다. 그것이 죄인가? 나는 모르오! 1917. 무정"
+    assert split_sentences(text) == ["나는 조선을 사랑하였다.", "그것이 죄인가?", "나는 모르오!", "1917. 무정"]
+
+
+def test_chunks_respect_size_and_overlap():
+    pages = [" ".join(f"{n}번째 문장이다." for n in range(10)), "다음 쪽 문장이다."]
+    chunks = chunk_pages(pages, chunk_size=30, chunk_overlap=10)
+    assert all(len(text) <= 30 for text, _ in chunks)
+    # 다음 청크는 직전 청크의 마지막 문장으로 시작
+    first, second = chunks[0][0], chunks[1][0]
+    assert second.startswith(first.split(". ")[-1])
+    assert chunks[-1][0].endswith("다음 쪽 문장이다.")
+
+
+def test_sentence_broken_across_pages_is_merged():
+    chunks = chunk_pages(["앞 쪽에서 시작한", "문장이 끝났다."], chunk_size=100, chunk_overlap=0)
+    assert chunks == [("앞 쪽에서 시작한 문장이 끝났다.", 0)]
+
+
+def test_text_warning():
+    assert text_warning(["가"]) != ""
+    assert text_warning(["이광수의 문장이다. " * 20]) == ""
+    assert text_warning(["abcdefghij " * 20]) != ""
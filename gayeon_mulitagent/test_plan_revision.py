@@ -0,0 +1,103 @@
+"""
+검증 실패 후 부분 재생성 테스트 (MultiAgentOrchestrator._plan_revision / StyleAgent mode)
+
+- 피드백이 어휘/문체를 지적하면 근대어 변환만(modernize), 그 외에는 가장 약한 항목만 보강(strengthen)
+- 평가 사유(reasoning)나 답변 주제에 나오는 말(근대화, 말투)로는 근대어 변환을 고르지 않는지
+- 부분 재생성 뒤 점수가 오르지 않으면 전체 재변환(full)
+- StyleAgent의 mode별 LLM 호출 수 (full 2회, modernize / strengthen 1회)
+
+실행:
+  python -m pytest test_plan_revision.py
+"""
+import pytest
+
+from agents_2.metrics import track_llm_calls
+from conftest import FakeStyleAgent, FakeValidatorAgent
+
+STYLE_RESULT = {"styled_text": "변환된 답변", "tone_text": "말투만 바꾼 답변"}
+
+
+def validation(score, feedback="", trigger=20, mechanism=10, persuasiveness=20, reasoning=""):
+    return {
+        "score": score,
+        "feedback": feedback,
+        "reasoning": reasoning,
+        "aspects": {"trigger_analysis": trigger, "mechanism_identification": mechanism,
+                    "persuasiveness": persuasiveness},
+    }
+
+
+def test_vocabulary_feedback_reruns_modernize_only(make_orchestrator):
+    orchestrator = make_orchestrator()
+    revision = orchestrator._plan_revision(validation(50, "한자어와 어미가 현대적임"), STYLE_RESULT,
+                                           {"mode": "full"}, None)
+    assert revision == {"mode": "modernize", "tone_text": "말투만 바꾼 답변", "feedback": "한자어와 어미가 현대적임"}
+
+
+def test_other_feedback_strengthens_weakest_aspect(make_orchestrator):
+    orchestrator = make_orchestrator()
+    # 만점 대비 비율: 20/30, 10/40, 20/30 -> 합리화 기제 식별이 가장 약함
+    revision = orchestrator._plan_revision(validation(50, "논리가 약함"), STYLE_RESULT, {"mode": "full"}, None)
+    assert revision["mode"] == "strengthen"
+    assert revision["aspect"] == "mechanism_identification"
+    assert revision["styled_text"] == "변환된 답변"
+
+    revision = orchestrator._plan_revision(validation(50, trigger=5, mechanism=30), STYLE_RESULT,
+                                           {"mode": "full"}, None)
+    assert revision["aspect"] == "trigger_analysis"
+
+
+def test_reasoning_about_modernization_strengthens(make_orchestrator):
+    orchestrator = make_orchestrator()
+    result = validation(50, "외부 정당화를 더 쓰세요",
+                        reasoning="근대화와 실력 양성을 명분으로 내세우나 말투가 단조롭고 변명이 약함")
+    assert orchestrator._plan_revision(result, STYLE_RESULT, {"mode": "full"}, None)["mode"] == "strengthen"
+
+
+@pytest.mark.parametrize("feedback", ["근대화 논리를 더 내세우세요", "피해자를 탓하는 말투를 더 쓰세요",
+                                      "민족 개조라는 용어로 포장하세요"])
+def test_topic_words_in_feedback_strengthen(make_orchestrator, feedback):
+    orchestrator = make_orchestrator()
+    assert orchestrator._plan_revision(validation(50, feedback), STYLE_RESULT,
+                                       {"mode": "full"}, None)["mode"] == "strengthen"
+
+
+def test_no_improvement_after_partial_revision_falls_back_to_full(make_orchestrator):
+    orchestrator = make_orchestrator()
+    last = {"mode": "strengthen"}
+    assert orchestrator._plan_revision(validation(50), STYLE_RESULT, last, 50) == {"mode": "full"}
+    assert orchestrator._plan_revision(validation(55), STYLE_RESULT, last, 50)["mode"] == "strengthen"
+    # 직전이 전체 변환이면 점수가 그대로여도 부분 재생성을 시도
+    assert orchestrator._plan_revision(validation(50), STYLE_RESULT, {"mode": "full"}, 50)["mode"] == "strengthen"
+
+
+def test_missing_tone_text_requires_full(make_orchestrator):
+    orchestrator = make_orchestrator()
+    revision = orchestrator._plan_revision(validation(50, "어휘"), {"styled_text": "초안"}, {"mode": "full"}, None)
+    assert revision == {"mode": "full"}
+
+
+def test_pipeline_retry_modes(make_orchestrator):
+    style = FakeStyleAgent()
+    validator = FakeValidatorAgent(scores=(50, 55, 55, 80), feedback="문체가 현대적임")
+    orchestrator = make_orchestrator(style=style, validator=validator, max_retries=4)
+    result = orchestrator.process_query("창씨개명을 왜 하셨습니까?", verbose=False)
+    # 50 -> modernize(55, 상승) -> modernize(55, 그대로) -> full(80)
+    assert style.modes == ["full", "modernize", "modernize", "full"]
+    assert result["success"] and result["retry_count"] == 3
+    # 부분 재생성은 스타일 1회 + 검증 1회, 전체 재변환만 초안에 힌트를 붙인다
+    assert result["llm_calls"] == 1 + 2 * 4
+    assert "[개선 필요]" not in validator.texts[1]
+    assert "[개선 필요]" in validator.texts[3]
+
+
+@pytest.mark.parametrize("mode, calls", [("full", 2), ("modernize", 1), ("strengthen", 1)])
+def test_style_agent_calls_per_mode(stub_style_agent, mode, calls):
+    request = {"text": "초안", "mode": mode, "tone_text": "말투 변환 결과", "styled_text": "이전 결과",
+               "aspect": "persuasiveness", "feedback": "설득력이 부족함"}
+    with track_llm_calls() as counter:
+        result = stub_style_agent.process(request)
+    assert counter.value == calls
+    assert result["styled_text"]
+    if mode != "full":
+        assert result["tone_text"] == "말투 변환 결과"
@@ -0,0 +1,92 @@
+"""
+대량 생성 테스트 (MultiAgentOrchestrator.process_many)
+
+- 질문마다 결과를 끝나는 순서대로 내고 마지막에 처리량/지연 시간 보고서를 내는지
+- 같은 질문은 한 번만 임베딩하고, 검색은 전체에서 한 번인지
+- 질문 하나의 실패는 오류 항목으로만 남고, 배치 검색이 실패하면 질문별 검색으로 진행하는지
+- concurrency개까지 동시에 실행되는지
+
+실행:
+  python -m pytest test_process_many.py
+"""
+import time
+
+import pytest
+
+from agents_2.errors import GenerationError, RetrievalError
+from agents_2.orchestrator import MultiAgentOrchestrator
+from conftest import FakeKnowledgeAgent, FakeStyleAgent, FakeValidatorAgent
+
+QUERIES = ["창씨개명을 왜 하셨습니까?", "민족개조론은 무엇입니까?", "창씨개명을 왜 하셨습니까?"]
+
+
+def test_results_and_report(make_orchestrator, monkeypatch):
+    knowledge = FakeKnowledgeAgent()
+    embedded = []
+    embed = knowledge.backend.embed
+    monkeypatch.setattr(knowledge.backend, "embed",
+                        lambda texts, model=None: embedded.append(list(texts)) or embed(texts, model))
+    orchestrator = make_orchestrator(knowledge=knowledge)
+    items = list(orchestrator.process_many(QUERIES, concurrency=2))
+
+    results, report = items[:-1], items[-1]["report"]
+    assert items[-1]["type"] == "report"
+    assert sorted(item["index"] for item in results) == [0, 1, 2]
+    for item in results:
+        assert item["type"] == "result"
+        assert item["result"]["final_answer"] == f"[full] 초안: {QUERIES[item['index']]}"
+    # 중복 질문은 한 번만 임베딩하고 검색은 한 번
+    assert embedded == [QUERIES[:2]]
+    assert knowledge.searches == 1
+    assert report["total"] == 3 and report["unique_queries"] == 2
+    assert report["succeeded"] == 3 and report["validated"] == 3 and report["failed"] == 0
+    assert report["batched_retrieval"]
+    assert report["llm_calls"] == 9 and report["model_calls"] == {"fake": 9}
+    assert set(report["stage_seconds"]) >= {"style", "validation"}
+    assert report["latency"]["max"] >= report["latency"]["p50"]
+
+
+def test_failed_query_is_isolated(make_orchestrator):
+    validator = FakeValidatorAgent(errors=[GenerationError("ValidatorAgent", "API 호출 실패")])
+    orchestrator = make_orchestrator(validator=validator, failure_policy="abort")
+    items = list(orchestrator.process_many(QUERIES, concurrency=1))
+    errors = [item for item in items if item["type"] == "error"]
+    assert len(errors) == 1 and errors[0]["index"] == 0
+    assert errors[0]["error"].stage == "validation"
+    assert items[-1]["report"]["failed"] == 1 and items[-1]["report"]["succeeded"] == 2
+
+
+def test_prefetch_failure_falls_back_to_per_query_search(make_orchestrator, monkeypatch):
+    knowledge = FakeKnowledgeAgent()
+
+    def fail(vectors, k=5):
+        raise RetrievalError("KnowledgeAgent", "인덱스 없음")
+
+    monkeypatch.setattr(knowledge, "search_knowledge_by_vectors", fail)
+    orchestrator = make_orchestrator(knowledge=knowledge)
+    items = list(orchestrator.process_many(QUERIES[:2]))
+    report = items[-1]["report"]
+    assert not report["batched_retrieval"]
+    assert report["succeeded"] == 2
+    # 미리 검색한 자료 없이 에이전트가 직접 검색
+    assert [data["knowledge_items"] for data in knowledge.inputs] == [None, None]
+
+
+def test_queries_run_concurrently(make_orchestrator):
+    orchestrator = make_orchestrator(style=FakeStyleAgent(delay=0.1))
+    started = time.monotonic()
+    items = list(orchestrator.process_many([f"질문 {n}" for n in range(4)], concurrency=4))
+    assert time.monotonic() - started < 0.3
+    assert items[-1]["report"]["concurrency"] == 4
+
+
+def test_invalid_concurrency(make_orchestrator):
+    with pytest.raises(ValueError):
+        list(make_orchestrator().process_many(QUERIES, concurrency=0))
+
+
+def test_percentile():
+    percentile = MultiAgentOrchestrator._percentile
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.95) == 4.0
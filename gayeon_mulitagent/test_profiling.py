@@ -0,0 +1,106 @@
+"""
+요청 단위 프로파일러 테스트 (agents_2/profiling.py)
+
+- sample 모드는 접힌 스택(.folded), cprofile 모드는 pstats(.prof) 파일을 남기는지
+- 꺼져 있거나 force=False면 프로파일링하지 않고, 중첩된 요청은 바깥 프로파일 하나로 기록
+- 분당 한도를 넘은 요청은 프로파일 없이 처리하고, 디렉토리 파일 수를 max_files로 유지하는지
+- 오케스트레이터가 profile=True 요청의 결과에 프로파일 요약을 담는지
+
+실행:
+  python -m pytest test_profiling.py
+"""
+import os
+import pstats
+import time
+
+import pytest
+
+from agents_2.profiling import RequestProfiler
+
+
+def busy_wait(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def make_profiler(tmp_path, mode="sample", **kwargs):
+    kwargs.setdefault("max_per_minute", 10)
+    return RequestProfiler(mode=mode, directory=str(tmp_path), sample_rate=0, interval=0.002,
+                           max_concurrent=2, max_files=10, **kwargs)
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        RequestProfiler(mode="perf")
+
+
+def test_sample_mode_writes_folded_stacks(tmp_path):
+    profiler = make_profiler(tmp_path)
+    with profiler.profile("conv/1?", force=True) as session:
+        busy_wait(0.05)
+    summary = session.to_dict()
+    assert summary["mode"] == "sample" and summary["samples"] > 0
+    assert summary["path"].endswith("-conv_1_.folded")
+    with open(summary["path"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == summary["samples"]
+    assert any("busy_wait (" in line for line in lines)
+
+
+def test_cprofile_mode_writes_pstats(tmp_path):
+    profiler = make_profiler(tmp_path, mode="cprofile")
+    assert profiler.max_concurrent == 1
+    with profiler.profile("query", force=True) as session:
+        busy_wait(0.01)
+    assert session.path.endswith(".prof")
+    stats = pstats.Stats(session.path)
+    assert any(name == "busy_wait" for _, _, name in stats.stats)
+
+
+def test_off_forced_false_and_nested(tmp_path):
+    with RequestProfiler(mode="off", directory=str(tmp_path)).profile("query", force=True) as session:
+        assert session is None
+    profiler = make_profiler(tmp_path)
+    with profiler.profile("query", force=False) as session:
+        assert session is None
+    # sample_rate 0이면 명시적으로 요청한 것만
+    with profiler.profile("query") as session:
+        assert session is None
+    with profiler.profile("outer", force=True) as outer:
+        with profiler.profile("inner", force=True) as inner:
+            assert outer is not None and inner is None
+    assert profiler.stats()["profiled"] == 1
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_per_minute_limit(tmp_path):
+    profiler = make_profiler(tmp_path, max_per_minute=2)
+    sessions = []
+    for _ in range(3):
+        with profiler.profile("query", force=True) as session:
+            sessions.append(session)
+    assert sessions[2] is None and all(sessions[:2])
+    assert profiler.stats()["rate_limited"] == 1 and profiler.stats()["active"] == 0
+
+
+def test_old_files_are_pruned(tmp_path):
+    profiler = RequestProfiler(mode="sample", directory=str(tmp_path), interval=0.002,
+                               max_per_minute=10, max_files=2)
+    for n in range(4):
+        with profiler.profile(f"q{n}", force=True):
+            time.sleep(0.002)
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 2
+    assert names[-1].endswith("-q3.folded")
+
+
+def test_orchestrator_attaches_profile(make_orchestrator, tmp_path):
+    orchestrator = make_orchestrator(profiler=make_profiler(tmp_path))
+    assert orchestrator.process_query("질문", verbose=False)["profile"] is None
+    result = orchestrator.process_query("질문", verbose=False, profile=True)
+    assert os.path.exists(result["profile"]["path"])
+    # 대화 턴은 세션 검색까지 포함한 프로파일 하나
+    result = orchestrator.process_conversation(None, "질문", profile=True)
+    assert result["conversation_id"] in os.path.basename(result["profile"]["path"])
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,93 @@
+"""
+에이전트별 모델 라우팅 테스트 (agents_2/routing.py)
+
+- 프로필 이름 / JSON 파일 / JSON 문자열로 라우팅 표를 불러오고, 잘못된 설정은 ValueError
+- 적용 순서: 에이전트 설정 → 에이전트 escalate → 단계 설정 → 단계 escalate
+- escalated()는 with 블록(과 그 스레드/태스크) 안에서만 승격 설정을 적용하는지
+- cheap_first로 만든 StyleAgent가 첫 시도는 가벼운 모델, 승격 시 Flash를 쓰는지 (stub 백엔드)
+
+실행:
+  python -m pytest test_routing.py
+"""
+import json
+import threading
+
+import pytest
+
+from agents_2.metrics import track_llm_calls
+from agents_2.routing import (
+    FLASH_MODEL, LITE_MODEL, ROUTING_PROFILES, agent_routing, escalated, escalation_level, load_routing,
+    resolve_settings,
+)
+
+DEFAULTS = {"model": "models/gemini-2.5-flash", "temperature": 0.8}
+
+
+def test_load_profiles_files_and_json(tmp_path):
+    assert load_routing(None) == {} and load_routing("") == {}
+    assert load_routing("split") is ROUTING_PROFILES["split"]
+    table = {"validator": {"model": LITE_MODEL}}
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps(table), encoding="utf-8")
+    assert load_routing(str(path)) == table
+    assert load_routing(json.dumps(table)) == table
+    assert load_routing(table) is table
+
+
+def test_invalid_routing_is_rejected(make_orchestrator):
+    with pytest.raises(ValueError):
+        load_routing("cheapest")
+    with pytest.raises(ValueError):
+        load_routing({"style": {"modle": LITE_MODEL}})
+    with pytest.raises(ValueError):
+        load_routing({"style": {"escalate": {"top_p": 0.9}}})
+    with pytest.raises(ValueError):
+        make_orchestrator(routing="cheapest")
+
+
+def test_agent_routing_splits_steps():
+    routing = agent_routing(ROUTING_PROFILES["cheap_first"], "style")
+    assert set(routing) == {"", "tone"}
+    assert agent_routing(ROUTING_PROFILES["cheap_first"], "knowledge") == {}
+
+
+def test_resolve_settings_order():
+    routing = {
+        "": {"model": "agent", "thinking_budget": 0, "escalate": {"model": "agent-up"}},
+        "tone": {"model": "step", "escalate": {"model": "step-up", "max_output_tokens": 64}},
+    }
+    assert resolve_settings(DEFAULTS, routing, None) == {
+        "model": "agent", "temperature": 0.8, "max_output_tokens": None, "thinking_budget": 0}
+    assert resolve_settings(DEFAULTS, routing, "tone")["model"] == "step"
+    assert resolve_settings(DEFAULTS, routing, "modernize")["model"] == "agent"
+    with escalated():
+        assert resolve_settings(DEFAULTS, routing, "modernize")["model"] == "agent-up"
+        settings = resolve_settings(DEFAULTS, routing, "tone")
+        assert settings["model"] == "step-up" and settings["max_output_tokens"] == 64
+    assert resolve_settings(DEFAULTS, {}, "tone") == {**DEFAULTS, "max_output_tokens": None, "thinking_budget": None}
+
+
+def test_escalation_is_scoped_to_context():
+    seen = []
+    with escalated(2):
+        assert escalation_level() == 2
+        thread = threading.Thread(target=lambda: seen.append(escalation_level()))
+        thread.start()
+        thread.join()
+    assert escalation_level() == 0
+    # 새 스레드는 기본 단계에서 시작
+    assert seen == [0]
+
+
+def test_cheap_first_style_agent_escalates_on_retry(stub_style_agent):
+    agent = stub_style_agent
+    agent.routing = agent_routing(load_routing("cheap_first"), "style")
+
+    with track_llm_calls() as counter:
+        agent.process({"text": "초안"})
+    assert dict(counter.models) == {LITE_MODEL: 2}
+
+    # 재시도: 어조 변환은 단계 설정(가벼운 모델)이 남고 근대어 변환만 Flash로 승격
+    with track_llm_calls() as counter, escalated():
+        agent.process({"text": "초안"})
+    assert dict(counter.models) == {LITE_MODEL: 1, FLASH_MODEL: 1}
@@ -0,0 +1,105 @@
+"""
+대화 세션 테스트 (agents_2/session.py, MultiAgentOrchestrator.process_conversation)
+
+- 대화 기록이 토큰 예산을 넘으면 오래된 턴부터 한 줄 요약으로 접히는지
+- 세션 저장소의 LRU 제거와 유휴 만료, 서버가 발급한 ID로만 세션을 찾는지
+- 같은 주제의 후속 질문은 이전 검색 결과를 재사용하고, 대화 기록이 초안 프롬프트에 들어가는지
+- 발급하지 않은 ID로 이어 가면 SessionNotFound, API는 404
+
+실행:
+  python -m pytest test_session.py
+"""
+import time
+
+import pytest
+
+from agents_2.errors import SessionNotFound
+from agents_2.session import ConversationSession, SessionStore, cosine_similarity
+from agents_2.tokens import estimate_tokens
+from conftest import FakeKnowledgeAgent
+
+
+def test_history_is_compacted_within_budget():
+    session = ConversationSession("c", history_tokens=120)
+    for n in range(6):
+        session.record(f"질문 {n}", f"{n}번째 답변의 첫 문장이오. " + "덧붙이는 설명이오. " * 3)
+    history = session.history()
+    assert session.turns == 6
+    assert estimate_tokens(history) <= 120
+    assert history.startswith("[이전 대화 요약]")
+    # 가장 최근 턴은 그대로, 오래된 턴은 질문과 답변 첫 문장으로
+    assert session.recent[-1][0] == "질문 5"
+    assert all(line.startswith("- 질문 ") and "첫 문장이오." in line and "덧붙이는" not in line
+               for line in session.summary)
+
+
+def test_reusable_retrieval_threshold():
+    session = ConversationSession("c", history_tokens=600)
+    assert session.reusable_retrieval([1.0, 0.0], 0.7) is None
+    session.remember_retrieval([{"content": "자료"}], [1.0, 0.0])
+    assert session.reusable_retrieval([0.9, 0.1], 0.7) == [{"content": "자료"}]
+    assert session.reusable_retrieval([0.0, 1.0], 0.7) is None
+    assert session.reused_retrievals == 1
+    assert cosine_similarity([1.0, 0.0], [0.0, 0.0]) == 0.0
+
+
+def test_store_issues_ids_and_evicts_least_recent():
+    store = SessionStore(max_sessions=2, idle_seconds=60, history_tokens=600)
+    first, second = store.create(), store.create()
+    assert len(first.conversation_id) == 32 and first.conversation_id != second.conversation_id
+    assert store.get(first.conversation_id) is first
+    third = store.create()
+    # first를 방금 썼으므로 second가 제거된다
+    assert store.get(second.conversation_id) is None
+    assert store.get(first.conversation_id) is first and store.get(third.conversation_id) is third
+    assert store.get("guessed-id") is None
+    assert store.stats()["evicted"] == 1 and len(store) == 2
+    with pytest.raises(ValueError):
+        SessionStore(max_sessions=0)
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(max_sessions=10, idle_seconds=0.05, history_tokens=600)
+    session = store.create()
+    time.sleep(0.1)
+    assert store.get(session.conversation_id) is None
+    assert store.stats()["expired"] == 1
+
+
+def test_conversation_reuses_retrieval_and_history(make_orchestrator):
+    knowledge = FakeKnowledgeAgent()
+    orchestrator = make_orchestrator(knowledge=knowledge)
+    first = orchestrator.process_conversation(None, "창씨개명을 왜 하셨습니까?")
+    assert first["turn"] == 1 and not first["retrieval_reused"]
+    assert knowledge.inputs[0]["history"] == ""
+
+    conversation_id = first["conversation_id"]
+    # stub 임베딩은 같은 질문이면 같은 벡터라 이전 검색 결과를 그대로 쓴다
+    second = orchestrator.process_conversation(conversation_id, "창씨개명을 왜 하셨습니까?")
+    assert second["conversation_id"] == conversation_id
+    assert second["turn"] == 2 and second["retrieval_reused"]
+    assert knowledge.searches == 1
+    assert "창씨개명을 왜 하셨습니까?" in knowledge.inputs[1]["history"]
+
+    third = orchestrator.process_conversation(conversation_id, "무정은 어떤 소설입니까?")
+    assert not third["retrieval_reused"] and knowledge.searches == 2
+    metrics = orchestrator.metrics.snapshot()
+    assert metrics["session_turns"] == 3 and metrics["session_retrieval_reused"] == 1
+
+
+def test_unknown_conversation_is_rejected(make_orchestrator):
+    orchestrator = make_orchestrator(sessions=SessionStore(max_sessions=10, idle_seconds=60))
+    with pytest.raises(SessionNotFound):
+        orchestrator.process_conversation("guessed-id", "질문")
+    assert len(orchestrator.sessions) == 0
+
+
+def test_api_returns_404_for_unknown_conversation(api_client):
+    client = api_client()
+    response = client.post("/api/chat", json={"query": "질문", "conversation_id": "guessed-id"})
+    assert response.status_code == 404
+    response = client.post("/api/chat", json={"query": "질문"})
+    assert response.status_code == 200
+    conversation_id = response.json()["conversation_id"]
+    follow_up = client.post("/api/chat", json={"query": "다음 질문", "conversation_id": conversation_id})
+    assert follow_up.status_code == 200 and follow_up.json()["turn"] == 2
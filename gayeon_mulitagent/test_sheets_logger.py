@@ -0,0 +1,112 @@
+"""
+Google Sheets 배치 로거 테스트 (web_release/sheets_logger.py)
+
+- 행을 시트별로 모아 append_rows 한 번으로 기록하는지
+- 실패하면 재시도 후 스풀 파일에 저장하고, 다음 성공 때 스풀의 행도 다시 올리는지
+- 연결된 시트가 없는 종류는 바로 스풀에 저장하는지
+
+gspread 대신 append_rows만 있는 가짜 시트를 쓴다.
+
+실행:
+  python -m pytest test_sheets_logger.py
+"""
+import json
+import time
+
+import pytest
+
+from sheets_logger import SheetsLogQueue
+
+
+class FakeWorksheet:
+    """append_rows 호출을 기록하고, failures번은 실패하는 시트"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = []
+
+    def append_rows(self, rows):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("quota exceeded")
+        self.calls.append(list(rows))
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def factory(sheets, **kwargs):
+        kwargs.setdefault("flush_interval", 60)
+        kwargs.setdefault("backoff_base", 0)
+        logger = SheetsLogQueue(sheets, str(tmp_path / "spool.jsonl"), **kwargs)
+        queues.append(logger)
+        return logger
+
+    yield factory
+    for logger in queues:
+        logger.stop()
+
+
+def read_spool(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_rows_are_batched_per_sheet(make_queue):
+    conversation, feedback = FakeWorksheet(), FakeWorksheet()
+    logger = make_queue({"conversation": conversation, "feedback": feedback}, max_batch=4)
+    for n in range(3):
+        assert logger.log("conversation", [n])
+    logger.log("feedback", ["좋음"])
+    wait_until(lambda: logger.stats()["sent"] == 4)
+    assert conversation.calls == [[[0], [1], [2]]]
+    assert feedback.calls == [[["좋음"]]]
+
+
+def test_full_batch_flushes_before_interval(make_queue):
+    sheet = FakeWorksheet()
+    logger = make_queue({"conversation": sheet}, max_batch=2)
+    logger.log("conversation", [1])
+    logger.log("conversation", [2])
+    wait_until(lambda: sheet.calls)
+    assert sheet.calls == [[[1], [2]]]
+
+
+def test_retries_with_backoff(make_queue):
+    sheet = FakeWorksheet(failures=2)
+    logger = make_queue({"conversation": sheet}, max_batch=1, max_retries=3)
+    logger.log("conversation", [1])
+    wait_until(lambda: sheet.calls)
+    assert sheet.calls == [[[1]]]
+    assert logger.stats()["last_error"] == "quota exceeded"
+
+
+def test_failed_rows_are_spooled_and_replayed(make_queue, tmp_path):
+    sheet = FakeWorksheet(failures=1)
+    logger = make_queue({"conversation": sheet}, max_batch=1, max_retries=1)
+    logger.log("conversation", ["실패한 행"])
+    wait_until(lambda: logger.stats()["spooled"] == 1)
+    assert read_spool(tmp_path) == [{"sheet": "conversation", "row": ["실패한 행"]}]
+
+    # 다음 기록에 성공하면 스풀의 행도 올린다
+    logger.log("conversation", ["새 행"])
+    wait_until(lambda: logger.stats()["sent"] == 2)
+    assert sheet.calls == [[["새 행"]], [["실패한 행"]]]
+    assert read_spool(tmp_path) == []
+
+
+def test_unknown_sheet_goes_to_spool(make_queue, tmp_path):
+    logger = make_queue(None)
+    assert not logger.log("conversation", ["행"])
+    assert read_spool(tmp_path) == [{"sheet": "conversation", "row": ["행"]}]
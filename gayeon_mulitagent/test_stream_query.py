@@ -0,0 +1,64 @@
+"""
+진행 이벤트 스트리밍 테스트 (MultiAgentOrchestrator.stream_query)
+
+- 단계 시작/완료, 답변 토큰, 검증 결과 이벤트가 도착 순서대로 나오고 마지막이 result인지
+- 재시도 중의 이벤트에 시도 번호(retry)가 붙는지
+- 파이프라인 오류는 예외 대신 error 이벤트로 전달되는지
+
+실행:
+  python -m pytest test_stream_query.py
+"""
+from agents_2.errors import GenerationError, PipelineError
+from conftest import FakeKnowledgeAgent, FakeStyleAgent, FakeValidatorAgent
+
+
+class TokenStyleAgent(FakeStyleAgent):
+    """답변을 두 조각의 토큰 이벤트로 내보내는 스타일 에이전트"""
+
+    def process(self, input_data):
+        result = super().process(input_data)
+        on_event = input_data.get("on_event")
+        if on_event:
+            text = result["styled_text"]
+            for chunk in (text[:5], text[5:]):
+                on_event({"type": "token", "text": chunk})
+        return result
+
+
+def test_events_arrive_in_order(make_orchestrator):
+    orchestrator = make_orchestrator(style=TokenStyleAgent())
+    events = list(orchestrator.stream_query("질문"))
+    stages = [(e["stage"], e["status"]) for e in events if e["type"] == "stage"]
+    assert stages == [("retrieval", "start"), ("retrieval", "done"),
+                      ("validation", "start"), ("validation", "done")]
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    assert events[-1]["type"] == "result"
+    assert tokens == events[-1]["result"]["final_answer"]
+    validation = [e for e in events if e["type"] == "validation"]
+    assert validation[0]["score"] == 80 and validation[0]["is_valid"]
+
+
+def test_retry_events_are_numbered(make_orchestrator):
+    orchestrator = make_orchestrator(style=TokenStyleAgent(), validator=FakeValidatorAgent(scores=[50, 90]))
+    events = list(orchestrator.stream_query("질문"))
+    assert [e["retry"] for e in events if e["type"] == "validation"] == [0, 1]
+    assert {e["retry"] for e in events if e["type"] == "token"} == {0, 1}
+    assert ("retry", "start") in [(e["stage"], e["status"]) for e in events if e["type"] == "stage"]
+    assert events[-1]["result"]["retry_count"] == 1
+
+
+def test_pipeline_error_becomes_error_event(make_orchestrator):
+    knowledge = FakeKnowledgeAgent(error=GenerationError("KnowledgeAgent", "검색 실패"))
+    orchestrator = make_orchestrator(knowledge=knowledge)
+    events = list(orchestrator.stream_query("질문"))
+    assert events[-1]["type"] == "error"
+    assert isinstance(events[-1]["error"], PipelineError)
+
+
+def test_stream_continues_conversation(make_orchestrator):
+    orchestrator = make_orchestrator()
+    session = orchestrator.sessions.create()
+    events = list(orchestrator.stream_query("질문", conversation_id=session.conversation_id))
+    result = events[-1]["result"]
+    assert result["conversation_id"] == session.conversation_id
+    assert result["turn"] == 1
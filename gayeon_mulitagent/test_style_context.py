@@ -0,0 +1,75 @@
+"""
+요청 단위 스타일 예시 재사용 테스트 (agents_2/style_agent.py StyleContext)
+
+- 예시는 처음 필요할 때 한 번만 검색하고, 미리 검색한 예시가 있으면 검색하지 않는지
+- 재시도와 검증이 같은 예시를 쓰고, 피드백이 다른 예시를 요구할 때만 다시 검색하는지
+- 요청마다 검색 횟수가 metrics의 style_searches에 쌓이는지
+
+실행:
+  python -m pytest test_style_context.py
+"""
+from agents_2.style_agent import StyleContext
+from conftest import FakeValidatorAgent
+
+
+class CountingStyleAgent:
+    def __init__(self):
+        self.queries = []
+
+    def get_style_examples(self, query, k=3):
+        self.queries.append(query)
+        return [f"{query} 예시 {n}" for n in range(k)]
+
+
+def test_examples_are_searched_once():
+    agent = CountingStyleAgent()
+    context = StyleContext(agent, "초안", k=2)
+    assert context.cached == []
+    assert context.examples == ["초안 예시 0", "초안 예시 1"]
+    assert context.examples == context.cached
+    assert agent.queries == ["초안"] and context.searches == 1
+
+
+def test_prefetched_examples_skip_search():
+    agent = CountingStyleAgent()
+    context = StyleContext(agent, "초안", examples=["미리 찾은 예시"])
+    assert context.examples == ["미리 찾은 예시"]
+    assert agent.queries == [] and context.searches == 0
+
+
+def test_refresh_only_on_explicit_request():
+    agent = CountingStyleAgent()
+    context = StyleContext(agent, "초안")
+    context.examples
+    assert not context.wants_refresh("합리화 기제 설명이 부족함")
+    assert not context.wants_refresh(None)
+    assert context.wants_refresh("다른 예시를 참고해 문장을 다듬으세요")
+
+    context.refresh("새 기준")
+    assert context.cached == []
+    context.examples
+    assert agent.queries == ["초안", "새 기준"] and context.searches == 2
+
+
+def styled_examples(result):
+    return [entry["result"]["style_examples"] for entry in result["workflow_log"] if entry["agent"] == "StyleAgent"]
+
+
+def test_retries_reuse_one_search(make_orchestrator, stub_style_agent):
+    validator = FakeValidatorAgent(scores=(50,))
+    orchestrator = make_orchestrator(style=stub_style_agent, validator=validator, max_retries=3)
+    result = orchestrator.process_query("창씨개명을 왜 하셨습니까?", verbose=False)
+    # full -> strengthen -> full: 힌트가 붙은 초안으로 다시 변환해도 검색은 처음 한 번뿐
+    assert [entry["mode"] for entry in result["workflow_log"] if entry["agent"] == "StyleAgent"] == \
+        ["full", "strengthen", "full"]
+    examples = styled_examples(result)
+    assert examples[0] and all(e == examples[0] for e in examples)
+    assert orchestrator.metrics.snapshot()["style_searches"] == 1
+
+
+def test_feedback_asking_for_other_examples_refreshes(make_orchestrator, stub_style_agent):
+    validator = FakeValidatorAgent(scores=(50, 80), feedback="다른 예시의 어휘를 참고하세요")
+    orchestrator = make_orchestrator(style=stub_style_agent, validator=validator, max_retries=3)
+    result = orchestrator.process_query("창씨개명을 왜 하셨습니까?", verbose=False)
+    assert result["success"]
+    assert orchestrator.metrics.snapshot()["style_searches"] == 2
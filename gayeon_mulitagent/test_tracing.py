@@ -0,0 +1,139 @@
+"""
+스팬 추적 테스트 (agents_2/tracing.py, agents_2/tokens.py)
+
+- 꺼져 있거나 표본에서 빠진 요청은 아무것도 기록하지 않는지
+- 트레이스 하나가 부모-자식 스팬과 이벤트, 오류 상태를 담은 OTLP/JSON 한 줄로 기록되는지
+- 추적 중인 요청 안의 trace()는 자식 스팬이 되고, 기록 실패는 요청을 실패시키지 않는지
+- 토큰 사용량: 제공자 값이 있으면 어림값으로 덮어쓰지 않음
+- 오케스트레이터 요청의 trace_id로 파일에서 LLM 호출 스팬을 찾을 수 있는지 (stub 백엔드)
+
+실행:
+  python -m pytest test_tracing.py
+"""
+import json
+import os
+
+import pytest
+
+from agents_2.tokens import estimate_tokens
+from agents_2.tracing import (
+    STATUS_ERROR, Tracer, add_event, current_span, record_usage, set_attributes, span,
+)
+
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f]
+    return [[s for rs in r["resourceSpans"] for ss in rs["scopeSpans"] for s in ss["spans"]] for r in requests]
+
+
+def attributes(otlp_span):
+    return {a["key"]: next(iter(a["value"].values())) for a in otlp_span["attributes"]}
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    return str(tmp_path / "traces" / "traces.jsonl")
+
+
+def test_disabled_tracer_records_nothing(trace_file):
+    tracer = Tracer(path="")
+    assert not tracer.enabled
+    with tracer.trace("request") as root, span("child") as child:
+        assert root is None and child is None and current_span() is None
+        set_attributes(ignored=True)
+        add_event("ignored")
+    with Tracer(path=trace_file, sample_rate=0).trace("request") as root:
+        assert root is None
+    assert not os.path.exists(trace_file)
+
+
+def test_trace_is_exported_as_otlp(trace_file):
+    tracer = Tracer(path=trace_file)
+    with tracer.trace("request", **{"query.length": 5, "skipped": None}) as root:
+        with span("llm.generate", kind="client", model="stub") as child:
+            set_attributes(retry=1, ratio=0.5, cached=False, tags=["a", "b"])
+            add_event("first_token")
+        with pytest.raises(ValueError):
+            with span("vector.search"):
+                raise ValueError("인덱스 없음")
+    assert tracer.stats()["exported"] == 1
+
+    [spans] = read_spans(trace_file)
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) == {"request", "llm.generate", "vector.search"}
+    assert all(s["traceId"] == root.trace_id for s in spans)
+    assert "parentSpanId" not in by_name["request"]
+    assert by_name["llm.generate"]["parentSpanId"] == root.span_id
+    assert by_name["llm.generate"]["spanId"] == child.span_id
+    assert by_name["request"]["kind"] == 2 and by_name["llm.generate"]["kind"] == 3
+    assert attributes(by_name["request"]) == {"query.length": "5"}
+    assert attributes(by_name["llm.generate"]) == {
+        "model": "stub", "retry": "1", "ratio": 0.5, "cached": False,
+        "tags": {"values": [{"stringValue": "a"}, {"stringValue": "b"}]}}
+    assert by_name["llm.generate"]["events"][0]["name"] == "first_token"
+    failed = by_name["vector.search"]
+    assert failed["status"] == {"code": STATUS_ERROR, "message": "인덱스 없음"}
+    assert failed["events"][0]["name"] == "exception"
+    assert int(failed["endTimeUnixNano"]) >= int(failed["startTimeUnixNano"])
+
+
+def test_nested_trace_becomes_child_span(trace_file):
+    tracer = Tracer(path=trace_file)
+    with tracer.trace("process_conversation") as outer:
+        with tracer.trace("process_query") as inner:
+            assert inner.parent_id == outer.span_id
+    [spans] = read_spans(trace_file)
+    assert [s["name"] for s in spans] == ["process_query", "process_conversation"]
+
+
+def test_export_failure_does_not_fail_request(trace_file, monkeypatch):
+    tracer = Tracer(path=trace_file)
+
+    def fail(spans):
+        raise OSError("디스크 가득 참")
+
+    monkeypatch.setattr(tracer.exporter, "export", fail)
+    with tracer.trace("request") as root:
+        assert root is not None
+    assert tracer.stats()["dropped"] == 1
+
+
+def test_trace_file_rotates(trace_file):
+    tracer = Tracer(path=trace_file, max_bytes=500, backups=1)
+    for _ in range(5):
+        with tracer.trace("request", padding="가" * 100):
+            pass
+    tracer.exporter.close()
+    assert os.path.exists(trace_file + ".1")
+    assert not os.path.exists(trace_file + ".2")
+
+
+def test_estimated_usage_does_not_overwrite_provider_usage(trace_file):
+    with Tracer(path=trace_file).trace("request") as root:
+        record_usage(None, None, estimated=True)
+        record_usage(12, 3)
+        record_usage(estimate_tokens("질문"), estimate_tokens("답"), estimated=True)
+    assert root.attributes == {"gen_ai.usage.input_tokens": 12, "gen_ai.usage.output_tokens": 3,
+                               "gen_ai.usage.estimated": False}
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("가") == 1
+    assert estimate_tokens("가나다라") == 2
+
+
+def test_orchestrator_request_trace(make_orchestrator, stub_style_agent, trace_file):
+    orchestrator = make_orchestrator(style=stub_style_agent, tracer=Tracer(path=trace_file))
+    result = orchestrator.process_query("창씨개명을 왜 하셨습니까?", verbose=False)
+    [spans] = read_spans(trace_file)
+    assert all(s["traceId"] == result["trace_id"] for s in spans)
+    root = next(s for s in spans if s["name"] == "process_query")
+    style = next(s for s in spans if s["name"] == "StyleAgent.process")
+    assert style["parentSpanId"] == root["spanId"]
+    calls = [s for s in spans if s["name"] == "llm.generate"]
+    assert [attributes(s)["agent.step"] for s in calls] == ["tone", "modernize"]
+    assert all(s["parentSpanId"] == style["spanId"] for s in calls)
+    # stub 백엔드는 사용량을 주지 않으므로 글자 수 어림값
+    assert all(attributes(s)["gen_ai.usage.estimated"] is True for s in calls)
@@ -0,0 +1,163 @@
+"""
+사용 통계 증분 집계 테스트 (web_release/usage_stats.py)
+
+- 로그 기록기 플러시마다 오늘의 집계가 갱신되고, 전체 로그를 다시 읽은 결과와 같은지
+- 스냅샷 + 나머지 부분만 읽어 재시작 후 집계를 복원하는지 (중복 집계 없음)
+- 날짜가 바뀌면 어제 집계를 저장하고 새로 시작하는지
+- 지난 날짜는 일별 요약 파일로 응답하고 기간 통계는 날짜별 요약을 합치는지
+
+실행:
+  python -m pytest test_usage_stats.py
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from log_writer import LogWriter
+from usage_stats import DailyAggregate, UsageStats, scan_log
+
+ENTRIES = [
+    {"score": 85, "success": True, "retry_count": 0},
+    {"score": 62, "success": False, "retry_count": 2},
+    {"score": 100, "success": True, "retry_count": 1},
+]
+
+
+def today():
+    return datetime.now().strftime('%Y%m%d')
+
+
+def write_log(path, entries):
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def make_stats(tmp_path, **kwargs):
+    writer = LogWriter()
+    stats = UsageStats(str(tmp_path), writer, **kwargs)
+    writer.add_listener(stats.on_flush)
+    return writer, stats
+
+
+def test_aggregate_summary():
+    agg = DailyAggregate()
+    for entry in ENTRIES:
+        agg.add(entry)
+    summary = agg.summary()
+    assert summary["total_queries"] == 3
+    assert summary["avg_score"] == pytest.approx(247 / 3)
+    assert (summary["min_score"], summary["max_score"]) == (62, 100)
+    assert summary["success_rate"] == pytest.approx(2 / 3)
+    assert summary["avg_retry"] == 1
+    # 100점은 마지막 구간(90)에 들어간다
+    assert summary["score_histogram"] == {"60": 1, "80": 1, "90": 1}
+    assert summary["retry_histogram"] == {"0": 1, "1": 1, "2": 1}
+
+
+def test_merge_equals_single_aggregate():
+    whole, first, second = DailyAggregate(), DailyAggregate(), DailyAggregate()
+    for entry in ENTRIES:
+        whole.add(entry)
+    first.add(ENTRIES[0])
+    for entry in ENTRIES[1:]:
+        second.add(entry)
+    first.merge(second)
+    assert first.to_dict() == whole.to_dict()
+    assert DailyAggregate.from_dict(whole.to_dict()).summary() == whole.summary()
+
+
+def test_scan_log_skips_partial_last_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write_log(path, ENTRIES[:2])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"score": 50')
+    agg, offset = scan_log(str(path))
+    assert agg.count == 2
+    assert offset == len(json.dumps(ENTRIES[0])) + len(json.dumps(ENTRIES[1])) + 2
+
+
+def test_on_flush_matches_full_scan(tmp_path):
+    writer, stats = make_stats(tmp_path)
+    stats.load()
+    for entry in ENTRIES:
+        writer.write(str(tmp_path), entry)
+    writer.stop()
+    full, _ = scan_log(writer.path_for(str(tmp_path), today()))
+    assert stats.day_aggregate(today()).to_dict() == full.to_dict()
+
+
+def test_restart_resumes_from_snapshot(tmp_path):
+    writer, stats = make_stats(tmp_path)
+    stats.load()
+    writer.write(str(tmp_path), ENTRIES[0])
+    writer.stop()
+    stats.snapshot()
+
+    # 스냅샷 이후 다른 프로세스가 덧붙인 줄은 재시작할 때 한 번만 반영된다
+    write_log(writer.path_for(str(tmp_path), today()), ENTRIES[1:])
+    _, restarted = make_stats(tmp_path)
+    restarted.load()
+    assert restarted.day_aggregate(today()).count == 3
+
+
+def test_corrupt_snapshot_rescans(tmp_path):
+    writer, stats = make_stats(tmp_path)
+    stats.load()
+    for entry in ENTRIES:
+        writer.write(str(tmp_path), entry)
+    writer.stop()
+    stats.snapshot()
+    snapshot_path = os.path.join(str(tmp_path), "summary", f"{today()}.snapshot.json")
+    with open(snapshot_path, "w") as f:
+        f.write("{")
+    _, restarted = make_stats(tmp_path)
+    restarted.load()
+    assert restarted.day_aggregate(today()).count == 3
+
+
+def test_date_rollover_snapshots_previous_day(tmp_path):
+    _, stats = make_stats(tmp_path)
+    stats.on_flush([(str(tmp_path), "20240101", ENTRIES[0])])
+    stats.on_flush([(str(tmp_path), "20240102", ENTRIES[1])])
+    snapshot_path = tmp_path / "summary" / "20240101.snapshot.json"
+    with open(snapshot_path, encoding="utf-8") as f:
+        assert json.load(f)["aggregate"]["count"] == 1
+    assert stats._date == "20240102"
+    assert stats._today.count == 1
+
+
+def test_past_day_uses_summary_file(tmp_path):
+    _, stats = make_stats(tmp_path)
+    date = (datetime.now() - timedelta(days=2)).strftime('%Y%m%d')
+    write_log(tmp_path / f"{date}.jsonl", ENTRIES)
+    assert stats.day_aggregate(date).count == 3
+    summary_path = tmp_path / "summary" / f"{date}.json"
+    assert summary_path.exists()
+
+    # 로그 크기가 같으면 요약 파일을 그대로 사용
+    with open(summary_path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["aggregate"]["count"] = 99
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert stats.day_aggregate(date).count == 99
+
+    # 로그가 바뀌면 다시 만든다
+    write_log(tmp_path / f"{date}.jsonl", ENTRIES[:1])
+    assert stats.day_aggregate(date).count == 4
+
+
+def test_range_summary(tmp_path):
+    _, stats = make_stats(tmp_path)
+    days = [(datetime.now() - timedelta(days=n)).strftime('%Y%m%d') for n in (3, 2)]
+    write_log(tmp_path / f"{days[0]}.jsonl", ENTRIES[:1])
+    write_log(tmp_path / f"{days[1]}.jsonl", ENTRIES[1:])
+    result = stats.range_summary(days[0], days[1])
+    assert result["total_queries"] == 3
+    assert sorted(result["days"]) == days
+    assert result["days"][days[1]]["total_queries"] == 2
+    with pytest.raises(ValueError):
+        stats.range_summary(days[1], days[0])
@@ -0,0 +1,96 @@
+"""
+검증 응답 파싱 테스트 (ValidatorAgent._parse_output / _repair_output)
+
+- 스키마대로 온 JSON은 "json", 형식이 어긋난 JSON은 재호출 없이 복구해 "repaired"
+- JSON이 없으면 예전 줄 단위 형식으로 읽어 "legacy", 점수를 하나도 못 읽으면 "failed"
+- stub 백엔드의 스키마 응답으로 process()가 점수와 통과 여부를 돌려주는지
+
+실행:
+  python -m pytest test_validator_output.py
+"""
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from agents_2.backends import get_backend  # noqa: E402
+from agents_2.validator_agent import ValidatorAgent  # noqa: E402
+
+
+@pytest.fixture
+def validator():
+    return ValidatorAgent(backend=get_backend("stub"))
+
+
+def evaluation(**overrides):
+    data = {
+        "trigger_analysis": 25, "mechanism_identification": 30, "persuasiveness": 20,
+        "total_score": 75, "reasoning": "외부 정당화가 분명함", "feedback": "PASS",
+    }
+    data.update(overrides)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def test_schema_json(validator):
+    score, aspects, feedback, reasoning, status = validator._parse_output(evaluation())
+    assert status == "json"
+    assert score == 75
+    assert aspects == {"trigger_analysis": 25, "mechanism_identification": 30, "persuasiveness": 20}
+    # 평가 사유는 피드백에 섞지 않는다
+    assert feedback == "PASS" and reasoning == "외부 정당화가 분명함"
+
+
+def test_code_fence_and_trailing_comma_are_repaired(validator):
+    text = "평가 결과입니다.\n```json\n" + evaluation()[:-1] + ",\n}\n```"
+    score, _, _, _, status = validator._parse_output(text)
+    assert status == "repaired"
+    assert score == 75
+
+
+def test_string_and_out_of_range_scores_are_repaired(validator):
+    text = evaluation(trigger_analysis="25/30", mechanism_identification=55, persuasiveness=None, total_score=0)
+    score, aspects, _, _, status = validator._parse_output(text)
+    assert status == "repaired"
+    assert aspects == {"trigger_analysis": 25, "mechanism_identification": 40, "persuasiveness": 0}
+    # 빠진 총점은 세부 점수 합
+    assert score == 65
+
+
+def test_missing_text_fields_are_repaired(validator):
+    data = json.loads(evaluation())
+    del data["reasoning"], data["feedback"]
+    score, _, feedback, reasoning, status = validator._parse_output(json.dumps(data))
+    assert status == "repaired"
+    assert score == 75 and feedback == "" and reasoning == ""
+
+
+def test_legacy_line_format(validator):
+    text = "\n".join([
+        "Step 1 부조화 트리거 분석: 20/30",
+        "Step 2 합리화 기제 식별: 30/40",
+        "Step 3 설득력 평가: 15/30",
+        "Total Score: 65",
+        "Reasoning: 근대화 논리는 있으나 변명이 약함",
+        "Feedback: 외부 정당화를 더 쓰세요",
+    ])
+    score, aspects, feedback, reasoning, status = validator._parse_output(text)
+    assert status == "legacy"
+    assert score == 65
+    assert aspects["mechanism_identification"] == 30
+    assert feedback == "외부 정당화를 더 쓰세요"
+    assert reasoning == "근대화 논리는 있으나 변명이 약함"
+
+
+def test_unreadable_response_fails(validator):
+    score, aspects, _, _, status = validator._parse_output("평가할 수 없습니다")
+    assert status == "failed"
+    assert score == 0 and not any(aspects.values())
+
+
+def test_process_with_stub_backend(validator, monkeypatch):
+    monkeypatch.setenv("STUB_SCORE_RATIO", "0.5")
+    result = validator.process({"generated_text": "답변", "original_query": "질문", "style_examples": ["예시"]})
+    assert result["parse_status"] == "json"
+    assert result["score"] == 50
+    assert not result["is_valid"]
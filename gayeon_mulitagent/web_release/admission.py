@@ -0,0 +1,126 @@
+"""
+/api/chat 요청 수락 제어 (동시 실행 제한 + 크기 제한 대기열)
+
+한 요청이 수십 초 동안 워커를 점유하고 상위 API를 여러 번 호출하므로,
+동시에 처리하는 요청 수를 제한하고 나머지는 제한된 대기열에서 기다리게 한다.
+대기열이 가득 차면 429, 대기 시간이 초과되면 503을 Retry-After와 함께 즉시 반환한다.
+
+모든 상태는 이벤트 루프 스레드에서만 갱신되므로 별도의 락이 필요 없다.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+
+
+class AdmissionRejected(Exception):
+    """요청 거절 (HTTP 상태 코드와 Retry-After 초를 포함)"""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """동시 실행 수와 대기열 길이를 제한하는 수락 제어기"""
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16,
+                 queue_timeout: float = 30.0, history_size: int = 200):
+        """
+        Args:
+            max_concurrent: 동시에 처리할 최대 요청 수
+            max_queue: 대기열에서 기다릴 수 있는 최대 요청 수
+            queue_timeout: 대기열 최대 대기 시간 (초)
+            history_size: 대기/처리 시간 통계에 사용할 최근 요청 수
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent는 1 이상이어야 합니다")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._wait_times = deque(maxlen=history_size)
+        self._service_times = deque(maxlen=history_size)
+
+    def _estimate_retry_after(self) -> int:
+        """현재 대기열이 비워지는 데 걸릴 예상 시간 (초, 최소 1)"""
+        if self._service_times:
+            avg_service = sum(self._service_times) / len(self._service_times)
+        else:
+            avg_service = self.queue_timeout / 2
+        backlog = self.queue_depth + self.in_flight
+        return max(1, math.ceil(avg_service * backlog / self.max_concurrent))
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        처리 슬롯 획득
+
+        Yields:
+            대기열에서 기다린 시간 (초)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나(429) 대기 시간이 초과된 경우(503)
+        """
+        # 슬롯 획득 전 요청도 queue_depth에 포함되므로 전체 수용량과 비교한다
+        if self.in_flight + self.queue_depth >= self.max_concurrent + self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, self._estimate_retry_after(), "대기열이 가득 찼습니다")
+
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(503, self._estimate_retry_after(), "대기 시간이 초과되었습니다")
+        finally:
+            self.queue_depth -= 1
+
+        wait_time = time.monotonic() - start
+        self._wait_times.append(wait_time)
+        self.admitted += 1
+        self.in_flight += 1
+        service_start = time.monotonic()
+        try:
+            yield wait_time
+        finally:
+            self._service_times.append(time.monotonic() - service_start)
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """현재 대기열 상태와 최근 대기/처리 시간 통계"""
+        waits = sorted(self._wait_times)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p * len(waits)))]
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "wait_ms_p50": round(percentile(0.5) * 1000, 1),
+            "wait_ms_p95": round(percentile(0.95) * 1000, 1),
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            "service_ms_avg": round(
+                sum(self._service_times) / len(self._service_times) * 1000, 1
+            ) if self._service_times else 0.0,
+        }
@@ -1,15 +1,19 @@
 """
 FastAPI 백엔드 - 이광수 AI API (인증 없음)
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from contextlib import asynccontextmanager, AsyncExitStack
+import asyncio
 import json
 import os
 import sys
-import uuid
+import time
 from dotenv import load_dotenv
 
 # .env 파일 로드 (상위 디렉토리)
@@ -20,11 +24,40 @@ load_dotenv(env_path)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents_2.orchestrator import MultiAgentOrchestrator
+from agents_2.deadline import Deadline
+from agents_2.errors import AgentError, DeadlineExceeded, PipelineError, SessionNotFound
+from agents_2.metrics import PipelineMetrics
+from agents_2.session import new_conversation_id
+from admission import AdmissionController, AdmissionRejected
+from log_writer import LogWriter
+from usage_stats import UsageStats
+from feedback_summary import FeedbackSummary
+from log_store import LogStore
+
+# 대화/사용/피드백 로그는 백그라운드 기록기가 모아서 기록
+log_writer = LogWriter.from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 로그 기록기를 띄우고, 종료 시 남은 로그를 모두 기록"""
+    usage_stats.load()
+    feedback_summary.load()
+    log_writer.start()
+    if os.getenv("AGENT_PREWARM", "0") == "1":
+        # 요청은 바로 받고, 에이전트/인덱스는 백그라운드에서 미리 준비
+        orchestrator.prewarm()
+    yield
+    log_writer.stop()
+    usage_stats.snapshot()
+    feedback_summary.snapshot()
+
 
 app = FastAPI(
     title="이광수 AI API",
     description="인지부조화 이론 기반 분석 시스템",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -44,11 +77,68 @@ os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(CONVERSATION_LOG_DIR, exist_ok=True)
 os.makedirs(FEEDBACK_LOG_DIR, exist_ok=True)
 
+# 사용 통계는 기록된 로그를 받아 메모리에서 증분 집계
+usage_stats = UsageStats(LOG_DIR, log_writer)
+log_writer.add_listener(usage_stats.on_flush)
+
+# 피드백 요약도 평점 집계 + 최근 피드백 링 버퍼로 유지
+feedback_summary = FeedbackSummary(FEEDBACK_LOG_DIR, log_writer)
+log_writer.add_listener(feedback_summary.on_flush)
+
+# 선택: SQLite 로그 저장소 (LOG_STORE_PATH 설정 시 JSONL과 함께 배치로 기록)
+log_store = None
+if os.getenv("LOG_STORE_PATH"):
+    log_store = LogStore(os.getenv("LOG_STORE_PATH"), {
+        CONVERSATION_LOG_DIR: "conversations",
+        LOG_DIR: "usage",
+        FEEDBACK_LOG_DIR: "feedback",
+    })
+    log_writer.add_listener(log_store.on_flush)
+
+
+def require_log_store() -> LogStore:
+    """로그 저장소가 꺼져 있으면 503"""
+    if log_store is None:
+        raise HTTPException(
+            status_code=503,
+            detail="로그 저장소가 비활성화되어 있습니다 (LOG_STORE_PATH 설정 필요)"
+        )
+    return log_store
+
+# 파이프라인 메트릭 (프로세스 단위)
+pipeline_metrics = PipelineMetrics()
+
+# Orchestrator는 프로세스당 하나만 두고, 에이전트는 첫 요청(또는 prewarm) 때 생성
+_base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+orchestrator = MultiAgentOrchestrator(
+    talk_style_dir=os.path.join(_base_dir, "GS_talk_style"),
+    paper_dir=os.path.join(_base_dir, "GS_paper"),
+    max_retries=3,
+    metrics=pipeline_metrics,
+    prewarm=False
+)
+
+# 배치 요청: 한 번에 받을 최대 질문 수, 배치 하나 안에서 동시에 실행할 파이프라인 수
+BATCH_MAX_QUERIES = int(os.getenv("API_BATCH_MAX_QUERIES", "500"))
+BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "4"))
+
+# 요청 마감 시간 (초): 요청이 따로 주지 않을 때의 기본값과 허용하는 최대값 (0이면 제한 없음)
+API_DEADLINE = float(os.getenv("API_DEADLINE", "0"))
+API_MAX_DEADLINE = float(os.getenv("API_MAX_DEADLINE", "0"))
+
+# 동시 처리 제한 및 대기열 (환경변수로 조정)
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("API_MAX_CONCURRENT", "4")),
+    max_queue=int(os.getenv("API_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("API_QUEUE_TIMEOUT", "30"))
+)
+
 
 def log_conversation(conversation_id: str, query: str, answer: str, result: Dict[str, Any]):
     """전체 대화 내용 저장 (질문 + 답변)"""
     log_entry = {
         "conversation_id": conversation_id,
+        "turn": result.get("turn", 1),
         "timestamp": datetime.now().isoformat(),
         "query": query,
         "answer": answer,
@@ -56,13 +146,12 @@ def log_conversation(conversation_id: str, query: str, answer: str, result: Dict
         "validation_details": result.get("validation_details", {}),
         "knowledge_sources": result.get("knowledge_sources", []),
         "success": result.get("success", False),
-        "retry_count": result.get("retry_count", 0)
+        "retry_count": result.get("retry_count", 0),
+        "failure": result.get("failure")
     }
     
-    # 일별 대화 로그 저장
-    log_file = os.path.join(CONVERSATION_LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    # 일별 대화 로그 저장 (백그라운드 기록)
+    log_writer.write(CONVERSATION_LOG_DIR, log_entry)
 
 
 def log_usage(query: str, result: Dict[str, Any]):
@@ -75,23 +164,56 @@ def log_usage(query: str, result: Dict[str, Any]):
         "retry_count": result.get("retry_count", 0)
     }
     
-    log_file = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    log_writer.write(LOG_DIR, log_entry)
+
+
+def request_deadline(seconds: Optional[float], arrived: float) -> Optional[Deadline]:
+    """
+    요청 마감 시간 (도착 시각부터 세므로 대기열 대기 시간도 예산에 포함)
+    
+    Args:
+        seconds: 요청이 준 예산 (None이면 API_DEADLINE, 둘 다 없으면 오케스트레이터 기본값)
+        arrived: 요청 도착 시각 (time.monotonic)
+    """
+    if seconds is None:
+        seconds = API_DEADLINE or None
+    if seconds is None:
+        return None
+    if seconds <= 0:
+        raise HTTPException(status_code=400, detail="deadline은 0보다 커야 합니다")
+    if API_MAX_DEADLINE > 0:
+        seconds = min(seconds, API_MAX_DEADLINE)
+    return Deadline(seconds, started=arrived)
 
 
 # 요청/응답 모델
 class ChatRequest(BaseModel):
     query: str
+    conversation_id: Optional[str] = None  # 이전 응답에서 받은 대화 ID (없으면 새 대화, 서버가 발급)
+    deadline: Optional[float] = None  # 마감 시간 (초, X-Request-Deadline 헤더보다 우선)
     
+class BatchChatRequest(BaseModel):
+    queries: List[str]
+    concurrency: Optional[int] = None  # 최대 API_BATCH_CONCURRENCY
+    deadline: Optional[float] = None  # 질문 하나당 마감 시간 (초, 질문 처리를 시작한 시각부터)
+
 class ChatResponse(BaseModel):
     conversation_id: str
+    turn: int = 1  # 이 대화에서 몇 번째 질문인지
+    retrieval_reused: bool = False  # 이전 턴의 검색 결과를 재사용했는지
     answer: str
     validation_score: float
     validation_details: Dict[str, Any]
     knowledge_sources: list
     retry_count: int
     success: bool
+    degraded: bool = False
+    failure: Optional[Dict[str, Any]] = None
+    deadline: Optional[Dict[str, Any]] = None  # {"budget", "remaining", "expired"}
+    skipped_stages: List[Dict[str, Any]] = []  # 마감 시간 때문에 건너뛴 단계
+    cached: bool = False  # 답변 캐시(prewarm_cache.py)에서 바로 돌려준 답변인지
+    profile: Optional[Dict[str, Any]] = None  # 이 요청의 프로파일 파일 {"mode", "path", "seconds", ...}
+    trace_id: Optional[str] = None  # 추적 파일(TRACE_FILE)에서 이 요청의 스팬을 찾을 트레이스 ID
 
 
 @app.get("/")
@@ -108,27 +230,57 @@ async def root():
 @app.get("/health")
 async def health_check():
     """상태 확인"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "agents_ready": orchestrator.is_ready(),
+        "in_flight": admission.in_flight,
+        "queue_depth": admission.queue_depth
+    }
+
+
+def run_pipeline(conversation_id: Optional[str], query: str, deadline: Optional[Deadline] = None,
+                 profile: Optional[bool] = None) -> Dict[str, Any]:
+    """Orchestrator 실행 (블로킹 - 스레드풀에서 호출, 같은 대화 세션에 이어서 처리)"""
+    return orchestrator.process_conversation(conversation_id, query, deadline=deadline, profile=profile)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, response: Response,
+               x_request_deadline: Optional[float] = Header(None),
+               x_profile: Optional[str] = Header(None)):
     """
     이광수 AI와 대화
+    
+    동시 처리 한도를 넘으면 대기열에서 기다리며, 대기열이 가득 차면 429,
+    대기 시간이 초과되면 503을 Retry-After 헤더와 함께 반환한다.
+    
+    마감 시간(본문 deadline 또는 X-Request-Deadline 헤더, 초)을 주면 대기 시간을 포함해
+    그 안에 응답한다. 재시도할 시간이 모자라면 최고점 후보를 돌려주고 건너뛴 단계를
+    skipped_stages에 담으며, 초안조차 만들 시간이 없으면 504를 반환한다.
+    
+    이전 응답의 conversation_id를 함께 보내면 같은 대화로 이어진다 (이전 턴 요약과 검색 결과 재사용).
+    대화 ID는 서버가 발급하며, 발급하지 않았거나 만료된(SESSION_IDLE_SECONDS) ID는 404를 반환한다.
+    이때는 conversation_id 없이 보내 새 대화를 시작한다.
+    
+    X-Profile: 1 헤더를 주면 이 요청을 프로파일링한다 (서버에 PROFILE_MODE가 켜져 있고
+    분당 한도 안일 때만, 파일 위치는 응답의 profile).
     """
+    if request.conversation_id is not None and not 0 < len(request.conversation_id) <= 64:
+        raise HTTPException(status_code=400, detail="conversation_id는 1~64자여야 합니다")
+    deadline = request_deadline(
+        request.deadline if request.deadline is not None else x_request_deadline,
+        time.monotonic()
+    )
     try:
-        # 대화 ID 생성
-        conversation_id = str(uuid.uuid4())[:8]
-        
-        # Orchestrator 초기화 및 실행 (절대 경로 사용)
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        orchestrator = MultiAgentOrchestrator(
-            talk_style_dir=os.path.join(base_dir, "GS_talk_style"),
-            paper_dir=os.path.join(base_dir, "GS_paper"),
-            max_retries=3
-        )
-        
-        result = orchestrator.process_query(request.query, verbose=False)
+        async with admission.slot() as wait_time:
+            response.headers["X-Queue-Wait-Ms"] = f"{wait_time * 1000:.0f}"
+            
+            # 파이프라인은 블로킹 호출이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+            # (새 대화면 오케스트레이터가 대화 ID를 발급)
+            profile = True if (x_profile or "").lower() in ("1", "true", "yes") else None
+            result = await run_in_threadpool(run_pipeline, request.conversation_id, request.query,
+                                             deadline, profile)
+            conversation_id = result["conversation_id"]
         
         # 전체 대화 로그 기록 (질문 + 답변)
         log_conversation(conversation_id, request.query, result["final_answer"], result)
@@ -138,14 +290,45 @@ async def chat(request: ChatRequest):
         
         return ChatResponse(
             conversation_id=conversation_id,
+            turn=result["turn"],
+            retrieval_reused=result["retrieval_reused"],
             answer=result["final_answer"],
             validation_score=result["validation_score"],
-            validation_details=result["validation_details"],
+            validation_details=result["validation_details"] or {},
             knowledge_sources=result["knowledge_sources"],
             retry_count=result["retry_count"],
-            success=result["success"]
+            success=result["success"],
+            degraded=result.get("degraded", False),
+            failure=result.get("failure"),
+            deadline=result.get("deadline"),
+            skipped_stages=result.get("skipped_stages", []),
+            cached=result.get("cached", False),
+            profile=result.get("profile"),
+            trace_id=result.get("trace_id")
         )
         
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except SessionNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail="대화 세션을 찾을 수 없습니다 (만료되었거나 발급되지 않은 ID). conversation_id 없이 새 대화를 시작하세요"
+        )
+    except PipelineError as e:
+        if isinstance(e.cause, DeadlineExceeded):
+            raise HTTPException(
+                status_code=504,
+                detail=f"마감 시간 안에 답변을 만들지 못했습니다: {e.cause}"
+            )
+        # 상위 API 실패: 오류 문자열을 답변으로 돌려주지 않는다
+        raise HTTPException(
+            status_code=502,
+            detail=f"{e.stage} 단계 실패: {e.cause}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -153,31 +336,272 @@ async def chat(request: ChatRequest):
         )
 
 
-@app.get("/api/stats")
-async def get_stats():
-    """통계"""
-    log_file = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
+class SlotStreamingResponse(StreamingResponse):
+    """
+    수락 슬롯을 잡은 채 돌려주는 스트리밍 응답
+
+    본문 생성기의 finally는 생성기가 한 번이라도 실행돼야 돌기 때문에, 클라이언트가 본문을 읽기 전에
+    끊으면 슬롯이 반환되지 않는다. 응답 전송이 어떻게 끝나든(정상 / 끊김 / 오류) 슬롯을 닫는다.
+    (AsyncExitStack.aclose는 두 번 불러도 한 번만 반환)
+    """
     
-    if not os.path.exists(log_file):
-        return {"total_queries": 0, "avg_score": 0}
+    def __init__(self, content, slot: AsyncExitStack, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
     
-    stats = {"total_queries": 0, "avg_score": 0, "scores": []}
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.slot.aclose()
+
+
+def prefetch_batch(queries: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """배치 검색 (한 번의 임베딩 호출 + 인덱스별 행렬 검색). 실패하면 None - 질문마다 따로 검색"""
+    try:
+        return orchestrator.prefetch(queries)
+    except AgentError as e:
+        print(f"배치 검색 실패, 질문별 검색으로 진행: {e}")
+        return None
+
+
+def ndjson_line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def run_batch_item(index: int, query: str, prefetched: Optional[Dict[str, Any]],
+                         semaphore: asyncio.Semaphore, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    배치의 질문 하나 처리 (실패는 오류 레코드로 반환하고 다른 질문에 영향을 주지 않음)
     
-    with open(log_file, "r", encoding="utf-8") as f:
-        for line in f:
+    질문마다 수락 슬롯을 하나씩 잡으므로 배치도 /api/chat과 같은 동시 처리 한도 안에서 실행된다.
+    semaphore는 배치 하나가 대기열을 한꺼번에 채우지 않도록 슬롯을 기다리는 질문 수를 제한한다.
+    """
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            async with admission.slot():
+                result = await run_in_threadpool(
+                    orchestrator.process_query, query, False, None, prefetched,
+                    request_deadline(deadline, started)
+                )
+        except AdmissionRejected as e:
+            error = f"요청 거절 ({e.status_code}): {e.reason}"
+        except PipelineError as e:
+            error = f"{e.stage} 단계 실패: {e.cause}"
+        except Exception as e:
+            error = f"처리 중 오류 발생: {str(e)}"
+        else:
+            conversation_id = new_conversation_id()
+            log_conversation(conversation_id, query, result["final_answer"], result)
+            log_usage(query, result)
+            return {
+                "type": "result",
+                "index": index,
+                "query": query,
+                "conversation_id": conversation_id,
+                "answer": result["final_answer"],
+                "validation_score": result["validation_score"],
+                "knowledge_sources": result["knowledge_sources"],
+                "retry_count": result["retry_count"],
+                "success": result["success"],
+                "degraded": result.get("degraded", False),
+                "failure": result.get("failure"),
+                "skipped_stages": result.get("skipped_stages", []),
+                "cached": result.get("cached", False),
+                "trace_id": result.get("trace_id"),
+                "elapsed": round(time.monotonic() - started, 2)
+            }
+        return {
+            "type": "error",
+            "index": index,
+            "query": query,
+            "error": error,
+            "elapsed": round(time.monotonic() - started, 2)
+        }
+
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """
+    여러 질문을 한 번에 처리하고 결과를 NDJSON으로 끝나는 순서대로 스트리밍
+    
+    질문 임베딩은 한 번의 호출로, 논문/스타일 인덱스 검색은 각각 행렬 연산 한 번으로 처리하고,
+    LLM 단계는 최대 concurrency개까지 동시에 실행한다. 배치 검색은 수락 슬롯 하나로, 이후 질문은
+    각각 수락 슬롯을 잡고 처리하므로 concurrency는 API_MAX_CONCURRENT를 넘지 않는다.
+    
+    각 줄은 {"type": "result", "index": ...} 또는 {"type": "error", "index": ...}이며,
+    마지막 줄은 처리량과 실패 수를 담은 {"type": "summary", ...}이다.
+    """
+    queries = request.queries
+    if not queries:
+        raise HTTPException(status_code=400, detail="queries가 비어 있습니다")
+    if len(queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {BATCH_MAX_QUERIES}개의 질문을 보낼 수 있습니다"
+        )
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY,
+                             admission.max_concurrent))
+    if request.deadline is not None and request.deadline <= 0:
+        raise HTTPException(status_code=400, detail="deadline은 0보다 커야 합니다")
+    
+    # 거절(429/503)은 스트림 시작 전에 돌려주고, 수락되면 슬롯은 배치 검색이 끝날 때
+    # (본문을 읽기 전에 끊기면 응답이 끝날 때 SlotStreamingResponse가) 반환
+    slot = AsyncExitStack()
+    try:
+        wait_time = await slot.enter_async_context(admission.slot())
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    async def stream():
+        started = time.monotonic()
+        succeeded, validated, failed_indices = 0, 0, []
+        tasks = []
+        try:
             try:
-                entry = json.loads(line)
-                stats["total_queries"] += 1
-                stats["scores"].append(entry.get("score", 0))
-            except:
-                continue
+                prefetched = await run_in_threadpool(prefetch_batch, queries)
+            finally:
+                await slot.aclose()
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = [
+                asyncio.create_task(run_batch_item(i, query, prefetched[i] if prefetched else None, semaphore,
+                                                   request.deadline))
+                for i, query in enumerate(queries)
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                record = await next_done
+                if record["type"] == "result":
+                    succeeded += 1
+                    validated += 1 if record["success"] else 0
+                else:
+                    failed_indices.append(record["index"])
+                yield ndjson_line(record)
+            
+            elapsed = time.monotonic() - started
+            yield ndjson_line({
+                "type": "summary",
+                "total": len(queries),
+                "succeeded": succeeded,
+                "validated": validated,
+                "failed": len(failed_indices),
+                "failed_indices": sorted(failed_indices),
+                "concurrency": concurrency,
+                "batched_retrieval": prefetched is not None,
+                "queue_wait": round(wait_time, 2),
+                "elapsed": round(elapsed, 2),
+                "queries_per_minute": round(len(queries) / elapsed * 60, 2) if elapsed > 0 else 0.0
+            })
+        finally:
+            # 클라이언트가 끊기면 아직 시작하지 않은 질문은 취소
+            for task in tasks:
+                task.cancel()
+            await slot.aclose()
+    
+    return SlotStreamingResponse(stream(), slot, media_type="application/x-ndjson")
+
+
+@app.get("/api/admission")
+async def get_admission_stats():
+    """요청 대기열 상태 (처리 중/대기 중 요청 수, 대기 시간)"""
+    return admission.stats()
+
+
+@app.get("/api/sessions")
+async def get_session_stats():
+    """대화 세션 저장소 상태 (활성 세션 수, LRU 제거 / 유휴 만료 횟수)"""
+    return orchestrator.sessions.stats()
+
+
+@app.delete("/api/sessions/{conversation_id}")
+async def end_session(conversation_id: str):
+    """
+    대화 세션 종료 (이전 턴 기록과 검색 결과를 버림)
+    
+    발급한 대화 ID를 아는 쪽만 종료할 수 있고, 없는 ID는 존재 여부를 구분하지 않고 404를 반환한다.
+    """
+    if not orchestrator.sessions.discard(conversation_id):
+        raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+    return {"status": "success", "conversation_id": conversation_id}
+
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """답변 캐시 상태 (항목 수, 완전 일치 / 의미 일치 적중 수, 적중률)"""
+    if orchestrator.answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.answer_cache.stats()}
+
+
+@app.get("/api/profiler")
+async def get_profiler_stats():
+    """요청 프로파일러 설정과 프로파일링 / 한도 초과 횟수"""
+    return orchestrator.profiler.stats()
+
+
+@app.get("/api/tracing")
+async def get_tracing_stats():
+    """스팬 추적 상태 (기록 파일, 기록한 / 실패한 트레이스 수)"""
+    return orchestrator.tracer.stats()
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """파이프라인 메트릭 (실패 횟수, 낭비된 호출 수 등)"""
+    return pipeline_metrics.snapshot()
+
+
+@app.get("/api/logs/status")
+async def get_log_writer_status():
+    """로그 기록기 상태 (대기 중/기록된/버려진 항목 수)"""
+    return log_writer.stats()
+
+
+@app.get("/api/stats")
+async def get_stats(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    통계
     
-    # 평균 계산
-    if stats["scores"]:
-        stats["avg_score"] = sum(stats["scores"]) / len(stats["scores"])
-    del stats["scores"]
+    파라미터가 없으면 오늘 통계, start/end(YYYYMMDD)를 주면 기간 통계를 반환한다.
+    오늘 통계는 메모리 집계, 지난 날짜는 일별 요약 파일에서 읽으므로 로그 전체를 다시 읽지 않는다.
+    """
+    if start is None and end is None:
+        return usage_stats.day_aggregate(datetime.now().strftime('%Y%m%d')).summary()
     
-    return stats
+    today = datetime.now().strftime('%Y%m%d')
+    try:
+        # 요약 파일이 없는 날짜는 한 번 재집계하므로 스레드풀에서 실행
+        return await run_in_threadpool(usage_stats.range_summary, start or end, end or today)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 날짜 형식: {e}")
+
+
+@app.get("/api/store/stats")
+async def get_store_stats(start: str, end: Optional[str] = None):
+    """기간 통계 (SQLite 저장소, start/end: YYYYMMDD)"""
+    store = require_log_store()
+    return await run_in_threadpool(store.stats_range, start, end or datetime.now().strftime('%Y%m%d'))
+
+
+@app.get("/api/store/retries")
+async def get_retry_distribution(start: str, end: Optional[str] = None):
+    """기간 내 재시도 횟수 분포 (SQLite 저장소)"""
+    store = require_log_store()
+    return await run_in_threadpool(store.retry_distribution, start, end or datetime.now().strftime('%Y%m%d'))
+
+
+@app.get("/api/conversations/{conversation_id}")
+async def get_conversation(conversation_id: str):
+    """대화 ID로 모든 턴의 기록과 턴별 피드백 조회 (SQLite 저장소)"""
+    store = require_log_store()
+    conversation = await run_in_threadpool(store.get_conversation, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    return conversation
 
 
 # 피드백 모델
@@ -188,6 +612,7 @@ class FeedbackRequest(BaseModel):
     rating: int  # 1-5 점수
     comment: Optional[str] = None  # 선택적 코멘트
     feedback_type: Optional[str] = None  # "positive", "negative", "suggestion"
+    turn: Optional[int] = None  # 피드백 대상 턴 (채팅 응답의 turn, 없으면 대화 전체)
 
 
 @app.post("/api/feedback")
@@ -197,6 +622,7 @@ async def submit_feedback(feedback: FeedbackRequest):
         feedback_entry = {
             "timestamp": datetime.now().isoformat(),
             "conversation_id": feedback.conversation_id,
+            "turn": feedback.turn,
             "query": feedback.query,
             "answer": feedback.answer,
             "rating": feedback.rating,
@@ -204,10 +630,8 @@ async def submit_feedback(feedback: FeedbackRequest):
             "feedback_type": feedback.feedback_type
         }
         
-        # 일별 피드백 로그 저장
-        log_file = os.path.join(FEEDBACK_LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(feedback_entry, ensure_ascii=False) + "\n")
+        # 일별 피드백 로그 저장 (백그라운드 기록)
+        log_writer.write(FEEDBACK_LOG_DIR, feedback_entry)
         
         return {"status": "success", "message": "피드백이 저장되었습니다."}
         
@@ -220,33 +644,15 @@ async def submit_feedback(feedback: FeedbackRequest):
 
 @app.get("/api/feedback/summary")
 async def get_feedback_summary():
-    """피드백 요약"""
-    log_file = os.path.join(FEEDBACK_LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
-    
-    if not os.path.exists(log_file):
-        return {"total_feedbacks": 0, "avg_rating": 0, "feedbacks": []}
-    
-    feedbacks = []
-    ratings = []
-    
-    with open(log_file, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                entry = json.loads(line)
-                feedbacks.append(entry)
-                ratings.append(entry.get("rating", 0))
-            except:
-                continue
-    
-    avg_rating = sum(ratings) / len(ratings) if ratings else 0
-    
-    return {
-        "total_feedbacks": len(feedbacks),
-        "avg_rating": round(avg_rating, 2),
-        "recent_feedbacks": feedbacks[-10:]  # 최근 10개
-    }
+    """피드백 요약 (평점 집계는 메모리, 최근 10개는 링 버퍼에서 - 피드백 양과 무관하게 일정한 시간)"""
+    return feedback_summary.summary()
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    workers = int(os.getenv("API_WORKERS", "1"))
+    if workers > 1:
+        # 워커 여러 개: VECTOR_INDEX_DIR 을 지정하면 모든 워커가 같은 인덱스 파일을 mmap으로 공유한다
+        uvicorn.run("api:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
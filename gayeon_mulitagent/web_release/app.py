@@ -7,7 +7,6 @@ import plotly.graph_objects as go
 from datetime import datetime
 import os
 import sys
-import uuid
 import json
 
 # 상위 디렉토리 agents_2 임포트를 위한 경로 추가
@@ -20,6 +19,7 @@ if hasattr(st, 'secrets') and 'GEMINI_API_KEY' in st.secrets:
     os.environ['GEMINI_API_KEY'] = st.secrets['GEMINI_API_KEY']
 
 from agents_2.orchestrator import MultiAgentOrchestrator
+from sheets_logger import SheetsLogQueue
 
 # ===== Google Sheets 연동 =====
 def get_gspread_client():
@@ -57,26 +57,31 @@ def get_sheets():
                 conversations = spreadsheet.worksheet("대화기록")
             except:
                 conversations = spreadsheet.add_worksheet("대화기록", 1000, 10)
-                conversations.append_row(["시간", "대화ID", "질문", "답변", "점수", "합격여부", "재시도", "출처"])
+                conversations.append_row(["시간", "대화ID", "질문", "답변", "점수", "합격여부", "재시도", "출처", "턴"])
             
             try:
                 feedbacks = spreadsheet.worksheet("피드백")
             except:
                 feedbacks = spreadsheet.add_worksheet("피드백", 1000, 8)
-                feedbacks.append_row(["시간", "대화ID", "질문", "평점", "유형", "코멘트"])
+                feedbacks.append_row(["시간", "대화ID", "질문", "평점", "유형", "코멘트", "턴"])
             
             return {"conversations": conversations, "feedbacks": feedbacks}
         except Exception as e:
             st.sidebar.warning(f"시트 접근 오류: {e}")
     return None
 
+@st.cache_resource
+def get_sheets_logger():
+    """Google Sheets 백그라운드 배치 로거 (세션 간 공유)"""
+    return SheetsLogQueue(
+        get_sheets(),
+        spool_path=os.path.join(current_dir, "sheets_spool.jsonl")
+    )
+
 def log_to_sheets(sheet_type: str, data: list):
-    """Google Sheets에 로그 저장"""
+    """Google Sheets에 로그 저장 (큐에 넣고 즉시 반환 - 기록은 백그라운드에서 배치로)"""
     try:
-        sheets = get_sheets()
-        if sheets and sheet_type in sheets:
-            sheets[sheet_type].append_row(data)
-            return True
+        return get_sheets_logger().log(sheet_type, data)
     except Exception as e:
         print(f"로그 저장 오류: {e}")
     return False
@@ -84,12 +89,13 @@ def log_to_sheets(sheet_type: str, data: list):
 # ===== Orchestrator 캐싱 =====
 @st.cache_resource
 def get_orchestrator():
-    """Orchestrator 싱글톤 인스턴스"""
+    """Orchestrator 싱글톤 인스턴스 (에이전트는 백그라운드에서 미리 생성)"""
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     return MultiAgentOrchestrator(
         talk_style_dir=os.path.join(base_dir, "GS_talk_style"),
         paper_dir=os.path.join(base_dir, "GS_paper"),
-        max_retries=3
+        max_retries=3,
+        prewarm=True
     )
 
 st.set_page_config(
@@ -99,22 +105,116 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 사용자가 첫 질문을 입력하는 동안 에이전트/인덱스 준비
+get_orchestrator()
+
 # 세션 상태 초기화
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "total_queries" not in st.session_state:
     st.session_state.total_queries = 0
+if "session_id" not in st.session_state:
+    # 브라우저 세션 하나가 하나의 대화 (이전 질문을 기억, ID는 첫 질문 때 오케스트레이터가 발급)
+    st.session_state.session_id = None
 if "feedback_given" not in st.session_state:
-    st.session_state.feedback_given = set()  # 피드백을 준 대화 ID 저장
+    st.session_state.feedback_given = set()  # 피드백을 준 답변 키("대화ID-턴") 저장
+
+
+# 검증 세부 항목 (키, 표시 이름, 만점)
+ASPECTS = [
+    ("trigger_analysis", "부조화 트리거", 30),
+    ("mechanism_identification", "합리화 기제", 40),
+    ("persuasiveness", "설득력", 30),
+]
+
+# 진행 단계 표시 문구
+STAGE_LABELS = {
+    "retrieval": "🔍 지식 검색 및 초안 작성 중...",
+    "tone": "🗣️ 이광수 말투로 변환 중...",
+    "modernize": "✍️ 근대 국어로 다듬는 중...",
+    "strengthen": "🛠️ 약한 논리를 보강하는 중...",
+    "validation": "✅ 스타일 검증 중...",
+    "retry": "🔄 피드백을 반영해 다시 쓰는 중...",
+}
 
 
-def call_api(query: str):
-    """직접 Orchestrator 호출"""
+def make_radar_chart(attempts: list):
+    """시도별 세부 평가 레이더 차트 (각 항목은 만점 대비 %)"""
+    labels = [label for _, label, _ in ASPECTS]
+    fig = go.Figure()
+    for i, aspects in enumerate(attempts):
+        values = [aspects.get(key, 0) / full * 100 for key, _, full in ASPECTS]
+        fig.add_trace(go.Scatterpolar(
+            r=values + values[:1],
+            theta=labels + labels[:1],
+            fill="toself",
+            name=f"시도 {i + 1}",
+            opacity=0.4 if i < len(attempts) - 1 else 0.8
+        ))
+    fig.update_layout(
+        polar={"radialaxis": {"visible": True, "range": [0, 100]}},
+        showlegend=len(attempts) > 1,
+        height=280,
+        margin=dict(l=30, r=30, t=30, b=30)
+    )
+    return fig
+
+
+def stream_answer(query: str, status, answer_slot, radar_slot):
+    """
+    Orchestrator 이벤트를 받아 단계 표시 / 답변 토큰 / 레이더 차트를 바로 갱신
+    
+    Returns:
+        (process_query 결과, 오류 메시지, 시도별 세부 평가 목록)
+    """
+    orchestrator = get_orchestrator()
+    if st.session_state.session_id is None or orchestrator.sessions.get(st.session_state.session_id) is None:
+        # 첫 질문이거나 세션이 만료된 경우 새 대화 세션 발급
+        st.session_state.session_id = orchestrator.sessions.create().conversation_id
+    events = orchestrator.stream_query(query, conversation_id=st.session_state.session_id)
+    state = {"result": None, "error": None, "attempts": [], "finished": False}
+    
+    def handle(event):
+        if event["type"] == "stage" and event["status"] == "start":
+            label = STAGE_LABELS.get(event["stage"], event["stage"])
+            if event["retry"] > 0 and event["stage"] != "retry":
+                label = f"{label} (재시도 {event['retry']})"
+            status.update(label=label)
+            status.write(label)
+        elif event["type"] == "validation":
+            state["attempts"].append(event["aspects"])
+            status.write(
+                f"📊 시도 {event['retry'] + 1}: {event['score']:.0f}/100 "
+                f"{'✅ 통과' if event['is_valid'] else '❌ 기준 미달'}"
+            )
+            radar_slot.plotly_chart(make_radar_chart(state["attempts"]), use_container_width=True)
+        elif event["type"] == "result":
+            state["result"] = event["result"]
+        elif event["type"] == "error":
+            state["error"] = f"처리 중 오류 발생: {event['error']}"
+    
+    def tokens():
+        # 답변을 쓰는 단계(근대어 변환 / 보강 편집)가 끝날 때까지의 토큰만 흘려보냄 (재시도마다 새로 그림)
+        for event in events:
+            if event["type"] == "token":
+                yield event["text"]
+                continue
+            handle(event)
+            if event["type"] == "stage" and event["stage"] in ("modernize", "strengthen") and event["status"] == "done":
+                return
+        state["finished"] = True
+    
+    while not state["finished"]:
+        with answer_slot.container():
+            st.write_stream(tokens())
+    return state["result"], state["error"], state["attempts"]
+
+
+def build_result(query: str, result: dict, attempts: list):
+    """Orchestrator 결과를 화면용으로 정리하고 Google Sheets에 기록 (대화 세션 ID + 몇 번째 턴인지)"""
     try:
-        orchestrator = get_orchestrator()
-        result = orchestrator.process_query(query, verbose=False)
-        
-        conversation_id = str(uuid.uuid4())[:8]
+        conversation_id = result["conversation_id"]
+        turn = result["turn"]
         
         # Google Sheets에 대화 기록 저장
         log_success = log_to_sheets("conversations", [
@@ -125,7 +225,8 @@ def call_api(query: str):
             result["validation_score"],
             "합격" if result["success"] else "불합격",
             result["retry_count"],
-            ", ".join(result["knowledge_sources"][:3])
+            ", ".join(result["knowledge_sources"][:3]),
+            turn
         ])
         
         if not log_success:
@@ -133,26 +234,30 @@ def call_api(query: str):
         
         return {
             "conversation_id": conversation_id,
+            "turn": turn,
             "answer": result["final_answer"],
             "validation_score": result["validation_score"],
             "validation_details": result["validation_details"],
             "knowledge_sources": result["knowledge_sources"],
             "retry_count": result["retry_count"],
-            "success": result["success"]
+            "success": result["success"],
+            "attempts": attempts
         }, None
         
     except Exception as e:
         return None, f"처리 중 오류 발생: {str(e)}"
 
 
-def submit_feedback(conversation_id: str, query: str, answer: str, rating: int, comment: str, feedback_type: str):
-    """피드백 저장 (Google Sheets + 세션)"""
+def submit_feedback(conversation_id: str, turn: int, query: str, answer: str, rating: int, comment: str,
+                    feedback_type: str):
+    """피드백 저장 (Google Sheets + 세션, 대화 기록과 같은 대화 ID + 턴으로)"""
     try:
         # 세션 상태에 저장
         if "feedbacks" not in st.session_state:
             st.session_state.feedbacks = []
         st.session_state.feedbacks.append({
             "conversation_id": conversation_id,
+            "turn": turn,
             "query": query,
             "rating": rating,
             "comment": comment,
@@ -168,7 +273,8 @@ def submit_feedback(conversation_id: str, query: str, answer: str, rating: int,
             query[:200],  # 질문 길이 제한
             rating,
             type_labels.get(feedback_type, feedback_type),
-            comment[:500] if comment else ""
+            comment[:500] if comment else "",
+            turn
         ])
         
         if not feedback_success:
@@ -254,9 +360,12 @@ with st.sidebar:
         
         # 세부 점수
         st.subheader("세부 평가")
-        details = result["validation_details"]
+        details = result["validation_details"] or {}
         aspects = details.get("aspects", {})
         
+        if result.get("attempts"):
+            st.plotly_chart(make_radar_chart(result["attempts"]), use_container_width=True)
+        
         st.metric(
             "1️⃣ 부조화 트리거",
             f"{aspects.get('trigger_analysis', 0):.0f} / 30",
@@ -294,6 +403,9 @@ with st.sidebar:
     else:
         st.info("질문을 입력하면 분석 결과가 여기에 표시됩니다.")
     
+    # 답변 생성 중 검증이 끝날 때마다 채워지는 레이더 차트 자리
+    live_radar = st.empty()
+    
     # 통계
     st.divider()
     st.subheader("📈 오늘의 통계")
@@ -321,6 +433,9 @@ with chat_container:
             if msg["role"] == "assistant" and "meta" in msg:
                 meta = msg["meta"]
                 conv_id = meta.get("conversation_id", str(idx))
+                turn = meta.get("turn", idx)
+                # 위젯 / 피드백 완료 표시는 답변(턴)마다 따로
+                answer_key = f"{conv_id}-{turn}"
                 
                 st.caption(
                     f"⏱️ 시간: {meta['timestamp']} | "
@@ -329,7 +444,7 @@ with chat_container:
                 )
                 
                 # 피드백 버튼 (아직 피드백을 주지 않은 경우만)
-                if conv_id not in st.session_state.feedback_given:
+                if answer_key not in st.session_state.feedback_given:
                     with st.expander("📝 이 답변에 피드백 남기기"):
                         # 이전 사용자 질문 찾기
                         prev_query = ""
@@ -343,7 +458,7 @@ with chat_container:
                                 min_value=1, 
                                 max_value=5, 
                                 value=3, 
-                                key=f"rating_{conv_id}",
+                                key=f"rating_{answer_key}",
                                 help="1: 매우 불만족, 5: 매우 만족"
                             )
                         with col_b:
@@ -351,18 +466,19 @@ with chat_container:
                                 "피드백 유형",
                                 ["positive", "negative", "suggestion"],
                                 format_func=lambda x: {"positive": "👍 좋아요", "negative": "👎 개선 필요", "suggestion": "💡 제안"}[x],
-                                key=f"type_{conv_id}"
+                                key=f"type_{answer_key}"
                             )
                         
                         comment = st.text_area(
                             "코멘트 (선택사항)",
                             placeholder="답변에 대한 의견을 자유롭게 작성해주세요...",
-                            key=f"comment_{conv_id}"
+                            key=f"comment_{answer_key}"
                         )
                         
-                        if st.button("피드백 제출", key=f"submit_{conv_id}", type="primary"):
+                        if st.button("피드백 제출", key=f"submit_{answer_key}", type="primary"):
                             success = submit_feedback(
                                 conv_id, 
+                                turn, 
                                 prev_query, 
                                 msg["content"], 
                                 rating, 
@@ -370,7 +486,7 @@ with chat_container:
                                 feedback_type
                             )
                             if success:
-                                st.session_state.feedback_given.add(conv_id)
+                                st.session_state.feedback_given.add(answer_key)
                                 st.success("✅ 피드백이 저장되었습니다. 감사합니다!")
                                 st.rerun()
                             else:
@@ -396,41 +512,50 @@ if prompt:
     # AI 응답
     with chat_container:
         with st.chat_message("assistant"):
-            with st.spinner("🤔 이광수가 고뇌하고 있습니다..."):
-                result, error = call_api(prompt)
+            status = st.status("🤔 이광수가 고뇌하고 있습니다...", expanded=False)
+            answer_slot = st.empty()
+            result, error, attempts = stream_answer(prompt, status, answer_slot, live_radar)
+            if result is not None:
+                result, error = build_result(prompt, result, attempts)
+            status.update(
+                label="❌ 처리 실패" if error else "✨ 답변 완료",
+                state="error" if error else "complete"
+            )
+            
+            if error:
+                st.error(f"❌ {error}")
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": f"[오류] {error}"
+                })
+            else:
+                answer = result["answer"]
+                conv_id = result.get("conversation_id", "unknown")
+                # 스트리밍된 마지막 시도 대신 최종 선택된 답변으로 교체 (fallback 시 최고점 후보)
+                answer_slot.write(answer)
                 
-                if error:
-                    st.error(f"❌ {error}")
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": f"[오류] {error}"
-                    })
-                else:
-                    answer = result["answer"]
-                    conv_id = result.get("conversation_id", "unknown")
-                    st.write(answer)
-                    
-                    # 메타 정보
-                    timestamp = datetime.now().strftime('%H:%M:%S')
-                    st.caption(
-                        f"⏱️ {timestamp} | "
-                        f"📊 {result['validation_score']:.0f}/100 | "
-                        f"{'✅ 합격' if result['success'] else '❌ 불합격'}"
-                    )
-                    
-                    # 세션에 저장
-                    st.session_state.last_result = result
-                    st.session_state.total_queries += 1
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": answer,
-                        "meta": {
-                            "conversation_id": conv_id,
-                            "timestamp": timestamp,
-                            "score": result["validation_score"],
-                            "success": result["success"]
-                        }
-                    })
+                # 메타 정보
+                timestamp = datetime.now().strftime('%H:%M:%S')
+                st.caption(
+                    f"⏱️ {timestamp} | "
+                    f"📊 {result['validation_score']:.0f}/100 | "
+                    f"{'✅ 합격' if result['success'] else '❌ 불합격'}"
+                )
+                
+                # 세션에 저장
+                st.session_state.last_result = result
+                st.session_state.total_queries += 1
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": answer,
+                    "meta": {
+                        "conversation_id": conv_id,
+                        "turn": result["turn"],
+                        "timestamp": timestamp,
+                        "score": result["validation_score"],
+                        "success": result["success"]
+                    }
+                })
     
     # 사이드바 업데이트를 위한 리렌더
     st.rerun()
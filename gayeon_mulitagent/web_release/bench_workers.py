@@ -0,0 +1,145 @@
+"""
+워커 수별 메모리 / 처리량 벤치마크
+
+API 워커와 같은 방식으로 별도 프로세스 N개가 각자 인덱스(논문 + 스타일)를 열고
+동시에 벡터 검색을 반복한다. 워커 수 1, 2, 4, 8에서 전체 RSS / PSS와 초당 검색 수를 보고한다.
+
+- mmap 모드: 메모리 맵 인덱스 (페이지 캐시 공유 → PSS가 워커 수만큼 늘지 않음)
+- chroma 모드: 워커마다 Chroma 클라이언트를 따로 염 (기존 방식)
+
+질의 임베딩은 인덱스의 벡터에 잡음을 더해 만들므로 Gemini API를 호출하지 않는다.
+LLM 생성 시간은 워커 수와 무관하게 외부 API가 결정하므로, 여기서는 워커가 직접
+쓰는 자원(메모리, 검색 CPU)만 측정한다.
+"""
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+CHROMA_SOURCES = {
+    "papers": (os.path.join(parent_dir, "GS_paper", "chroma_db_gemini"), "lee_gwangsu_papers_gemini"),
+    "style": (os.path.join(parent_dir, "GS_talk_style", "chroma_db_style_gemini"), "lee_gwangsu_style_gemini"),
+}
+
+
+def read_memory(pid: int) -> dict:
+    """프로세스의 RSS / PSS (KB, 리눅스 /proc 기준)"""
+    memory = {"rss": 0, "pss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key = line.split(":")[0].lower()
+                if key in memory:
+                    memory[key] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def open_searchers(mode: str, index_dir: str):
+    """모드별 (검색 함수, 질의용 벡터) 목록"""
+    searchers = []
+    if mode == "mmap":
+        from agents_2.mmap_index import MmapVectorIndex, PAPER_INDEX, STYLE_INDEX, resolve_index_dir
+        for name, k in ((PAPER_INDEX, 5), (STYLE_INDEX, 3)):
+            index = MmapVectorIndex(resolve_index_dir(index_dir, name))
+            search = lambda v, index=index, k=k: index.similarity_search_by_vector_with_score(v, k)
+            searchers.append((search, np.asarray(index.vectors[:64])))
+    else:
+        import chromadb
+        for name, k in (("papers", 5), ("style", 3)):
+            persist_directory, collection_name = CHROMA_SOURCES[name]
+            collection = chromadb.PersistentClient(path=persist_directory).get_collection(collection_name)
+            sample = collection.get(limit=64, include=["embeddings"])["embeddings"]
+            search = lambda v, c=collection, k=k: c.query(query_embeddings=[v.tolist()], n_results=k)
+            searchers.append((search, np.asarray(sample, dtype=np.float32)))
+    return searchers
+
+
+def worker(mode: str, index_dir: str, duration: float, ready, start, done, results):
+    """벤치마크 워커: 인덱스를 열고 신호를 기다렸다가 duration초 동안 검색"""
+    searchers = open_searchers(mode, index_dir)
+    rng = np.random.default_rng(os.getpid())
+    ready.put(os.getpid())
+    start.wait()
+
+    count = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        # 한 요청 = 논문 검색 + 스타일 검색 (KnowledgeAgent + StyleAgent)
+        for search, sample in searchers:
+            query = sample[rng.integers(len(sample))] + rng.normal(0, 0.01, sample.shape[1]).astype(np.float32)
+            search(query)
+        count += 1
+    results.put(count)
+    done.wait()
+
+
+def run(mode: str, index_dir: str, workers: int, duration: float) -> dict:
+    """워커 workers개로 한 번 측정"""
+    ctx = mp.get_context("spawn")  # 워커마다 독립 프로세스 (fork로 인한 페이지 공유 배제)
+    ready, results = ctx.Queue(), ctx.Queue()
+    start, done = ctx.Event(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(mode, index_dir, duration, ready, start, done, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    pids = [ready.get() for _ in procs]
+
+    start.set()
+    began = time.monotonic()
+    counts = [results.get() for _ in procs]
+    elapsed = time.monotonic() - began
+    # 검색이 끝난 직후 (인덱스 페이지가 모두 올라온 상태) 메모리 측정
+    memory = [read_memory(pid) for pid in pids]
+
+    done.set()
+    for p in procs:
+        p.join()
+    return {
+        "workers": workers,
+        "requests_per_sec": sum(counts) / elapsed,
+        "rss_mb": sum(m["rss"] for m in memory) / 1024,
+        "pss_mb": sum(m["pss"] for m in memory) / 1024,
+    }
+
+
+def main(index_dir: str, mode: str = "mmap", duration: float = 5.0):
+    worker_counts = [int(n) for n in os.getenv("BENCH_WORKERS", "1,2,4,8").split(",")]
+    print(f"모드: {mode} | 인덱스: {index_dir if mode == 'mmap' else 'Chroma DB'} | 측정 시간: {duration}초\n")
+    print(f"{'워커':>4} {'검색 요청/s':>12} {'RSS 합계(MB)':>14} {'PSS 합계(MB)':>14} {'워커당 PSS 증가(MB)':>20}")
+    base = None
+    for n in worker_counts:
+        r = run(mode, index_dir, n, duration)
+        if base is None:
+            base = r
+        growth = (r["pss_mb"] - base["pss_mb"]) / (n - base["workers"]) if n > base["workers"] else 0
+        print(f"{n:>4} {r['requests_per_sec']:>12.1f} {r['rss_mb']:>14.1f} {r['pss_mb']:>14.1f} {growth:>20.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("""
+사용법:
+  python bench_workers.py <index_dir> [mmap|chroma] [duration]
+    → 워커 1, 2, 4, 8개에서 전체 RSS / PSS와 초당 검색 요청 수 측정
+      (워커 수는 BENCH_WORKERS=1,2,4,8 로 변경 가능)
+
+예시:
+  python build_index.py build all --from-chroma  # (상위 디렉토리에서) 인덱스 만들기
+  python bench_workers.py ../indexes mmap 10
+  python bench_workers.py ../indexes chroma 10
+        """)
+        sys.exit(1)
+
+    main(
+        sys.argv[1],
+        sys.argv[2] if len(sys.argv) > 2 else "mmap",
+        float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    )
@@ -0,0 +1,171 @@
+"""
+피드백 요약 (평점 증분 집계 + 최근 피드백 링 버퍼)
+
+/api/feedback/summary가 피드백 파일 전체를 읽지 않도록 평점 집계는 메모리에서
+증분 갱신하고, 최근 피드백은 크기가 고정된 링 버퍼에 유지한다.
+서버 시작 시 링 버퍼는 오늘의 JSONL 파일을 끝에서부터 거꾸로 읽어 채운다.
+"""
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
+
+from log_writer import daily_log_files
+from usage_stats import LogAggregator
+
+
+def read_lines_backwards(path: str, block_size: int = 8192) -> Iterator[bytes]:
+    """
+    파일의 줄을 끝에서부터 거꾸로 반환 (필요한 블록만 읽음)
+
+    Args:
+        path: 파일 경로
+        block_size: 한 번에 읽을 바이트 수
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b"\n")
+            # 첫 조각은 앞 블록과 이어질 수 있으므로 다음 반복으로 넘김
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+class RatingAggregate:
+    """피드백 평점 누적 집계"""
+
+    def __init__(self):
+        self.count = 0
+        self.rating_sum = 0.0
+        self.rating_hist: Dict[str, int] = {}
+        self.type_counts: Dict[str, int] = {}
+
+    def add(self, entry: Dict[str, Any]):
+        """피드백 항목 하나 반영"""
+        rating = entry.get("rating", 0) or 0
+        self.count += 1
+        self.rating_sum += rating
+        self.rating_hist[str(rating)] = self.rating_hist.get(str(rating), 0) + 1
+        feedback_type = entry.get("feedback_type") or "none"
+        self.type_counts[feedback_type] = self.type_counts.get(feedback_type, 0) + 1
+
+    def merge(self, other: "RatingAggregate"):
+        """다른 집계를 합침"""
+        self.count += other.count
+        self.rating_sum += other.rating_sum
+        for key, value in other.rating_hist.items():
+            self.rating_hist[key] = self.rating_hist.get(key, 0) + value
+        for key, value in other.type_counts.items():
+            self.type_counts[key] = self.type_counts.get(key, 0) + value
+
+    def copy(self) -> "RatingAggregate":
+        """복사본"""
+        return RatingAggregate.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """저장용 딕셔너리"""
+        return {
+            "count": self.count,
+            "rating_sum": self.rating_sum,
+            "rating_hist": self.rating_hist,
+            "type_counts": self.type_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RatingAggregate":
+        """저장된 딕셔너리에서 복원"""
+        agg = cls()
+        for key, value in data.items():
+            if hasattr(agg, key):
+                setattr(agg, key, dict(value) if isinstance(value, dict) else value)
+        return agg
+
+    def summary(self) -> Dict[str, Any]:
+        """API 응답용 요약"""
+        return {
+            "total_feedbacks": self.count,
+            "avg_rating": round(self.rating_sum / self.count, 2) if self.count else 0,
+            "rating_histogram": dict(sorted(self.rating_hist.items())),
+            "feedback_types": self.type_counts,
+        }
+
+
+class FeedbackSummary(LogAggregator):
+    """피드백 평점 증분 집계 + 최근 피드백 링 버퍼"""
+
+    aggregate_cls = RatingAggregate
+
+    def __init__(self, log_dir: str, log_writer, recent_size: int = 10,
+                 snapshot_interval: float = 30.0):
+        """
+        Args:
+            log_dir: 피드백 로그 디렉토리
+            log_writer: 로그 파일 경로 규칙을 공유할 LogWriter
+            recent_size: 유지할 최근 피드백 수
+            snapshot_interval: 스냅샷 저장 주기 (초)
+        """
+        super().__init__(log_dir, log_writer, snapshot_interval)
+        self.recent_size = recent_size
+        self._recent: deque = deque(maxlen=recent_size)
+        self._recent_date: Optional[str] = None
+        self._recent_lock = threading.Lock()
+
+    def load(self):
+        """평점 집계 복원 + 오늘 로그를 거꾸로 읽어 링 버퍼 재구성"""
+        super().load()
+        date = datetime.now().strftime('%Y%m%d')
+        recent = []
+        for log_file in daily_log_files(self.log_dir, date):
+            taken = 0
+            for raw in read_lines_backwards(log_file):
+                try:
+                    recent.append(json.loads(raw))
+                except Exception:
+                    continue
+                taken += 1
+                if taken >= self.recent_size:
+                    break
+        # 워커별 파일을 합쳤으므로 시간순 정렬 후 마지막 recent_size개만 유지
+        recent.sort(key=lambda e: e.get("timestamp", ""))
+        with self._recent_lock:
+            self._recent = deque(recent[-self.recent_size:], maxlen=self.recent_size)
+            self._recent_date = date
+
+    def on_flush(self, batch: List[tuple]):
+        """LogWriter 리스너: 평점 집계 갱신 + 링 버퍼에 추가"""
+        super().on_flush(batch)
+        with self._recent_lock:
+            for directory, date, entry in batch:
+                if directory != self.log_dir:
+                    continue
+                if self._recent_date is None or date > self._recent_date:
+                    self._recent.clear()
+                    self._recent_date = date
+                if date == self._recent_date:
+                    self._recent.append(entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        오늘의 피드백 요약
+
+        다른 워커의 피드백은 집계에는 포함되지만, 링 버퍼는 시작 시점 이후로는
+        이 워커가 기록한 피드백만 추가된다.
+        """
+        date = datetime.now().strftime('%Y%m%d')
+        result = self.day_aggregate(date).summary()
+        with self._recent_lock:
+            recent = list(self._recent) if self._recent_date == date else []
+        result["recent_feedbacks"] = recent
+        return result
@@ -0,0 +1,60 @@
+"""
+기존 JSONL 로그를 SQLite 로그 저장소로 가져오는 스크립트
+
+이미 가져온 파일은 가져온 위치(오프셋)를 기록해 두므로 여러 번 실행해도 중복되지 않는다.
+서버(LOG_STORE_PATH)가 이미 저장한 항목도 내용 해시로 걸러내므로 같은 날짜 파일을 가져와도 안전하다.
+"""
+import glob
+import os
+import sys
+import time
+
+from log_store import LogStore
+
+# api.py와 같은 로그 디렉토리 → 테이블 매핑
+LOG_TABLES = {
+    "conversation_logs": "conversations",
+    "usage_logs": "usage",
+    "feedback_logs": "feedback",
+}
+
+
+def import_all(db_path: str, base_dir: str = "."):
+    """모든 로그 디렉토리의 JSONL 파일 가져오기"""
+    store = LogStore(db_path, LOG_TABLES)
+    started = time.time()
+    total = 0
+
+    for directory, table in LOG_TABLES.items():
+        files = sorted(glob.glob(os.path.join(base_dir, directory, "*.jsonl")))
+        if not files:
+            print(f"  - {directory}: 파일 없음")
+            continue
+        count = 0
+        for path in files:
+            count += store.import_jsonl(path, table)
+        total += count
+        print(f"  ✓ {directory} → {table}: {len(files)}개 파일, {count}건")
+
+    print(f"\n✅ 총 {total}건 가져오기 완료 ({time.time() - started:.1f}초) → {db_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("""
+사용법:
+  python import_logs.py <db_path> [log_base_dir]
+    → conversation_logs / usage_logs / feedback_logs 의 JSONL을 SQLite로 가져오기
+      (log_base_dir 기본값: 현재 디렉토리)
+
+예시:
+  python import_logs.py logs.db
+  LOG_STORE_PATH=logs.db python api.py   # 이후 새 로그는 서버가 직접 기록
+        """)
+        sys.exit(1)
+
+    try:
+        import_all(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else ".")
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        sys.exit(1)
@@ -0,0 +1,331 @@
+"""
+SQLite 로그 저장소 (선택 사항)
+
+일별 JSONL 파일과 별도로 대화/사용/피드백 로그를 인덱스가 있는 SQLite(WAL 모드)에
+배치로 저장해, 기간 통계·재시도 분포·대화 ID 조회를 파일 스캔 없이 처리한다.
+
+LogWriter 리스너로 등록하면 플러시된 배치가 한 트랜잭션으로 들어간다.
+연결은 스레드마다 따로 열며, WAL 모드이므로 기록 중에도 읽기가 막히지 않는다.
+
+모든 행은 로그 항목 내용의 해시(entry_hash, UNIQUE)를 가지므로, 서버가 리스너로 이미 저장한
+항목을 import_logs.py로 같은 JSONL에서 다시 가져와도 중복 저장되지 않는다.
+
+대화 ID 하나가 여러 턴의 대화 세션이므로 대화/피드백 행은 턴 번호(turn)를 함께 저장하고,
+get_conversation()은 모든 턴을 턴 순서대로 각 턴의 피드백과 함께 돌려준다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_hash TEXT,
+    conversation_id TEXT,
+    turn INTEGER,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    query TEXT,
+    answer TEXT,
+    validation_score REAL,
+    success INTEGER,
+    retry_count INTEGER,
+    knowledge_sources TEXT,
+    validation_details TEXT,
+    failure TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp);
+CREATE INDEX IF NOT EXISTS idx_conversations_conversation_id ON conversations(conversation_id);
+CREATE INDEX IF NOT EXISTS idx_conversations_score ON conversations(validation_score);
+
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_hash TEXT,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    query TEXT,
+    score REAL,
+    success INTEGER,
+    retry_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage(timestamp);
+CREATE INDEX IF NOT EXISTS idx_usage_date ON usage(date);
+CREATE INDEX IF NOT EXISTS idx_usage_score ON usage(score);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_hash TEXT,
+    conversation_id TEXT,
+    turn INTEGER,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    query TEXT,
+    answer TEXT,
+    rating INTEGER,
+    comment TEXT,
+    feedback_type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback(timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_conversation_id ON feedback(conversation_id);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+# 나중에 추가된 컬럼 (테이블, 컬럼, 타입) - 예전 저장소를 열면 추가하고 기존 행은 NULL로 남는다
+ADDED_COLUMNS = [
+    ("conversations", "entry_hash", "TEXT"),
+    ("usage", "entry_hash", "TEXT"),
+    ("feedback", "entry_hash", "TEXT"),
+    ("conversations", "turn", "INTEGER"),
+    ("feedback", "turn", "INTEGER"),
+]
+
+# entry_hash 컬럼이 없던 저장소도 열 수 있도록 컬럼 추가 후에 만든다 (기존 행은 NULL로 남음)
+HASH_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_entry_hash ON conversations(entry_hash);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_usage_entry_hash ON usage(entry_hash);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_feedback_entry_hash ON feedback(entry_hash);
+"""
+
+# 테이블별 (컬럼, 로그 항목 → 값 변환 함수)
+_COLUMNS = {
+    "conversations": [
+        ("conversation_id", lambda e: e.get("conversation_id")),
+        ("turn", lambda e: e.get("turn", 1)),
+        ("query", lambda e: e.get("query")),
+        ("answer", lambda e: e.get("answer")),
+        ("validation_score", lambda e: e.get("validation_score", 0)),
+        ("success", lambda e: int(bool(e.get("success")))),
+        ("retry_count", lambda e: e.get("retry_count", 0)),
+        ("knowledge_sources", lambda e: json.dumps(e.get("knowledge_sources", []), ensure_ascii=False)),
+        ("validation_details", lambda e: json.dumps(e.get("validation_details") or {}, ensure_ascii=False)),
+        ("failure", lambda e: json.dumps(e["failure"], ensure_ascii=False) if e.get("failure") else None),
+    ],
+    "usage": [
+        ("query", lambda e: e.get("query")),
+        ("score", lambda e: e.get("score", 0)),
+        ("success", lambda e: int(bool(e.get("success")))),
+        ("retry_count", lambda e: e.get("retry_count", 0)),
+    ],
+    "feedback": [
+        ("conversation_id", lambda e: e.get("conversation_id")),
+        ("turn", lambda e: e.get("turn")),
+        ("query", lambda e: e.get("query")),
+        ("answer", lambda e: e.get("answer")),
+        ("rating", lambda e: e.get("rating")),
+        ("comment", lambda e: e.get("comment")),
+        ("feedback_type", lambda e: e.get("feedback_type")),
+    ],
+}
+
+
+def _date_of(entry: Dict[str, Any]) -> str:
+    """ISO 타임스탬프 → YYYYMMDD"""
+    return entry.get("timestamp", "")[:10].replace("-", "")
+
+
+def _entry_hash(entry: Dict[str, Any]) -> str:
+    """로그 항목 내용의 해시 (키 순서와 무관, 리스너로 받은 항목과 JSONL에서 읽은 항목이 같은 값)"""
+    canonical = json.dumps(entry, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class LogStore:
+    """인덱스가 있는 SQLite 로그 저장소"""
+
+    def __init__(self, path: str, table_map: Dict[str, str]):
+        """
+        Args:
+            path: SQLite 파일 경로
+            table_map: 로그 디렉토리 → 테이블 이름 (conversations / usage / feedback)
+        """
+        self.path = path
+        self.table_map = table_map
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            for table, column, column_type in ADDED_COLUMNS:
+                existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            conn.executescript(HASH_INDEXES)
+
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (없으면 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ----- 기록 -----
+
+    def insert_entries(self, table: str, entries: List[Dict[str, Any]],
+                       conn: Optional[sqlite3.Connection] = None):
+        """같은 테이블의 항목들을 한 번에 삽입 (이미 저장된 항목은 건너뜀)"""
+        columns = _COLUMNS[table]
+        names = ["entry_hash", "timestamp", "date"] + [name for name, _ in columns]
+        placeholders = ", ".join("?" for _ in names)
+        rows = [
+            [_entry_hash(e), e.get("timestamp", ""), _date_of(e)] + [convert(e) for _, convert in columns]
+            for e in entries
+        ]
+        (conn or self._connect()).executemany(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(names)}) VALUES ({placeholders})", rows
+        )
+
+    def on_flush(self, batch: List[tuple]):
+        """LogWriter 리스너: 플러시된 배치를 한 트랜잭션으로 저장"""
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        for directory, _, entry in batch:
+            table = self.table_map.get(directory)
+            if table:
+                by_table.setdefault(table, []).append(entry)
+        if not by_table:
+            return
+        conn = self._connect()
+        with conn:
+            for table, entries in by_table.items():
+                self.insert_entries(table, entries, conn)
+
+    def import_jsonl(self, path: str, table: str, batch_size: int = 1000) -> int:
+        """
+        JSONL 파일을 가져옴 (이미 가져온 부분은 건너뛰므로 여러 번 실행해도 안전)
+
+        가져온 위치(오프셋) 이후의 줄만 읽고, 서버가 리스너로 이미 저장한 항목은 entry_hash로 걸러낸다.
+
+        Returns:
+            새로 가져온 항목 수
+        """
+        conn = self._connect()
+        key = os.path.abspath(path)
+        row = conn.execute("SELECT offset FROM imported_files WHERE path = ?", (key,)).fetchone()
+        offset = row["offset"] if row else 0
+        imported = 0
+        batch = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            with conn:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    offset += len(raw)
+                    try:
+                        batch.append(json.loads(raw))
+                    except Exception:
+                        continue
+                    if len(batch) >= batch_size:
+                        imported += self._insert_counted(table, batch, conn)
+                        batch = []
+                if batch:
+                    imported += self._insert_counted(table, batch, conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO imported_files (path, offset) VALUES (?, ?)",
+                    (key, offset)
+                )
+        return imported
+
+    def _insert_counted(self, table: str, entries: List[Dict[str, Any]], conn: sqlite3.Connection) -> int:
+        """삽입 후 실제로 새로 들어간 행 수"""
+        before = conn.total_changes
+        self.insert_entries(table, entries, conn)
+        return conn.total_changes - before
+
+    # ----- 조회 -----
+
+    def stats_range(self, start: str, end: str) -> Dict[str, Any]:
+        """기간(YYYYMMDD, 양 끝 포함) 사용 통계와 일별 내역"""
+        conn = self._connect()
+        total = conn.execute(
+            """SELECT COUNT(*) AS total_queries, AVG(score) AS avg_score,
+                      MIN(score) AS min_score, MAX(score) AS max_score,
+                      AVG(success) AS success_rate, AVG(retry_count) AS avg_retry
+               FROM usage WHERE date BETWEEN ? AND ?""",
+            (start, end)
+        ).fetchone()
+        days = conn.execute(
+            """SELECT date, COUNT(*) AS total_queries, AVG(score) AS avg_score,
+                      AVG(success) AS success_rate
+               FROM usage WHERE date BETWEEN ? AND ? GROUP BY date ORDER BY date""",
+            (start, end)
+        ).fetchall()
+        result = {key: (total[key] or 0) for key in total.keys()}
+        result.update({
+            "start": start,
+            "end": end,
+            "days": {row["date"]: {k: row[k] for k in row.keys() if k != "date"} for row in days}
+        })
+        return result
+
+    def retry_distribution(self, start: str, end: str) -> Dict[str, Any]:
+        """기간 내 재시도 횟수 분포와 재시도 횟수별 평균 점수"""
+        rows = self._connect().execute(
+            """SELECT retry_count, COUNT(*) AS count, AVG(score) AS avg_score,
+                      AVG(success) AS success_rate
+               FROM usage WHERE date BETWEEN ? AND ?
+               GROUP BY retry_count ORDER BY retry_count""",
+            (start, end)
+        ).fetchall()
+        return {
+            "start": start,
+            "end": end,
+            "distribution": {
+                str(row["retry_count"]): {
+                    "count": row["count"],
+                    "avg_score": row["avg_score"],
+                    "success_rate": row["success_rate"]
+                } for row in rows
+            }
+        }
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        대화 ID로 대화 기록과 피드백 조회
+
+        Returns:
+            {"conversation_id", "turns": [턴 기록 + "feedbacks"], "feedbacks": 턴을 알 수 없는 피드백}
+            (턴 번호가 없던 예전 행은 1턴으로 본다), 없으면 None
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            """SELECT * FROM conversations WHERE conversation_id = ?
+               ORDER BY COALESCE(turn, 1), timestamp""",
+            (conversation_id,)
+        ).fetchall()
+        if not rows:
+            return None
+        turns = []
+        by_turn: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            turn = dict(row)
+            for key in ("id", "entry_hash", "conversation_id"):
+                del turn[key]
+            turn["turn"] = turn["turn"] or 1
+            for key in ("knowledge_sources", "validation_details", "failure"):
+                if turn.get(key):
+                    turn[key] = json.loads(turn[key])
+            turn["success"] = bool(turn["success"])
+            turn["feedbacks"] = []
+            turns.append(turn)
+            by_turn.setdefault(turn["turn"], turn)
+        unassigned = []
+        feedbacks = conn.execute(
+            """SELECT turn, timestamp, rating, comment, feedback_type FROM feedback
+               WHERE conversation_id = ? ORDER BY timestamp""",
+            (conversation_id,)
+        ).fetchall()
+        for row in feedbacks:
+            feedback = dict(row)
+            turn = by_turn.get(feedback.pop("turn"))
+            (turn["feedbacks"] if turn is not None else unassigned).append(feedback)
+        return {"conversation_id": conversation_id, "turns": turns, "feedbacks": unassigned}
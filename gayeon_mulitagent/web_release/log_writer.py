@@ -0,0 +1,200 @@
+"""
+백그라운드 로그 기록기
+
+요청 처리 중에는 로그 항목을 메모리 큐에 넣기만 하고, 전용 스레드가
+주기적으로 모아서 일별 JSONL 파일에 한 번에 기록한다.
+
+- 이벤트 루프에서 디스크 I/O가 일어나지 않는다
+- 한 프로세스 안의 모든 기록이 하나의 스레드를 거치므로 줄이 섞이지 않는다
+- 멀티 프로세스 배포에서는 per_worker=True로 워커(PID)마다 별도 파일에 기록한다
+  (파일명: YYYYMMDD.<pid>.jsonl)
+"""
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+
+FSYNC_POLICIES = ("none", "batch", "interval")
+
+
+def daily_log_files(directory: str, date: str) -> List[str]:
+    """
+    해당 날짜의 로그 파일 목록 (워커별 파일 포함)
+
+    Args:
+        directory: 로그 디렉토리
+        date: YYYYMMDD 형식 날짜
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{date}.jsonl")) +
+                  glob.glob(os.path.join(directory, f"{date}.*.jsonl")))
+
+
+class LogWriter:
+    """메모리 큐 + 배치 플러시 방식의 JSONL 로그 기록기"""
+
+    def __init__(self,
+                 flush_interval: float = 1.0,
+                 max_batch: int = 256,
+                 fsync_policy: str = "batch",
+                 fsync_interval: float = 5.0,
+                 per_worker: bool = False,
+                 max_queue: int = 10000):
+        """
+        Args:
+            flush_interval: 플러시 주기 (초)
+            max_batch: 이 개수가 모이면 주기와 관계없이 플러시
+            fsync_policy: "none"(OS 버퍼에 맡김) / "batch"(플러시마다 fsync) /
+                          "interval"(fsync_interval초마다 fsync)
+            fsync_interval: fsync_policy="interval"일 때 fsync 주기 (초)
+            per_worker: True면 워커(PID)별로 파일을 분리
+            max_queue: 큐 최대 길이 (넘치면 항목을 버리고 dropped를 증가)
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"알 수 없는 fsync 정책: {fsync_policy} (가능: {FSYNC_POLICIES})")
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.per_worker = per_worker
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_fsync = time.monotonic()
+        self._listeners: List[Callable[[List[tuple]], None]] = []
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    @classmethod
+    def from_env(cls) -> "LogWriter":
+        """환경변수 설정으로 생성"""
+        return cls(
+            flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "1.0")),
+            max_batch=int(os.getenv("LOG_MAX_BATCH", "256")),
+            fsync_policy=os.getenv("LOG_FSYNC_POLICY", "batch"),
+            fsync_interval=float(os.getenv("LOG_FSYNC_INTERVAL", "5.0")),
+            per_worker=os.getenv("LOG_PER_WORKER", "0") == "1",
+        )
+
+    def path_for(self, directory: str, date: str) -> str:
+        """항목이 기록될 파일 경로"""
+        suffix = f".{os.getpid()}" if self.per_worker else ""
+        return os.path.join(directory, f"{date}{suffix}.jsonl")
+
+    def add_listener(self, callback: Callable[[List[tuple]], None]):
+        """
+        플러시된 배치를 받을 콜백 등록 (기록 스레드에서 호출됨)
+
+        Args:
+            callback: [(directory, date, entry), ...] 를 받는 함수
+        """
+        self._listeners.append(callback)
+
+    def start(self):
+        """기록 스레드 시작"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 항목을 모두 기록하고 스레드 종료"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        # 스레드가 없거나 시간 내에 끝나지 못한 경우 남은 항목 직접 기록
+        self._flush(self._drain())
+
+    def write(self, directory: str, entry: Dict[str, Any]):
+        """
+        로그 항목을 큐에 추가 (블로킹 없음)
+
+        Args:
+            directory: 로그 디렉토리
+            entry: JSON 직렬화 가능한 로그 항목
+        """
+        date = datetime.now().strftime('%Y%m%d')
+        try:
+            self._queue.put_nowait((directory, date, entry))
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """기록기 상태"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "fsync_policy": self.fsync_policy,
+            "per_worker": self.per_worker,
+        }
+
+    def _drain(self, limit: Optional[int] = None) -> List[tuple]:
+        """큐에 쌓인 항목을 꺼냄"""
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        """기록 스레드 본체"""
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            batch.extend(self._drain(self.max_batch - len(batch)))
+            if batch:
+                self._flush(batch)
+        self._flush(self._drain())
+
+    def _flush(self, batch: List[tuple]):
+        """배치를 파일별로 묶어 한 번씩 기록"""
+        if not batch:
+            return
+        by_path = defaultdict(list)
+        for directory, date, entry in batch:
+            by_path[self.path_for(directory, date)].append(entry)
+
+        do_fsync = self.fsync_policy == "batch" or (
+            self.fsync_policy == "interval"
+            and time.monotonic() - self._last_fsync >= self.fsync_interval
+        )
+        for path, entries in by_path.items():
+            try:
+                lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    if do_fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                self.written += len(entries)
+            except Exception as e:
+                print(f"[LogWriter] 로그 기록 오류 ({path}): {e}")
+        if do_fsync:
+            self._last_fsync = time.monotonic()
+        self.flushes += 1
+
+        for callback in self._listeners:
+            try:
+                callback(batch)
+            except Exception as e:
+                print(f"[LogWriter] 리스너 오류: {e}")
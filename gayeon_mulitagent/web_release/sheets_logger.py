@@ -0,0 +1,179 @@
+"""
+Google Sheets 비동기 배치 로거
+
+Streamlit 스크립트 스레드에서는 행을 큐에 넣기만 하고, 백그라운드 스레드가
+일정 시간마다 또는 일정 개수가 모이면 시트별로 append_rows 한 번으로 기록한다.
+
+- 실패 시 지수 백오프로 재시도
+- 끝내 실패하면 로컬 스풀 파일(JSONL)에 저장하고, 다음 성공 시 다시 올린다
+- 프로세스 종료 시 남은 행을 기록 (atexit)
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+
+class SheetsLogQueue:
+    """Google Sheets 행 기록 큐"""
+
+    def __init__(self,
+                 sheets: Optional[Dict[str, Any]],
+                 spool_path: str,
+                 flush_interval: float = 5.0,
+                 max_batch: int = 20,
+                 max_retries: int = 4,
+                 backoff_base: float = 1.0):
+        """
+        Args:
+            sheets: 시트 종류 → gspread Worksheet (None이면 모두 스풀에 저장)
+            spool_path: Sheets에 올리지 못한 행을 저장할 JSONL 파일
+            flush_interval: 플러시 주기 (초)
+            max_batch: 이 개수가 모이면 주기와 관계없이 플러시
+            max_retries: 배치당 최대 재시도 횟수
+            backoff_base: 첫 재시도 대기 시간 (초, 재시도마다 2배)
+        """
+        self.sheets = sheets or {}
+        self.spool_path = spool_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._spool_lock = threading.Lock()
+        self.sent = 0
+        self.spooled = 0
+        self.last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="sheets-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def log(self, sheet_type: str, row: list) -> bool:
+        """
+        행을 큐에 추가 (즉시 반환)
+
+        Returns:
+            큐에 들어갔으면 True (연결된 시트가 없으면 False - 이 경우 스풀에만 저장)
+        """
+        if sheet_type not in self.sheets:
+            self._spool([(sheet_type, row)])
+            return False
+        self._queue.put((sheet_type, row))
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """남은 행을 기록하고 스레드 종료"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 상태"""
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "spooled": self.spooled,  # 누적 (재전송 성공분 포함)
+            "last_error": self.last_error,
+        }
+
+    def _drain(self) -> List[tuple]:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _run(self):
+        """백그라운드 스레드 본체"""
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+            if batch:
+                self._flush(batch)
+        self._flush(self._drain(), retries=1)
+
+    def _flush(self, batch: List[tuple], retries: Optional[int] = None):
+        """시트별로 묶어 append_rows 호출, 실패하면 스풀에 저장"""
+        if not batch:
+            return
+        by_sheet = defaultdict(list)
+        for sheet_type, row in batch:
+            by_sheet[sheet_type].append(row)
+
+        all_sent = True
+        for sheet_type, rows in by_sheet.items():
+            if self._append_with_retry(sheet_type, rows, retries or self.max_retries):
+                self.sent += len(rows)
+            else:
+                all_sent = False
+                self._spool([(sheet_type, row) for row in rows])
+
+        # Sheets가 다시 응답하면 스풀에 쌓인 행도 올린다
+        if all_sent:
+            self._replay_spool()
+
+    def _append_with_retry(self, sheet_type: str, rows: list, retries: int) -> bool:
+        """지수 백오프로 append_rows 재시도"""
+        worksheet = self.sheets.get(sheet_type)
+        if worksheet is None:
+            return False
+        for attempt in range(retries):
+            try:
+                worksheet.append_rows(rows)
+                return True
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[SheetsLogQueue] {sheet_type} 기록 실패 ({attempt + 1}/{retries}): {e}")
+                if attempt + 1 < retries and not self._stop.is_set():
+                    time.sleep(self.backoff_base * (2 ** attempt) * (1 + random.random() * 0.1))
+        return False
+
+    def _spool(self, items: List[tuple], count: bool = True):
+        """Sheets에 올리지 못한 행을 로컬 파일에 저장 (count: spooled 누적 여부)"""
+        with self._spool_lock:
+            try:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for sheet_type, row in items:
+                        f.write(json.dumps({"sheet": sheet_type, "row": row}, ensure_ascii=False) + "\n")
+                if count:
+                    self.spooled += len(items)
+            except Exception as e:
+                print(f"[SheetsLogQueue] 스풀 저장 실패: {e}")
+
+    def _replay_spool(self):
+        """스풀 파일의 행을 다시 올림 (실패한 행은 스풀에 남김)"""
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return
+            replay_path = f"{self.spool_path}.replay"
+            os.replace(self.spool_path, replay_path)
+        by_sheet = defaultdict(list)
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                    by_sheet[item["sheet"]].append(item["row"])
+                except Exception:
+                    continue
+        os.remove(replay_path)
+        for sheet_type, rows in by_sheet.items():
+            if self._append_with_retry(sheet_type, rows, 1):
+                self.sent += len(rows)
+            else:
+                self._spool([(sheet_type, row) for row in rows], count=False)
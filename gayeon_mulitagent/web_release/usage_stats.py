@@ -0,0 +1,309 @@
+"""
+사용 통계 증분 집계
+
+/api/stats가 매번 오늘의 JSONL 전체를 다시 읽지 않도록, 로그 기록기가 플러시할
+때마다 메모리의 집계값(건수, 합계, 최소/최대, 점수/재시도 히스토그램)을 갱신한다.
+
+- 스냅샷: summary/<로그파일명>.snapshot.json 에 집계값과 "어디까지 읽었는지"(바이트 오프셋)를
+  저장한다. 재시작 시 스냅샷을 읽고 로그 파일의 나머지 부분만 읽으면 된다.
+- 일별 요약: 지난 날짜는 summary/YYYYMMDD.json 에 하루 전체 요약을 저장해 두고,
+  기간 조회는 이 요약 파일들만 합쳐서 응답한다.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from log_writer import daily_log_files
+
+
+SCORE_BUCKET_SIZE = 10
+
+
+class DailyAggregate:
+    """하루(또는 여러 날) 사용 로그의 누적 집계"""
+
+    def __init__(self):
+        self.count = 0
+        self.score_sum = 0.0
+        self.score_min: Optional[float] = None
+        self.score_max: Optional[float] = None
+        self.success_count = 0
+        self.retry_sum = 0
+        self.score_hist: Dict[str, int] = {}
+        self.retry_hist: Dict[str, int] = {}
+
+    def add(self, entry: Dict[str, Any]):
+        """사용 로그 항목 하나 반영"""
+        score = float(entry.get("score", 0) or 0)
+        retries = int(entry.get("retry_count", 0) or 0)
+        self.count += 1
+        self.score_sum += score
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+        if entry.get("success"):
+            self.success_count += 1
+        self.retry_sum += retries
+        bucket = str(min(int(score // SCORE_BUCKET_SIZE) * SCORE_BUCKET_SIZE, 100 - SCORE_BUCKET_SIZE))
+        self.score_hist[bucket] = self.score_hist.get(bucket, 0) + 1
+        self.retry_hist[str(retries)] = self.retry_hist.get(str(retries), 0) + 1
+
+    def merge(self, other: "DailyAggregate"):
+        """다른 집계를 합침"""
+        self.count += other.count
+        self.score_sum += other.score_sum
+        for attr, pick in (("score_min", min), ("score_max", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+        self.success_count += other.success_count
+        self.retry_sum += other.retry_sum
+        for key, value in other.score_hist.items():
+            self.score_hist[key] = self.score_hist.get(key, 0) + value
+        for key, value in other.retry_hist.items():
+            self.retry_hist[key] = self.retry_hist.get(key, 0) + value
+
+    def copy(self) -> "DailyAggregate":
+        """복사본"""
+        return DailyAggregate.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """저장용 딕셔너리"""
+        return {
+            "count": self.count,
+            "score_sum": self.score_sum,
+            "score_min": self.score_min,
+            "score_max": self.score_max,
+            "success_count": self.success_count,
+            "retry_sum": self.retry_sum,
+            "score_hist": self.score_hist,
+            "retry_hist": self.retry_hist,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DailyAggregate":
+        """저장된 딕셔너리에서 복원"""
+        agg = cls()
+        for key, value in data.items():
+            if hasattr(agg, key):
+                setattr(agg, key, dict(value) if isinstance(value, dict) else value)
+        return agg
+
+    def summary(self) -> Dict[str, Any]:
+        """API 응답용 요약"""
+        return {
+            "total_queries": self.count,
+            "avg_score": self.score_sum / self.count if self.count else 0,
+            "min_score": self.score_min if self.score_min is not None else 0,
+            "max_score": self.score_max if self.score_max is not None else 0,
+            "success_rate": self.success_count / self.count if self.count else 0,
+            "avg_retry": self.retry_sum / self.count if self.count else 0,
+            "score_histogram": dict(sorted(self.score_hist.items(), key=lambda kv: int(kv[0]))),
+            "retry_histogram": dict(sorted(self.retry_hist.items(), key=lambda kv: int(kv[0]))),
+        }
+
+
+def scan_log(path: str, offset: int = 0, aggregate_cls=DailyAggregate) -> Tuple[Any, int]:
+    """
+    로그 파일을 offset부터 읽어 집계
+
+    Returns:
+        (집계, 마지막으로 읽은 완전한 줄 끝의 바이트 오프셋)
+    """
+    agg = aggregate_cls()
+    if not os.path.exists(path):
+        return agg, offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            # 기록 중인 마지막 줄(개행 없음)은 다음에 다시 읽는다
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            try:
+                agg.add(json.loads(raw))
+            except Exception:
+                continue
+    return agg, offset
+
+
+class LogAggregator:
+    """
+    일별 JSONL 로그 증분 집계기 (LogWriter 리스너로 등록해 사용)
+
+    집계 클래스(aggregate_cls)는 add / merge / copy / to_dict / from_dict / summary를 제공해야 한다.
+    """
+
+    aggregate_cls = DailyAggregate
+
+    def __init__(self, log_dir: str, log_writer, snapshot_interval: float = 30.0):
+        """
+        Args:
+            log_dir: 로그 디렉토리
+            log_writer: 로그 파일 경로 규칙을 공유할 LogWriter
+            snapshot_interval: 스냅샷 저장 주기 (초)
+        """
+        self.log_dir = log_dir
+        self.summary_dir = os.path.join(log_dir, "summary")
+        self.log_writer = log_writer
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._date: Optional[str] = None
+        self._today = self.aggregate_cls()
+        self._offset = 0
+        self._last_snapshot = time.monotonic()
+        os.makedirs(self.summary_dir, exist_ok=True)
+
+    # ----- 경로 -----
+
+    def _snapshot_path(self, log_file: str) -> str:
+        name = os.path.basename(log_file)[:-len(".jsonl")]
+        return os.path.join(self.summary_dir, f"{name}.snapshot.json")
+
+    def _day_summary_path(self, date: str) -> str:
+        return os.path.join(self.summary_dir, f"{date}.json")
+
+    # ----- 스냅샷 -----
+
+    def _read_snapshot(self, log_file: str) -> Tuple[Any, int]:
+        """로그 파일의 스냅샷 + 스냅샷 이후 추가된 부분 집계"""
+        agg, offset = self.aggregate_cls(), 0
+        snapshot_path = self._snapshot_path(log_file)
+        if os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                agg, offset = self.aggregate_cls.from_dict(data["aggregate"]), data["offset"]
+            except Exception as e:
+                print(f"[{self.__class__.__name__}] 스냅샷 손상, 전체 재집계: {snapshot_path} ({e})")
+                agg, offset = self.aggregate_cls(), 0
+        tail, offset = scan_log(log_file, offset, self.aggregate_cls)
+        agg.merge(tail)
+        return agg, offset
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        """임시 파일에 쓰고 교체 (중간에 죽어도 파일이 깨지지 않음)"""
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def snapshot(self):
+        """현재 워커의 오늘 집계를 디스크에 저장"""
+        with self._lock:
+            if self._date is None:
+                return
+            log_file = self.log_writer.path_for(self.log_dir, self._date)
+            data = {"aggregate": self._today.to_dict(), "offset": self._offset}
+        self._write_json(self._snapshot_path(log_file), data)
+        self._last_snapshot = time.monotonic()
+
+    def load(self):
+        """서버 시작 시 오늘의 집계 복원 (스냅샷 + 나머지 부분만 읽기)"""
+        date = datetime.now().strftime('%Y%m%d')
+        log_file = self.log_writer.path_for(self.log_dir, date)
+        agg, offset = self._read_snapshot(log_file)
+        with self._lock:
+            self._date, self._today, self._offset = date, agg, offset
+
+    # ----- 갱신 -----
+
+    def on_flush(self, batch: List[tuple]):
+        """LogWriter 리스너: 방금 기록된 배치 반영 (기록 스레드에서 호출)"""
+        entries = [(date, entry) for directory, date, entry in batch if directory == self.log_dir]
+        if not entries:
+            return
+        for date, entry in entries:
+            if self._date is not None and date > self._date:
+                # 날짜가 바뀌면 어제 집계를 마지막으로 저장하고 새로 시작
+                self.snapshot()
+                with self._lock:
+                    self._date, self._today, self._offset = date, self.aggregate_cls(), 0
+            with self._lock:
+                if self._date is None:
+                    self._date = date
+                if date == self._date:
+                    self._today.add(entry)
+                # 자정 직후 플러시된 어제 항목은 일별 요약 재계산 때 반영된다
+        log_file = self.log_writer.path_for(self.log_dir, self._date)
+        with self._lock:
+            # 이 리스너는 기록 직후 같은 스레드에서 호출되므로 파일 크기 = 집계에 반영된 위치
+            self._offset = os.path.getsize(log_file) if os.path.exists(log_file) else 0
+        if time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    # ----- 조회 -----
+
+    def _own_log_file(self, date: str) -> str:
+        return self.log_writer.path_for(self.log_dir, date)
+
+    def day_aggregate(self, date: str) -> Any:
+        """
+        하루 집계
+
+        오늘은 이 워커의 메모리 집계 + 다른 워커 파일의 스냅샷(및 그 이후 부분)을 합친다.
+        지난 날짜는 일별 요약 파일을 사용하고, 없거나 로그가 바뀌었으면 새로 만든다.
+        """
+        today = datetime.now().strftime('%Y%m%d')
+        log_files = daily_log_files(self.log_dir, date)
+
+        if date == today:
+            with self._lock:
+                agg = self._today.copy() if self._date == date else self.aggregate_cls()
+            own = self._own_log_file(date)
+            for log_file in log_files:
+                if log_file != own:
+                    agg.merge(self._read_snapshot(log_file)[0])
+            return agg
+
+        sizes = {os.path.basename(p): os.path.getsize(p) for p in log_files}
+        summary_path = self._day_summary_path(date)
+        if os.path.exists(summary_path):
+            try:
+                with open(summary_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("files") == sizes:
+                    return self.aggregate_cls.from_dict(data["aggregate"])
+            except Exception:
+                pass
+
+        agg = self.aggregate_cls()
+        for log_file in log_files:
+            agg.merge(self._read_snapshot(log_file)[0])
+        if log_files:
+            self._write_json(summary_path, {"date": date, "files": sizes, "aggregate": agg.to_dict()})
+        return agg
+
+    def range_summary(self, start: str, end: str) -> Dict[str, Any]:
+        """
+        기간 통계 (start, end: YYYYMMDD, 양 끝 포함)
+        """
+        start_day = datetime.strptime(start, '%Y%m%d')
+        end_day = datetime.strptime(end, '%Y%m%d')
+        if end_day < start_day:
+            raise ValueError("end는 start보다 빠를 수 없습니다")
+
+        total = self.aggregate_cls()
+        days = {}
+        day = start_day
+        while day <= end_day:
+            date = day.strftime('%Y%m%d')
+            agg = self.day_aggregate(date)
+            if agg.count:
+                days[date] = agg.summary()
+                total.merge(agg)
+            day += timedelta(days=1)
+
+        result = total.summary()
+        result["start"] = start
+        result["end"] = end
+        result["days"] = days
+        return result
+
+
+class UsageStats(LogAggregator):
+    """사용 로그(점수/재시도) 증분 집계기"""
+
+    aggregate_cls = DailyAggregate